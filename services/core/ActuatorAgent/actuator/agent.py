@@ -53,6 +53,13 @@ ActuatorAgent Configuration
     "heartbeat_interval"
         How often to send a heartbeat signal to all devices in seconds.
         Defaults to 60.
+    "driver_rpc_concurrency"
+        Maximum number of concurrent calls to the Platform Driver made by
+        get_multiple_points and set_multiple_points. Defaults to 10.
+    "driver_rpc_timeout"
+        Time in seconds get_multiple_points and set_multiple_points wait for
+        all devices to respond. Points on devices that have not responded are
+        reported as errors. Defaults to 30.
 
 
 Sample configuration file
@@ -432,10 +439,13 @@ __docformat__ = 'reStructuredText'
 
 import collections
 import datetime
+import hashlib
 import logging
 import sys
+import time
 
 import gevent
+import gevent.pool
 
 from actuator.scheduler import ScheduleManager
 
@@ -500,12 +510,16 @@ def actuator_agent(config_path, **kwargs):
     driver_vip_identity = config.get('driver_vip_identity', PLATFORM_DRIVER)
 
     allow_no_lock_write = bool(config.get('allow_no_lock_write', True))
+    driver_rpc_concurrency = int(config.get('driver_rpc_concurrency', 10))
+    driver_rpc_timeout = float(config.get('driver_rpc_timeout', 30))
 
     return ActuatorAgent(heartbeat_interval,
                          schedule_publish_interval,
                          preempt_grace_time,
                          driver_vip_identity,
                          allow_no_lock_write,
+                         driver_rpc_concurrency,
+                         driver_rpc_timeout,
                          **kwargs)
 
 
@@ -527,11 +541,17 @@ class ActuatorAgent(Agent):
     :param preempt_grace_time: Time in seconds after a schedule is preemted
         before it is actually cancelled.
     :param driver_vip_identity: VIP identity of the Platform Driver Agent.
+    :param driver_rpc_concurrency: Maximum number of concurrent calls to the
+        Platform Driver for multiple point requests.
+    :param driver_rpc_timeout: Time in seconds to wait for all devices of a
+        multiple point request to respond.
 
     :type heartbeat_interval: float
     :type schedule_publish_interval: float
     :type preempt_grace_time: float
     :type driver_vip_identity: str
+    :type driver_rpc_concurrency: int
+    :type driver_rpc_timeout: float
     """
 
     def __init__(self, heartbeat_interval=60,
@@ -539,6 +559,8 @@ class ActuatorAgent(Agent):
                  preempt_grace_time=60,
                  driver_vip_identity=PLATFORM_DRIVER,
                  allow_no_lock_write=True,
+                 driver_rpc_concurrency=10,
+                 driver_rpc_timeout=30,
                  **kwargs):
 
         super(ActuatorAgent, self).__init__(**kwargs)
@@ -556,12 +578,16 @@ class ActuatorAgent(Agent):
         #Only turn this on once we have confirmation from the config store.
         self.allow_no_lock_write = False
         self._update_event_time = None
+        self.driver_rpc_concurrency = driver_rpc_concurrency
+        self.driver_rpc_timeout = driver_rpc_timeout
 
         self.default_config = {"heartbeat_interval": heartbeat_interval,
                               "schedule_publish_interval": schedule_publish_interval,
                               "preempt_grace_time": preempt_grace_time,
                               "driver_vip_identity": driver_vip_identity,
-                               "allow_no_lock_write": allow_no_lock_write}
+                               "allow_no_lock_write": allow_no_lock_write,
+                               "driver_rpc_concurrency": driver_rpc_concurrency,
+                               "driver_rpc_timeout": driver_rpc_timeout}
 
 
         self.vip.config.set_default("config", self.default_config)
@@ -580,6 +606,10 @@ class ActuatorAgent(Agent):
             heartbeat_interval = float(config["heartbeat_interval"])
             preempt_grace_time = float(config["preempt_grace_time"])
             allow_no_lock_write = bool(config["allow_no_lock_write"])
+            driver_rpc_concurrency = int(config["driver_rpc_concurrency"])
+            driver_rpc_timeout = float(config["driver_rpc_timeout"])
+            if driver_rpc_concurrency < 1:
+                raise ValueError("driver_rpc_concurrency must be at least 1")
         except ValueError as e:
             _log.error("ERROR PROCESSING CONFIGURATION: {}".format(e))
             #TODO: set a health status for the agent
@@ -588,6 +618,8 @@ class ActuatorAgent(Agent):
         self.driver_vip_identity = driver_vip_identity
         self.schedule_publish_interval = schedule_publish_interval
         self.allow_no_lock_write = allow_no_lock_write
+        self.driver_rpc_concurrency = driver_rpc_concurrency
+        self.driver_rpc_timeout = driver_rpc_timeout
 
         _log.debug("PlatformDriver VIP IDENTITY: {}".format(self.driver_vip_identity))
         _log.debug("Schedule publish interval: {}".format(self.schedule_publish_interval))
@@ -607,11 +639,12 @@ class ActuatorAgent(Agent):
         _log.debug("Preemption grace period: {}".format(preempt_grace_time))
 
         if self._schedule_manager is None:
-            try:
-                state_string = self.vip.config.get(self.schedule_state_file)
-            except KeyError:
-                state_string = None
-            self._setup_schedule(preempt_grace_time, state_string)
+            # Each task is saved in its own configuration under
+            # schedule_state_file/
+            prefix = self.schedule_state_file + "/"
+            task_states = [self.vip.config.get(name) for name in self.vip.config.list()
+                           if name.startswith(prefix)]
+            self._setup_schedule(preempt_grace_time, task_states)
         else:
             self._schedule_manager.set_grace_period(preempt_grace_time)
 
@@ -652,18 +685,28 @@ class ActuatorAgent(Agent):
             _log.warning(''.join([e.__class__.__name__, '(', str(e), ')']))
 
 
-    def _schedule_save_callback(self, state_file_contents):
-        _log.debug("Saving schedule state")
-        self.vip.config.set(self.schedule_state_file, state_file_contents, send_update=False)
+    def _schedule_save_task_callback(self, task_id, task_state):
+        _log.debug("Saving schedule state of task {}".format(task_id))
+        # Task ids are case sensitive, configuration names are not.
+        config_name = "{}/{}".format(self.schedule_state_file,
+                                     hashlib.sha1(task_id.encode('utf-8')).hexdigest())
+        if task_state is not None:
+            self.vip.config.set(config_name, task_state, send_update=False)
+            return
+        try:
+            self.vip.config.delete(config_name, send_update=False)
+        except RemoteError:
+            # The task finished before it was ever saved.
+            _log.debug("No saved state for task {}".format(task_id))
 
 
-    def _setup_schedule(self, preempt_grace_time, initial_state=None):
+    def _setup_schedule(self, preempt_grace_time, initial_task_states=None):
         now = utils.get_aware_utc_now()
         self._schedule_manager = ScheduleManager(
             preempt_grace_time,
             now=now,
-            save_state_callback=self._schedule_save_callback,
-            initial_state_string=initial_state)
+            save_task_callback=self._schedule_save_task_callback,
+            initial_task_states=initial_task_states)
 
         self._update_device_state_and_schedule(now)
 
@@ -962,7 +1005,10 @@ class ActuatorAgent(Agent):
         """RPC method
 
         Get multiple points on multiple devices. Makes a single
-        RPC call to the platform driver per device.
+        RPC call to the platform driver per device. Devices are read
+        concurrently, at most driver_rpc_concurrency at a time. Points on
+        devices that fail or do not respond within driver_rpc_timeout
+        seconds are reported in the error dictionary.
 
         :param topics: List of topics or list of [device, point] pairs.
         :param \*\*kwargs: Any driver specific parameters
@@ -990,15 +1036,18 @@ class ActuatorAgent(Agent):
                 e = ValueError("Invalid topic: {}".format(topic))
                 errors[repr(topic)] = repr(e)
 
-        for device, point_names in devices.items():
-            r, e = self.vip.rpc.call(self.driver_vip_identity,
-                                     'get_multiple_points',
-                                     device,
-                                     point_names,
-                                     **kwargs).get()
+        def on_result(device, point_names, result):
+            r, e = result
             results.update(r)
             errors.update(e)
 
+        def on_error(device, point_names, exc):
+            for point_name in point_names:
+                errors[device + '/' + point_name] = repr(exc)
+
+        self._call_driver_per_device('get_multiple_points', devices,
+                                     on_result, on_error, **kwargs)
+
         return results, errors
 
     @RPC.export
@@ -1006,7 +1055,10 @@ class ActuatorAgent(Agent):
         """RPC method
 
         Set multiple points on multiple devices. Makes a single
-        RPC call to the platform driver per device.
+        RPC call to the platform driver per device. Devices are written
+        concurrently, at most driver_rpc_concurrency at a time. Points on
+        devices that fail or do not respond within driver_rpc_timeout
+        seconds are reported as errors.
 
         :param requester_id: Ignored, VIP Identity used internally
         :param topics_values: List of (topic, value) tuples
@@ -1039,16 +1091,66 @@ class ActuatorAgent(Agent):
             if not self._check_lock(device, requester_id):
                 raise LockError("caller ({}) does not lock for device {}".format(requester_id, device))
 
-        for device, point_names_values in devices.items():
-            r = self.vip.rpc.call(self.driver_vip_identity,
-                                  'set_multiple_points',
-                                  device,
-                                  point_names_values,
-                                  **kwargs).get()
-            results.update(r)
+        def on_result(device, point_names_values, result):
+            results.update(result)
+
+        def on_error(device, point_names_values, exc):
+            for point_name, _ in point_names_values:
+                results[device + '/' + point_name] = repr(exc)
+
+        self._call_driver_per_device('set_multiple_points', devices,
+                                     on_result, on_error, **kwargs)
 
         return results
 
+    def _call_driver_per_device(self, method, devices, on_result, on_error,
+                                **kwargs):
+        """
+        Call a Platform Driver RPC method once per device, running up to
+        driver_rpc_concurrency calls at a time. Results are passed to
+        on_result(device, args, result) as each call completes. Failed calls
+        and calls still pending driver_rpc_timeout seconds after the first
+        call was made are passed to on_error(device, args, exception).
+        Devices whose turn comes after the timeout are not called at all and
+        are passed to on_error with a TimeoutError saying so, so a caller can
+        retry them without writing a point twice.
+
+        :param method: Platform Driver RPC method taking (device, args)
+        :param devices: Dictionary of device to the args for that device
+        """
+        deadline = time.monotonic() + self.driver_rpc_timeout
+        pool = gevent.pool.Pool(self.driver_rpc_concurrency)
+
+        def call(device, args):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                e = TimeoutError("{} not attempted for device {}, no time left of {} seconds".format(
+                    method, device, self.driver_rpc_timeout))
+                _log.warning(str(e))
+                on_error(device, args, e)
+                return
+            try:
+                result = self.vip.rpc.call(self.driver_vip_identity,
+                                           method,
+                                           device,
+                                           args,
+                                           **kwargs).get(timeout=remaining)
+            except gevent.Timeout:
+                e = TimeoutError("No response from {} for device {} within {} seconds".format(
+                    self.driver_vip_identity, device, self.driver_rpc_timeout))
+                _log.warning(str(e))
+                on_error(device, args, e)
+            except Exception as e:
+                _log.warning("{} failed for device {}: {!r}".format(method, device, e))
+                on_error(device, args, e)
+            else:
+                on_result(device, args, result)
+
+        for device, args in devices.items():
+            # Blocks while driver_rpc_concurrency calls are in progress.
+            pool.spawn(call, device, args)
+        pool.join()
+
     def handle_revert_point(self, peer, sender, bus, topic, headers, message):
         """
         Revert the value of a point.
@@ -24,7 +24,9 @@
 
 
 import bisect
+import heapq
 import logging
+from base64 import b64decode, b64encode
 from pickle import dumps, loads
 from collections import defaultdict, namedtuple
 from copy import deepcopy
@@ -45,6 +47,13 @@ DeviceState = namedtuple('DeviceState',
 _log = logging.getLogger(__name__)
 
 
+def round_event_time(event_time):
+    # Round to the next second to fix timer goofyness in agent timers.
+    if event_time.microsecond:
+        event_time = event_time.replace(microsecond=0) + timedelta(seconds=1)
+    return event_time
+
+
 class TimeSlice:
     def __init__(self, start=None, end=None):
         if end is None:
@@ -223,6 +232,20 @@ class Task:
 
         return None
 
+    def get_next_transition(self, now):
+        """Return the exact time after now at which the state of this task
+        or one of its device schedules changes next."""
+        events = [x for x in (self.time_slice.start, self.time_slice.end)
+                  if x is not None and x > now]
+        events.extend(x for x in (schedule.get_next_transition(now)
+                                  for schedule in self.devices.values())
+                      if x is not None)
+
+        if events:
+            return min(events)
+
+        return None
+
 
 class ScheduleError(Exception):
     pass
@@ -254,18 +277,18 @@ class Schedule:
     def get_next_event_time(self, now):
         """Run this to know when to the next state change is going to happen
         with this schedule"""
+        next_time = self.get_next_transition(now)
+        if next_time is None:
+            return None
+        return round_event_time(next_time)
+
+    def get_next_transition(self, now):
+        """Exact time of the next slot start or end after now."""
         self.make_current(now)
         if not self.time_slots:
             return None
-        _log.debug("in schedule get_next_event_time timeslots {} now {}"
-                   .format(self.time_slots[0], now))
-        next_time = self.time_slots[0].end if self.time_slots[
+        return self.time_slots[0].end if self.time_slots[
             0].contains_include_start(now) else self.time_slots[0].start
-        # Round to the next second to fix timer goofyness in agent timers.
-        if next_time.microsecond:
-            next_time = next_time.replace(microsecond=0) + timedelta(seconds=1)
-
-        return next_time
 
     def get_current_slot(self, now):
         self.make_current(now)
@@ -309,16 +332,94 @@ class Schedule:
         pass
 
 
+class DeviceSlotIndex:
+    """Reserved time slots of every device ordered by start time.
+
+    Entries are (start, end, task_id) tuples. Slots of one device only
+    overlap during preemption grace periods, so every slot overlapping a
+    given time slice starts less than the longest slot duration of the
+    device before it. Lookups bisect to that range instead of checking
+    every task."""
+
+    def __init__(self):
+        self._slots = defaultdict(list)
+        self._max_duration = {}
+        self._task_entries = defaultdict(list)
+
+    def add_task(self, task_id, task):
+        for device, schedule in task.devices.items():
+            slots = self._slots[device]
+            for time_slot in schedule.time_slots:
+                entry = (time_slot.start, time_slot.end, task_id)
+                bisect.insort(slots, entry)
+                self._task_entries[task_id].append((device, entry))
+                duration = time_slot.end - time_slot.start
+                self._max_duration[device] = max(
+                    duration, self._max_duration.get(device, duration))
+
+    def remove_task(self, task_id):
+        for device, entry in self._task_entries.pop(task_id, ()):
+            slots = self._slots[device]
+            index = bisect.bisect_left(slots, entry)
+            if index < len(slots) and slots[index] == entry:
+                del slots[index]
+            if not slots:
+                del self._slots[device]
+                del self._max_duration[device]
+
+    def get_conflicts(self, task, now):
+        """Return {task_id: {device: [(start, end), ...]}} of the reserved
+        slots that overlap the slots of task."""
+        results = defaultdict(dict)
+        for device, schedule in task.devices.items():
+            slots = self._slots.get(device)
+            if not slots:
+                continue
+            max_duration = self._max_duration[device]
+            conflicts = set()
+            for time_slot in schedule.time_slots:
+                low = bisect.bisect_left(slots,
+                                         (time_slot.start - max_duration,))
+                high = bisect.bisect_left(slots, (time_slot.end,))
+                for entry in slots[low:high]:
+                    start, end, _ = entry
+                    # Skip slots that are already over.
+                    if end <= now and start < now:
+                        continue
+                    if end > time_slot.start:
+                        conflicts.add(entry)
+            for start, end, task_id in sorted(conflicts):
+                results[task_id].setdefault(device, []).append((start, end))
+        return results
+
+
 class ScheduleManager:
-    def __init__(self, grace_time, now=None, save_state_callback=None, initial_state_string=None):
+    def __init__(self, grace_time, now=None, save_state_callback=None, initial_state_string=None,
+                 save_task_callback=None, initial_task_states=None):
+        """
+        :param save_state_callback: called with the pickled state of all tasks
+            whenever the schedule changes.
+        :param save_task_callback: called with (task_id, task_state) for each
+            task that changed since the last save instead of saving all
+            tasks. task_state is None when the task was removed.
+        :param initial_task_states: task states previously passed to
+            save_task_callback.
+        """
         self.tasks = {}
         self.running_tasks = set()
         self.preempted_tasks = set()
         self.set_grace_period(grace_time)
         self.save_state_callback = save_state_callback
+        self.save_task_callback = save_task_callback
+        self._slot_index = DeviceSlotIndex()
+        # Heap of (time, task_id) of the next transition of each task.
+        self._events = []
+        self._event_times = {}
+        self._changed_tasks = set()
         if now is None:
             now = utils.get_aware_utc_now()
         self.load_state(now, initial_state_string)
+        self.load_task_states(now, initial_task_states)
 
     def set_grace_period(self, seconds):
         self.grace_time = timedelta(seconds=seconds)
@@ -328,13 +429,44 @@ class ScheduleManager:
             return
 
         try:
-            self.tasks = loads(initial_state_string)
-            self._cleanup(now)
+            tasks = loads(initial_state_string)
         except Exception:
-            self.tasks = {}
+            tasks = {}
             _log.error ('Scheduler state file corrupted!')
 
+        for task_id, task in tasks.items():
+            self._add_task(task_id, task, now)
+
+    def load_task_states(self, now, task_states):
+        if not task_states:
+            return
+
+        for task_state in task_states:
+            try:
+                task_id, task = loads(b64decode(task_state))
+            except Exception:
+                _log.error('Scheduler task state corrupted!')
+                continue
+            # Tasks that finished while we were not running are removed
+            # from the saved state on the next save.
+            self._add_task(task_id, task, now)
+
+    @staticmethod
+    def dump_task(task_id, task):
+        return b64encode(dumps((task_id, task))).decode('ascii')
+
     def save_state(self, now):
+        if self.save_task_callback is not None:
+            changed_tasks, self._changed_tasks = self._changed_tasks, set()
+            for task_id in changed_tasks:
+                task = self.tasks.get(task_id)
+                try:
+                    self.save_task_callback(
+                        task_id, None if task is None else self.dump_task(task_id, task))
+                except Exception:
+                    _log.error('Failed to save scheduler state for task {}!'.format(task_id))
+            return
+
         if self.save_state_callback is None:
             return
 
@@ -387,14 +519,17 @@ class ScheduleManager:
         conflicts = defaultdict(dict)
         preempted_tasks = set()
 
-        for task_id, task in self.tasks.items():
-            conflict_list = new_task.get_conflicts(task)
+        # Only the tasks holding slots that overlap the request are checked.
+        for task_id, device_conflicts in self._slot_index.get_conflicts(new_task, now).items():
+            task = self.tasks[task_id]
             agent_id = task.agent_id
-            if conflict_list:
-                if not new_task.check_can_preempt_other(task):
-                    conflicts[agent_id][task_id] = conflict_list
-                else:
-                    preempted_tasks.add((agent_id, task_id))
+            if not new_task.check_can_preempt_other(task):
+                conflicts[agent_id][task_id] = [
+                    [device, str(start), str(end)]
+                    for device in new_task.devices if device in device_conflicts
+                    for start, end in device_conflicts[device]]
+            else:
+                preempted_tasks.add((agent_id, task_id))
 
         if conflicts:
             return RequestResult(False, conflicts,
@@ -403,11 +538,17 @@ class ScheduleManager:
             # By this point we know that any remaining conflicts can be
             # preempted
         # and the request will succeed.
-        self.tasks[id_] = new_task
+        self._add_task(id_, new_task, now)
+        self._changed_tasks.add(id_)
 
         for _, task_id in preempted_tasks:
             task = self.tasks[task_id]
             task.preempt(self.grace_time, now)
+            # Preemption shrinks the slots of the task.
+            self._slot_index.remove_task(task_id)
+            self._slot_index.add_task(task_id, task)
+            self._update_task(task_id, now)
+            self._changed_tasks.add(task_id)
 
         self.save_state(now)
 
@@ -422,7 +563,7 @@ class ScheduleManager:
         if task.agent_id != agent_id:
             return RequestResult(False, {}, 'AGENT_ID_TASK_ID_MISMATCH')
 
-        del self.tasks[task_id]
+        self._remove_task(task_id)
 
         self.save_state(now)
 
@@ -455,38 +596,67 @@ class ScheduleManager:
         return running_results
 
     def get_next_event_time(self, now):
-        task_times = (x.get_next_event_time(now) for x in self.tasks.values())
-        events = [x for x in task_times if x is not None]
-
-        if events:
-            return min(events)
+        self._cleanup(now)
+        while self._events:
+            event_time, task_id = self._events[0]
+            if self._event_times.get(task_id) == event_time:
+                return round_event_time(event_time)
+            heapq.heappop(self._events)
 
         return None
 
+    def _add_task(self, task_id, task, now):
+        self.tasks[task_id] = task
+        self._slot_index.add_task(task_id, task)
+        self._update_task(task_id, now)
+
+    def _remove_task(self, task_id):
+        del self.tasks[task_id]
+        self._slot_index.remove_task(task_id)
+        self._event_times.pop(task_id, None)
+        self.running_tasks.discard(task_id)
+        self.preempted_tasks.discard(task_id)
+        self._changed_tasks.add(task_id)
+
+    def _update_task(self, task_id, now):
+        """Bring a task up to date with the current time and queue its next
+        transition."""
+        task = self.tasks[task_id]
+        task.make_current(now)
+        self.running_tasks.discard(task_id)
+        self.preempted_tasks.discard(task_id)
+
+        if task.state == Task.STATE_FINISHED:
+            self._remove_task(task_id)
+            return
+
+        if task.state == Task.STATE_RUNNING:
+            self.running_tasks.add(task_id)
+
+        elif task.state == Task.STATE_PREEMPTED:
+            self.preempted_tasks.add(task_id)
+
+        next_time = task.get_next_transition(now)
+        if next_time is None:
+            self._event_times.pop(task_id, None)
+        elif self._event_times.get(task_id) != next_time:
+            self._event_times[task_id] = next_time
+            heapq.heappush(self._events, (next_time, task_id))
+
     def _cleanup(self, now):
         """Cleans up self and contained tasks to reflect the current time.
+        Only tasks with a transition due by now are updated.
         Should be called:
         1. Before serializing to disk.
         2. After reading from disk.
         3. Before handling a schedule submission request.
         4. After handling a schedule submission request.
         5. Before handling a state request."""
-
-        # Reset the running tasks.
-        self.running_tasks = set()
-        self.preempted_tasks = set()
-
-        for task_id in list(self.tasks.keys()):
-            task = self.tasks[task_id]
-            task.make_current(now)
-            if task.state == Task.STATE_FINISHED:
-                del self.tasks[task_id]
-
-            elif task.state == Task.STATE_RUNNING:
-                self.running_tasks.add(task_id)
-
-            elif task.state == Task.STATE_PREEMPTED:
-                self.preempted_tasks.add(task_id)
+        while self._events and self._events[0][0] <= now:
+            event_time, task_id = heapq.heappop(self._events)
+            if self._event_times.get(task_id) == event_time and task_id in self.tasks:
+                del self._event_times[task_id]
+                self._update_task(task_id, now)
 
     def __repr__(self):
         pass
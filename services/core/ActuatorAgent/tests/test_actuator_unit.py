@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2023 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+
+"""
+Unit tests for the per device fan-out of get_multiple_points and
+set_multiple_points to the Platform Driver.
+"""
+
+import gevent
+import pytest
+from gevent.event import AsyncResult
+
+from actuator.agent import ActuatorAgent
+from volttron.platform.vip.agent import Agent
+from volttrontesting.utils.utils import AgentMock
+
+ActuatorAgent.__bases__ = (AgentMock.imitate(Agent, Agent()),)
+ActuatorAgent.core.identity = "platform.actuator"
+
+
+class FakeDriver:
+    """Answers Platform Driver RPC calls after a per device delay."""
+
+    def __init__(self, delays=None, failures=None):
+        self.delays = delays or {}
+        self.failures = failures or {}
+        self.calls = []
+        self.active = 0
+        self.peak = 0
+
+    def call(self, peer, method, device, args, **kwargs):
+        self.calls.append((method, device))
+        result = AsyncResult()
+        gevent.spawn(self._respond, result, method, device, args)
+        return result
+
+    def _respond(self, result, method, device, args):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            gevent.sleep(self.delays.get(device, 0.01))
+        finally:
+            self.active -= 1
+        if device in self.failures:
+            result.set_exception(self.failures[device])
+        elif method == 'get_multiple_points':
+            result.set(({device + '/' + point: 1 for point in args}, {}))
+        else:
+            result.set({})
+
+
+@pytest.fixture
+def actuator():
+    agent = ActuatorAgent(driver_vip_identity='platform.driver', driver_rpc_concurrency=2, driver_rpc_timeout=1)
+    agent.driver_vip_identity = 'platform.driver'
+    agent.allow_no_lock_write = True
+    agent.vip.rpc.context.vip_message.peer = 'requester'
+    yield agent
+    agent.vip.rpc.call.side_effect = None
+    agent.vip.rpc.call.reset_mock()
+
+
+@pytest.mark.actuator
+def test_get_multiple_points_should_limit_concurrent_driver_calls(actuator):
+    driver = FakeDriver()
+    actuator.vip.rpc.call.side_effect = driver.call
+    topics = ['campus/device{}/point'.format(i) for i in range(6)]
+
+    results, errors = actuator.get_multiple_points(topics)
+
+    assert results == {topic: 1 for topic in topics}
+    assert errors == {}
+    assert len(driver.calls) == 6
+    assert driver.peak == 2
+
+
+@pytest.mark.actuator
+def test_get_multiple_points_should_attribute_errors_to_devices(actuator):
+    driver = FakeDriver(failures={'campus/device1': ValueError('bad register')})
+    actuator.vip.rpc.call.side_effect = driver.call
+
+    results, errors = actuator.get_multiple_points(['campus/device0/a', 'campus/device1/b', 'campus/device1/c',
+                                                    ['campus/device2', 'd']])
+
+    assert results == {'campus/device0/a': 1, 'campus/device2/d': 1}
+    assert set(errors) == {'campus/device1/b', 'campus/device1/c'}
+    assert 'bad register' in errors['campus/device1/b']
+
+
+@pytest.mark.actuator
+def test_set_multiple_points_should_not_call_devices_after_timeout(actuator):
+    actuator.driver_rpc_concurrency = 1
+    actuator.driver_rpc_timeout = 0.05
+    driver = FakeDriver(delays={'campus/device0': 0.2})
+    actuator.vip.rpc.call.side_effect = driver.call
+
+    errors = actuator.set_multiple_points('requester', [('campus/device0/a', 1), ('campus/device1/b', 2)])
+
+    # device0 was called and did not answer in time, device1 was never called.
+    assert driver.calls == [('set_multiple_points', 'campus/device0')]
+    assert 'No response' in errors['campus/device0/a']
+    assert 'not attempted' in errors['campus/device1/b']
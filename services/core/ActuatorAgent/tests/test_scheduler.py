@@ -363,3 +363,73 @@ def test_conflict_override_success_running_agent2():
     assert data2 == {('Agent1', 'Task1')}
     assert info_string2 == ''
     assert event_time2 == parse('2013-11-27 12:26:00')
+
+
+def test_many_devices_conflicts():
+    print('Test conflicts among many reservations', now)
+    sch_man = ScheduleManager(60, now=now)
+    start = parse('2013-11-27 12:00:00')
+    for i in range(200):
+        result = sch_man.request_slots('Agent{}'.format(i), 'Task{}'.format(i),
+                                       [['campus/building/rtu{}'.format(i % 10),
+                                         start + timedelta(minutes=10 * (i // 10)),
+                                         start + timedelta(minutes=10 * (i // 10 + 1))]],
+                                       PRIORITY_LOW, now)
+        assert result.success
+
+    result = sch_man.request_slots('Agent', 'Task',
+                                   [['campus/building/rtu3', start + timedelta(minutes=25),
+                                     start + timedelta(minutes=45)],
+                                    ['campus/building/rtu4', start + timedelta(minutes=30),
+                                     start + timedelta(minutes=30)]],
+                                   PRIORITY_LOW, now)
+    assert not result.success
+    assert result.data == {'Agent23': {'Task23': [['campus/building/rtu3', '2013-11-27 12:20:00',
+                                                   '2013-11-27 12:30:00']]},
+                           'Agent33': {'Task33': [['campus/building/rtu3', '2013-11-27 12:30:00',
+                                                   '2013-11-27 12:40:00']]},
+                           'Agent43': {'Task43': [['campus/building/rtu3', '2013-11-27 12:40:00',
+                                                   '2013-11-27 12:50:00']]}}
+    assert sch_man.get_next_event_time(now) == start
+
+    state = sch_man.get_schedule_state(start + timedelta(minutes=15))
+    assert len(state) == 10
+    assert state['campus/building/rtu3'] == DeviceState('Agent13', 'Task13', 300.0)
+    assert sch_man.get_next_event_time(start + timedelta(minutes=15)) == start + timedelta(minutes=20)
+    assert len(sch_man.tasks) == 190
+
+
+def test_save_changed_tasks_only():
+    print('Test saving and restoring individual tasks', now)
+    saved = {}
+
+    def save_task(task_id, task_state):
+        if task_state is None:
+            del saved[task_id]
+        else:
+            saved[task_id] = task_state
+
+    sch_man = ScheduleManager(60, now=now, save_task_callback=save_task)
+    for i in range(3):
+        result = sch_man.request_slots('Agent1', 'Task{}'.format(i),
+                                       [['campus/building/rtu{}'.format(i), parse('2013-11-27 12:00:00'),
+                                         parse('2013-11-27 13:00:00')]],
+                                       PRIORITY_LOW, now)
+        assert result.success
+    assert sorted(saved) == ['Task0', 'Task1', 'Task2']
+
+    saved_states = dict(saved)
+    sch_man.cancel_task('Agent1', 'Task1', now)
+    assert sorted(saved) == ['Task0', 'Task2']
+    # Unchanged tasks are not saved again
+    assert saved['Task0'] is saved_states['Task0']
+
+    restored = ScheduleManager(60, now=now, save_task_callback=save_task,
+                               initial_task_states=list(saved.values()))
+    assert sorted(restored.tasks) == ['Task0', 'Task2']
+    result = restored.request_slots('Agent2', 'Task3',
+                                    [['campus/building/rtu0', parse('2013-11-27 12:30:00'),
+                                      parse('2013-11-27 12:45:00')]],
+                                    PRIORITY_LOW, now)
+    assert not result.success
+    assert list(result.data) == ['Agent1']
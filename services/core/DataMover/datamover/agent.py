@@ -29,7 +29,7 @@ import time
 import gevent
 
 from volttron.platform.agent import utils
-from volttron.platform.agent.base_historian import BaseHistorian, add_timing_data_to_header
+from volttron.platform.agent.base_historian import BaseHistorian, add_timing_data_to_header, build_insert_batch
 from volttron.platform.agent.known_identities import PLATFORM_HISTORIAN
 from volttron.platform.keystore import KnownHostsStore
 from volttron.platform.messaging import headers as headers_mod
@@ -37,6 +37,12 @@ from volttron.platform.messaging.health import STATUS_BAD, Status
 from volttron.platform.vip.agent.utils import build_agent
 
 DATAMOVER_TIMEOUT_KEY = 'DATAMOVER_TIMEOUT_KEY'
+# Seconds to wait for the destination historian to answer an RPC call.
+INSERT_TIMEOUT = 10
+# Seconds between insert_credit calls while the destination historian
+# reports no credit, and the longest it is waited for in one publish.
+CREDIT_POLL_INTERVAL = 1
+MAX_CREDIT_WAIT = 30
 utils.setup_logging()
 _log = logging.getLogger(__name__)
 __version__ = '0.1'
@@ -76,24 +82,39 @@ class DataMover(BaseHistorian):
         :param destination_historian_identity: vip identity of the
         destination historian. default is 'platform.historian'
         :param destination_instance_name: instance name of destination server
+        :param bulk_insert: send data with the insert_batch RPC method of the
+        destination historian, which reports how many more records it can
+        accept, instead of the insert RPC method
+        :param max_bulk_batch_size: maximum number of records sent in one
+        insert_batch call
         :param kwargs: additional arguments to be passed along to parent class
         """
         kwargs["process_loop_in_greenlet"] = True
         self.destination_instance_name = kwargs.pop('destination_instance_name', None)
         self.destination_message_bus = kwargs.pop('destination_message_bus', 'zmq')
+        self.bulk_insert = bool(kwargs.pop('bulk_insert', False))
+        self.max_bulk_batch_size = int(kwargs.pop('max_bulk_batch_size', 5000))
         super(DataMover, self).__init__(**kwargs)
         self.destination_vip = destination_vip
         self.destination_serverkey = destination_serverkey
         self.destination_historian_identity = destination_historian_identity
         self.remote_identity = remote_identity
         self._target_platform = None
+        # Adapted to the destination's throughput while sending in bulk.
+        self._bulk_batch_size = self.max_bulk_batch_size
+        # Records the destination historian will accept, None until it tells us.
+        self._insert_credit = None
+        # Set while the destination historian applies backpressure.
+        self._destination_busy = False
 
         self.local_message_bus = utils.get_messagebus()
         self.rmq_to_rmq_comm = False
         config = {"destination_vip":self.destination_vip,
                   "destination_serverkey": self.destination_serverkey,
                   "destination_historian_identity": self.destination_historian_identity,
-                  "remote_identity": self.remote_identity
+                  "remote_identity": self.remote_identity,
+                  "bulk_insert": self.bulk_insert,
+                  "max_bulk_batch_size": self.max_bulk_batch_size
                   }
 
         self.update_default_config(config)
@@ -109,6 +130,18 @@ class DataMover(BaseHistorian):
         self.destination_historian_identity = str(configuration.get('destination_historian_identity',
                                                                     PLATFORM_HISTORIAN))
         self.remote_identity = configuration.get("remote_identity")
+        self.bulk_insert = bool(configuration.get("bulk_insert", False))
+        self.max_bulk_batch_size = max(int(configuration.get("max_bulk_batch_size", 5000)), 1)
+        self._bulk_batch_size = self.max_bulk_batch_size
+        self._insert_credit = None
+
+    def _send_alert(self, updates, key):
+        # Records left in the cache because the destination historian has no
+        # credit are held back by flow control, not lost by a failure.
+        if key == "historian_not_publishing" and self._destination_busy:
+            _log.info("Destination historian is not accepting records yet, keeping them cached.")
+            return
+        super(DataMover, self)._send_alert(updates, key)
 
     # Redirect the normal capture functions to capture_data.
     def _capture_device_data(self, peer, sender, bus, topic, headers, message):
@@ -185,6 +218,10 @@ class DataMover(BaseHistorian):
                             'headers': headers,
                             'message': message})
 
+        if self.bulk_insert:
+            self._publish_bulk(to_publish_list, to_send)
+            return
+
         with gevent.Timeout(30):
             try:
                 _log.debug("Sending to destination historian.")
@@ -209,6 +246,80 @@ class DataMover(BaseHistorian):
                 self.vip.health.set_status(
                     STATUS_BAD, "Timeout occurred")
 
+    def _call_destination(self, method, *args):
+        # If local and destination platforms are using RMQ message bus,
+        # then shovel will be used to setup the connection and forwarding
+        # of data.
+        if self.rmq_to_rmq_comm:
+            return self.vip.rpc.call(self.destination_historian_identity, method, *args,
+                                     external_platform=self.destination_instance_name)
+        return self._target_platform.vip.rpc.call(self.destination_historian_identity, method, *args)
+
+    def _publish_bulk(self, to_publish_list, to_send):
+        """
+        Send records with the insert_batch RPC method of the destination
+        historian. A batch holds no more records than the credit the
+        destination last reported and the current batch size, which halves
+        after a timeout and doubles, up to max_bulk_batch_size, after a batch
+        is accepted quickly. Records are removed from the cache as their
+        batch is accepted. While the destination reports no credit it is
+        polled for up to MAX_CREDIT_WAIT seconds. Records it still does not
+        accept stay in the cache without raising a publishing alert.
+        """
+        sent = 0
+        self._destination_busy = False
+        try:
+            while sent < len(to_send):
+                size = min(self._bulk_batch_size, len(to_send) - sent)
+                if self._insert_credit is not None:
+                    size = min(size, self._insert_credit)
+                if size == 0:
+                    self._insert_credit = self._wait_for_credit()
+                    if self._insert_credit == 0:
+                        _log.info("Destination historian accepted no records for {} seconds.".format(
+                            MAX_CREDIT_WAIT))
+                        self._destination_busy = True
+                        break
+                    continue
+
+                start = time.monotonic()
+                result = self._call_destination('insert_batch',
+                                                build_insert_batch(to_send[sent:sent + size])).get(
+                    timeout=INSERT_TIMEOUT)
+                self._insert_credit = result['credit']
+                if result['accepted']:
+                    self.report_handled(to_publish_list[sent:sent + size])
+                    sent += size
+                    if time.monotonic() - start < INSERT_TIMEOUT / 4:
+                        self._bulk_batch_size = min(self._bulk_batch_size * 2, self.max_bulk_batch_size)
+        except gevent.Timeout:
+            self._bulk_batch_size = max(self._bulk_batch_size // 2, 1)
+            self._insert_credit = None
+            self._last_timeout = self.timestamp()
+            if self._target_platform:
+                self._target_platform.core.stop()
+            self._target_platform = None
+            _log.error("Timeout when attempting to publish to target.")
+            self.vip.health.set_status(
+                STATUS_BAD, "Timeout occurred")
+
+        _log.debug("Sent {} of {} records, batch size {}, credit {}".format(
+            sent, len(to_send), self._bulk_batch_size, self._insert_credit))
+
+    def _wait_for_credit(self):
+        """
+        Ask the destination historian for its credit until it reports some or
+        MAX_CREDIT_WAIT seconds have passed.
+
+        :return: the last credit reported
+        """
+        deadline = time.monotonic() + MAX_CREDIT_WAIT
+        while True:
+            credit = self._call_destination('insert_credit').get(timeout=INSERT_TIMEOUT)['credit']
+            if credit or time.monotonic() + CREDIT_POLL_INTERVAL > deadline:
+                return credit
+            gevent.sleep(CREDIT_POLL_INTERVAL)
+
     def historian_setup(self):
         if self.rmq_to_rmq_comm:
             _log.debug("Setting up to forward to {}".format(self.destination_instance_name))
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2023 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+
+"""
+Unit tests for the bulk_insert publishing of the DataMover.
+"""
+
+from unittest import mock
+
+import gevent
+import pytest
+from gevent.event import AsyncResult
+
+from datamover import agent
+from datamover.agent import DataMover
+from volttron.platform.agent.base_historian import BaseHistorian, BaseHistorianAgent
+from volttron.platform.vip.agent import Agent
+from volttrontesting.utils.utils import AgentMock
+
+DataMover.__bases__ = (AgentMock.imitate(Agent, Agent(), BaseHistorianAgent, BaseHistorian),)
+
+
+class FakeDestination:
+    """Answers insert_credit and insert_batch like a destination historian
+    that accepts up to `credit` queued records."""
+
+    def __init__(self, credits, delay=0, timeouts=0):
+        # Credit reported by each insert_credit call, the last one repeats.
+        self.credits = list(credits)
+        self.delay = delay
+        self.timeouts = timeouts
+        self.batches = []
+        self.credit_calls = 0
+
+    def __call__(self, method, *args):
+        result = AsyncResult()
+        if method == 'insert_credit':
+            self.credit_calls += 1
+            result.set({'credit': self.credits.pop(0) if len(self.credits) > 1 else self.credits[0]})
+        elif self.timeouts:
+            self.timeouts -= 1
+            result.set_exception(gevent.Timeout())
+        else:
+            batch = args[0]
+            self.batches.append(len(batch['topics']))
+            gevent.sleep(self.delay)
+            result.set({'accepted': True, 'credit': 100})
+        return result
+
+
+def records(count):
+    return [{'_id': i, 'topic': 'record/r{}'.format(i),
+             'value': {'headers': {}, 'message': i}}
+            for i in range(count)]
+
+
+def send(datamover, destination, count):
+    to_publish = records(count)
+    to_send = [{'topic': x['topic'], 'headers': {}, 'message': x['value']['message']}
+               for x in to_publish]
+    with mock.patch.object(datamover, '_call_destination', destination):
+        datamover._publish_bulk(to_publish, to_send)
+
+
+def handled_count(datamover):
+    return sum(len(call.args[-1]) for call in datamover.report_handled.call_args_list)
+
+
+@pytest.fixture
+def datamover(monkeypatch):
+    monkeypatch.setattr(agent, 'CREDIT_POLL_INTERVAL', 0.01)
+    monkeypatch.setattr(agent, 'MAX_CREDIT_WAIT', 0.1)
+    datamover = DataMover(destination_vip=None, destination_serverkey=None,
+                          bulk_insert=True, max_bulk_batch_size=8)
+    datamover.report_handled.reset_mock()
+    monkeypatch.setattr(AgentMock, '_send_alert', mock.Mock())
+    yield datamover
+    datamover.report_handled.reset_mock()
+
+
+def test_batches_should_be_limited_by_credit(datamover):
+    datamover._insert_credit = 3
+    destination = FakeDestination([100])
+
+    send(datamover, destination, 10)
+
+    assert destination.batches[0] == 3
+    assert sum(destination.batches) == 10
+    assert handled_count(datamover) == 10
+
+
+def test_zero_credit_should_wait_for_credit(datamover):
+    datamover._insert_credit = 0
+    destination = FakeDestination([0, 0, 5])
+
+    send(datamover, destination, 4)
+
+    assert destination.credit_calls == 3
+    assert destination.batches == [4]
+    assert not datamover._destination_busy
+
+
+def test_zero_credit_should_not_raise_publishing_alert(datamover):
+    datamover._insert_credit = 0
+    destination = FakeDestination([0])
+
+    send(datamover, destination, 4)
+
+    # The cache keeps the records and the base historian's alert is held back
+    assert destination.batches == []
+    assert handled_count(datamover) == 0
+    assert datamover._destination_busy
+    datamover._send_alert({}, "historian_not_publishing")
+    AgentMock._send_alert.assert_not_called()
+    datamover._send_alert({}, "error_managing_db_size")
+    AgentMock._send_alert.assert_called_once()
+
+
+def test_timeout_should_halve_batch_size(datamover):
+    destination = FakeDestination([100], timeouts=1)
+
+    send(datamover, destination, 10)
+
+    assert datamover._bulk_batch_size == 4
+    assert datamover._insert_credit is None
+    assert handled_count(datamover) == 0
+
+
+def test_fast_replies_should_double_batch_size(datamover):
+    datamover._bulk_batch_size = 1
+    destination = FakeDestination([100])
+
+    send(datamover, destination, 15)
+
+    assert destination.batches == [1, 2, 4, 8]
+    assert datamover._bulk_batch_size == 8
+
+
+def test_slow_replies_should_keep_batch_size(datamover, monkeypatch):
+    monkeypatch.setattr(agent, 'INSERT_TIMEOUT', 0.2)
+    datamover._bulk_batch_size = 2
+    destination = FakeDestination([100], delay=0.1)
+
+    send(datamover, destination, 4)
+
+    assert destination.batches == [2, 2]
+    assert datamover._bulk_batch_size == 2
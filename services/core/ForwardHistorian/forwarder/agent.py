@@ -22,6 +22,7 @@
 # ===----------------------------------------------------------------------===
 # }}}
 
+import collections
 import datetime
 import logging
 import sys
@@ -34,6 +35,8 @@ import gevent
 from volttron.platform.vip.agent import Agent, compat, Unreachable
 from volttron.platform.agent.base_historian import BaseHistorian, add_timing_data_to_header
 from volttron.platform.agent import utils
+from volttron.platform.agent.forward_batch import pack_batch
+from volttron.platform.agent.known_identities import PLATFORM_FORWARD_RECEIVER
 from volttron.platform.keystore import KnownHostsStore
 from volttron.platform.messaging import headers as headers_mod
 from volttron.platform.messaging.health import (STATUS_BAD,
@@ -83,6 +86,11 @@ def historian(config_path, **kwargs):
 
     required_target_agents = config.pop('required_target_agents', [])
     cache_only = config.pop('cache_only', False)
+    batch_forwarding = config.pop('batch_forwarding', False)
+    batch_receiver_identity = config.pop('batch_receiver_identity', PLATFORM_FORWARD_RECEIVER)
+    forward_batch_size = config.pop('forward_batch_size', 250)
+    forward_window = config.pop('forward_window', 4)
+    forward_timeout = config.pop('forward_timeout', 30)
 
     utils.update_kwargs_with_config(kwargs, config)
 
@@ -92,6 +100,11 @@ def historian(config_path, **kwargs):
                             required_target_agents=required_target_agents,
                             cache_only=cache_only,
                             destination_address=destination_address,
+                            batch_forwarding=batch_forwarding,
+                            batch_receiver_identity=batch_receiver_identity,
+                            forward_batch_size=forward_batch_size,
+                            forward_window=forward_window,
+                            forward_timeout=forward_timeout,
                             **kwargs)
 
 
@@ -99,6 +112,12 @@ class ForwardHistorian(BaseHistorian):
     """
     This historian forwards data to another instance as if it was published
     originally to the second instance.
+
+    With batch_forwarding enabled cached records are sent in compressed
+    batches of up to forward_batch_size records to the ForwardReceiver agent
+    on the destination instance, which publishes them. Up to forward_window
+    batches are sent before waiting for the receiver to acknowledge the
+    oldest one.
     """
 
     def __init__(self, destination_vip, destination_serverkey,
@@ -107,6 +126,11 @@ class ForwardHistorian(BaseHistorian):
                  required_target_agents=[],
                  cache_only=False,
                  destination_address=None,
+                 batch_forwarding=False,
+                 batch_receiver_identity=PLATFORM_FORWARD_RECEIVER,
+                 forward_batch_size=250,
+                 forward_window=4,
+                 forward_timeout=30,
                  **kwargs):
         kwargs["process_loop_in_greenlet"] = True
         super(ForwardHistorian, self).__init__(**kwargs)
@@ -123,6 +147,14 @@ class ForwardHistorian(BaseHistorian):
         self.required_target_agents = required_target_agents
         self.cache_only = cache_only
         self.destination_address = destination_address
+        self.batch_forwarding = batch_forwarding
+        self.batch_receiver_identity = batch_receiver_identity
+        self.forward_batch_size = forward_batch_size
+        self.forward_window = forward_window
+        self.forward_timeout = forward_timeout
+        # Batches sent to the batch receiver and not yet acknowledged, oldest
+        # first. Kept between calls of publish_to_historian.
+        self._in_flight = collections.deque()
         config = {
             "custom_topic_list": custom_topic_list,
             "topic_replace_list": self.topic_replace_list,
@@ -130,7 +162,12 @@ class ForwardHistorian(BaseHistorian):
             "destination_vip": self.destination_vip,
             "destination_serverkey": self.destination_serverkey,
             "cache_only": self.cache_only,
-            "destination_address": self.destination_address
+            "destination_address": self.destination_address,
+            "batch_forwarding": self.batch_forwarding,
+            "batch_receiver_identity": self.batch_receiver_identity,
+            "forward_batch_size": self.forward_batch_size,
+            "forward_window": self.forward_window,
+            "forward_timeout": self.forward_timeout
         }
 
         self.update_default_config(config)
@@ -148,6 +185,11 @@ class ForwardHistorian(BaseHistorian):
         self.topic_replace_list = configuration.get('topic_replace_list', [])
         self.cache_only = configuration.get('cache_only', False)
         self.destination_address = configuration.get('destination_address', None)
+        self.batch_forwarding = bool(configuration.get('batch_forwarding', False))
+        self.batch_receiver_identity = configuration.get('batch_receiver_identity', PLATFORM_FORWARD_RECEIVER)
+        self.forward_batch_size = max(int(configuration.get('forward_batch_size', 250)), 1)
+        self.forward_window = max(int(configuration.get('forward_window', 4)), 1)
+        self.forward_timeout = float(configuration.get('forward_timeout', 30))
         # Reset the replace map.
         self._topic_replace_map = {}
 
@@ -324,9 +366,13 @@ class ForwardHistorian(BaseHistorian):
                 self.destination_vip, self.destination_address))
             return
 
-        for vip_id in self.required_target_agents:
+        # Ping the required agents concurrently rather than one round trip
+        # after another.
+        pings = [(vip_id, self._target_platform.vip.ping(vip_id))
+                 for vip_id in self.required_target_agents]
+        for vip_id, ping in pings:
             try:
-                self._target_platform.vip.ping(vip_id).get()
+                ping.get()
             except Unreachable:
                 skip = "Skipping publish: Target platform not running " \
                        "required agent {}".format(vip_id)
@@ -342,39 +388,22 @@ class ForwardHistorian(BaseHistorian):
                     STATUS_BAD, err)
                 return
 
+        if self.batch_forwarding:
+            self._publish_batches(to_publish_list)
+            return
+
         for x in to_publish_list:
             topic = x['topic']
             value = x['value']
             # payload = jsonapi.loads(value)
             payload = value
-            headers = payload['headers']
-            headers['X-Forwarded'] = True
-            if 'X-Forwarded-From' in headers:
-                if not isinstance(headers['X-Forwarded-From'], list):
-                    headers['X-Forwarded-From'] = [headers['X-Forwarded-From']]
-                headers['X-Forwarded-From'].append(self.instance_name)
-            else:
-                headers['X-Forwarded-From'] = self.instance_name
-
-            try:
-                del headers['Origin']
-            except KeyError:
-                pass
-            try:
-                del headers['Destination']
-            except KeyError:
-                pass
-
-            if self.gather_timing_data:
-                add_timing_data_to_header(headers,
-                                          self.core.agent_uuid or self.core.identity,
-                                          "forwarded")
+            headers = self._forwarded_headers(payload['headers'])
 
             if timeout_occurred:
                 _log.error(
                     'A timeout has occurred so breaking out of publishing')
                 break
-            with gevent.Timeout(30):
+            with gevent.Timeout(self.forward_timeout):
                 try:
                     self._target_platform.vip.pubsub.publish(
                         peer='pubsub',
@@ -428,6 +457,119 @@ class ForwardHistorian(BaseHistorian):
                 STATUS_GOOD,"published {} items".format(
                     len(to_publish_list)))
 
+    def _forwarded_headers(self, headers):
+        headers['X-Forwarded'] = True
+        if 'X-Forwarded-From' in headers:
+            if not isinstance(headers['X-Forwarded-From'], list):
+                headers['X-Forwarded-From'] = [headers['X-Forwarded-From']]
+            headers['X-Forwarded-From'].append(self.instance_name)
+        else:
+            headers['X-Forwarded-From'] = self.instance_name
+
+        try:
+            del headers['Origin']
+        except KeyError:
+            pass
+        try:
+            del headers['Destination']
+        except KeyError:
+            pass
+
+        if self.gather_timing_data:
+            add_timing_data_to_header(headers,
+                                      self.core.agent_uuid or self.core.identity,
+                                      "forwarded")
+        return headers
+
+    def _publish_batches(self, to_publish_list):
+        """
+        Send the records to the batch receiver of the target platform in
+        batches of forward_batch_size, keeping up to forward_window batches
+        waiting for acknowledgement. The window is kept between calls: records
+        of batches still in flight, which the cache returns again until they
+        are handled, are not sent twice. Records are reported as handled one
+        batch at a time as the receiver acknowledges them, and every call
+        waits for at least one acknowledgement. On failure the window is
+        dropped and the unacknowledged records stay in the cache to be sent
+        again.
+        """
+        in_flight = self._in_flight
+        sent_ids = set(x['_id'] for batch, result in in_flight for x in batch)
+        to_send = [x for x in to_publish_list if x['_id'] not in sent_ids]
+        handled_count = 0
+        timeout_occurred = False
+        error = None
+
+        def send(batch):
+            publishes = [(x['topic'], self._forwarded_headers(x['value']['headers']), x['value']['message'])
+                         for x in batch]
+            result = self._target_platform.vip.rpc.call(self.batch_receiver_identity,
+                                                        'forward_batch',
+                                                        pack_batch(publishes))
+            in_flight.append((batch, result))
+
+        def acknowledge_oldest():
+            batch, result = in_flight[0]
+            result.get(timeout=self.forward_timeout)
+            in_flight.popleft()
+            self.report_handled(batch)
+            return len(batch)
+
+        try:
+            while in_flight and in_flight[0][1].ready():
+                handled_count += acknowledge_oldest()
+            for start in range(0, len(to_send), self.forward_batch_size):
+                if len(in_flight) >= self.forward_window:
+                    handled_count += acknowledge_oldest()
+                send(to_send[start:start + self.forward_batch_size])
+            if not handled_count and in_flight:
+                handled_count += acknowledge_oldest()
+        except gevent.Timeout:
+            _log.error("Timeout waiting for {} on target platform to acknowledge a batch".format(
+                self.batch_receiver_identity))
+            timeout_occurred = True
+            self._last_timeout = self.timestamp()
+            self._num_failures += 1
+            error = "Timeout occured"
+        except Unreachable:
+            _log.error("Target not reachable. Wait till it's ready!")
+            error = "Batch receiver {} not reachable".format(self.batch_receiver_identity)
+        except ZMQError as exc:
+            if exc.errno == ENOTSOCK:
+                _log.error("Target disconnected. Stopping target platform agent")
+                error = "Target platform disconnected"
+            else:
+                _log.error(traceback.format_exc())
+                error = "Unhandled error publishing to target platfom."
+        except Exception:
+            error = "Unhandled error publishing to target platfom."
+            _log.error(error)
+            _log.error(traceback.format_exc())
+
+        if error is not None:
+            # Keep anything the receiver already acknowledged out of the
+            # cache so it is not forwarded twice.
+            for batch, result in in_flight:
+                if result.ready() and result.successful():
+                    self.report_handled(batch)
+                    handled_count += len(batch)
+            in_flight.clear()
+            if timeout_occurred or error == "Target platform disconnected":
+                # Stop the current platform from attempting to connect
+                self.historian_teardown()
+            self.vip.health.set_status(STATUS_BAD, error)
+
+        _log.debug("handled: {} of {} items".format(handled_count, len(to_publish_list)))
+
+        if timeout_occurred:
+            _log.debug('Sending alert from the ForwardHistorian')
+            status = Status.from_json(self.vip.health.get_status_json())
+            self.vip.health.send_alert(FORWARD_TIMEOUT_KEY,
+                                       status)
+        elif error is None:
+            self.vip.health.set_status(
+                STATUS_GOOD, "published {} items".format(handled_count))
+
     @doc_inherit
     def historian_setup(self):
         _log.debug("Setting up to forward to {}".format(self.destination_vip))
@@ -462,6 +604,9 @@ class ForwardHistorian(BaseHistorian):
         if self._target_platform is not None:
             self._target_platform.core.stop()
             self._target_platform = None
+        # Acknowledgements of batches sent to the stopped platform never
+        # arrive, their records are sent again.
+        self._in_flight.clear()
 
 
 def main(argv=sys.argv):
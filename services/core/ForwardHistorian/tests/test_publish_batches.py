@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2023 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+
+"""
+Unit tests for the windowed batch forwarding of the ForwardHistorian.
+"""
+
+from unittest import mock
+
+import gevent
+import pytest
+from gevent.event import AsyncResult
+
+from forwarder.agent import ForwardHistorian
+from volttron.platform.agent.base_historian import BaseHistorian, BaseHistorianAgent
+from volttron.platform.agent.forward_batch import unpack_batch
+from volttron.platform.messaging.health import STATUS_BAD, Status
+from volttron.platform.vip.agent import Agent
+from volttrontesting.utils.utils import AgentMock
+
+ForwardHistorian.__bases__ = (AgentMock.imitate(Agent, Agent(), BaseHistorianAgent, BaseHistorian),)
+
+
+class FakeReceiver:
+    """Records forward_batch calls and leaves them to the test to answer."""
+
+    def __init__(self):
+        self.results = []
+        self.batches = []
+
+    def call(self, peer, method, batch):
+        assert method == 'forward_batch'
+        self.batches.append(unpack_batch(batch))
+        result = AsyncResult()
+        self.results.append(result)
+        return result
+
+    def acknowledge(self, index):
+        self.results[index].set(len(self.batches[index]))
+
+
+def records(first, count):
+    return [{'_id': i, 'topic': 'devices/d{}/all'.format(i),
+             'value': {'headers': {}, 'message': [{'p': i}]}}
+            for i in range(first, first + count)]
+
+
+def handled_ids(historian):
+    return [[x['_id'] for x in call.args[-1]] for call in historian.report_handled.call_args_list]
+
+
+@pytest.fixture
+def historian():
+    historian = ForwardHistorian(destination_vip=None, destination_serverkey=None,
+                                 batch_forwarding=True, forward_batch_size=2,
+                                 forward_window=2, forward_timeout=1)
+    historian.instance_name = 'source'
+    historian.gather_timing_data = False
+    historian.report_handled.reset_mock()
+    historian.vip.health.get_status_json.return_value = Status.build(STATUS_BAD).as_json()
+    historian._target_platform = mock.MagicMock()
+    historian._target_platform.vip.rpc = FakeReceiver()
+    yield historian
+    historian.report_handled.reset_mock()
+
+
+def test_window_should_limit_unacknowledged_batches(historian):
+    receiver = historian._target_platform.vip.rpc
+    gevent.spawn_later(0.1, receiver.acknowledge, 0)
+
+    historian._publish_batches(records(0, 6))
+
+    # The third batch waits for the first to be acknowledged and the call
+    # returns with two batches still in flight.
+    assert [[x[2][0]['p'] for x in batch] for batch in receiver.batches] == [[0, 1], [2, 3], [4, 5]]
+    assert handled_ids(historian) == [[0, 1]]
+    assert len(historian._in_flight) == 2
+
+
+def test_window_should_span_calls(historian):
+    receiver = historian._target_platform.vip.rpc
+    gevent.spawn_later(0.1, receiver.acknowledge, 0)
+    historian._publish_batches(records(0, 4))
+    assert handled_ids(historian) == [[0, 1]]
+
+    # The cache returns the records still in flight again, they are not
+    # sent twice. An acknowledgement already received is enough for the
+    # call to return.
+    receiver.acknowledge(1)
+    historian._publish_batches(records(2, 4))
+    assert handled_ids(historian) == [[0, 1], [2, 3]]
+    assert len(historian._in_flight) == 1
+
+    # Without one the call waits for the oldest batch.
+    gevent.spawn_later(0.1, receiver.acknowledge, 2)
+    historian._publish_batches(records(4, 2))
+
+    assert [[x[2][0]['p'] for x in batch] for batch in receiver.batches] == [[0, 1], [2, 3], [4, 5]]
+    assert handled_ids(historian) == [[0, 1], [2, 3], [4, 5]]
+    assert not historian._in_flight
+
+
+def test_unacknowledged_batches_should_be_sent_again_after_timeout(historian):
+    receiver = historian._target_platform.vip.rpc
+    target = historian._target_platform
+    historian.forward_timeout = 0.2
+    gevent.spawn_later(0.1, receiver.acknowledge, 0)
+
+    historian._publish_batches(records(0, 4))
+    historian._publish_batches(records(2, 2))
+
+    # The second batch is never acknowledged, the target platform is
+    # stopped and the window dropped so the records are retried.
+    assert handled_ids(historian) == [[0, 1]]
+    target.core.stop.assert_called_once()
+    assert historian._target_platform is None
+    assert not historian._in_flight
+
+    historian._target_platform = target
+    historian._last_timeout = 0
+    gevent.spawn_later(0.1, receiver.acknowledge, 2)
+    historian._publish_batches(records(2, 2))
+    assert [[x[2][0]['p'] for x in batch] for batch in receiver.batches] == [[0, 1], [2, 3], [2, 3]]
+    assert handled_ids(historian) == [[0, 1], [2, 3]]
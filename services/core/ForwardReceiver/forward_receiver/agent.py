@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2023 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+import logging
+import sys
+
+import gevent
+
+from volttron.platform.agent import utils
+from volttron.platform.agent.forward_batch import unpack_batch
+from volttron.platform.agent.known_identities import PLATFORM_FORWARD_RECEIVER
+from volttron.platform.vip.agent import Agent, RPC
+
+utils.setup_logging()
+_log = logging.getLogger(__name__)
+__version__ = '1.0'
+
+
+def forward_receiver(config_path, **kwargs):
+    """
+    Load the ForwardReceiver agent configuration and returns an instance
+    of the agent created using that configuration.
+    :param config_path: Path to a configuration file.
+    :type config_path: str
+    :returns: ForwardReceiver agent instance
+    :rtype: ForwardReceiver agent
+    """
+    try:
+        config = utils.load_config(config_path)
+    except Exception:
+        config = {}
+    publish_timeout = float(config.get('publish_timeout', 30))
+    return ForwardReceiver(publish_timeout=publish_timeout, **kwargs)
+
+
+class ForwardReceiver(Agent):
+    """
+    Receives batches of publishes from ForwardHistorians on other platforms
+    configured with batch_forwarding and publishes them on the local message
+    bus with their original topics, headers and messages. Subscribers see
+    the ForwardReceiver, not the ForwardHistorian, as the sender.
+
+    :param publish_timeout: Time in seconds to wait for the publishes of a
+        batch to be accepted by the local message bus.
+    :type publish_timeout: float
+    """
+
+    def __init__(self, publish_timeout=30, **kwargs):
+        super(ForwardReceiver, self).__init__(**kwargs)
+        self.publish_timeout = publish_timeout
+
+    @RPC.export
+    @RPC.allow('forward_batch')
+    def forward_batch(self, batch):
+        """RPC method
+
+        Publish every message of a batch on the local message bus. The
+        publishes are all issued before waiting for any of them to complete.
+        The caller requires the forward_batch capability.
+
+        :param batch: batch built by
+            :py:func:`volttron.platform.agent.forward_batch.pack_batch`
+        :type batch: dict
+        :returns: Number of messages published
+        :rtype: int
+        """
+        publishes = unpack_batch(batch)
+        results = [self.vip.pubsub.publish(peer='pubsub',
+                                           topic=topic,
+                                           headers=headers,
+                                           message=message)
+                   for topic, headers, message in publishes]
+        with gevent.Timeout(self.publish_timeout):
+            for result in results:
+                result.get()
+        _log.debug("Published batch of {} messages from {}".format(
+            len(publishes), self.vip.rpc.context.vip_message.peer))
+        return len(publishes)
+
+
+def main(argv=sys.argv):
+    """
+    Main method called by the platform.
+    """
+    utils.vip_main(forward_receiver, identity=PLATFORM_FORWARD_RECEIVER, version=__version__)
+
+
+if __name__ == '__main__':
+    # Entry point for script
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2023 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+
+"""
+Unit tests for the forward_batch RPC method of the ForwardReceiver.
+"""
+
+from unittest import mock
+
+import gevent
+import pytest
+from gevent.event import AsyncResult
+
+from forward_receiver.agent import ForwardReceiver
+from volttron.platform import jsonrpc
+from volttron.platform.agent.forward_batch import pack_batch
+from volttron.platform.vip.agent import Agent
+from volttron.platform.vip.agent.decorators import annotations
+from volttron.platform.vip.agent.subsystems.rpc import RPC
+from volttrontesting.utils.utils import AgentMock
+
+ForwardReceiver.__bases__ = (AgentMock.imitate(Agent, Agent()),)
+
+PUBLISHES = [("devices/campus/building/all",
+              {"Date": "2023-01-01T00:00:00+00:00", "min_compatible_version": "3.0",
+               "X-Forwarded": True, "X-Forwarded-From": "remote"},
+              [{"temperature": 70.5}, {"temperature": {"units": "F"}}]),
+             ("record/alarm",
+              {"Date": "2023-01-01T00:00:01+00:00"},
+              "door open")]
+
+
+def completed(value=None):
+    result = AsyncResult()
+    result.set(value)
+    return result
+
+
+@pytest.fixture
+def receiver():
+    receiver = ForwardReceiver(publish_timeout=0.1)
+    receiver.vip.pubsub.publish.reset_mock()
+    receiver.vip.pubsub.publish.side_effect = lambda **kwargs: completed()
+    yield receiver
+    receiver.vip.pubsub.publish.side_effect = None
+
+
+@pytest.mark.parametrize("compress", [True, False])
+def test_forward_batch_should_publish_with_original_headers(receiver, compress):
+    assert receiver.forward_batch(pack_batch(PUBLISHES, compress=compress)) == 2
+
+    published = [(call.kwargs["topic"], call.kwargs["headers"], call.kwargs["message"])
+                 for call in receiver.vip.pubsub.publish.call_args_list]
+    assert published == PUBLISHES
+    for call in receiver.vip.pubsub.publish.call_args_list:
+        assert call.kwargs["peer"] == "pubsub"
+
+
+@pytest.mark.parametrize("change", [{"version": 2},
+                                    {"compression": "lzma"},
+                                    {"count": 3}])
+def test_forward_batch_should_reject_invalid_batch(receiver, change):
+    batch = pack_batch(PUBLISHES)
+    batch.update(change)
+
+    with pytest.raises(ValueError):
+        receiver.forward_batch(batch)
+    receiver.vip.pubsub.publish.assert_not_called()
+
+
+def test_forward_batch_should_time_out_on_pending_publishes(receiver):
+    receiver.vip.pubsub.publish.side_effect = lambda **kwargs: AsyncResult()
+
+    with pytest.raises(gevent.Timeout):
+        receiver.forward_batch(pack_batch(PUBLISHES))
+
+
+@pytest.mark.parametrize("capabilities, allowed", [({}, False),
+                                                   ({"edit_config_store": None}, False),
+                                                   ({"forward_batch": None}, True)])
+def test_forward_batch_should_require_capability(receiver, capabilities, allowed):
+    required = annotations(ForwardReceiver.forward_batch, set, "rpc.allow_capabilities")
+    assert required == {"forward_batch"}
+
+    # Wrap the method with the check the RPC subsystem applies to exported methods
+    rpc = mock.Mock(_message_bus="zmq")
+    rpc.context.vip_message.user = "forwarder"
+    rpc._owner.vip.auth.get_capabilities.return_value = capabilities
+    checked = RPC._add_auth_check(rpc, receiver.forward_batch, required)
+
+    if allowed:
+        assert checked(pack_batch(PUBLISHES)) == 2
+    else:
+        with pytest.raises(jsonrpc.Error) as error:
+            checked(pack_batch(PUBLISHES))
+        assert error.value.code == jsonrpc.UNAUTHORIZED
+        receiver.vip.pubsub.publish.assert_not_called()
@@ -23,8 +23,10 @@
 # }}}
 
 import logging
+import random
 import sys
 import gevent
+import gevent.pool
 from collections import defaultdict
 from volttron.platform.vip.agent import Agent, RPC
 from volttron.platform.agent import utils
@@ -36,13 +38,20 @@ from datetime import datetime, timedelta
 import bisect
 import fnmatch
 from volttron.platform import jsonapi
+from volttron.platform.messaging import headers as headers_mod
+from volttron.platform.messaging.topics import DRIVER_TOPIC_BATCH
+from volttron.platform.vip.agent.errors import VIPError, Again
 from .interfaces import DriverInterfaceError
 from .driver_locks import configure_socket_lock, configure_publish_lock
+from .interface_threads import configure_interface_thread_pools
 
 utils.setup_logging()
 _log = logging.getLogger(__name__)
 __version__ = '4.0'
 
+# Devices read or written at once by a batch_get_multiple_points or batch_set_multiple_points call.
+BATCH_CONCURRENCY = 32
+
 
 class OverrideError(DriverInterfaceError):
     """Error raised when the user tries to set/revert point when global override is set."""
@@ -99,9 +108,14 @@ def platform_driver_agent(config_path, **kwargs):
     publish_breadth_first_all = bool(get_config("publish_breadth_first_all", False))
     publish_depth_first = bool(get_config("publish_depth_first", False))
     publish_breadth_first = bool(get_config("publish_breadth_first", False))
+    publish_batch = bool(get_config("publish_batch", False))
+    publish_pipelined = bool(get_config("publish_pipelined", False))
+    batch_publish_interval = get_config("batch_publish_interval", 1.0)
 
     group_offset_interval = get_config("group_offset_interval", 0.0)
 
+    interface_thread_pools = get_config("interface_thread_pools", {})
+
     return PlatformDriverAgent(driver_config_list, scalability_test,
                              scalability_test_iterations,
                              driver_scrape_interval,
@@ -113,6 +127,10 @@ def platform_driver_agent(config_path, **kwargs):
                              publish_breadth_first_all,
                              publish_depth_first,
                              publish_breadth_first,
+                             interface_thread_pools,
+                             publish_batch,
+                             publish_pipelined,
+                             batch_publish_interval,
                              heartbeat_autostart=True, **kwargs)
 
 
@@ -128,6 +146,10 @@ class PlatformDriverAgent(Agent):
                  publish_breadth_first_all=False,
                  publish_depth_first=False,
                  publish_breadth_first=False,
+                 interface_thread_pools=None,
+                 publish_batch=False,
+                 publish_pipelined=False,
+                 batch_publish_interval=1.0,
                  **kwargs):
         super(PlatformDriverAgent, self).__init__(**kwargs)
         self.instances = {}
@@ -154,6 +176,16 @@ class PlatformDriverAgent(Agent):
         self.publish_breadth_first_all = bool(publish_breadth_first_all)
         self.publish_depth_first = bool(publish_depth_first)
         self.publish_breadth_first = bool(publish_breadth_first)
+        self.publish_batch = bool(publish_batch)
+        self.publish_pipelined = bool(publish_pipelined)
+        try:
+            self.batch_publish_interval = float(batch_publish_interval)
+        except ValueError:
+            _log.warning("Invalid batch_publish_interval, setting to default value.")
+            self.batch_publish_interval = 1.0
+        # Scrape results waiting to be published together on devices/batch.
+        self._batch = {}
+        self._batch_flush = None
         self._override_devices = set()
         self._override_patterns = None
         self._override_interval_events = {}
@@ -173,7 +205,11 @@ class PlatformDriverAgent(Agent):
                                "publish_depth_first_all": self.publish_depth_first_all,
                                "publish_breadth_first_all": self.publish_breadth_first_all,
                                "publish_depth_first": self.publish_depth_first,
-                               "publish_breadth_first": self.publish_breadth_first}
+                               "publish_breadth_first": self.publish_breadth_first,
+                               "interface_thread_pools": interface_thread_pools or {},
+                               "publish_batch": self.publish_batch,
+                               "publish_pipelined": self.publish_pipelined,
+                               "batch_publish_interval": self.batch_publish_interval}
 
         self.vip.config.set_default("config", self.default_config)
         self.vip.config.subscribe(self.configure_main, actions=["NEW", "UPDATE"], pattern="config")
@@ -210,6 +246,11 @@ class PlatformDriverAgent(Agent):
                     _log.info("maximum concurrent driver publishes limited to " + str(max_concurrent_publishes))
                 configure_publish_lock(max_concurrent_publishes)
 
+                self.interface_thread_pools = config["interface_thread_pools"]
+                if not isinstance(self.interface_thread_pools, dict):
+                    raise ValueError("interface_thread_pools must be a dictionary of driver type to thread count")
+                configure_interface_thread_pools(self.interface_thread_pools)
+
                 self.scalability_test = bool(config["scalability_test"])
                 self.scalability_test_iterations = int(config["scalability_test_iterations"])
 
@@ -233,6 +274,10 @@ class PlatformDriverAgent(Agent):
                 _log.info("The platform driver must be restarted for changes to the max_concurrent_publishes setting to "
                           "take effect")
 
+            if self.interface_thread_pools != config["interface_thread_pools"]:
+                _log.info("The platform driver must be restarted for changes to the interface_thread_pools setting to "
+                          "take effect")
+
             if self.scalability_test != bool(config["scalability_test"]):
                 if not self.scalability_test:
                     _log.info(
@@ -313,13 +358,22 @@ class PlatformDriverAgent(Agent):
         self.publish_breadth_first_all = bool(config["publish_breadth_first_all"])
         self.publish_depth_first = bool(config["publish_depth_first"])
         self.publish_breadth_first = bool(config["publish_breadth_first"])
+        self.publish_batch = bool(config["publish_batch"])
+        self.publish_pipelined = bool(config["publish_pipelined"])
+        try:
+            self.batch_publish_interval = float(config["batch_publish_interval"])
+        except ValueError as e:
+            _log.error("ERROR PROCESSING CONFIGURATION: {}".format(e))
+            _log.error("Platform driver batch_publish_interval setting unchanged")
 
         # Update the publish settings on running devices.
         for driver in self.instances.values():
             driver.update_publish_types(self.publish_depth_first_all,
                                         self.publish_breadth_first_all,
                                         self.publish_depth_first,
-                                        self.publish_breadth_first)
+                                        self.publish_breadth_first,
+                                        self.publish_batch,
+                                        self.publish_pipelined)
 
     def derive_device_topic(self, config_name):
         _, topic = config_name.split('/', 1)
@@ -361,7 +415,9 @@ class PlatformDriverAgent(Agent):
                              self.publish_depth_first_all,
                              self.publish_breadth_first_all,
                              self.publish_depth_first,
-                             self.publish_breadth_first)
+                             self.publish_breadth_first,
+                             self.publish_batch,
+                             self.publish_pipelined)
         gevent.spawn(driver.core.run)
         self.instances[topic] = driver
         self.group_counts[group] += 1
@@ -378,6 +434,39 @@ class PlatformDriverAgent(Agent):
     #     topic = topic.strip('/')
     #     self.instances[topic] = driver
 
+    def add_to_batch(self, device_path, results, meta_data, headers):
+        """Queue the scrape results of a device to be published with the other devices scraped within
+        batch_publish_interval seconds in a single message on devices/batch."""
+        self._batch[device_path] = [results, meta_data, headers]
+        if self._batch_flush is None:
+            self._batch_flush = gevent.spawn_later(self.batch_publish_interval, self._publish_batch)
+
+    def _publish_batch(self):
+        batch = self._batch
+        self._batch = {}
+        self._batch_flush = None
+        if not batch:
+            return
+
+        utcnow_string = utils.format_timestamp(utils.get_aware_utc_now())
+        headers = {headers_mod.DATE: utcnow_string,
+                   headers_mod.TIMESTAMP: utcnow_string}
+        while True:
+            try:
+                _log.debug("publishing batch of {} devices".format(len(batch)))
+                self.vip.pubsub.publish('pubsub', DRIVER_TOPIC_BATCH, headers=headers, message=batch).get(timeout=10.0)
+            except gevent.Timeout:
+                _log.warning("Did not receive confirmation of publish to " + DRIVER_TOPIC_BATCH)
+                break
+            except Again:
+                _log.warning("publish delayed: " + DRIVER_TOPIC_BATCH + " pubsub is busy")
+                gevent.sleep(random.random())
+            except VIPError as ex:
+                _log.warning("driver failed to publish " + DRIVER_TOPIC_BATCH + ": " + str(ex))
+                break
+            else:
+                break
+
     def scrape_starting(self, topic):
         if not self.scalability_test:
             return
@@ -457,6 +546,21 @@ class PlatformDriverAgent(Agent):
     def scrape_all(self, path):
         return self.instances[path].scrape_all()
 
+    @RPC.export
+    def get_scrape_statistics(self, path=None):
+        """RPC method
+
+        Return scrape latency histograms of the devices. Each histogram counts the scrapes that took up to the
+        number of seconds of each bucket, along with the count, sum, mean and max of the latencies and the number
+        of scrapes that took longer than the device's scrape interval.
+        :param path: device path, None for all devices
+        :type path: str
+        :return: dictionary of device path to histogram
+        """
+        if path is not None:
+            return {path: self.instances[path].scrape_latency.to_dict()}
+        return {topic: driver.scrape_latency.to_dict() for topic, driver in self.instances.items()}
+
     @RPC.export
     def get_multiple_points(self, path, point_names, **kwargs):
         return self.instances[path].get_multiple_points(point_names, **kwargs)
@@ -479,6 +583,68 @@ class PlatformDriverAgent(Agent):
         else:
             return self.instances[path].set_multiple_points(point_names_values, **kwargs)
 
+    @RPC.export
+    def batch_get_multiple_points(self, points_by_device, **kwargs):
+        """RPC method
+
+        Get multiple points on multiple devices with a single call. Devices are read concurrently, at most
+        BATCH_CONCURRENCY at a time.
+        Points on devices that are not configured or fail to respond are reported in the errors dictionary.
+        :param points_by_device: dictionary of device path to list of point names
+        :type points_by_device: dict
+        :param kwargs: additional arguments for the devices
+        :type kwargs: arguments pointer
+        :returns: Dictionary of points to values and dictionary of points to errors
+        :rtype: (dict, dict)
+        """
+        results = {}
+        errors = {}
+
+        def get(path, point_names):
+            try:
+                r, e = self.get_multiple_points(path, point_names, **kwargs)
+            except Exception as e:
+                for point_name in point_names:
+                    errors[path + '/' + point_name] = repr(e)
+            else:
+                results.update(r)
+                errors.update(e)
+
+        pool = gevent.pool.Pool(BATCH_CONCURRENCY)
+        for path, point_names in points_by_device.items():
+            pool.spawn(get, path, point_names)
+        pool.join()
+        return results, errors
+
+    @RPC.export
+    def batch_set_multiple_points(self, values_by_device, **kwargs):
+        """RPC method
+
+        Set values on multiple set points of multiple devices with a single call. Devices are written concurrently,
+        at most BATCH_CONCURRENCY at a time.
+        Points on devices that are not configured, have global override set or fail are reported as errors.
+        :param values_by_device: dictionary of device path to list of points and corresponding values
+        :type values_by_device: dict
+        :param kwargs: additional arguments for the devices
+        :type kwargs: arguments pointer
+        :returns: Dictionary of points to errors, empty if all points were set
+        :rtype: dict
+        """
+        errors = {}
+
+        def set_values(path, point_names_values):
+            try:
+                errors.update(self.set_multiple_points(path, point_names_values, **kwargs))
+            except Exception as e:
+                for point_name, _ in point_names_values:
+                    errors[path + '/' + point_name] = repr(e)
+
+        pool = gevent.pool.Pool(BATCH_CONCURRENCY)
+        for path, point_names_values in values_by_device.items():
+            pool.spawn(set_values, path, point_names_values)
+        pool.join()
+        return errors
+
     @RPC.export
     def heart_beat(self):
         """RPC method
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2023 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+import gevent
+
+_log = logging.getLogger(__name__)
+
+# Seconds between attempts of a greenlet waiting for a connection.
+_POLL_INTERVAL = 0.001
+_MAX_POLL_INTERVAL = 0.05
+
+
+class _Gateway(object):
+    """Connections, concurrency limit and idle timeout of one pool key."""
+    __slots__ = ('max_connections', 'idle_timeout', 'lock', 'idle')
+
+    def __init__(self, max_connections, idle_timeout):
+        self.max_connections = max_connections
+        self.idle_timeout = idle_timeout
+        self.lock = threading.BoundedSemaphore(max_connections)
+        # (connection, time it was returned) with the most recently used last.
+        self.idle = []
+
+
+class ConnectionPool(object):
+    """
+    Pool of long lived connections keyed by gateway address.
+
+    Devices behind the same gateway share its connections instead of opening and closing a socket for every
+    request. At most max_connections connections per key are in use at once, which also limits the concurrent
+    requests sent to a gateway. Idle connections are reused while healthy and closed after the key's idle timeout.
+    A connection is closed rather than returned to the pool when the code using it raises one of the
+    discard_on exceptions, so the next request reconnects.
+
+    The pool may be used from greenlets of the thread that created it and from other threads, such as the
+    interface thread pools, at the same time. Other threads block while a key's limit is reached, greenlets
+    wait by polling so they never block the gevent loop.
+
+    :param factory: called with the key to create a new connection
+    :param close: called with a connection to close it
+    :param is_healthy: called with an idle connection before it is reused, returns False if it must be replaced
+    :param discard_on: exception types that mean the connection is broken
+    :param max_connections: default per key limit of connections in use
+    :param idle_timeout: default seconds an unused connection is kept open
+    """
+    def __init__(self, factory, close, is_healthy=None, discard_on=(Exception,), max_connections=1,
+                 idle_timeout=60.0):
+        self._factory = factory
+        self._close = close
+        self._is_healthy = is_healthy
+        self._discard_on = discard_on
+        self.max_connections = max_connections
+        self.idle_timeout = idle_timeout
+        # Guards _gateways, the idle lists and _next_sweep. Never held while a connection is opened or closed.
+        self._lock = threading.Lock()
+        self._gevent_thread = threading.get_ident()
+        self._gateways = {}
+        self._next_sweep = time.monotonic() + idle_timeout / 2
+
+    def set_max_connections(self, key, max_connections):
+        """
+        Set the limit of connections in use for key. The first limit set for a key is kept, later calls with a
+        different limit are ignored with a warning.
+        """
+        with self._lock:
+            gateway = self._gateways.get(key)
+            if gateway is None:
+                self._gateways[key] = _Gateway(max_connections, self.idle_timeout)
+                return
+        if gateway.max_connections != max_connections:
+            _log.warning("Connection limit for {} is already {}, ignoring new limit {}".format(
+                key, gateway.max_connections, max_connections))
+
+    def set_idle_timeout(self, key, idle_timeout):
+        """Set the seconds an unused connection to key is kept open."""
+        with self._lock:
+            self._get_gateway(key).idle_timeout = idle_timeout
+            self._next_sweep = min(self._next_sweep, time.monotonic() + idle_timeout / 2)
+
+    @contextmanager
+    def connection(self, key):
+        """
+        Context manager yielding a connection to key, waiting while the key's connection limit is reached.
+        """
+        with self._lock:
+            gateway = self._get_gateway(key)
+        self._sweep()
+
+        self._acquire(gateway)
+        try:
+            connection = self._checkout(key, gateway)
+            try:
+                yield connection
+            except self._discard_on:
+                self._discard(key, connection)
+                raise
+            except BaseException:
+                self._checkin(gateway, connection)
+                raise
+            else:
+                self._checkin(gateway, connection)
+        finally:
+            gateway.lock.release()
+
+    def close_all(self):
+        """Close every idle connection."""
+        with self._lock:
+            idle = [(key, connection) for key, gateway in self._gateways.items() for connection, _ in gateway.idle]
+            for gateway in self._gateways.values():
+                del gateway.idle[:]
+        for key, connection in idle:
+            self._discard(key, connection)
+
+    def _get_gateway(self, key):
+        gateway = self._gateways.get(key)
+        if gateway is None:
+            gateway = self._gateways[key] = _Gateway(self.max_connections, self.idle_timeout)
+        return gateway
+
+    def _acquire(self, gateway):
+        if threading.get_ident() != self._gevent_thread:
+            gateway.lock.acquire()
+            return
+        # Blocking on a threading primitive here would stop every greenlet, including the one that would
+        # release it.
+        interval = _POLL_INTERVAL
+        while not gateway.lock.acquire(blocking=False):
+            gevent.sleep(interval)
+            interval = min(interval * 2, _MAX_POLL_INTERVAL)
+
+    def _checkin(self, gateway, connection):
+        with self._lock:
+            gateway.idle.append((connection, time.monotonic()))
+
+    def _checkout(self, key, gateway):
+        while True:
+            now = time.monotonic()
+            with self._lock:
+                if not gateway.idle:
+                    break
+                connection, returned = gateway.idle.pop()
+            if now - returned < gateway.idle_timeout and (self._is_healthy is None or self._is_healthy(connection)):
+                return connection
+            self._discard(key, connection)
+        _log.debug("Opening new connection to {}".format(key))
+        return self._factory(key)
+
+    def _sweep(self):
+        now = time.monotonic()
+        expired = []
+        with self._lock:
+            if now < self._next_sweep:
+                return
+            self._next_sweep = now + min([self.idle_timeout] +
+                                         [gateway.idle_timeout for gateway in self._gateways.values()]) / 2
+            for key, gateway in self._gateways.items():
+                # idle is ordered by last use, so expired connections are at the front.
+                count = 0
+                for _, returned in gateway.idle:
+                    if now - returned < gateway.idle_timeout:
+                        break
+                    count += 1
+                expired.extend((key, connection) for connection, _ in gateway.idle[:count])
+                del gateway.idle[:count]
+        for key, connection in expired:
+            self._discard(key, connection)
+
+    def _discard(self, key, connection):
+        try:
+            self._close(connection)
+        except Exception as e:
+            _log.debug("Error closing connection to {}: {}".format(key, e))
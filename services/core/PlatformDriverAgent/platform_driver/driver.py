@@ -26,8 +26,10 @@ from volttron.platform.vip.agent import BasicAgent, Core
 from volttron.platform.agent import utils
 import logging
 import random
+import time
 import gevent
 import traceback
+from gevent.lock import Semaphore
 from volttron.platform.messaging import headers as headers_mod
 from volttron.platform.messaging.topics import (DRIVER_TOPIC_BASE,
                                                 DRIVER_TOPIC_ALL,
@@ -36,6 +38,8 @@ from volttron.platform.messaging.topics import (DRIVER_TOPIC_BASE,
 
 from volttron.platform.vip.agent.errors import VIPError, Again
 from .driver_locks import publish_lock
+from .interface_threads import interface_thread_pool
+from .scrape_stats import LatencyHistogram
 import datetime
 
 utils.setup_logging()
@@ -49,6 +53,8 @@ class DriverAgent(BasicAgent):
                  default_publish_breadth_first_all=True,
                  default_publish_depth_first=True,
                  default_publish_breadth_first=True,
+                 default_publish_batch=False,
+                 default_publish_pipelined=False,
                  **kwargs):
         super(DriverAgent, self).__init__(**kwargs)
         self.heart_beat_value = 0
@@ -62,7 +68,9 @@ class DriverAgent(BasicAgent):
         self.update_publish_types(default_publish_depth_first_all ,
                                  default_publish_breadth_first_all,
                                  default_publish_depth_first,
-                                 default_publish_breadth_first)
+                                 default_publish_breadth_first,
+                                 default_publish_batch,
+                                 default_publish_pipelined)
 
 
         try:
@@ -76,18 +84,27 @@ class DriverAgent(BasicAgent):
         self.interval = interval
         self.periodic_read_event = None
 
+        # Set in setup_device if the driver type's interface calls run in a thread pool.
+        self.thread_pool = None
+        self.interface_lock = Semaphore()
+        self.scrape_latency = LatencyHistogram()
+
         self.update_scrape_schedule(time_slot, driver_scrape_interval, group, group_offset_interval)
 
     def update_publish_types(self, publish_depth_first_all,
                                    publish_breadth_first_all,
                                    publish_depth_first,
-                                   publish_breadth_first):
+                                   publish_breadth_first,
+                                   publish_batch=False,
+                                   publish_pipelined=False):
         """Setup which publish types happen for a scrape.
            Values passed in are overridden by settings in the specific device configuration."""
         self.publish_depth_first_all = bool(self.config.get("publish_depth_first_all", publish_depth_first_all))
         self.publish_breadth_first_all = bool(self.config.get("publish_breadth_first_all", publish_breadth_first_all))
         self.publish_depth_first = bool(self.config.get("publish_depth_first", publish_depth_first))
         self.publish_breadth_first = bool(self.config.get("publish_breadth_first", publish_breadth_first))
+        self.publish_batch = bool(self.config.get("publish_batch", publish_batch))
+        self.publish_pipelined = bool(self.config.get("publish_pipelined", publish_pipelined))
 
 
     def update_scrape_schedule(self, time_slot, driver_scrape_interval, group, group_offset_interval):
@@ -170,6 +187,7 @@ class DriverAgent(BasicAgent):
 
 
         self.interface = self.get_interface(driver_type, driver_config, registry_config)
+        self.thread_pool = interface_thread_pool(driver_type)
         self.meta_data = {}
 
         for point in self.interface.get_register_names():
@@ -228,8 +246,9 @@ class DriverAgent(BasicAgent):
 
         self.parent.scrape_starting(self.device_name)
 
+        scrape_start = time.monotonic()
         try:
-            results = self.interface.scrape_all()
+            results = self._call_interface(self.interface.scrape_all)
             register_names = self.interface.get_register_names_view()
             for point in (register_names - results.keys()):
                 depth_first_topic = self.base_topic(point=point)
@@ -238,6 +257,8 @@ class DriverAgent(BasicAgent):
             tb = traceback.format_exc()
             _log.error('Failed to scrape ' + self.device_name + ':\n' + tb)
             return
+        finally:
+            self.scrape_latency.observe(time.monotonic() - scrape_start, self.interval)
 
         # XXX: Does a warning need to be printed?
         if not results:
@@ -253,31 +274,35 @@ class DriverAgent(BasicAgent):
             headers_mod.SYNC_TIMESTAMP: sync_timestamp
         }
 
+        publishes = []
         if self.publish_depth_first or self.publish_breadth_first:
             for point, value in results.items():
                 depth_first_topic, breadth_first_topic = self.get_paths_for_point(point)
                 message = [value, self.meta_data[point]]
 
                 if self.publish_depth_first:
-                    self._publish_wrapper(depth_first_topic,
-                                          headers=headers,
-                                          message=message)
+                    publishes.append((depth_first_topic, message))
 
                 if self.publish_breadth_first:
-                    self._publish_wrapper(breadth_first_topic,
-                                          headers=headers,
-                                          message=message)
+                    publishes.append((breadth_first_topic, message))
 
         message = [results, self.meta_data]
         if self.publish_depth_first_all:
-            self._publish_wrapper(self.all_path_depth,
-                                  headers=headers,
-                                  message=message)
+            publishes.append((self.all_path_depth, message))
 
         if self.publish_breadth_first_all:
-            self._publish_wrapper(self.all_path_breadth,
-                                  headers=headers,
-                                  message=message)
+            publishes.append((self.all_path_breadth, message))
+
+        if self.publish_pipelined:
+            gevent.spawn(self._publish_pipelined, publishes, headers)
+        else:
+            for topic, message in publishes:
+                self._publish_wrapper(topic,
+                                      headers=headers,
+                                      message=message)
+
+        if self.publish_batch:
+            self.parent.add_to_batch(self.device_path, results, self.meta_data, headers)
 
         self.parent.scrape_ending(self.device_name)
 
@@ -304,6 +329,31 @@ class DriverAgent(BasicAgent):
             else:
                 break
 
+    def _publish_pipelined(self, publishes, headers):
+        """Sends all publishes of a scrape before waiting on any of the confirmations. Publishes the router reports
+        as busy are resent after a random delay, the same back off as :py:meth:`_publish_wrapper`."""
+        with publish_lock():
+            while publishes:
+                _log.debug("publishing {} topics".format(len(publishes)))
+                pending = [(topic, message, self.vip.pubsub.publish('pubsub',
+                                                                    topic,
+                                                                    headers=headers,
+                                                                    message=message))
+                           for topic, message in publishes]
+                publishes = []
+                for topic, message, result in pending:
+                    try:
+                        result.get(timeout=10.0)
+                    except gevent.Timeout:
+                        _log.warning("Did not receive confirmation of publish to "+topic)
+                    except Again:
+                        _log.warning("publish delayed: " + topic + " pubsub is busy")
+                        publishes.append((topic, message))
+                    except VIPError as ex:
+                        _log.warning("driver failed to publish " + topic + ": " + str(ex))
+                if publishes:
+                    gevent.sleep(random.random())
+
     def heart_beat(self):
         if self.heart_beat_point is None:
             return
@@ -325,30 +375,40 @@ class DriverAgent(BasicAgent):
 
         return depth_first, breadth_first
 
+    def _call_interface(self, method, *args, **kwargs):
+        """Calls an interface method, in the driver type's thread pool if it has one. A device's calls are made one
+        at a time so interfaces never run on two threads at once."""
+        if self.thread_pool is None:
+            return method(*args, **kwargs)
+        with self.interface_lock:
+            return self.thread_pool.apply(method, args, kwargs)
+
     def get_point(self, point_name, **kwargs):
-        return self.interface.get_point(point_name, **kwargs)
+        return self._call_interface(self.interface.get_point, point_name, **kwargs)
 
     def set_point(self, point_name, value, **kwargs):
-        return self.interface.set_point(point_name, value, **kwargs)
+        return self._call_interface(self.interface.set_point, point_name, value, **kwargs)
 
     def scrape_all(self):
-        return self.interface.scrape_all()
+        return self._call_interface(self.interface.scrape_all)
 
     def get_multiple_points(self, point_names, **kwargs):
-        return self.interface.get_multiple_points(self.device_name,
-                                                  point_names,
-                                                  **kwargs)
+        return self._call_interface(self.interface.get_multiple_points,
+                                    self.device_name,
+                                    point_names,
+                                    **kwargs)
 
     def set_multiple_points(self, point_names_values, **kwargs):
-        return self.interface.set_multiple_points(self.device_name,
-                                                  point_names_values,
-                                                  **kwargs)
+        return self._call_interface(self.interface.set_multiple_points,
+                                    self.device_name,
+                                    point_names_values,
+                                    **kwargs)
 
     def revert_point(self, point_name, **kwargs):
-        self.interface.revert_point(point_name, **kwargs)
+        self._call_interface(self.interface.revert_point, point_name, **kwargs)
 
     def revert_all(self, **kwargs):
-        self.interface.revert_all(**kwargs)
+        self._call_interface(self.interface.revert_all, **kwargs)
 
     def publish_cov_value(self, point_name, point_values):
         """
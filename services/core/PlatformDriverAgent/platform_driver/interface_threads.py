@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2023 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+import logging
+
+from gevent.threadpool import ThreadPool
+
+_log = logging.getLogger(__name__)
+
+# Interface calls of driver types without a pool run in the device's greenlet.
+_thread_pools = None
+
+
+def configure_interface_thread_pools(pool_sizes=None):
+    """
+    Create a thread pool for each driver type in pool_sizes, a dictionary of driver type to number of threads.
+    The "default" key applies to driver types that are not listed. Sizes less than 1 leave the driver type in the
+    device greenlets.
+    """
+    global _thread_pools
+    if _thread_pools is not None:
+        raise RuntimeError("interface thread pools already configured!")
+    _thread_pools = {}
+    for driver_type, size in (pool_sizes or {}).items():
+        size = int(size)
+        if size > 0:
+            _thread_pools[driver_type] = ThreadPool(size)
+            _log.info("{} interface calls run in a pool of {} threads".format(driver_type, size))
+
+
+def interface_thread_pool(driver_type):
+    """Returns the thread pool for driver_type, None if calls should be made in the calling greenlet."""
+    if not _thread_pools:
+        return None
+    pool = _thread_pools.get(driver_type)
+    if pool is None:
+        pool = _thread_pools.get("default")
+    return pool
@@ -33,17 +33,22 @@ from pymodbus.exceptions import ConnectionException, ModbusIOException, ModbusEx
 from pymodbus.pdu import ExceptionResponse
 from pymodbus.constants import Defaults
 
-from contextlib import contextmanager, closing
-
-from platform_driver.driver_locks import socket_lock
+from platform_driver.connection_pool import ConnectionPool
 from platform_driver.interfaces import BaseInterface, BaseRegister, BasicRevert, DriverInterfaceError
 from volttron.platform.agent import utils
 
-@contextmanager
+# Errors after which a pooled client is closed instead of reused.
+CONNECTION_ERRORS = (ConnectionException, ModbusIOException, OSError)
+
+# Clients are kept open between requests and shared by all devices behind the same (ip, port).
+connection_pool = ConnectionPool(factory=lambda key: SyncModbusClient(*key),
+                                 close=lambda client: client.close(),
+                                 is_healthy=lambda client: client.is_socket_open(),
+                                 discard_on=CONNECTION_ERRORS)
+
+
 def modbus_client(address, port):
-    with socket_lock():
-        with closing(SyncModbusClient(address, port)) as client:
-            yield client
+    return connection_pool.connection((address, port))
 
 
 modbus_logger = logging.getLogger("pymodbus")
@@ -184,8 +189,25 @@ class Interface(BasicRevert, BaseInterface):
         self.slave_id = config_dict.get("slave_id", 0)
         self.ip_address = config_dict["device_address"]
         self.port = config_dict.get("port", Defaults.Port)
+        gateway = (self.ip_address, self.port)
+        connection_pool.set_max_connections(gateway, int(config_dict.get("max_gateway_connections", 1)))
+        if "connection_idle_timeout" in config_dict:
+            connection_pool.set_idle_timeout(gateway, float(config_dict["connection_idle_timeout"]))
         self.parse_config(registry_config_str)
 
+    def _with_client(self, operation):
+        """
+        Run operation with a pooled client. A pooled connection may have been closed by the gateway while it was
+        idle, so after a connection error the operation is retried once on a new connection.
+        """
+        try:
+            with modbus_client(self.ip_address, self.port) as client:
+                return operation(client)
+        except CONNECTION_ERRORS as e:
+            _log.debug("Reconnecting to {}:{} after error: {}".format(self.ip_address, self.port, e))
+        with modbus_client(self.ip_address, self.port) as client:
+            return operation(client)
+
     def build_ranges_map(self):
         self.register_ranges = {('byte', True): [],
                                 ('byte', False): [],
@@ -229,11 +251,10 @@ class Interface(BasicRevert, BaseInterface):
 
     def get_point(self, point_name):
         register = self.get_register_by_name(point_name)
-        with modbus_client(self.ip_address, self.port) as client:
-            try:
-                result = register.get_state(client)
-            except (ConnectionException, ModbusIOException, ModbusInterfaceException):
-                result = None
+        try:
+            result = self._with_client(register.get_state)
+        except (ConnectionException, ModbusIOException, ModbusInterfaceException):
+            result = None
         return result
 
     def _set_point(self, point_name, value):
@@ -241,11 +262,10 @@ class Interface(BasicRevert, BaseInterface):
         if register.read_only:
             raise  IOError("Trying to write to a point configured read only: "+point_name)
 
-        with modbus_client(self.ip_address, self.port) as client:
-            try:
-                result = register.set_state(client, value)
-            except (ConnectionException, ModbusIOException, ModbusInterfaceException) as ex:
-                raise IOError("Error encountered trying to write to point {}: {}".format(point_name, ex))
+        try:
+            result = self._with_client(lambda client: register.set_state(client, value))
+        except (ConnectionException, ModbusIOException, ModbusInterfaceException) as ex:
+            raise IOError("Error encountered trying to write to point {}: {}".format(point_name, ex))
         return result
 
     def scrape_byte_registers(self, client, read_only):
@@ -304,22 +324,22 @@ class Interface(BasicRevert, BaseInterface):
 
         return result_dict
 
-    def _scrape_all(self):
+    def _scrape_registers(self, client):
         result_dict = {}
-        with modbus_client(self.ip_address, self.port) as client:
-            try:
-
-                result_dict.update(self.scrape_byte_registers(client, True))
-                result_dict.update(self.scrape_byte_registers(client, False))
-
-                result_dict.update(self.scrape_bit_registers(client, True))
-                result_dict.update(self.scrape_bit_registers(client, False))
-            except (ConnectionException, ModbusIOException, ModbusInterfaceException) as e:
-                raise DriverInterfaceError("Failed to scrape device at " + self.ip_address + ":" + str(self.port) +
-                                           " ID: " + str(self.slave_id) + str(e))
+        result_dict.update(self.scrape_byte_registers(client, True))
+        result_dict.update(self.scrape_byte_registers(client, False))
 
+        result_dict.update(self.scrape_bit_registers(client, True))
+        result_dict.update(self.scrape_bit_registers(client, False))
         return result_dict
 
+    def _scrape_all(self):
+        try:
+            return self._with_client(self._scrape_registers)
+        except (ConnectionException, ModbusIOException, ModbusInterfaceException) as e:
+            raise DriverInterfaceError("Failed to scrape device at " + self.ip_address + ":" + str(self.port) +
+                                       " ID: " + str(self.slave_id) + str(e))
+
     def parse_config(self, configDict):
         if configDict is None:
             return
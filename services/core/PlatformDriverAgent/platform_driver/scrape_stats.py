@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2023 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+import bisect
+
+# Upper bounds, in seconds, of the scrape latency buckets. Slower scrapes are counted in a final overflow bucket.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class LatencyHistogram(object):
+    """
+    Fixed bucket histogram of scrape latencies of one device.
+    """
+    __slots__ = ('counts', 'count', 'total', 'max', 'overruns')
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        # Scrapes that took longer than the device's scrape interval.
+        self.overruns = 0
+
+    def observe(self, seconds, interval=None):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        if interval is not None and seconds > interval:
+            self.overruns += 1
+
+    def to_dict(self):
+        """
+        Returns the histogram with the count of each bucket keyed by its upper bound, "+Inf" for the overflow
+        bucket, like a Prometheus histogram (but not cumulative).
+        """
+        buckets = {str(bound): count for bound, count in zip(LATENCY_BUCKETS, self.counts)}
+        buckets["+Inf"] = self.counts[-1]
+        return {"buckets": buckets,
+                "count": self.count,
+                "sum": self.total,
+                "mean": self.total / self.count if self.count else 0.0,
+                "max": self.max,
+                "overruns": self.overruns}
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2023 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+import threading
+import time
+
+import gevent
+import pytest
+from gevent.threadpool import ThreadPool
+
+from platform_driver.connection_pool import ConnectionPool
+
+
+class FakeConnection:
+    def __init__(self, key):
+        self.key = key
+        self.open = True
+
+    def close(self):
+        self.open = False
+
+
+class ConnectionBroken(Exception):
+    pass
+
+
+def make_pool(**kwargs):
+    created = []
+
+    def factory(key):
+        connection = FakeConnection(key)
+        created.append(connection)
+        return connection
+
+    pool = ConnectionPool(factory=factory, close=lambda c: c.close(), is_healthy=lambda c: c.open,
+                          discard_on=(ConnectionBroken,), **kwargs)
+    return pool, created
+
+
+@pytest.mark.driver_unit
+def test_connection_should_be_reused_per_key():
+    pool, created = make_pool()
+
+    for _ in range(3):
+        with pool.connection(("10.0.0.1", 502)) as connection:
+            assert connection.key == ("10.0.0.1", 502)
+    with pool.connection(("10.0.0.2", 502)):
+        pass
+
+    assert [c.key for c in created] == [("10.0.0.1", 502), ("10.0.0.2", 502)]
+    assert all(c.open for c in created)
+
+
+@pytest.mark.driver_unit
+def test_connection_should_be_replaced_after_error_or_when_unhealthy():
+    pool, created = make_pool()
+    key = ("10.0.0.1", 502)
+
+    with pytest.raises(ConnectionBroken):
+        with pool.connection(key):
+            raise ConnectionBroken()
+    assert not created[0].open
+
+    with pool.connection(key):
+        pass
+    created[1].open = False
+    with pool.connection(key) as connection:
+        assert connection is created[2]
+
+    # Other errors leave the connection in the pool.
+    with pytest.raises(ValueError):
+        with pool.connection(key):
+            raise ValueError()
+    with pool.connection(key) as connection:
+        assert connection is created[2]
+    assert len(created) == 3
+
+
+@pytest.mark.driver_unit
+def test_idle_connections_should_be_closed_after_timeout():
+    pool, created = make_pool(idle_timeout=0.01)
+    with pool.connection(("10.0.0.1", 502)):
+        pass
+    gevent.sleep(0.02)
+
+    with pool.connection(("10.0.0.2", 502)):
+        pass
+
+    assert not created[0].open
+    assert created[1].open
+
+
+@pytest.mark.driver_unit
+def test_requests_to_a_gateway_should_be_limited():
+    pool, created = make_pool()
+    key = ("10.0.0.1", 502)
+    pool.set_max_connections(key, 2)
+    active = []
+    peak = []
+
+    def request():
+        with pool.connection(key):
+            active.append(1)
+            peak.append(len(active))
+            gevent.sleep(0.01)
+            active.pop()
+
+    gevent.joinall([gevent.spawn(request) for _ in range(6)])
+
+    assert max(peak) == 2
+    assert len(created) == 2
+
+
+@pytest.mark.driver_unit
+def test_idle_timeout_should_be_per_key():
+    pool, created = make_pool(idle_timeout=60)
+    pool.set_idle_timeout(("10.0.0.1", 502), 0.01)
+    with pool.connection(("10.0.0.1", 502)):
+        pass
+    with pool.connection(("10.0.0.2", 502)):
+        pass
+    gevent.sleep(0.02)
+
+    with pool.connection(("10.0.0.1", 502)) as connection:
+        assert connection is created[2]
+    with pool.connection(("10.0.0.2", 502)) as connection:
+        assert connection is created[1]
+    assert not created[0].open
+
+
+@pytest.mark.driver_unit
+def test_requests_from_threads_and_greenlets_should_be_limited():
+    pool, created = make_pool()
+    key = ("10.0.0.1", 502)
+    pool.set_max_connections(key, 2)
+    thread_pool = ThreadPool(8)
+    lock = threading.Lock()
+    active = []
+    peak = []
+
+    def request(pause):
+        with pool.connection(key):
+            with lock:
+                active.append(1)
+                peak.append(len(active))
+            pause(0.01)
+            with lock:
+                active.pop()
+        return True
+
+    try:
+        requests = [gevent.spawn(thread_pool.apply, request, (time.sleep,)) for _ in range(8)]
+        requests += [gevent.spawn(request, gevent.sleep) for _ in range(4)]
+        finished = gevent.joinall(requests, timeout=5)
+    finally:
+        thread_pool.kill()
+
+    assert len(finished) == 12
+    assert all(r.value for r in requests)
+    assert max(peak) == 2
+    assert len(created) == 2
@@ -24,20 +24,25 @@
 
 import logging
 import contextlib
+import errno
+import threading
 from datetime import datetime, date, time
 from mock import create_autospec
 
 import pytest
 import pytz
+from gevent.threadpool import ThreadPool
 
-from platform_driver import agent
+from platform_driver import agent, driver
 from platform_driver.agent import DriverAgent
 from platform_driver.interfaces import BaseInterface
 from platform_driver.interfaces.fakedriver import Interface as FakeInterface
+from platform_driver.scrape_stats import LatencyHistogram
 from volttrontesting.utils.utils import AgentMock
 from volttron.platform.vip.agent import Agent
 from volttron.platform.messaging.utils import Topic
 from volttron.platform.vip.agent.core import ScheduledEvent
+from volttron.platform.vip.agent.errors import Again
 
 
 agent._log = logging.getLogger("test_logger")
@@ -191,6 +196,80 @@ def test_periodic_read_should_return_none_on_scrape_response(scrape_all_response
         assert isinstance(driver_agent.periodic_read_event, ScheduledEvent)
 
 
+@pytest.mark.driver_unit
+@pytest.mark.parametrize("scrape_all_response", [{"foo": "bar"}, Exception()])
+def test_periodic_read_should_record_scrape_latency(scrape_all_response):
+    now = pytz.UTC.localize(datetime.utcnow())
+
+    with get_driver_agent(has_core_schedule=True, meta_data={"foo": "bar"},
+                          has_base_topic=True, mock_publish_wrapper=True,
+                          interface_scrape_all=scrape_all_response) as driver_agent:
+        driver_agent.periodic_read(now)
+
+        stats = driver_agent.scrape_latency.to_dict()
+        assert stats["count"] == 1
+        assert stats["buckets"]["0.005"] == 1
+        assert stats["overruns"] == 0
+
+
+@pytest.mark.driver_unit
+def test_interface_calls_should_run_in_thread_pool():
+    with get_driver_agent() as driver_agent:
+        driver_agent.thread_pool = ThreadPool(2)
+        driver_agent.interface.scrape_all.side_effect = lambda: threading.get_ident()
+
+        assert driver_agent.scrape_all() != threading.get_ident()
+        driver_agent.thread_pool.kill()
+
+
+@pytest.mark.driver_unit
+def test_latency_histogram_should_count_buckets_and_overruns():
+    histogram = LatencyHistogram()
+    for seconds in (0.001, 0.2, 0.2, 90.0):
+        histogram.observe(seconds, interval=60)
+
+    stats = histogram.to_dict()
+    assert stats["buckets"]["0.005"] == 1
+    assert stats["buckets"]["0.25"] == 2
+    assert stats["buckets"]["+Inf"] == 1
+    assert stats["count"] == 4
+    assert stats["max"] == 90.0
+    assert stats["overruns"] == 1
+
+
+@pytest.mark.driver_unit
+def test_publish_pipelined_should_send_all_before_waiting_and_retry_busy(monkeypatch):
+    monkeypatch.setattr(driver, "publish_lock", contextlib.nullcontext)
+    events = []
+
+    class Result:
+        def __init__(self, topic, busy):
+            self.topic = topic
+            self.busy = busy
+
+        def get(self, timeout=None):
+            events.append(("get", self.topic))
+            if self.busy:
+                raise Again(errno.EAGAIN, "busy", "pubsub", "pubsub")
+
+    busy = {"b"}
+
+    def publish(peer, topic, headers=None, message=None):
+        events.append(("send", topic))
+        result = Result(topic, topic in busy)
+        busy.discard(topic)
+        return result
+
+    with get_driver_agent() as driver_agent:
+        driver_agent.vip = create_autospec(MockedVip)
+        driver_agent.vip.pubsub.publish.side_effect = publish
+
+        driver_agent._publish_pipelined([("a", [1, {}]), ("b", [2, {}])], headers={})
+
+    assert events == [("send", "a"), ("send", "b"), ("get", "a"), ("get", "b"),
+                      ("send", "b"), ("get", "b")]
+
+
 @pytest.mark.driver_unit
 def test_heart_beat_should_return_none_on_no_heart_beat_point():
     with get_driver_agent() as driver_agent:
@@ -300,6 +379,15 @@ class MockedParent:
         pass
 
 
+class MockedPubSub:
+    def publish(self, peer, topic, headers=None, message=None):
+        pass
+
+
+class MockedVip:
+    pubsub = MockedPubSub()
+
+
 class MockedBaseTopic:
     def __call__(self, point):
         return point
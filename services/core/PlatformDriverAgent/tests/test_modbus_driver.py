@@ -243,3 +243,42 @@ class TestModbusDriver:
             self.set_point(agent, key, registers_dict[key])
             assert self.get_point(agent, key) == registers_dict[key]
         assert self.scrape_all(agent) == registers_dict
+
+
+@pytest.mark.driver_unit
+def test_pooled_clients_should_be_limited_across_interface_threads(monkeypatch):
+    from gevent.threadpool import ThreadPool
+    from threading import Lock
+    from platform_driver.connection_pool import ConnectionPool
+    from platform_driver.interfaces import modbus
+
+    opened = []
+    pool = ConnectionPool(factory=lambda key: opened.append(key) or key, close=lambda client: None)
+    pool.set_max_connections((IP, PORT), 2)
+    monkeypatch.setattr(modbus, "connection_pool", pool)
+    lock = Lock()
+    active = []
+    peak = []
+
+    def request(client):
+        with lock:
+            active.append(client)
+            peak.append(len(active))
+        time.sleep(0.01)
+        with lock:
+            active.pop()
+        return client
+
+    interface = modbus.Interface()
+    interface.ip_address, interface.port = IP, PORT
+    thread_pool = ThreadPool(8)
+    try:
+        calls = [gevent.spawn(thread_pool.apply, interface._with_client, (request,)) for _ in range(8)]
+        finished = gevent.joinall(calls, timeout=5)
+    finally:
+        thread_pool.kill()
+
+    assert len(finished) == 8
+    assert all(call.value == (IP, PORT) for call in calls)
+    assert max(peak) == 2
+    assert len(opened) == 2
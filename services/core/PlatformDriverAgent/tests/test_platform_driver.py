@@ -180,6 +180,103 @@ class MockedInstance:
         pass
 
 
+class MockedDevice:
+    def __init__(self, path, values):
+        self.path = path
+        self.values = values
+
+    def get_multiple_points(self, point_names, **kwargs):
+        gevent.sleep(0.01)
+        results = {}
+        errors = {}
+        for point_name in point_names:
+            if point_name in self.values:
+                results[self.path + '/' + point_name] = self.values[point_name]
+            else:
+                errors[self.path + '/' + point_name] = repr(KeyError(point_name))
+        return results, errors
+
+    def set_multiple_points(self, point_names_values, **kwargs):
+        self.values.update(point_names_values)
+        return {}
+
+
+@pytest.mark.driver_unit
+def test_batch_get_multiple_points_should_merge_devices():
+    with get_platform_driver_agent() as platform_driver_agent:
+        platform_driver_agent.instances = {"campus/device1": MockedDevice("campus/device1", {"a": 1}),
+                                           "campus/device2": MockedDevice("campus/device2", {"b": 2})}
+
+        results, errors = platform_driver_agent.batch_get_multiple_points({"campus/device1": ["a", "c"],
+                                                                           "campus/device2": ["b"],
+                                                                           "campus/missing": ["d"]})
+
+        assert results == {"campus/device1/a": 1, "campus/device2/b": 2}
+        assert set(errors) == {"campus/device1/c", "campus/missing/d"}
+
+
+@pytest.mark.driver_unit
+def test_batch_set_multiple_points_should_report_overridden_devices():
+    with get_platform_driver_agent() as platform_driver_agent:
+        device1 = MockedDevice("campus/device1", {})
+        device2 = MockedDevice("campus/device2", {})
+        platform_driver_agent.instances = {"campus/device1": device1, "campus/device2": device2}
+        platform_driver_agent._override_devices = {"campus/device2"}
+
+        errors = platform_driver_agent.batch_set_multiple_points({"campus/device1": [("a", 1)],
+                                                                  "campus/device2": [("b", 2)]})
+
+        assert device1.values == {"a": 1}
+        assert device2.values == {}
+        assert list(errors) == ["campus/device2/b"]
+        assert "OverrideError" in errors["campus/device2/b"]
+
+
+@pytest.mark.driver_unit
+def test_batch_get_multiple_points_should_limit_concurrent_devices(monkeypatch):
+    monkeypatch.setattr(agent, "BATCH_CONCURRENCY", 2)
+    active = []
+    peak = []
+
+    class CountingDevice(MockedDevice):
+        def get_multiple_points(self, point_names, **kwargs):
+            active.append(self.path)
+            peak.append(len(active))
+            try:
+                return super().get_multiple_points(point_names, **kwargs)
+            finally:
+                active.remove(self.path)
+
+    with get_platform_driver_agent() as platform_driver_agent:
+        platform_driver_agent.instances = {"campus/device{}".format(i): CountingDevice("campus/device{}".format(i),
+                                                                                      {"a": i})
+                                           for i in range(6)}
+
+        results, errors = platform_driver_agent.batch_get_multiple_points(
+            {"campus/device{}".format(i): ["a"] for i in range(6)})
+
+        assert results == {"campus/device{}/a".format(i): i for i in range(6)}
+        assert errors == {}
+        assert max(peak) == 2
+
+
+@pytest.mark.driver_unit
+def test_add_to_batch_should_publish_devices_in_one_message():
+    with get_platform_driver_agent() as platform_driver_agent:
+        platform_driver_agent.batch_publish_interval = 0.01
+        headers = {"Date": "2023-01-01T00:00:00.000000+00:00"}
+        platform_driver_agent.add_to_batch("campus/building1/device1", {"a": 1}, {"a": {}}, headers)
+        platform_driver_agent.add_to_batch("campus/building1/device2", {"b": 2}, {"b": {}}, headers)
+        gevent.sleep(0.05)
+
+        platform_driver_agent.vip.pubsub.publish.assert_called_once()
+        args, kwargs = platform_driver_agent.vip.pubsub.publish.call_args
+        assert args == ('pubsub', 'devices/batch')
+        assert kwargs["message"] == {"campus/building1/device1": [{"a": 1}, {"a": {}}, headers],
+                                     "campus/building1/device2": [{"b": 2}, {"b": {}}, headers]}
+        assert platform_driver_agent._batch == {}
+
+
 @contextlib.contextmanager
 def get_platform_driver_agent(override_patterns: set = set(),
                             override_interval_events: dict = {},
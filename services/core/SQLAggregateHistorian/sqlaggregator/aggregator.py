@@ -28,7 +28,8 @@ import logging
 import sys
 
 from volttron.platform.agent import utils
-from volttron.platform.agent.base_aggregate_historian import AggregateHistorian
+from volttron.platform.agent.base_aggregate_historian import (
+    AggregateHistorian, PartialAggregate)
 from volttron.platform.dbutils import sqlutils
 
 _log = logging.getLogger(__name__)
@@ -116,6 +117,15 @@ class SQLAggregateHistorian(AggregateHistorian):
             start_time,
             end_time)
 
+    def collect_partial_aggregate(self, topic_ids, start_time, end_time):
+        return PartialAggregate(*self.dbfuncts_class.collect_partial_aggregate(
+            topic_ids,
+            start_time,
+            end_time))
+
+    def get_topic_list_version(self):
+        return self.dbfuncts_class.get_topic_list_version()
+
     def insert_aggregate(self, topic_id, agg_type, period, end_time,
                          value, topic_ids):
         self.dbfuncts_class.insert_aggregate(topic_id,
@@ -26,10 +26,14 @@
 import logging
 import sys
 import threading
+import uuid
 
-from volttron.platform.agent import utils
+from volttron.platform.agent import timestamps, utils
 from volttron.platform.agent.base_historian import BaseHistorian
+from volttron.platform.agent.topic_index import TopicIndex
 from volttron.platform.dbutils import sqlutils
+from volttron.platform.dbutils.basedb import DbDriverPool
+from volttron.platform.vip.agent import Core
 from volttron.utils.docs import doc_inherit
 
 __version__ = "4.0.0"
@@ -37,6 +41,8 @@ __version__ = "4.0.0"
 utils.setup_logging()
 _log = logging.getLogger(__name__)
 
+STATUS_KEY_QUERY_POOL = "query_pool"
+
 
 class MaskedString(str):
     def __repr__(self):
@@ -89,7 +95,9 @@ class SQLHistorian(BaseHistorian):
      - :py:mod:`volttron.platform.dbutils.sqlitefuncts`
     """
 
-    def __init__(self, connection, tables_def=None, **kwargs):
+    epoch_timestamps_supported = True
+
+    def __init__(self, connection, tables_def=None, query_connections=2, **kwargs):
         """Initialise the historian.
 
         The historian makes two connections to the data store.  Both of
@@ -116,12 +124,21 @@ class SQLHistorian(BaseHistorian):
           4. "meta_table": name of the table that stores the metadata data
           for topics
 
+        :param query_connections: number of database connections, each with
+        its own thread, that answer queries without blocking the agent. 0
+        answers queries on the main thread with a single connection.
+
         :param kwargs: additional keyword arguments.
         """
         self.connection = connection
         self.tables_def, self.table_names = self.parse_table_def(tables_def)
         self.topic_id_map = {}
         self.topic_name_map = {}
+        # Answers topic pattern queries from memory. Kept in sync with
+        # topic_id_map and topic_name_map
+        self.topic_index = TopicIndex()
+        # Distinguishes the topic list versions of this run from earlier ones
+        self._topic_list_token = uuid.uuid4().hex[:8]
         self.topic_meta = {}
         self.agg_topic_id_map = {}
         # Create two instance so connection is shared within a single thread.
@@ -132,11 +149,41 @@ class SQLHistorian(BaseHistorian):
 
         # One utils class instance( hence one db connection) for main thread
         self.main_thread_dbutils = self.get_dbfuncts_object()
+        # Connections used to answer queries off the gevent loop. An in memory sqlite database is private to its
+        # connection so it can only be queried through main_thread_dbutils
+        self.query_connections = query_connections
+        self.query_pool = self._create_query_pool()
         # One utils class instance( hence one db connection) for background thread
         # this gets initialized in the bg_thread within historian_setup
         self.bg_thread_dbutils = None
         super(SQLHistorian, self).__init__(**kwargs)
 
+    def _create_query_pool(self):
+        if self.query_connections > 0 and self.connection['params'].get('database') != ':memory:':
+            return DbDriverPool(self.get_dbfuncts_object, self.query_connections)
+        return None
+
+    def _close_query_pool(self):
+        """
+        Stop the query pool threads and close their connections
+        """
+        if self.query_pool is not None:
+            self.query_pool.close()
+            self.query_pool = None
+
+    @doc_inherit
+    def configure(self, configuration):
+        query_connections = int(configuration.get('query_connections', self.query_connections))
+        if query_connections != self.query_connections:
+            _log.info("Resizing the query pool to {} connections".format(query_connections))
+            self._close_query_pool()
+            self.query_connections = query_connections
+            self.query_pool = self._create_query_pool()
+
+    @Core.receiver("onstop")
+    def close_query_pool(self, sender, **kwargs):
+        self._close_query_pool()
+
     def manage_db_size(self, history_limit_timestamp, storage_limit_gb):
         """
         Optional function to manage database size.
@@ -156,6 +203,9 @@ class SQLHistorian(BaseHistorian):
 
                 for x in to_publish_list:
                     ts = x['timestamp']
+                    if isinstance(ts, float):
+                        # epoch_timestamps
+                        ts = timestamps.from_epoch(ts)
                     topic = x['topic']
                     value = x['value']
                     meta = x['meta']
@@ -173,6 +223,7 @@ class SQLHistorian(BaseHistorian):
                         # user lower case topic name when storing in map for case insensitive comparison
                         self.topic_name_map[lowercase_name] = topic
                         self.topic_id_map[lowercase_name] = topic_id
+                        self.topic_index.add(topic, topic_id)
                         update_topic_meta = False
                     elif db_topic_name != topic:
                         if old_meta != meta:
@@ -184,6 +235,7 @@ class SQLHistorian(BaseHistorian):
                         else:
                             self.bg_thread_dbutils.update_topic(topic, topic_id)
                         self.topic_name_map[lowercase_name] = topic
+                        self.topic_index.add(topic, topic_id)
 
                     if old_meta != meta:
                         if self.bg_thread_dbutils.topics_table != self.bg_thread_dbutils.meta_table:
@@ -237,9 +289,16 @@ class SQLHistorian(BaseHistorian):
             # No topics present.
             return []
 
+    def query_topic_list_version(self):
+        """
+        Version of the in memory topic index, changes whenever a topic is
+        added or renamed.
+        """
+        return "{}-{}".format(self._topic_list_token, self.topic_index.version)
+
     @doc_inherit
     def query_topics_by_pattern(self, topic_pattern):
-        return self.main_thread_dbutils.query_topics_by_pattern(topic_pattern)
+        return self.topic_index.match_regex(topic_pattern)
 
     @doc_inherit
     def query_topics_metadata(self, topics):
@@ -255,12 +314,24 @@ class SQLHistorian(BaseHistorian):
                     meta[topic] = self.topic_meta.get(topic_id)
         return meta
 
+    def _query_db(self, method, *args, **kwargs):
+        """
+        Call a read method of the database driver, through the query pool if there is one
+        """
+        query_pool = self.query_pool
+        if query_pool is None:
+            return getattr(self.main_thread_dbutils, method)(*args, **kwargs)
+        try:
+            return query_pool.call(method, *args, **kwargs)
+        finally:
+            self._update_status({STATUS_KEY_QUERY_POOL: query_pool.status()})
+
     def query_aggregate_topics(self):
-        return self.main_thread_dbutils.get_agg_topics()
+        return self._query_db('get_agg_topics')
 
     @doc_inherit
     def query_historian(self, topic, start=None, end=None, agg_type=None, agg_period=None, skip=0, count=None,
-                        order="FIRST_TO_LAST"):
+                        order="FIRST_TO_LAST", raw=False):
         _log.debug("query_historian Thread is: {}".format(threading.currentThread().getName()))
         results = dict()
         topics_list = []
@@ -281,7 +352,7 @@ class SQLHistorian(BaseHistorian):
                 topic_id = self.agg_topic_id_map.get((topic_lower, agg_type, agg_period))
                 if topic_id is None:
                     # load agg topic id again as it might be a newly configured aggregation
-                    agg_map = self.main_thread_dbutils.get_agg_topic_map()
+                    agg_map = self._query_db('get_agg_topic_map')
                     self.agg_topic_id_map.update(agg_map)
                     _log.debug(" Agg topic map after updating {} ".format(self.agg_topic_id_map))
                     topic_id = self.agg_topic_id_map.get((topic_lower, agg_type, agg_period))
@@ -297,8 +368,8 @@ class SQLHistorian(BaseHistorian):
 
         _log.debug("Querying db reader with topic_ids {} ".format(topic_ids))
 
-        values = self.main_thread_dbutils.query(topic_ids, id_name_map, start=start, end=end, agg_type=agg_type,
-                                                agg_period=agg_period, skip=skip, count=count, order=order)
+        values = self._query_db('query', topic_ids, id_name_map, start=start, end=end, agg_type=agg_type,
+                                agg_period=agg_period, skip=skip, count=count, order=order, raw=raw)
         meta_tid = None
         if len(values) > 0:
             # If there are results add metadata if it is a query on a single topic
@@ -334,6 +405,7 @@ class SQLHistorian(BaseHistorian):
         topic_id_map, topic_name_map = self.bg_thread_dbutils.get_topic_map()
         self.topic_id_map.update(topic_id_map)
         self.topic_name_map.update(topic_name_map)
+        self.topic_index.update(topic_id_map, topic_name_map)
         self.agg_topic_id_map = self.bg_thread_dbutils.get_agg_topic_map()
         topic_meta_map = self.bg_thread_dbutils.get_topic_meta_map()
         self.topic_meta.update(topic_meta_map)
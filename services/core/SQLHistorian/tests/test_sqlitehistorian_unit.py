@@ -1,4 +1,5 @@
 import os
+import sqlite3
 from shutil import rmtree
 import subprocess
 from pathlib import Path
@@ -63,6 +64,47 @@ def test_historian_should_filter_duplicates(sql_historian):
     )
     # check that the historian saves only one duplicate in the "topics" table
     assert f"1|duplicate_topic" in query_db("""select * from topics""", HISTORIAN_DB)
+    # check that topic pattern queries are answered from the topics inserted by the historian
+    assert sql_historian.query_topics_by_pattern("^duplicate") == {"duplicate_topic": 1}
+    assert len(sql_historian.query_topics_by_pattern("unique_record_topic[2-4]")) == 3
+    # queries are answered by the query connection pool
+    assert sql_historian.query_historian("duplicate_topic")["values"] == [
+        ("2015-11-17T21:24:10.189393+00:00", "last_duplicate_42")]
+    assert sql_historian.query_pool.status()["calls"] == 1
+
+
+def test_historian_should_close_query_pool(sql_historian):
+    pool = sql_historian.query_pool
+    assert pool.call("select", "SELECT 1") == [(1,)]
+    driver = pool._drivers[0]
+    connection = pool.call("cursor").connection
+    errors = []
+
+    # sqlite only lets the thread that opened a connection use it, so check it right after closing it
+    def close_and_use(close=driver.close):
+        close()
+        try:
+            connection.execute("SELECT 1")
+        except sqlite3.ProgrammingError as e:
+            errors.append(str(e))
+
+    driver.close = close_and_use
+
+    # Changing query_connections replaces the pool after closing the old one
+    sql_historian.configure({"query_connections": 1})
+    assert pool._drivers == []
+    assert pool._threadpool.size == 0
+    assert errors == ["Cannot operate on a closed database."]
+    assert sql_historian.query_pool.size == 1
+
+    # The same configuration keeps the pool
+    pool = sql_historian.query_pool
+    sql_historian.configure({"query_connections": 1})
+    assert sql_historian.query_pool is pool
+
+    sql_historian.close_query_pool(None)
+    assert sql_historian.query_pool is None
+    assert pool._threadpool.size == 0
 
 
 @pytest.fixture()
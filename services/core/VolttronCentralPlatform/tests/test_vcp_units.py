@@ -1,3 +1,5 @@
+from unittest.mock import MagicMock
+
 from volttron.platform.vip.agent import Agent
 from volttrontesting.utils.utils import  AgentMock
 from vcplatform.agent import VolttronCentralPlatform
@@ -8,3 +10,39 @@ from vcplatform.agent import VolttronCentralPlatform
 VolttronCentralPlatform.__bases__ = (AgentMock.imitate(Agent, Agent()),)
 
 
+def test_get_devices_should_reload_when_store_version_changes(tmp_path, monkeypatch):
+    monkeypatch.setenv('VOLTTRON_HOME', str(tmp_path))
+    store_dir = tmp_path / 'configuration_store'
+    store_dir.mkdir()
+    # Only the log exists until the store is compacted.
+    (store_dir / 'platform.driver.store.log').write_text('')
+
+    vcp = VolttronCentralPlatform(reconnect_interval=10, vc_address=None, vc_serverkey=None, instance_name='test',
+                                  stats_publish_interval=30, topic_replace_map={}, device_status_interval=60,
+                                  platform_driver_ids=['platform.driver'])
+    vcp._platform_driver_ids = ['platform.driver']
+    store = {'devices/campus/device1': {'registry_config': 'config://registry.csv'},
+             'registry.csv': [{'Volttron Point Name': 'point1'}]}
+    version = ['token-1']
+
+    def call(peer, method, *args, **kwargs):
+        result = MagicMock()
+        if method == 'get_store_version':
+            result.get.return_value = version[0]
+        elif method == 'list_configs':
+            result.get.return_value = list(store)
+        else:
+            result.get.return_value = store[args[1]]
+        return result
+
+    vcp.vip.rpc.call.side_effect = call
+
+    vcp._devices = vcp.get_devices()
+    assert vcp._devices == {'devices/campus/device1': {'points': ['point1']}}
+
+    # The store files are untouched by a set_config until compaction.
+    store['devices/campus/device2'] = {'registry_config': 'config://registry.csv'}
+    assert vcp.get_devices() is vcp._devices
+
+    version[0] = 'token-2'
+    assert set(vcp.get_devices()) == {'devices/campus/device1', 'devices/campus/device2'}
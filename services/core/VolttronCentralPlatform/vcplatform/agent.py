@@ -174,8 +174,8 @@ class VolttronCentralPlatform(Agent):
         self._platform_driver_ids = None
         self._device_publishes = {}
         self._devices = {}
-        # platform driver config store stat times
-        self._platform_driver_stat_times = {}
+        # platform driver config store versions
+        self._platform_driver_store_versions = {}
 
         # instance id is the vip identity of this agent on the remote platform.
         self._instance_id = None
@@ -933,23 +933,28 @@ class VolttronCentralPlatform(Agent):
 
         :return:
         """
-        # If the device list is already loaded and the platform config on disk is unchanged, use the current list.
+        # If the device list is already loaded and the platform config is unchanged, use the current list.
         config_changed = False
         found_a_platform_driver = False
         for platform_driver_id in self._platform_driver_ids:
             fname = os.path.join(os.environ['VOLTTRON_HOME'], "configuration_store/{}.store".format(platform_driver_id))
-            stat_time = os.stat(fname).st_mtime if os.path.exists(fname) else None
-            if self._platform_driver_stat_times.get(platform_driver_id, None) != stat_time:
+            version = None
+            if os.path.exists(fname) or os.path.exists(fname + '.log'):
+                # Changes are appended to the .store.log file and only reach the .store file when the log is
+                # compacted, so neither file's modification time tells whether the store changed.
+                version = self.vip.rpc.call(CONFIGURATION_STORE, 'get_store_version',
+                                            platform_driver_id).get(timeout=5)
+            if self._platform_driver_store_versions.get(platform_driver_id, None) != version:
                 config_changed = True
-            found_a_platform_driver = found_a_platform_driver or stat_time
-            self._platform_driver_stat_times[platform_driver_id] = stat_time
+            found_a_platform_driver = found_a_platform_driver or version
+            self._platform_driver_store_versions[platform_driver_id] = version
 
         if not found_a_platform_driver:
             _log.debug("No platform driver currently on this platform.")
             return {}
 
         if not config_changed:
-            # The stat times of the config files are unchanged. Return the device list that's already in memory.
+            # The config stores are unchanged. Return the device list that's already in memory.
             keys = self._devices.keys()
 
             for k in keys:
@@ -26,7 +26,9 @@
 
 import copy
 import logging
+from bisect import bisect_left
 from datetime import datetime, timedelta
+from heapq import heappop, heappush
 
 import pytz
 from abc import abstractmethod
@@ -39,6 +41,224 @@ from volttron.platform.vip.agent.subsystems import RPC
 _log = logging.getLogger(__name__)
 __version__ = '1.0'
 
+# Aggregation types that can be composed from count/sum/min/max partials
+PARTIAL_AGGREGATIONS = ('AVG', 'SUM', 'TOTAL', 'COUNT', 'MIN', 'MAX')
+
+
+class PartialAggregate(object):
+    """
+    Running count, sum, min and max of the raw values within a time slice.
+    Partials of adjacent slices merge into the partial of the combined slice,
+    so coarser aggregates can be computed without reading raw data again.
+
+    count is the number of values, as counted by COUNT. numeric_count is the
+    number of them in sum, min and max, the divisor of AVG. The two differ
+    where non numeric values are counted but not summed. It defaults to
+    count.
+    """
+    __slots__ = ('count', 'sum', 'min', 'max', 'numeric_count')
+
+    def __init__(self, count=0, total=None, minimum=None, maximum=None,
+                 numeric_count=None):
+        self.count = count or 0
+        self.numeric_count = self.count if numeric_count is None \
+            else numeric_count
+        self.sum = float(total) if total is not None else None
+        self.min = float(minimum) if minimum is not None else None
+        self.max = float(maximum) if maximum is not None else None
+
+    def merge(self, other):
+        """
+        Fold another partial into this one.
+
+        :param other: partial of a slice that does not overlap this one
+        """
+        if not other.count:
+            return
+        self.count += other.count
+        self.numeric_count += other.numeric_count
+        if other.sum is not None:
+            self.sum = other.sum if self.sum is None else self.sum + other.sum
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min,
+                                                              other.min)
+        if other.max is not None:
+            self.max = other.max if self.max is None else max(self.max,
+                                                              other.max)
+
+    def value(self, agg_type):
+        """
+        Compute the final aggregate from this partial
+
+        :param agg_type: one of PARTIAL_AGGREGATIONS
+        :return: aggregate value or None if there were no records
+        """
+        agg_type = agg_type.upper()
+        if agg_type == 'COUNT':
+            return self.count
+        if agg_type == 'TOTAL':
+            return self.sum if self.sum is not None else 0.0
+        if not self.count:
+            return None
+        if agg_type == 'AVG':
+            if not self.numeric_count:
+                return None
+            return self.sum / self.numeric_count
+        if agg_type == 'SUM':
+            return self.sum
+        if agg_type == 'MIN':
+            return self.min
+        if agg_type == 'MAX':
+            return self.max
+        raise ValueError("Aggregation type {} cannot be computed from "
+                         "partial aggregates".format(agg_type))
+
+
+class _Slices(object):
+    """
+    Slices of one set of topic ids ordered by start time, longest first
+    among slices with the same start.
+    """
+    __slots__ = ('keys', 'entries', 'expiry', 'latest')
+
+    def __init__(self):
+        # (start, -duration in seconds) of every slice, kept sorted
+        self.keys = []
+        # (end, expiry time or None, partial) in the order of keys
+        self.entries = []
+        # heap of (expiry time, key) of the slices that expire
+        self.expiry = []
+        # latest end of a slice added, the time slices expire against
+        self.latest = None
+
+
+class PartialAggregateStore(object):
+    """
+    Partial aggregates of already collected time slices, kept per set of
+    topic ids. Collection of a time period reuses the stored slices that fall
+    within it and only reads raw data for the gaps between them.
+
+    Every slice is kept for its own retention period, counted back from the
+    end of the latest slice of the same topic ids. Slices only expire when
+    slices of the same topic ids are added.
+
+    The store does not see data written to the historian. Data that arrives
+    for a period after it was collected is not included in coarser periods
+    composed from the stored slice until the slice expires or is dropped by
+    :py:meth:`invalidate`.
+    """
+
+    def __init__(self, retention=None):
+        self.retention = retention
+        self._slices = {}
+
+    @staticmethod
+    def _key(topic_ids):
+        return tuple(sorted(topic_ids))
+
+    def cover(self, topic_ids, start, end):
+        """
+        Merge the stored slices that lie within the given time period
+
+        :param topic_ids: topic ids the aggregate is computed over
+        :param start: start of the time period (inclusive)
+        :param end: end of the time period (exclusive)
+        :return: tuple of (merged partial, list of (start, end) gaps not
+                 covered by any stored slice)
+        """
+        merged = PartialAggregate()
+        gaps = []
+        cursor = start
+        slices = self._slices.get(self._key(topic_ids))
+        if slices is not None:
+            for index in range(bisect_left(slices.keys, (start,)),
+                               len(slices.keys)):
+                s_start = slices.keys[index][0]
+                if s_start >= end:
+                    break
+                s_end, _, partial = slices.entries[index]
+                if s_start < cursor or s_end > end:
+                    continue
+                if s_start > cursor:
+                    gaps.append((cursor, s_start))
+                merged.merge(partial)
+                cursor = s_end
+        if cursor < end:
+            gaps.append((cursor, end))
+        return merged, gaps
+
+    def add(self, topic_ids, start, end, partial, retention=None):
+        """
+        Store the partial aggregate of a collected time slice
+
+        :param topic_ids: topic ids the aggregate was computed over
+        :param start: start of the time slice (inclusive)
+        :param end: end of the time slice (exclusive)
+        :param partial: PartialAggregate of the time slice
+        :param retention: timedelta the slice is kept for, the store's
+                          retention if None
+        """
+        key = self._key(topic_ids)
+        slices = self._slices.get(key)
+        if slices is None:
+            slices = self._slices[key] = _Slices()
+        if retention is None:
+            retention = self.retention
+        expires = end + retention if retention is not None else None
+        sort_key = (start, -(end - start).total_seconds())
+        index = bisect_left(slices.keys, sort_key)
+        if index < len(slices.keys) and slices.keys[index] == sort_key:
+            slices.entries[index] = (end, expires, partial)
+        else:
+            slices.keys.insert(index, sort_key)
+            slices.entries.insert(index, (end, expires, partial))
+        if expires is not None:
+            heappush(slices.expiry, (expires, sort_key))
+        if slices.latest is None or end > slices.latest:
+            slices.latest = end
+        self._expire(key, slices)
+
+    def invalidate(self, start, end, topic_ids=None):
+        """
+        Drop the slices that overlap a time period, for example after data
+        was backfilled into the historian for it.
+
+        :param start: start of the time period (inclusive)
+        :param end: end of the time period (exclusive)
+        :param topic_ids: drop only slices computed over any of these
+                          topic ids, all slices if None
+        :return: number of slices dropped
+        """
+        topic_ids = set(topic_ids) if topic_ids is not None else None
+        dropped = 0
+        for key, slices in list(self._slices.items()):
+            if topic_ids is not None and topic_ids.isdisjoint(key):
+                continue
+            kept = [(k, e) for k, e in zip(slices.keys, slices.entries)
+                    if k[0] >= end or e[0] <= start]
+            dropped += len(slices.keys) - len(kept)
+            if not kept:
+                del self._slices[key]
+                continue
+            slices.keys = [k for k, _ in kept]
+            slices.entries = [e for _, e in kept]
+        return dropped
+
+    def _expire(self, key, slices):
+        while slices.expiry and slices.expiry[0][0] <= slices.latest:
+            expires, sort_key = heappop(slices.expiry)
+            index = bisect_left(slices.keys, sort_key)
+            # Skip slices replaced or dropped since the entry was pushed
+            if index < len(slices.keys) and slices.keys[index] == sort_key \
+                    and slices.entries[index][1] == expires:
+                del slices.keys[index]
+                del slices.entries[index]
+        if not slices.keys:
+            del self._slices[key]
+
+    def clear(self):
+        self._slices.clear()
+
 
 class AggregateHistorian(Agent):
     """
@@ -54,6 +274,12 @@ class AggregateHistorian(Agent):
     - :py:meth:`insert_aggregate() <AggregateHistorian.insert_aggregate>`
     - :py:meth:`get_aggregation_list() <AggregateHistorian.get_aggregation_list>`
 
+    Subclasses may also override the following methods to make incremental
+    aggregation and topic pattern caching cheaper
+
+    - :py:meth:`collect_partial_aggregate() <AggregateHistorian.collect_partial_aggregate>`
+    - :py:meth:`get_topic_list_version() <AggregateHistorian.get_topic_list_version>`
+
     """
 
     def __init__(self, config_path, **kwargs):
@@ -69,6 +295,10 @@ class AggregateHistorian(Agent):
         config = utils.load_config(config_path)
         self.topic_id_map = None
         self.aggregate_topic_id_map = None
+        self.partial_aggregates = PartialAggregateStore()
+        # aggregation period -> timedelta its partial aggregates are kept
+        self._partial_retention = {}
+        self._topic_pattern_cache = {}
 
         self.vip.config.set_default("config", config)
         self.vip.config.subscribe(self.configure, actions=["NEW", "UPDATE"],
@@ -103,6 +333,9 @@ class AggregateHistorian(Agent):
 
         self.topic_id_map, name_map = self.get_topic_map()
         self.agg_topic_id_map = self.get_agg_topic_map()
+        self.partial_aggregates.clear()
+        self._topic_pattern_cache.clear()
+        incremental = config.get('incremental_aggregation', False)
         _log.debug("In start of aggregate historian. "
                    "After loading topic and aggregate topic maps")
 
@@ -111,6 +344,9 @@ class AggregateHistorian(Agent):
                 datetime.utcnow()))
             return
 
+        self._partial_retention = \
+            AggregateHistorian.compute_partial_retention(
+                config['aggregations']) if incremental else {}
         for agg_group in config['aggregations']:
             # 1. Validate and normalize aggregation period and
             # initialize use_calendar_periods flag
@@ -123,6 +359,17 @@ class AggregateHistorian(Agent):
             # 2. Validate aggregation details in under points and update
             # aggregate_topics and aggregate_meta tables
             self._init_agg_group(agg_group, agg_time_period)
+            if incremental:
+                for data in agg_group['points']:
+                    if data['aggregation_type'].upper() in \
+                            PARTIAL_AGGREGATIONS:
+                        data['incremental'] = True
+                    else:
+                        _log.info("Aggregation type {} cannot be computed "
+                                  "incrementally. {} will be aggregated from "
+                                  "raw data".format(
+                                    data['aggregation_type'],
+                                    data['aggregation_topic_name']))
 
             # 3. Call parent method to set up periodic aggregation
             # collection calls
@@ -206,10 +453,7 @@ class AggregateHistorian(Agent):
             else:
                 # Find if the topic_name patterns result in any topics
                 # at all. If it does log them as info
-                topic_map = self.vip.rpc.call(
-                    PLATFORM_HISTORIAN,
-                    "get_topics_by_pattern",
-                    topic_pattern=topic_pattern).get()
+                topic_map = self._get_topics_by_pattern(topic_pattern)
                 if topic_map is None or len(topic_map) == 0:
                     raise ValueError(
                         "Please provide a valid topic_name or "
@@ -356,10 +600,7 @@ class AggregateHistorian(Agent):
 
                 if topic_pattern:
                     # Find topic ids that match the pattern at runtime
-                    topic_map = self.vip.rpc.call(
-                        PLATFORM_HISTORIAN,
-                        "get_topics_by_pattern",
-                        topic_pattern=topic_pattern).get()
+                    topic_map = self._get_topics_by_pattern(topic_pattern)
                     _log.debug("Found topics for pattern {}".format(topic_map))
                     if topic_map:
                         topic_ids = list(topic_map.values())
@@ -372,11 +613,19 @@ class AggregateHistorian(Agent):
                                         end_time=end_time))
                         return
 
-                agg_value, count = self.collect_aggregate(
-                    topic_ids,
-                    data['aggregation_type'],
-                    start_time,
-                    end_time)
+                if data.get('incremental'):
+                    agg_value, count = self._collect_incremental_aggregate(
+                        topic_ids,
+                        data['aggregation_type'],
+                        start_time,
+                        end_time,
+                        self._partial_retention.get(agg_time_period))
+                else:
+                    agg_value, count = self.collect_aggregate(
+                        topic_ids,
+                        data['aggregation_type'],
+                        start_time,
+                        end_time)
                 if count == 0:
                     _log.warning("No records found for topic {topic} between {start_time} and {end_time}".format(
                         topic=topic_pattern if topic_pattern else
@@ -414,6 +663,87 @@ class AggregateHistorian(Agent):
                                            points)
                 _log.debug("After Scheduling next collection.{}".format(event))
 
+    def _collect_incremental_aggregate(self, topic_ids, agg_type, start_time,
+                                       end_time, retention=None):
+        """
+        Compute an aggregate from the stored partial aggregates of slices
+        within the time period, reading raw data only for the gaps between
+        them. The partial of the whole period is stored for retention so
+        that coarser aggregation periods can be composed from it.
+
+        :return: a tuple of (aggregated value, count of records over which
+                 this aggregation was computed)
+        """
+        partial, gaps = self.partial_aggregates.cover(topic_ids, start_time,
+                                                      end_time)
+        for gap_start, gap_end in gaps:
+            partial.merge(self.collect_partial_aggregate(topic_ids, gap_start,
+                                                         gap_end))
+        _log.debug("Composed aggregate for {} between {} and {} reading raw "
+                   "data for {} gap(s)".format(topic_ids, start_time,
+                                               end_time, len(gaps)))
+        self.partial_aggregates.add(topic_ids, start_time, end_time, partial,
+                                    retention)
+        if agg_type.upper() == 'COUNT':
+            return partial.value(agg_type), partial.count
+        return partial.value(agg_type), partial.numeric_count
+
+    def _get_topics_by_pattern(self, topic_pattern):
+        """
+        Resolve a topic name pattern through the platform historian. Results
+        are cached until the topic list version reported by
+        :py:meth:`get_topic_list_version() <AggregateHistorian.get_topic_list_version>`
+        changes.
+
+        :return: dictionary of {topic_name:topic_id}
+        """
+        version = self.get_topic_list_version()
+        cached = self._topic_pattern_cache.get(topic_pattern)
+        if version is not None and cached and cached[0] == version:
+            return cached[1]
+        topic_map = self.vip.rpc.call(
+            PLATFORM_HISTORIAN,
+            "get_topics_by_pattern",
+            topic_pattern=topic_pattern).get()
+        if version is not None:
+            self._topic_pattern_cache[topic_pattern] = (version, topic_map)
+        return topic_map
+
+    def get_topic_list_version(self):
+        """
+        Return a cheap value that changes whenever topics are added to or
+        removed from the historian's data store. Topic name pattern lookups
+        are cached until it changes. The default returns None which disables
+        the cache.
+
+        :return: hashable version of the topic list or None
+        """
+        return None
+
+    def collect_partial_aggregate(self, topic_ids, start_time, end_time):
+        """
+        Collect the count, sum, min and max of raw data used by incremental
+        aggregation. The default implementation makes four
+        :py:meth:`collect_aggregate() <AggregateHistorian.collect_aggregate>`
+        calls. Subclasses should override it with a single query where the
+        data store allows.
+
+        :param topic_ids: list of topic ids for which aggregation should be
+                          performed.
+        :param start_time: start time for query (inclusive)
+        :param end_time:  end time for query (exclusive)
+        :return: PartialAggregate of the raw data in the time period
+        """
+        count, _ = self.collect_aggregate(topic_ids, 'count', start_time,
+                                          end_time)
+        total, numeric_count = self.collect_aggregate(topic_ids, 'sum',
+                                                      start_time, end_time)
+        minimum, _ = self.collect_aggregate(topic_ids, 'min', start_time,
+                                            end_time)
+        maximum, _ = self.collect_aggregate(topic_ids, 'max', start_time,
+                                            end_time)
+        return PartialAggregate(count, total, minimum, maximum, numeric_count)
+
     @abstractmethod
     def get_topic_map(self):
         """
@@ -524,6 +854,32 @@ class AggregateHistorian(Agent):
         else:
             return False
 
+    @RPC.export
+    def invalidate_partial_aggregates(self, start, end, topic_names=None):
+        """
+        Drop the stored partial aggregates that overlap a time period so that
+        later collections read its raw data again. Call it after data for an
+        already collected period was written to the historian, for example
+        by a backfill. Only used with incremental_aggregation.
+
+        :param start: start of the time period (inclusive), ISO 8601 string.
+                      UTC if it has no time zone
+        :param end: end of the time period (exclusive), ISO 8601 string
+        :param topic_names: drop only partial aggregates computed over any of
+                            these topics, all if None
+        :return: number of partial aggregates dropped
+        """
+        start, end = [utils.parse_timestamp_string(t) for t in (start, end)]
+        start, end = [t if t.tzinfo else t.replace(tzinfo=pytz.utc)
+                      for t in (start, end)]
+        topic_ids = None
+        if topic_names is not None:
+            if isinstance(topic_names, str):
+                topic_names = [topic_names]
+            topic_ids = [self.topic_id_map[name.lower()] for name in
+                         topic_names if name.lower() in self.topic_id_map]
+        return self.partial_aggregates.invalidate(start, end, topic_ids)
+
     @RPC.export
     def get_supported_aggregations(self):
         return self.get_aggregation_list()
@@ -580,6 +936,36 @@ class AggregateHistorian(Agent):
 
         return str(period) + unit
 
+    @staticmethod
+    def compute_partial_retention(aggregations):
+        """
+        Computes how long the partial aggregates of each aggregation period
+        are kept for incremental aggregation. Slices are only reused by
+        longer periods, so the slices of a period are kept for twice the
+        span of the next longer period with incrementally computed points,
+        long enough for it to be collected late. The longest period keeps
+        its slices for twice its own span.
+
+        :param aggregations: aggregations list of the agent configuration
+        :return: dictionary of normalized aggregation period to timedelta
+        """
+        spans = {}
+        for agg_group in aggregations:
+            if not any(point['aggregation_type'].upper() in
+                       PARTIAL_AGGREGATIONS for point in agg_group['points']):
+                continue
+            agg_time_period = \
+                AggregateHistorian.normalize_aggregation_time_period(
+                    agg_group['aggregation_period'])
+            start, end = AggregateHistorian.compute_aggregation_time_slice(
+                datetime.utcnow(), agg_time_period, False)
+            spans[agg_time_period] = end - start
+        retention = {}
+        for agg_time_period, span in spans.items():
+            longer = [s for s in spans.values() if s > span]
+            retention[agg_time_period] = 2 * (min(longer) if longer else span)
+        return retention
+
     @staticmethod
     def compute_next_collection_time(collection_time, agg_period,
                                      use_calendar_periods):
@@ -211,6 +211,8 @@ import re
 import sqlite3
 import threading
 from threading import Thread
+import time
+import uuid
 import weakref
 
 from dateutil.parser import parse
@@ -252,7 +254,7 @@ try:
 except ImportError:
     from volttron.platform.jsonapi import dumps, loads
 
-from volttron.platform.agent import utils
+from volttron.platform.agent import timestamps, utils
 
 _log = logging.getLogger(__name__)
 
@@ -267,6 +269,19 @@ ALL_REX = re.compile('.*/all$')
 fix_sqlite3_datetime()
 
 
+def parse_backup_timestamp(time_stamp_bytes):
+    """sqlite3 converter for the timestamps read from the backup cache.
+    With epoch_timestamps they are cached as integer microseconds, SQLite
+    would round a REAL to 15 digits."""
+    if time_stamp_bytes.isdigit():
+        return int(time_stamp_bytes) / 1000000
+    return timestamps.parse_timestamp(time_stamp_bytes.decode("utf-8"))
+
+
+# Only applies to columns selected as "ts [backup_timestamp]".
+sqlite3.register_converter("backup_timestamp", parse_backup_timestamp)
+
+
 def add_timing_data_to_header(headers, agent_id, phase):
     if "timing_data" not in headers:
         headers["timing_data"] = timing_data = {}
@@ -292,6 +307,27 @@ def add_timing_data_to_header(headers, agent_id, phase):
     return abs((time1 - time2).total_seconds())
 
 
+def build_insert_batch(records):
+    """
+    Build the columnar batch accepted by
+    :py:meth:`BaseHistorianAgent.insert_batch` from records in the format
+    accepted by :py:meth:`BaseHistorianAgent.insert`. Each distinct topic
+    name is only sent once.
+
+    :param records: list of dictionaries with topic, headers and message keys
+    :return: dictionary of topics, the list of distinct topic names, and the
+             topic, headers and message columns
+    """
+    topic_indexes = {}
+    topic_column = []
+    for r in records:
+        topic_column.append(topic_indexes.setdefault(r['topic'], len(topic_indexes)))
+    return {"topics": list(topic_indexes),
+            "topic": topic_column,
+            "headers": [r['headers'] for r in records],
+            "message": [r['message'] for r in records]}
+
+
 STATUS_KEY_BACKLOGGED = "backlogged"
 STATUS_KEY_CACHE_COUNT = "cache_count"
 STATUS_KEY_PUBLISHING = "publishing"
@@ -300,6 +336,87 @@ STATUS_KEY_TIME_ERROR = "records_with_invalid_timestamp"
 STATUS_KEY_CACHE_ONLY = "cache_only_enabled"
 STATUS_KEY_ERROR_MANAGE_DB_SIZE = "error_managing_db_size"
 
+# Seconds a paged query cursor may go unused before it is discarded.
+DEFAULT_QUERY_CURSOR_TIMEOUT = 300
+
+# SQLite settings of the backup cache database. "default" is the way the
+# cache has always been set up. "wal" avoids most of the fsyncs of writing and
+# draining a large backlog at the cost of possibly losing the last transactions
+# (but never corrupting the cache) on power loss.
+# The pragmas are applied in order, auto_vacuum has to come before journal_mode
+# as switching to WAL initializes the database file.
+BACKUP_CACHE_PROFILES = {
+    "default": {"auto_vacuum": "FULL",
+                "journal_mode": "DELETE",
+                "synchronous": "FULL",
+                "mmap_size": 0},
+    "wal": {"auto_vacuum": "INCREMENTAL",
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "mmap_size": 256 * 1024 ** 2}
+}
+
+
+def get_backup_cache_pragmas(profile):
+    """
+    Returns the SQLite pragmas for a backup cache profile.
+
+    :param profile: Name of one of the BACKUP_CACHE_PROFILES or a dictionary
+                    of pragmas overriding the profile named by its "profile"
+                    entry (defaults to "default").
+    :type profile: str or dict
+    :returns: pragma name to value
+    :rtype: dict
+    """
+    overrides = {}
+    if isinstance(profile, dict):
+        overrides = dict(profile)
+        profile = overrides.pop("profile", "default")
+    try:
+        pragmas = dict(BACKUP_CACHE_PROFILES[profile])
+    except (KeyError, TypeError):
+        raise ValueError(f"Unknown backup_cache_profile {profile}. "
+                         f"Valid profiles are {list(BACKUP_CACHE_PROFILES)}")
+    for name, value in overrides.items():
+        if name not in pragmas:
+            raise ValueError(f"Invalid backup_cache_profile setting {name}. "
+                             f"Valid settings are {list(pragmas)}")
+        if not re.match(r'^\w+$', str(value)):
+            raise ValueError(f"Invalid value {value} for backup_cache_profile setting {name}")
+        pragmas[name] = str(value).upper() if isinstance(value, str) else value
+    return pragmas
+
+
+class DeviceRecord:
+    """
+    All of the points of a single device or analysis publish, queued as one
+    item for the backup cache.
+
+    It stands in for the one record per point queued for other publishes and
+    is expanded by :py:class:`BackupDatabase` in the processing thread.
+    """
+    __slots__ = ('source', 'device', 'timestamp', 'values', 'meta', 'headers')
+
+    def __init__(self, source, device, timestamp, values, meta, headers):
+        self.source = source
+        self.device = device
+        self.timestamp = timestamp
+        self.values = values
+        self.meta = meta
+        self.headers = headers
+
+    def __len__(self):
+        return len(self.values)
+
+    def entries(self):
+        """
+        Yields (source, topic, meta, readings, headers) for every point.
+        """
+        prefix = self.device + '/'
+        meta = self.meta
+        for key, value in self.values.items():
+            yield self.source, prefix + key, meta.get(key, {}), ((self.timestamp, value),), self.headers
+
 
 class BaseHistorianAgent(Agent):
     """
@@ -330,12 +447,18 @@ class BaseHistorianAgent(Agent):
     historian.
     """
 
+    # Set by historians whose publish_to_historian accepts the float
+    # timestamps produced by the epoch_timestamps option.
+    epoch_timestamps_supported = False
+
     def __init__(self,
                  retry_period=300.0,
                  submit_size_limit=1000,
                  max_time_publishing=30.0,
                  backup_storage_limit_gb=None,
                  backup_storage_report=0.9,
+                 backup_storage_check_interval=1,
+                 backup_cache_profile="default",
                  topic_replace_list=[],
                  gather_timing_data=False,
                  readonly=False,
@@ -354,6 +477,8 @@ class BaseHistorianAgent(Agent):
                  time_tolerance=None,
                  time_tolerance_topics=None,
                  cache_only_enabled=False,
+                 insert_queue_limit=10000,
+                 epoch_timestamps=False,
                  **kwargs):
 
         super(BaseHistorianAgent, self).__init__(**kwargs)
@@ -372,6 +497,8 @@ class BaseHistorianAgent(Agent):
 
         self._backup_storage_limit_gb = backup_storage_limit_gb
         self._backup_storage_report = backup_storage_report
+        self._backup_storage_check_interval = int(backup_storage_check_interval)
+        self._backup_cache_profile = backup_cache_profile
         self._retry_period = float(retry_period)
         self._submit_size_limit = int(submit_size_limit)
         self._max_time_publishing = float(max_time_publishing)
@@ -388,6 +515,10 @@ class BaseHistorianAgent(Agent):
         self._setup_failed = False
         self._process_thread = None
         self._message_publish_count = int(message_publish_count)
+        self._insert_queue_limit = int(insert_queue_limit)
+        if epoch_timestamps and not self.epoch_timestamps_supported:
+            raise ValueError(f"epoch_timestamps is not supported by {type(self).__name__}")
+        self._epoch_timestamps = bool(epoch_timestamps)
 
         self.no_insert = False
         self.no_query = False
@@ -424,6 +555,8 @@ class BaseHistorianAgent(Agent):
                                 "max_time_publishing": self._max_time_publishing,
                                 "backup_storage_limit_gb": self._backup_storage_limit_gb,
                                 "backup_storage_report": self._backup_storage_report,
+                                "backup_storage_check_interval": self._backup_storage_check_interval,
+                                "backup_cache_profile": self._backup_cache_profile,
                                 "topic_replace_list": self._topic_replace_list,
                                 "gather_timing_data": self.gather_timing_data,
                                 "readonly": self._readonly,
@@ -439,7 +572,9 @@ class BaseHistorianAgent(Agent):
                                 "all_platforms": self._all_platforms,
                                 "time_tolerance": self._time_tolerance,
                                 "time_tolerance_topics": self._time_tolerance_topics,
-                                "cache_only_enabled": self._cache_only_enabled
+                                "cache_only_enabled": self._cache_only_enabled,
+                                "insert_queue_limit": self._insert_queue_limit,
+                                "epoch_timestamps": self._epoch_timestamps
                                }
 
         self.vip.config.set_default("config", self._default_config)
@@ -519,6 +654,12 @@ class BaseHistorianAgent(Agent):
             else:
                 backup_storage_report = 0.9
 
+            backup_storage_check_interval = max(1, int(config.get("backup_storage_check_interval", 1)))
+
+            backup_cache_profile = config.get("backup_cache_profile", "default")
+            # Validate the profile now rather than in the process thread.
+            get_backup_cache_pragmas(backup_cache_profile)
+
             retry_period = float(config.get("retry_period", 300.0))
 
             storage_limit_gb = config.get("storage_limit_gb")
@@ -536,6 +677,11 @@ class BaseHistorianAgent(Agent):
 
             readonly = bool(config.get("readonly", False))
             message_publish_count = int(config.get("message_publish_count", 10000))
+            insert_queue_limit = int(config.get("insert_queue_limit", 10000))
+            query_cursor_timeout = float(config.get("query_cursor_timeout", DEFAULT_QUERY_CURSOR_TIMEOUT))
+            epoch_timestamps = bool(config.get("epoch_timestamps", False))
+            if epoch_timestamps and not self.epoch_timestamps_supported:
+                raise ValueError(f"epoch_timestamps is not supported by {type(self).__name__}")
 
             all_platforms = bool(config.get("all_platforms", False))
 
@@ -577,6 +723,8 @@ class BaseHistorianAgent(Agent):
         self.gather_timing_data = gather_timing_data
         self._backup_storage_limit_gb = backup_storage_limit_gb
         self._backup_storage_report = backup_storage_report
+        self._backup_storage_check_interval = backup_storage_check_interval
+        self._backup_cache_profile = backup_cache_profile
         self._retry_period = retry_period
         self._submit_size_limit = submit_size_limit
         self._max_time_publishing = max_time_publishing
@@ -585,6 +733,11 @@ class BaseHistorianAgent(Agent):
         self._all_platforms = all_platforms
         self._readonly = readonly
         self._message_publish_count = message_publish_count
+        self._insert_queue_limit = insert_queue_limit
+        # Used by BaseQueryHistorianAgent. Cursors already open keep their
+        # expiry until they are next used.
+        self._query_cursor_timeout = query_cursor_timeout
+        self._epoch_timestamps = epoch_timestamps
         self._time_tolerance = time_tolerance
         self._time_tolerance_topics = time_tolerance_topics
 
@@ -678,27 +831,75 @@ class BaseHistorianAgent(Agent):
         _log.debug("insert called by {} with {} records".format(rpc_peer, len(records)))
 
         for r in records:
-            topic = r['topic']
-            headers = r['headers']
-            message = r['message']
-
-            capture_func = None
-            if topic.startswith(topics.DRIVER_TOPIC_BASE):
-                capture_func = self._capture_device_data
-            elif topic.startswith(topics.LOGGER_BASE):
-                capture_func = self._capture_log_data
-            elif topic.startswith(topics.ANALYSIS_TOPIC_BASE):
-                capture_func = self._capture_analysis_data
-            elif topic.startswith(topics.RECORD_BASE):
-                capture_func = self._capture_record_data
-
-            if capture_func:
-                capture_func(peer=None, sender=None, bus=None,
-                             topic=topic, headers=headers, message=message)
-            else:
-                _log.error("Unrecognized topic in insert call: {}".format(topic))
+            self._insert_record(r['topic'], r['headers'], r['message'])
+
+    @RPC.export
+    def insert_batch(self, batch):
+        """RPC method to add a columnar batch of records to the local cache
+        with flow control.
+
+        The batch is rejected as a whole when the event queue already holds
+        ``insert_queue_limit`` items. The returned credit is the number of
+        records the sender may send in its next batch.
+
+        :param batch: batch built by :py:func:`build_insert_batch`
+        :type batch: dict
+        :returns: dictionary with the number of records accepted, the current
+                  event queue depth and the credit
+        :rtype: dict
+        """
+        if self.no_insert:
+            raise RuntimeError("Insert not supported by this historian.")
+
+        topic_names = batch['topics']
+        columns = (batch['topic'], batch['headers'], batch['message'])
+        if len(set(len(c) for c in columns)) != 1:
+            raise ValueError("Columns of insert batch must have the same length")
+
+        if self._event_queue.qsize() >= self._insert_queue_limit:
+            result = self.insert_credit()
+            result["accepted"] = 0
+            return result
 
+        for topic_index, headers, message in zip(*columns):
+            self._insert_record(topic_names[topic_index], headers, message)
 
+        _log.debug("insert_batch called by {} with {} records".format(
+            self.vip.rpc.context.vip_message.peer, len(columns[0])))
+        result = self.insert_credit()
+        result["accepted"] = len(columns[0])
+        return result
+
+    @RPC.export
+    def insert_credit(self):
+        """RPC method
+
+        :returns: dictionary with the current event queue depth and the
+                  credit, the number of records that may be sent with
+                  :py:meth:`insert_batch` before the event queue reaches
+                  ``insert_queue_limit``
+        :rtype: dict
+        """
+        depth = self._event_queue.qsize()
+        return {"queue_depth": depth,
+                "credit": max(self._insert_queue_limit - depth, 0)}
+
+    def _insert_record(self, topic, headers, message):
+        capture_func = None
+        if topic.startswith(topics.DRIVER_TOPIC_BASE):
+            capture_func = self._capture_device_data
+        elif topic.startswith(topics.LOGGER_BASE):
+            capture_func = self._capture_log_data
+        elif topic.startswith(topics.ANALYSIS_TOPIC_BASE):
+            capture_func = self._capture_analysis_data
+        elif topic.startswith(topics.RECORD_BASE):
+            capture_func = self._capture_record_data
+
+        if capture_func:
+            capture_func(peer=None, sender=None, bus=None,
+                         topic=topic, headers=headers, message=message)
+        else:
+            _log.error("Unrecognized topic in insert call: {}".format(topic))
 
     @Core.receiver("onstop")
     def stopping(self, sender, **kwargs):
@@ -782,9 +983,22 @@ class BaseHistorianAgent(Agent):
             # If time tolerance is set, and it needs to be checked for this topic
             # compare the incoming timestamp with the current time.
             if topic.startswith(tuple(self._time_tolerance_topics)):
+                if not isinstance(utc_timestamp, datetime):
+                    return abs(time.time() - utc_timestamp) > self._time_tolerance
                 return abs(get_aware_utc_now() - utc_timestamp).seconds > self._time_tolerance
         return False
 
+    def _timestamp_now(self):
+        return time.time() if self._epoch_timestamps else get_aware_utc_now()
+
+    def _process_timestamp(self, timestamp_string, topic):
+        """process_timestamp that returns seconds since the epoch instead
+        of a datetime when epoch_timestamps is set."""
+        timestamp, my_tz = process_timestamp(timestamp_string, topic)
+        if self._epoch_timestamps:
+            timestamp = timestamps.to_epoch(timestamp)
+        return timestamp, my_tz
+
     def is_cache_only_enabled(self):
         return self._cache_only_enabled
 
@@ -794,9 +1008,9 @@ class BaseHistorianAgent(Agent):
         # Anon the topic if necessary.
         topic = self.get_renamed_topic(topic)
         timestamp_string = headers.get(headers_mod.DATE, None)
-        timestamp = get_aware_utc_now()
+        timestamp = self._timestamp_now()
         if timestamp_string is not None:
-            timestamp, my_tz = process_timestamp(timestamp_string, topic)
+            timestamp, my_tz = self._process_timestamp(timestamp_string, topic)
             headers['time_error'] = self.does_time_exceed_tolerance(topic, timestamp)
 
         if sender == 'pubsub.compat':
@@ -853,9 +1067,9 @@ class BaseHistorianAgent(Agent):
             readings = item['Readings']
 
             if not isinstance(readings, list):
-                readings = [(get_aware_utc_now(), readings)]
+                readings = [(self._timestamp_now(), readings)]
             elif isinstance(readings[0], str):
-                my_ts, my_tz = process_timestamp(readings[0], topic)
+                my_ts, my_tz = self._process_timestamp(readings[0], topic)
                 headers['time_error'] = self.does_time_exceed_tolerance(topic, my_ts)
                 readings = [(my_ts, readings[1])]
                 if tz:
@@ -948,9 +1162,9 @@ class BaseHistorianAgent(Agent):
         topic = self.get_renamed_topic(topic)
         timestamp_string = headers.get(headers_mod.SYNC_TIMESTAMP if self._sync_timestamp else headers_mod.TIMESTAMP,
                                        headers.get(headers_mod.DATE))
-        timestamp = get_aware_utc_now()
+        timestamp = self._timestamp_now()
         if timestamp_string is not None:
-            timestamp, my_tz = process_timestamp(timestamp_string, topic)
+            timestamp, my_tz = self._process_timestamp(timestamp_string, topic)
             headers['time_error'] = self.does_time_exceed_tolerance(topic, timestamp)
 
         try:
@@ -977,6 +1191,10 @@ class BaseHistorianAgent(Agent):
             _log.exception(e)
             return
 
+        if not isinstance(values, dict):
+            _log.error("message for {topic} is not a dictionary of point values".format(topic=topic))
+            return
+
         meta = {}
         if not isinstance(message, dict):
             if len(message) == 2:
@@ -993,13 +1211,7 @@ class BaseHistorianAgent(Agent):
         if self.gather_timing_data:
             add_timing_data_to_header(headers, self.core.agent_uuid or self.core.identity, "collected")
 
-        for key, value in values.items():
-            point_topic = device + '/' + key
-            self._event_queue.put({'source': source,
-                                   'topic': point_topic,
-                                   'readings': [(timestamp, value)],
-                                   'meta': meta.get(key, {}),
-                                   'headers': headers})
+        self._event_queue.put(DeviceRecord(source, device, timestamp, values, meta, headers))
 
     def _capture_actuator_data(self, topic, headers, message, match):
         """Capture actuation data and submit it to be published by a historian.
@@ -1111,7 +1323,9 @@ class BaseHistorianAgent(Agent):
                 return
 
             backupdb = BackupDatabase(self, self._backup_storage_limit_gb,
-                                      self._backup_storage_report)
+                                      self._backup_storage_report,
+                                      storage_check_interval=self._backup_storage_check_interval,
+                                      cache_profile=self._backup_cache_profile)
             self._update_status({STATUS_KEY_CACHE_COUNT: backupdb.get_backlog_count()})
 
             # now that everything is setup we need to make sure that the topics
@@ -1202,6 +1416,8 @@ class BaseHistorianAgent(Agent):
                         if self._history_limit_days is not None:
                             last_element = to_publish_list[-1]
                             last_time_stamp = last_element["timestamp"]
+                            if not isinstance(last_time_stamp, datetime):
+                                last_time_stamp = timestamps.from_epoch(last_time_stamp)
                             history_limit_timestamp = last_time_stamp - self._history_limit_days
 
                         try:
@@ -1354,6 +1570,14 @@ class BaseHistorianAgent(Agent):
         the way the cache
         treats meta data.
 
+        If the historian is configured with `epoch_timestamps` the
+        "timestamp" of records is a float of seconds since the epoch instead
+        of a datetime, so it does not have to be parsed and formatted on the
+        way through the cache. Only historians that set
+        `epoch_timestamps_supported` accept the option. They convert the
+        timestamp, if needed, when writing to their database with
+        :py:func:`volttron.platform.agent.timestamps.from_epoch`.
+
         Once one or more records are published either
         :py:meth:`BaseHistorianAgent.report_all_handled` or
         :py:meth:`BaseHistorianAgent.report_handled` must be called to
@@ -1446,8 +1670,11 @@ class BackupDatabase:
     use only.
     """
 
+    # Maximum number of host parameters used in a single "IN (...)" query.
+    _MAX_QUERY_PARAMETERS = 500
+
     def __init__(self, owner, backup_storage_limit_gb, backup_storage_report,
-                 check_same_thread=True):
+                 check_same_thread=True, storage_check_interval=1, cache_profile="default"):
         # The topic cache is only meant as a local lookup and should not be
         # accessed via the implemented historians.
         self._backup_cache = {}
@@ -1458,6 +1685,11 @@ class BackupDatabase:
         self._owner = weakref.ref(owner)
         self._backup_storage_limit_gb = backup_storage_limit_gb
         self._backup_storage_report = backup_storage_report
+        # The storage limit is checked on every storage_check_interval call
+        # to backup_new_data.
+        self._storage_check_interval = max(1, int(storage_check_interval))
+        self._batches_since_storage_check = 0
+        self._pragmas = get_backup_cache_pragmas(cache_profile)
         self._connection = None
         self._setupdb(check_same_thread)
         self._dupe_ids = []
@@ -1474,107 +1706,97 @@ class BackupDatabase:
         #_log.debug("Backing up unpublished values.")
         c = self._connection.cursor()
         self.time_error_records = False # will update at the end of the method
-        for item in new_publish_list:
-            if item is None:
-                continue
-            source = item['source']
-            topic = item['topic']
-            meta = item.get('meta', {})
-            readings = item['readings']
-            headers = item.get('headers', {})
-
-            topic_id = self._backup_cache.get(topic)
-
-            if topic_id is None:
-                c.execute('''INSERT INTO topics values (?,?)''',
-                          (None, topic))
-                c.execute('''SELECT last_insert_rowid()''')
-                row = c.fetchone()
-                topic_id = row[0]
-                self._backup_cache[topic_id] = topic
-                self._backup_cache[topic] = topic_id
+        entries = list(self._iter_entries(new_publish_list))
+
+        # Create ids for all new topics of the batch up front.
+        self._resolve_topic_ids(c, [entry[1] for entry in entries])
+
+        metadata_rows = []
+        outstanding_rows = []
+        time_error_rows = []
+        # Items from the same publish share their headers and timestamp, only serialize them once.
+        header_strings = {}
+        timestamp_strings = {}
+        for source, topic, meta, readings, headers in entries:
+            topic_id = self._backup_cache[topic]
 
             meta_dict = self._meta_data[(source, topic_id)]
             for name, value in meta.items():
                 current_meta_value = meta_dict.get(name)
                 if current_meta_value != value:
-                    c.execute('''INSERT OR REPLACE INTO metadata
-                                 values(?, ?, ?, ?)''',
-                              (source, topic_id, name, value))
+                    metadata_rows.append((source, topic_id, name, value))
                     meta_dict[name] = value
 
-            # Check outside loop so that we do the check inside loop only if necessary
-            if time_tolerance_check:
-                for timestamp, value in readings:
-                    if timestamp is None:
-                        timestamp = get_aware_utc_now()
-                    elif headers["time_error"]:
-                        _log.warning(f"Found data with timestamp {timestamp} that is out of configured tolerance ")
-                        c.execute(
-                            '''INSERT INTO time_error
-                            values(NULL, ?, ?, ?, ?, ?)''',
-                            (timestamp, source, topic_id, dumps(value), dumps(headers)))
-                        self.time_error_records = True
-                        continue  # continue to the next record. don't record in outstanding
-                    try:
-                        c.execute(
-                            '''INSERT INTO outstanding
-                            values(NULL, ?, ?, ?, ?, ?)''',
-                            (timestamp, source, topic_id, dumps(value), dumps(headers)))
-                        self._record_count += 1
-                    except sqlite3.IntegrityError as e:
-                        # In the case where we are upgrading an existing installed historian the
-                        # unique constraint may still exist on the outstanding database.
-                        # Ignore this case.
-                        _log.warning(f"sqlite3.Integrity error -- {e}")
-                        pass
-            else:
-                for timestamp, value in readings:
-                    if timestamp is None:
-                        timestamp = get_aware_utc_now()
+            try:
+                header_string = header_strings[id(headers)]
+            except KeyError:
+                header_strings[id(headers)] = header_string = dumps(headers)
+
+            time_error = time_tolerance_check and headers["time_error"]
+            for timestamp, value in readings:
+                if timestamp is None:
+                    timestamp = get_aware_utc_now()
+                elif time_error:
+                    _log.warning(f"Found data with timestamp {timestamp} that is out of configured tolerance ")
+                    time_error_rows.append((timestamp, source, topic_id, dumps(value), header_string))
+                    continue  # continue to the next record. don't record in outstanding
+                elif isinstance(timestamp, datetime):
+                    # Same conversion as the sqlite3 datetime adapter, done once per timestamp object.
                     try:
-                        c.execute(
-                            '''INSERT INTO outstanding
-                            values(NULL, ?, ?, ?, ?, ?)''',
-                            (timestamp, source, topic_id, dumps(value), dumps(headers)))
-                        self._record_count += 1
-                    except sqlite3.IntegrityError as e:
-                        # In the case where we are upgrading an existing installed historian the
-                        # unique constraint may still exist on the outstanding database.
-                        # Ignore this case.
-                        _log.warning(f"sqlite3.Integrity error -- {e}")
-                        pass
+                        timestamp = timestamp_strings[id(timestamp)]
+                    except KeyError:
+                        timestamp_strings[id(timestamp)] = timestamp = utils.format_timestamp(timestamp)
+                elif isinstance(timestamp, float):
+                    # epoch_timestamps, see parse_backup_timestamp
+                    timestamp = round(timestamp * 1000000)
+                outstanding_rows.append((timestamp, source, topic_id, dumps(value), header_string))
+
+        if metadata_rows:
+            c.executemany('''INSERT OR REPLACE INTO metadata
+                             values(?, ?, ?, ?)''', metadata_rows)
+
+        if time_error_rows:
+            c.executemany('''INSERT INTO time_error
+                             values(NULL, ?, ?, ?, ?, ?)''', time_error_rows)
+            self.time_error_records = True
+
+        if outstanding_rows:
+            # In the case where we are upgrading an existing installed historian the
+            # unique constraint may still exist on the outstanding database.
+            # Rows violating it are ignored.
+            c.executemany('''INSERT OR IGNORE INTO outstanding
+                             values(NULL, ?, ?, ?, ?, ?)''', outstanding_rows)
+            self._update_record_count(c, c.rowcount)
+            if c.rowcount < len(outstanding_rows):
+                _log.warning(f"Ignored {len(outstanding_rows) - c.rowcount} records violating a unique "
+                             f"constraint of the outstanding table")
 
         cache_full = False
-        if self._backup_storage_limit_gb is not None:
+        self._batches_since_storage_check += 1
+        if self._backup_storage_limit_gb is not None and \
+                self._batches_since_storage_check >= self._storage_check_interval:
+            self._batches_since_storage_check = 0
             try:
-                def page_count():
+                def used_pages():
+                    # Pages on the freelist are reused by later inserts so they do not count
+                    # against the limit. Unlike page_count, freelist_count also reflects deletes
+                    # that are not committed yet.
                     c.execute("PRAGMA page_count")
-                    return c.fetchone()[0]
-
-                def free_count():
+                    page_count = c.fetchone()[0]
                     c.execute("PRAGMA freelist_count")
-                    return c.fetchone()[0]
+                    return page_count - c.fetchone()[0]
 
-                p = page_count()
-                f = free_count()
+                used = used_pages()
 
                 # check if we are over the alert threshold.
-                if page_count() >= self.max_pages - int(self.max_pages * (1.0 - self._backup_storage_report)):
+                if used >= self.max_pages - int(self.max_pages * (1.0 - self._backup_storage_report)):
                     cache_full = True
 
                 # Now check if we are above the limit, if so start deleting in batches of 100
-                # page count doesnt update even after deleting all records
-                # and record count becomes zero. If we have deleted all record
-                # exit.
-                # _log.debug(f"record count before check is {self._record_count} page count is {p}"
-                #            f" free count is {f}")
-                # max_pages  gets updated based on inserts but freelist_count doesn't
-                # enter delete loop based on page_count
-                min_free_pages = p - self.max_pages
+                # until enough pages have been freed or there is nothing left to delete.
                 error_record_count = 0
                 get_error_count_from_db = True
-                while p > self.max_pages:
+                while used > self.max_pages:
                     cache_full = True
                     if time_tolerance_check and get_error_count_from_db:
                         # if time_tolerance_check is enabled and this the first time
@@ -1590,7 +1812,7 @@ class BackupDatabase:
                             WHERE ROWID IN
                             (SELECT ROWID FROM time_error
                             ORDER BY ROWID ASC LIMIT 100)''')
-                        error_record_count -= c.rowcount
+                        error_record_count = max(0, error_record_count - max(c.rowcount, 1))
                     else:
                         # error record count is 0, sp set time_error_records to False
                         self.time_error_records = False
@@ -1600,18 +1822,14 @@ class BackupDatabase:
                             WHERE ROWID IN
                             (SELECT ROWID FROM outstanding
                             ORDER BY ROWID ASC LIMIT 100)''')
-                        if self._record_count < c.rowcount:
-                            self._record_count = 0
-                        else:
-                            self._record_count -= c.rowcount
-                    p = page_count()  # page count doesn't reflect delete without commit
-                    f = free_count()  # freelist count does. So using that to break from loop
-                    if f >= min_free_pages:
-                        break
+                        if c.rowcount <= 0:
+                            break
+                        self._update_record_count(c, -c.rowcount)
+                    used = used_pages()
                     _log.debug(f" Cleaning cache since we are over the limit. "
                                f"After delete of 100 records from cache"
                                f" record count is {self._record_count} time_error record count is {error_record_count} "
-                               f"page count is {p} freelist count is{f}")
+                               f"used page count is {used}")
 
             except Exception:
                 _log.exception(f"Exception when checking page count and deleting")
@@ -1629,6 +1847,45 @@ class BackupDatabase:
                 self.time_error_records = True
         return cache_full
 
+    @staticmethod
+    def _iter_entries(new_publish_list):
+        """
+        Yields (source, topic, meta, readings, headers) for every record of
+        new_publish_list, expanding :py:class:`DeviceRecord` items to one
+        entry per point.
+        """
+        for item in new_publish_list:
+            if item is None:
+                continue
+            if isinstance(item, DeviceRecord):
+                yield from item.entries()
+            else:
+                yield (item['source'], item['topic'], item.get('meta', {}),
+                       item['readings'], item.get('headers', {}))
+
+    def _resolve_topic_ids(self, c, topic_names):
+        """
+        Makes sure every topic in topic_names has an id in the topics table
+        and in the local topic cache.
+
+        :param c: cursor of the backup database
+        :param topic_names: iterable of topic names
+        """
+        # dict.fromkeys keeps the order the topics were first seen in.
+        new_topics = [topic for topic in dict.fromkeys(topic_names)
+                      if topic not in self._backup_cache]
+        if not new_topics:
+            return
+        c.executemany('''INSERT OR IGNORE INTO topics values (NULL, ?)''',
+                      ((topic,) for topic in new_topics))
+        for i in range(0, len(new_topics), self._MAX_QUERY_PARAMETERS):
+            chunk = new_topics[i:i + self._MAX_QUERY_PARAMETERS]
+            c.execute('''SELECT topic_id, topic_name FROM topics
+                         WHERE topic_name IN ({})'''.format(','.join('?' * len(chunk))), chunk)
+            for topic_id, topic in c.fetchall():
+                self._backup_cache[topic_id] = topic
+                self._backup_cache[topic] = topic_id
+
     def remove_successfully_published(self, successful_publishes,
                                       submit_size):
         """
@@ -1651,18 +1908,12 @@ class BackupDatabase:
                 c.executemany('''DELETE FROM outstanding
                                           WHERE id = ?''',
                               ((_id,) for _id in self._unique_ids))
-                if self._record_count < c.rowcount:
-                    self._record_count = 0
-                else:
-                    self._record_count -= len(self._unique_ids)
             else:
-                temp = list(successful_publishes)
-                temp.sort()
                 c.executemany('''DELETE FROM outstanding
                                 WHERE id = ?''',
                               ((_id,) for _id in
                                successful_publishes))
-                self._record_count -= len(temp)
+            self._update_record_count(c, -c.rowcount)
         finally:
             # if we don't clear these attributes on every publish,
             # we could possibly delete a non-existing record on the next publish
@@ -1671,6 +1922,15 @@ class BackupDatabase:
 
         self._connection.commit()
 
+        if self._record_count == 0 and self._pragmas.get('auto_vacuum') == 'INCREMENTAL':
+            # Caught up, return the pages freed while draining the cache to the file system.
+            # execute() only steps the statement once, which frees a single page.
+            vacuum = 'PRAGMA incremental_vacuum;'
+            if str(self._pragmas.get('journal_mode')).upper() == 'WAL':
+                # The database file only shrinks once the WAL is checkpointed.
+                vacuum += ' PRAGMA wal_checkpoint(TRUNCATE);'
+            self._connection.executescript(vacuum)
+
     def get_outstanding_to_publish(self, size_limit):
         """
         Retrieve up to `size_limit` records from the cache. Guarantees a unique list of records,
@@ -1683,7 +1943,8 @@ class BackupDatabase:
         """
         # _log.debug("Getting oldest outstanding to publish.")
         c = self._connection.cursor()
-        c.execute('select * from outstanding order by ts limit ?', (size_limit,))
+        c.execute('''SELECT id, ts AS "ts [backup_timestamp]", source, topic_id, value_string, header_string
+                     FROM outstanding ORDER BY ts LIMIT ?''', (size_limit,))
         results = []
         unique_records = set()
         for row in c:
@@ -1704,8 +1965,10 @@ class BackupDatabase:
             unique_records.add((topic_id, timestamp))
             self._unique_ids.append(_id)
 
+            if isinstance(timestamp, datetime):
+                timestamp = timestamp.replace(tzinfo=pytz.UTC)
             results.append({'_id': _id,
-                            'timestamp': timestamp.replace(tzinfo=pytz.UTC),
+                            'timestamp': timestamp,
                             'source': source,
                             'topic': topic,
                             'value': value,
@@ -1713,16 +1976,6 @@ class BackupDatabase:
                             'meta': meta})
 
         c.close()
-        # If we were backlogged at startup and our initial estimate was
-        # off this will correct it.
-        if len(results) < size_limit:
-            self._record_count = len(results)
-
-        # if we have duplicates, we must count them as part of the "real" total of _record_count
-        if self._dupe_ids:
-            _log.debug(f"Adding duplicates to the total record count: {self._dupe_ids}")
-            self._record_count += len(self._dupe_ids)
-
         return results
 
     def get_backlog_count(self):
@@ -1731,6 +1984,15 @@ class BackupDatabase:
         """
         return self._record_count
 
+    def _update_record_count(self, c, delta):
+        """
+        Adjusts the record count and persists it as part of the current
+        transaction so the count stays exact across restarts.
+        """
+        self._record_count = max(0, self._record_count + delta)
+        c.execute('''UPDATE cache_stats SET value = ? WHERE name = ?''',
+                  (self._record_count, 'record_count'))
+
     def close(self):
         self._connection.close()
         self._connection = None
@@ -1754,6 +2016,12 @@ class BackupDatabase:
             detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES,
             check_same_thread=check_same_thread)
 
+        # auto_vacuum must be set before the tables are created. Changing it
+        # from NONE on an existing cache requires a VACUUM and is ignored.
+        for name, value in self._pragmas.items():
+            self._connection.execute(f'''PRAGMA {name} = {value}''')
+        _log.debug(f"Backup DB settings: {self._pragmas}")
+
         c = self._connection.cursor()
         if self._backup_storage_limit_gb is not None:
             c.execute('''PRAGMA page_size''')
@@ -1767,7 +2035,6 @@ class BackupDatabase:
 
         if c.fetchone() is None:
             _log.debug("Configuring backup DB for the first time.")
-            self._connection.execute('''PRAGMA auto_vacuum = FULL''')
             self._connection.execute('''CREATE TABLE IF NOT EXISTS outstanding
                                         (id INTEGER PRIMARY KEY,
                                          ts timestamp NOT NULL,
@@ -1775,7 +2042,6 @@ class BackupDatabase:
                                          topic_id INTEGER NOT NULL,
                                          value_string TEXT NOT NULL,
                                          header_string TEXT)''')
-            self._record_count = 0
         else:
             # Check to see if we have a header_string column.
             c.execute("pragma table_info(outstanding);")
@@ -1795,24 +2061,24 @@ class BackupDatabase:
                 _log.info("Updating cache database to support storing header data.")
                 c.execute("ALTER TABLE outstanding ADD COLUMN header_string text;")
 
-            # Initialize record_count at startup.
-            # This is a (probably correct) estimate of the total records cached.
-            # We do not use count() as it can be very slow if the cache is quite large.
+        # The number of records in outstanding is kept up to date in the same
+        # transactions that add and remove records.
+        c.execute("SELECT name FROM sqlite_master WHERE type='table' "
+                  "AND name='cache_stats';")
+
+        if c.fetchone() is None:
+            self._connection.execute('''CREATE TABLE IF NOT EXISTS cache_stats
+                                        (name TEXT PRIMARY KEY,
+                                         value INTEGER NOT NULL)''')
+            # Only a cache created before the count was stored needs to be counted.
             _log.info("Counting existing rows.")
-            self._connection.execute('''select
-                                        max(id)
-                                        from outstanding''')
-            max_id = c.fetchone()
-
-            self._connection.execute('''select
-                                        min(id)
-                                        from outstanding''')
-            min_id = c.fetchone()
-
-            if max_id is not None and min_id is not None:
-                self._record_count = max_id[0] - min_id[0] + 1
-            else:
-                self._record_count = 0
+            c.execute('''SELECT count(*) FROM outstanding''')
+            self._record_count = c.fetchone()[0]
+            c.execute('''INSERT INTO cache_stats VALUES (?, ?)''',
+                      ('record_count', self._record_count))
+        else:
+            c.execute('''SELECT value FROM cache_stats WHERE name = ?''', ('record_count',))
+            self._record_count = c.fetchone()[0]
 
         c.execute('''CREATE INDEX IF NOT EXISTS outstanding_ts_index
                                            ON outstanding (ts)''')
@@ -1822,7 +2088,6 @@ class BackupDatabase:
 
         if c.fetchone() is None:
             _log.debug("Configuring backup DB for the first time.")
-            self._connection.execute('''PRAGMA auto_vacuum = FULL''')
             self._connection.execute('''CREATE TABLE IF NOT EXISTS time_error
                                                 (id INTEGER PRIMARY KEY,
                                                  ts timestamp NOT NULL,
@@ -1889,15 +2154,72 @@ for method in [BackupDatabase.get_outstanding_to_publish,
     setattr(AsyncBackupDatabase, method.__name__, _using_threadpool(method))
 
 
+class QueryCursor(object):
+    """Position of a paged query started with
+    :py:meth:`BaseQueryHistorianAgent.query_start`.
+
+    Only the query arguments and the last timestamp returned are kept, never
+    the results themselves.
+    """
+    __slots__ = ('topics', 'multi_topic', 'start', 'end', 'agg_type',
+                 'agg_period', 'order', 'raw', 'topic_index', 'last_timestamp',
+                 'last_timestamp_count', 'metadata_sent', 'expires')
+
+    def __init__(self, topics, multi_topic, start, end, agg_type, agg_period,
+                 order, raw):
+        self.topics = topics
+        self.multi_topic = multi_topic
+        self.start = start
+        self.end = end
+        self.agg_type = agg_type
+        self.agg_period = agg_period
+        self.order = order
+        self.raw = raw
+        self.topic_index = 0
+        self.last_timestamp = None
+        self.last_timestamp_count = 0
+        self.metadata_sent = False
+        self.expires = None
+
+    def advance(self, rows):
+        """Record the last timestamp of a page of (timestamp, value) rows
+        and how many rows returned so far share it."""
+        last = rows[-1][0]
+        count = 0
+        for ts, _ in reversed(rows):
+            if ts != last:
+                break
+            count += 1
+        if count == len(rows) and last == self.last_timestamp:
+            count += self.last_timestamp_count
+        self.last_timestamp = last
+        self.last_timestamp_count = count
+
+    def next_topic(self):
+        self.topic_index += 1
+        self.last_timestamp = None
+        self.last_timestamp_count = 0
+
+    def last_datetime(self):
+        if self.raw:
+            return datetime.fromtimestamp(self.last_timestamp, pytz.UTC)
+        last = parse_timestamp_string(self.last_timestamp)
+        if last.tzinfo is None:
+            last = last.replace(tzinfo=pytz.UTC)
+        return last
+
+
 class BaseQueryHistorianAgent(Agent):
     """This is the base agent for historian Agents that support querying of
     their data stores.
     """
 
-    def __init__(self, **kwargs):
+    def __init__(self, query_cursor_timeout=DEFAULT_QUERY_CURSOR_TIMEOUT, **kwargs):
         _log.debug('Constructor of BaseQueryHistorianAgent thread: {}'.format(
             threading.currentThread().getName()
         ))
+        self._query_cursor_timeout = float(query_cursor_timeout)
+        self._query_cursors = {}
         global time_parser
         if time_parser is None:
             if utils.is_secure_mode():
@@ -1936,6 +2258,32 @@ class BaseQueryHistorianAgent(Agent):
         """
         return self.query_topic_list()
 
+    @RPC.export
+    def get_topic_list_version(self):
+        """RPC call to get a token that changes whenever the topic list
+        returned by get_topic_list changes. Lets callers that cache the topic
+        list check it is current without transferring the whole list.
+
+        :return: opaque version string
+        :rtype: str
+        """
+        return self.query_topic_list_version()
+
+    def query_topic_list_version(self):
+        """
+        This function is called by
+        :py:meth:`BaseQueryHistorianAgent.get_topic_list_version`.
+
+        The default implementation digests the list returned by
+        query_topic_list. Historians that keep their topics in memory should
+        override it with something that does not need the whole list.
+
+        :return: opaque version string
+        :rtype: str
+        """
+        topics = self.query_topic_list()
+        return "{}-{:x}".format(len(topics), hash(frozenset(topics)) & 0xffffffffffffffff)
+
     @RPC.export
     def get_topics_by_pattern(self, topic_pattern):
         """ Find the list of topics and its id for a given topic_pattern
@@ -2031,7 +2379,8 @@ class BaseQueryHistorianAgent(Agent):
 
     @RPC.export
     def query(self, topic=None, start=None, end=None, agg_type=None,
-              agg_period=None, skip=0, count=None, order="FIRST_TO_LAST"):
+              agg_period=None, skip=0, count=None, order="FIRST_TO_LAST",
+              raw=False):
         """RPC call to query an Historian for time series data.
 
         :param topic: Topic or topics to query for.
@@ -2043,6 +2392,10 @@ class BaseQueryHistorianAgent(Agent):
         :param count: Limit results to this value.
         :param order: How to order the results, either "FIRST_TO_LAST" or
                       "LAST_TO_FIRST"
+        :param raw: Return timestamps as seconds since the epoch instead of
+                    ISO 8601 strings. Only supported by historians whose
+                    query_historian accepts a raw argument, such as the
+                    SQL historians.
         :type topic: str or list
         :type start: str
         :type end: str
@@ -2081,6 +2434,151 @@ class BaseQueryHistorianAgent(Agent):
 
         """
 
+        start, end, agg_period = self._parse_query_arguments(
+            topic, start, end, agg_type, agg_period)
+
+        results = self._query_historian(topic, start, end, agg_type,
+                                        agg_period, skip, count, order, raw)
+        metadata = results.get("metadata", None)
+        values = results.get("values", None)
+        if values and metadata is None:
+            results['metadata'] = {}
+
+        return results
+
+    @RPC.export
+    def query_start(self, topic=None, start=None, end=None, agg_type=None,
+                    agg_period=None, order="FIRST_TO_LAST", raw=False):
+        """RPC call to start a paged query of an Historian.
+
+        Takes the same arguments as :py:meth:`query`, without skip and
+        count, and returns a cursor id to pass to :py:meth:`query_next`.
+        Nothing is read from the data store until :py:meth:`query_next` is
+        called, and each call only reads the rows it returns, so large
+        results never have to be held in memory or sent in one message.
+
+        Cursors that are not used for ``query_cursor_timeout`` seconds are
+        discarded.
+
+        :return: cursor id
+        :rtype: str
+        """
+        start, end, agg_period = self._parse_query_arguments(
+            topic, start, end, agg_type, agg_period)
+        self._expire_query_cursors()
+
+        if isinstance(topic, str):
+            topics_list = [topic]
+        else:
+            topics_list = list(topic)
+        cursor = QueryCursor(topics_list, not isinstance(topic, str), start,
+                             end, agg_type, agg_period, order, raw)
+        cursor_id = uuid.uuid4().hex
+        cursor.expires = time.monotonic() + self._query_cursor_timeout
+        self._query_cursors[cursor_id] = cursor
+        return cursor_id
+
+    @RPC.export
+    def query_next(self, cursor, count=1000):
+        """RPC call to read the next results of a paged query.
+
+        :param cursor: cursor id returned by :py:meth:`query_start`
+        :param count: maximum number of values to return
+        :type cursor: str
+        :type count: int
+
+        :return: The next results in the same form as :py:meth:`query`,
+                 with "done" set to True once the query is exhausted. The
+                 cursor is closed when "done" is True.
+        :rtype: dict
+
+        .. code-block:: python
+
+            {
+                "values": [(<timestamp string1>: value1), ...],
+                "metadata": {"key1": value1, ...},
+                "done": False
+            }
+        """
+        self._expire_query_cursors()
+        state = self._query_cursors.get(cursor)
+        if state is None:
+            raise ValueError("Unknown or expired query cursor {}".format(cursor))
+        if count < 1:
+            raise ValueError("count must be greater than 0")
+
+        values = {}
+        metadata = {}
+        remaining = count
+        while remaining > 0 and state.topic_index < len(state.topics):
+            topic = state.topics[state.topic_index]
+            requested = remaining
+            page = self._query_cursor_page(state, topic, requested)
+            rows = page.get("values") or []
+            if rows:
+                if not state.multi_topic and not state.metadata_sent:
+                    metadata = page.get("metadata") or {}
+                    state.metadata_sent = True
+                values.setdefault(topic, []).extend(rows)
+                state.advance(rows)
+                remaining -= len(rows)
+            if len(rows) < requested:
+                # Fewer rows than asked for, this topic is exhausted.
+                state.next_topic()
+
+        done = state.topic_index >= len(state.topics)
+        if done:
+            del self._query_cursors[cursor]
+        else:
+            state.expires = time.monotonic() + self._query_cursor_timeout
+
+        if not state.multi_topic:
+            values = values.get(state.topics[0], [])
+        return {"values": values, "metadata": metadata, "done": done}
+
+    @RPC.export
+    def query_close(self, cursor):
+        """RPC call to discard a paged query before it is exhausted.
+
+        :param cursor: cursor id returned by :py:meth:`query_start`
+        :type cursor: str
+        """
+        self._query_cursors.pop(cursor, None)
+        self._expire_query_cursors()
+
+    def _expire_query_cursors(self):
+        now = time.monotonic()
+        expired = [cursor_id for cursor_id, cursor in self._query_cursors.items() if cursor.expires < now]
+        for cursor_id in expired:
+            _log.debug("Discarding expired query cursor {}".format(cursor_id))
+            del self._query_cursors[cursor_id]
+
+    def _query_cursor_page(self, state, topic, count):
+        # Keyset paging: restart each page at the last timestamp returned and skip the rows at that
+        # timestamp which were already returned, so every page is a bounded index range scan.
+        start, end, skip = state.start, state.end, 0
+        if state.last_timestamp is not None:
+            skip = state.last_timestamp_count
+            last = state.last_datetime()
+            if state.order == "LAST_TO_FIRST":
+                end = last + timedelta(microseconds=1)
+            else:
+                start = last
+        return self._query_historian(topic, start, end, state.agg_type,
+                                     state.agg_period, skip, count,
+                                     state.order, state.raw)
+
+    def _query_historian(self, topic, start, end, agg_type, agg_period, skip,
+                         count, order, raw):
+        if raw:
+            return self.query_historian(topic, start, end, agg_type,
+                                        agg_period, skip, count, order,
+                                        raw=True)
+        return self.query_historian(topic, start, end, agg_type,
+                                    agg_period, skip, count, order)
+
+    @staticmethod
+    def _parse_query_arguments(topic, start, end, agg_type, agg_period):
         if topic is None:
             raise TypeError('"Topic" required')
 
@@ -2114,15 +2612,7 @@ class BaseQueryHistorianAgent(Agent):
 
         if start:
             _log.debug("start={}".format(start))
-
-        results = self.query_historian(topic, start, end, agg_type,
-                                       agg_period, skip, count, order)
-        metadata = results.get("metadata", None)
-        values = results.get("values", None)
-        if values and metadata is None:
-            results['metadata'] = {}
-
-        return results
+        return start, end, agg_period
 
     @abstractmethod
     def query_historian(self, topic, start=None, end=None, agg_type=None,
@@ -2180,6 +2670,9 @@ class BaseQueryHistorianAgent(Agent):
                       records for each topic
         :param order: How to order the results, either "FIRST_TO_LAST" or
                       "LAST_TO_FIRST"
+        :param raw: Optional. Historians that support it accept a raw
+                    keyword argument and, when it is True, return timestamps
+                    as seconds since the epoch (float) instead of strings.
         :type topic: str or list
         :type start: datetime
         :type end: datetime
@@ -2199,6 +2692,7 @@ class BaseHistorian(BaseHistorianAgent, BaseQueryHistorianAgent):
             threading.currentThread().getName()
         ))
         super(BaseHistorian, self).__init__(**kwargs)
+        self.update_default_config({"query_cursor_timeout": self._query_cursor_timeout})
 
 
 # The following code is
@@ -28,9 +28,12 @@ import csv
 import sqlite3
 import datetime
 import os
+import time
+from collections import deque, OrderedDict
 from functools import wraps
 from abc import abstractmethod
 from gevent import get_hub
+from gevent.pool import Pool
 from volttron.platform.agent.utils import fix_sqlite3_datetime, \
     get_aware_utc_now, format_timestamp, process_timestamp, \
     parse_timestamp_string
@@ -98,6 +101,9 @@ class BaseWeatherAgent(Agent):
                  poll_interval=None,
                  poll_topic_suffixes=None,
                  api_calls_limit=-1,
+                 max_concurrent_requests=10,
+                 api_calls_checkpoint_interval=60,
+                 current_data_cache_size=0,
                  **kwargs):
         # Initial agent configuration
         try:
@@ -109,6 +115,9 @@ class BaseWeatherAgent(Agent):
             self._api_key = api_key
             self._max_size_gb = max_size_gb
             self._api_calls_limit = api_calls_limit
+            self._max_concurrent_requests = max_concurrent_requests
+            self._api_calls_checkpoint_interval = api_calls_checkpoint_interval
+            self._current_data_cache_size = current_data_cache_size
             self.poll_locations = poll_locations
             self.poll_interval = poll_interval
             self.poll_topic_suffixes = poll_topic_suffixes
@@ -124,6 +133,9 @@ class BaseWeatherAgent(Agent):
                     "api_key": self._api_key,
                     "max_size_gb": self._max_size_gb,
                     "api_calls_limit": self._api_calls_limit,
+                    "max_concurrent_requests": self._max_concurrent_requests,
+                    "api_calls_checkpoint_interval": self._api_calls_checkpoint_interval,
+                    "current_data_cache_size": self._current_data_cache_size,
                     "poll_locations": self.poll_locations,
                     "poll_interval": self.poll_interval,
                     "poll_topic_suffixes": self.poll_topic_suffixes
@@ -392,6 +404,15 @@ class BaseWeatherAgent(Agent):
         self._api_key = config.get("api_key")
         self._api_calls_limit = config.get("api_calls_limit",
                                            self._api_calls_limit)
+        try:
+            self._max_concurrent_requests = max(int(config.get("max_concurrent_requests", 10)), 1)
+            self._api_calls_checkpoint_interval = float(config.get("api_calls_checkpoint_interval", 60))
+            self._current_data_cache_size = int(config.get("current_data_cache_size", 0))
+        except ValueError as e:
+            _log.warning("Invalid weather request setting: {}. Using defaults".format(e))
+            self._max_concurrent_requests = 10
+            self._api_calls_checkpoint_interval = 60
+            self._current_data_cache_size = 0
         self.poll_locations = config.get("poll_locations")
         self.poll_interval = config.get("poll_interval")
         self.poll_topic_suffixes = config.get("poll_topic_suffixes")
@@ -407,11 +428,16 @@ class BaseWeatherAgent(Agent):
         else:
             _log.debug("Configuration successful")
             try:
+                if self._cache is not None:
+                    # Save the API calls tracked in memory before reopening
+                    self._cache.close()
                 self._cache = WeatherCache(self._database_file,
                                            calls_period=self._api_calls_period,
                                            calls_limit=self._api_calls_limit,
                                            api_services=self._api_services,
-                                           max_size_gb=self._max_size_gb)
+                                           max_size_gb=self._max_size_gb,
+                                           checkpoint_interval=self._api_calls_checkpoint_interval,
+                                           current_data_cache_size=self._current_data_cache_size)
                 self.vip.health.set_status(STATUS_GOOD,
                                            "Configuration of weather agent "
                                            "successful")
@@ -544,6 +570,7 @@ class BaseWeatherAgent(Agent):
 
         """
         result = []
+        remote = []
         for location in locations:
             record_dict = self.validate_location_dict(SERVICE_CURRENT_WEATHER,
                                                       location)
@@ -552,25 +579,50 @@ class BaseWeatherAgent(Agent):
                 continue
             # Attempt getting from cache
             record_dict = self.get_cached_current_data(location)
-            cache_warning = record_dict.get(WEATHER_WARN)
             # if there was no data in cache or if data is old, query api
             if not record_dict.get(WEATHER_RESULTS):
-                _log.debug("Current weather data from api")
-                if self.api_calls_available():
-                    record_dict = self.get_current_weather_remote(location)
-                    # rework this check to catch specific problems (probably
-                    # just weather_error)
-                    if cache_warning:
-                        warnings = record_dict.get(WEATHER_WARN, [])
-                        warnings.extend(cache_warning)
-                        record_dict[WEATHER_WARN] = warnings
-                else:
-                    record_dict[WEATHER_ERROR] = "No calls currently " \
-                                                 "available for the " \
-                                                 "configured API key"
+                remote.append((len(result), location))
             result.append(record_dict)
+        if remote:
+            _log.debug("Current weather data from api")
+            self.fetch_remote(result, remote, self.get_current_weather_remote)
         return result
 
+    def fetch_remote(self, result, remote, fetch):
+        """
+        Retrieves data for locations from the remote api concurrently, with at
+        most max_concurrent_requests requests in progress. A request is only
+        made while the api calls limit allows it, counting the requests that
+        are still in progress.
+        :param result: list of result dictionaries, the entries of remotely
+        retrieved locations are replaced by the result of fetch
+        :param remote: list of (index in result, location) to retrieve
+        :param fetch: function taking a location and returning its result
+        dictionary
+        """
+        pool = Pool(self._max_concurrent_requests)
+
+        def run(index, location):
+            # rework this check to catch specific problems (probably
+            # just weather_error)
+            cache_warning = result[index].get(WEATHER_WARN)
+            record_dict = fetch(location)
+            if cache_warning:
+                warnings = record_dict.get(WEATHER_WARN, [])
+                warnings.extend(cache_warning)
+                record_dict[WEATHER_WARN] = warnings
+            result[index] = record_dict
+
+        for index, location in remote:
+            if self.api_calls_available(len(pool) + 1):
+                # Blocks while max_concurrent_requests requests are running
+                pool.spawn(run, index, location)
+            else:
+                result[index][WEATHER_ERROR] = "No calls currently " \
+                                               "available for the " \
+                                               "configured API key"
+        pool.join()
+
     def get_cached_current_data(self, location):
         """
         Retrieves current weather data stored in cache if it exists and is
@@ -732,6 +784,7 @@ class BaseWeatherAgent(Agent):
         """
         request_time = get_aware_utc_now()
         result = []
+        remote = []
         for location in locations:
             record_dict = self.validate_location_dict(service,
                                                       location)
@@ -745,24 +798,15 @@ class BaseWeatherAgent(Agent):
                                                               request_time,
                                                               service,
                                                               service_length)
-            cache_warning = record_dict.get(WEATHER_WARN)
             # if cache didn't work out query remote api
             if not record_dict.get(WEATHER_RESULTS):
-                if self.api_calls_available():
-                    _log.debug("forecast weather from api")
-                    record_dict = self.get_remote_forecast(service, location,
-                                                           quantity,
-                                                           request_time)
-                    if cache_warning:
-                        warnings = record_dict.get(WEATHER_WARN, [])
-                        warnings.extend(cache_warning)
-                        record_dict[WEATHER_WARN] = warnings
-                else:
-                    record_dict[WEATHER_ERROR] = "No calls currently " \
-                                                 "available for the " \
-                                                 "configured API key"
+                remote.append((len(result), location))
             result.append(record_dict)
 
+        if remote:
+            _log.debug("forecast weather from api")
+            self.fetch_remote(result, remote,
+                              lambda location: self.get_remote_forecast(service, location, quantity, request_time))
         return result
 
     @RPC.export
@@ -1213,7 +1257,9 @@ class WeatherCache:
                  calls_limit=None,
                  calls_period=None,
                  max_size_gb=1,
-                 check_same_thread=True):
+                 check_same_thread=True,
+                 checkpoint_interval=60,
+                 current_data_cache_size=0):
         """
 
         :param database_file: path sqlite file to use for cache
@@ -1225,6 +1271,10 @@ class WeatherCache:
         :param check_same_thread: True to allow multiple threads to connect
         to the sqlite object, else false (see
         https://docs.python.org/3/library/sqlite3.html)
+        :param checkpoint_interval: API calls are tracked in memory and
+        written to the database at most this often in seconds
+        :param current_data_cache_size: number of locations for which the
+        latest current weather observation is kept in memory
         """
         self._calls_limit = calls_limit
         self._calls_period = calls_period
@@ -1233,8 +1283,16 @@ class WeatherCache:
         self._max_size_gb = max_size_gb
         self._sqlite_conn = None
         self._max_pages = None
-        self._setup_cache(check_same_thread)
+        self._checkpoint_interval = checkpoint_interval
+        self._last_checkpoint = time.monotonic()
+        # Times of the API calls within the calls period, oldest first
+        self._api_calls = deque()
+        # API calls not yet written to the database
         self.pending_calls = []
+        self._current_data_cache_size = current_data_cache_size
+        # (service_name, location) -> (observation_time, points)
+        self._current_data = OrderedDict()
+        self._setup_cache(check_same_thread)
 
     # cache setup methods
 
@@ -1254,6 +1312,8 @@ class WeatherCache:
         _log.info("connected to database, sqlite version: {}".format(
             sqlite3.version))
         self.create_tables()
+        if self._calls_limit:
+            self.load_api_calls()
         cursor = self._sqlite_conn.cursor()
         if self._max_size_gb is not None:
             cursor.execute("PRAGMA page_size")
@@ -1350,6 +1410,24 @@ class WeatherCache:
                     self._sqlite_conn.commit()
                     break
 
+    def load_api_calls(self):
+        """
+        Loads the API calls stored in the database into the in memory
+        sliding window used to check the api calls limit
+        """
+        cursor = self._sqlite_conn.cursor()
+        cursor.execute("""SELECT CALL_TIME FROM API_CALLS
+                          ORDER BY CALL_TIME ASC;""")
+        self._api_calls = deque(row[0] for row in cursor.fetchall())
+        cursor.close()
+        self._expire_api_calls()
+
+    def _expire_api_calls(self):
+        if self._calls_period:
+            expiry_time = get_aware_utc_now() - self._calls_period
+            while self._api_calls and self._api_calls[0] <= expiry_time:
+                self._api_calls.popleft()
+
     def api_calls_available(self, num_calls=1):
         """
         :param num_calls: Number of calls requested by the agent to fulfill the
@@ -1361,50 +1439,49 @@ class WeatherCache:
             raise ValueError('Invalid quantity for API calls')
         if self._calls_limit < 0:
             return True
-        try:
-            cursor = self._sqlite_conn.cursor()
-            if self._calls_period:
-                current_time = get_aware_utc_now()
-                expiry_time = current_time - self._calls_period
-                delete_query = """DELETE FROM API_CALLS WHERE CALL_TIME <= ?;"""
-                cursor.execute(delete_query, (expiry_time,))
-                self._sqlite_conn.commit()
-            active_calls_query = """SELECT COUNT(*) FROM API_CALLS;"""
-            cursor.execute(active_calls_query)
-            active_calls = cursor.fetchone()[0]
-            cursor.close()
-            return active_calls + num_calls <= self._calls_limit
-        except AttributeError as error:
-            _log.error("Error getting available API calls: {}".format(error))
-            # Add a call to the pending queue so we can track it later
-            self.pending_calls.append(get_aware_utc_now())
-            return True
+        self._expire_api_calls()
+        return len(self._api_calls) + num_calls <= self._calls_limit
 
     def add_api_call(self):
         """
-        If an API call is available given the constraints, adds an entry to
-        the table for tracking
-        :return: True if an entry was made successfully, false otherwise
+        Tracks an API call. The call is written to the database with the
+        next checkpoint.
+        :return: True if the call was tracked and any checkpoint that was due
+        succeeded, false otherwise
+        """
+        current_time = get_aware_utc_now()
+        self._api_calls.append(current_time)
+        self.pending_calls.append(current_time)
+        if time.monotonic() - self._last_checkpoint >= self._checkpoint_interval:
+            return self.checkpoint_api_calls()
+        return True
+
+    def checkpoint_api_calls(self):
+        """
+        Writes the tracked API calls to the database and removes calls that
+        are older than the calls period from it, so the limit still applies
+        after the agent restarts.
+        :return: True if the API calls were written, false otherwise
         """
         try:
             cursor = self._sqlite_conn.cursor()
+            if self._calls_period:
+                expiry_time = get_aware_utc_now() - self._calls_period
+                delete_query = """DELETE FROM API_CALLS WHERE CALL_TIME <= ?;"""
+                cursor.execute(delete_query, (expiry_time,))
             insert_query = """INSERT INTO API_CALLS
-                                         (CALL_TIME) VALUES (?);"""
-            # Account for calls that went through to the API but did not get added
-            # to the SQLite table due to an error
+                             (CALL_TIME) VALUES (?);"""
             cursor.executemany(
                 insert_query, [(call,) for call in self.pending_calls])
-            cursor = self._sqlite_conn.cursor()
-            current_time = (get_aware_utc_now(),)
-            insert_query = """INSERT INTO API_CALLS
-                             (CALL_TIME) VALUES (?);"""
-            cursor.execute(insert_query, current_time)
             self._sqlite_conn.commit()
             cursor.close()
-            return True
         except (AttributeError, sqlite3.Error) as error:
+            # Calls stay pending and are written by the next checkpoint
             _log.error("Error Adding api calls {}:{}".format(type(error), error))
             return False
+        self.pending_calls = []
+        self._last_checkpoint = time.monotonic()
+        return True
 
     def get_current_data(self, service_name, location):
         """
@@ -1413,7 +1490,10 @@ class WeatherCache:
         :param location: location to query by
         :return: a single current weather observation record
         """
-        query = ""
+        key = (service_name, location)
+        if key in self._current_data:
+            self._current_data.move_to_end(key)
+            return self._current_data[key]
 
         cursor = self._sqlite_conn.cursor()
         query = """SELECT max(OBSERVATION_TIME), POINTS
@@ -1424,10 +1504,23 @@ class WeatherCache:
         data = cursor.fetchone()
         cursor.close()
         if data and data[0]:
-            return parse_timestamp_string(data[0]), data[1]
+            record = parse_timestamp_string(data[0]), data[1]
+            self._remember_current_data(key, record)
+            return record
         else:
             return None, None
 
+    def _remember_current_data(self, key, record):
+        if self._current_data_cache_size <= 0:
+            return
+        cached = self._current_data.get(key)
+        if cached is not None and cached[0] > record[0]:
+            return
+        self._current_data[key] = record
+        self._current_data.move_to_end(key)
+        if len(self._current_data) > self._current_data_cache_size:
+            self._current_data.popitem(last=False)
+
     def get_forecast_data(self, service_name, service_length, location,
                           quantity, request_time):
         """
@@ -1519,6 +1612,9 @@ class WeatherCache:
         else:
             cursor.executemany(query, records)
         self._sqlite_conn.commit()
+        if request_type == "current":
+            location, observation_time, points = records
+            self._remember_current_data((service_name, location), (observation_time, points))
 
         cache_full = False
         if self._max_size_gb is not None and \
@@ -1604,6 +1700,11 @@ class WeatherCache:
 
     def close(self):
         """Close the sqlite database connection when the agent stops"""
+        self._current_data.clear()
+        if self._sqlite_conn is None:
+            return
+        if self.pending_calls:
+            self.checkpoint_api_calls()
         self._sqlite_conn.close()
         self._sqlite_conn = None
 
@@ -1630,6 +1731,7 @@ class AsyncWeatherCache(WeatherCache):
 # Cache methods to make available for threading.
 for method in [WeatherCache.get_current_data,
                WeatherCache.get_forecast_data,
+               WeatherCache.checkpoint_api_calls,
                # WeatherCache.get_historical_data,
                WeatherCache._setup_cache,
                WeatherCache.store_weather_records]:
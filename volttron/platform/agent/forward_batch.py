@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2023 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+"""
+Message format used by the ForwardHistorian to send many publishes to the
+ForwardReceiver agent on another platform in a single RPC call.
+
+A batch is a dictionary that can be passed as an RPC argument::
+
+    {
+        "version": 1,
+        "count": <number of publishes>,
+        "compression": "zlib" or None,
+        "data": <base64 of the (compressed) JSON list of
+                 [topic, headers, message] entries>
+    }
+"""
+
+import base64
+import zlib
+
+from volttron.platform import jsonapi
+
+__all__ = ['BATCH_VERSION', 'pack_batch', 'unpack_batch']
+
+BATCH_VERSION = 1
+
+
+def pack_batch(publishes, compress=True):
+    """
+    Build a batch from publishes
+
+    :param publishes: list of (topic, headers, message) tuples
+    :param compress: zlib compress the publishes
+    :return: batch dictionary
+    """
+    data = jsonapi.dumpb([list(p) for p in publishes])
+    if compress:
+        data = zlib.compress(data)
+    return {"version": BATCH_VERSION,
+            "count": len(publishes),
+            "compression": "zlib" if compress else None,
+            "data": base64.b64encode(data).decode('ascii')}
+
+
+def unpack_batch(batch):
+    """
+    :param batch: batch dictionary built by pack_batch
+    :return: list of (topic, headers, message) tuples
+    """
+    version = batch.get("version")
+    if version != BATCH_VERSION:
+        raise ValueError("Unsupported batch version {}".format(version))
+    data = base64.b64decode(batch["data"])
+    compression = batch.get("compression")
+    if compression == "zlib":
+        data = zlib.decompress(data)
+    elif compression is not None:
+        raise ValueError("Unsupported batch compression {}".format(compression))
+    publishes = [tuple(p) for p in jsonapi.loadb(data)]
+    if len(publishes) != batch.get("count", len(publishes)):
+        raise ValueError("Batch count {} does not match {} publishes".format(batch["count"], len(publishes)))
+    return publishes
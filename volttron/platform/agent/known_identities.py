@@ -36,6 +36,7 @@ PLATFORM_HEALTH = 'platform.health'
 # The PLATFORM_ALERTER known name is now deprecated
 PLATFORM_ALERTER = PLATFORM_TOPIC_WATCHER
 PLATFORM_HISTORIAN = 'platform.historian'
+PLATFORM_FORWARD_RECEIVER = 'platform.forward_receiver'
 
 PLATFORM_MARKET_SERVICE = 'platform.market'
 
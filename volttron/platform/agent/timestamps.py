@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2023 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+"""
+Fast conversion of timestamps between datetime objects, the ISO 8601 strings
+used in message headers and the historians, and seconds since the epoch.
+
+Timestamps written by VOLTTRON always have the same layout::
+
+    YYYY-MM-DDTHH:MM:SS.mmmmmm          naive
+    YYYY-MM-DDTHH:MM:SS.mmmmmm+HH:MM    aware
+
+so parsing slices the string at fixed positions and uses the C
+implementation of :meth:`datetime.fromisoformat`, falling back to
+:func:`dateutil.parser.parse` for anything else. Time zones are cached per
+offset string so every "+00:00" timestamp shares the same ``pytz.UTC``, and
+offset strings are cached per UTC offset when formatting.
+
+Epoch values are float seconds since 1970-01-01 UTC, naive datetimes are
+taken to be UTC like the historians do.
+
+``volttrontesting/benchmarks/timestamps.py`` compares these functions with
+the older implementations.
+"""
+
+from datetime import datetime, timezone
+
+import pytz
+from dateutil.parser import parse
+from dateutil.tz import tzoffset
+
+__all__ = ['format_timestamp', 'parse_timestamp', 'utc_now', 'to_epoch',
+           'from_epoch', 'format_epoch', 'parse_epoch']
+
+# Offset string -> tzinfo and utcoffset -> offset string
+_zones = {"+00:00": pytz.UTC, "Z": pytz.UTC}
+_offset_strings = {}
+
+
+def _zone(offset_str):
+    tz = _zones.get(offset_str)
+    if tz is None:
+        if len(offset_str) != 6 or offset_str[0] not in '+-' or offset_str[3] != ':':
+            raise ValueError("Invalid UTC offset {}".format(offset_str))
+        seconds = int(offset_str[1:3]) * 3600 + int(offset_str[4:6]) * 60
+        if offset_str[0] == '-':
+            seconds = -seconds
+        tz = _zones[offset_str] = tzoffset("", seconds)
+    return tz
+
+
+def _offset_string(offset):
+    offset_str = _offset_strings.get(offset)
+    if offset_str is None:
+        sign = '+'
+        td = offset
+        if td.days < 0:
+            sign = '-'
+            td = -td
+        minutes, seconds = divmod(td.seconds, 60)
+        hours, minutes = divmod(minutes, 60)
+        offset_str = _offset_strings[offset] = "{}{:02}:{:02}".format(sign, hours, minutes)
+    return offset_str
+
+
+def format_timestamp(time_stamp):
+    """
+    Same output as :func:`volttron.platform.agent.utils.format_timestamp`,
+    YYYY-MM-DDTHH:MM:SS.mmmmmm with +HH:MM appended for aware datetimes.
+    """
+    # Quicker than strftime or isoformat
+    time_str = '%04d-%02d-%02dT%02d:%02d:%02d.%06d' % (
+        time_stamp.year, time_stamp.month, time_stamp.day, time_stamp.hour,
+        time_stamp.minute, time_stamp.second, time_stamp.microsecond)
+    if time_stamp.tzinfo is None:
+        return time_str
+    return time_str + _offset_string(time_stamp.utcoffset())
+
+
+def _with_zone(naive, tz):
+    # Quicker than naive.replace(tzinfo=tz)
+    return datetime(naive.year, naive.month, naive.day, naive.hour, naive.minute, naive.second,
+                    naive.microsecond, tz)
+
+
+def parse_timestamp(time_stamp_str):
+    """
+    Same result as :func:`volttron.platform.agent.utils.parse_timestamp_string`.
+    "+00:00" and "Z" give pytz.UTC, other offsets a dateutil tzoffset.
+    """
+    length = len(time_stamp_str)
+    try:
+        if length == 26 or length == 19:
+            return datetime.fromisoformat(time_stamp_str)
+        if length == 32:
+            return _with_zone(datetime.fromisoformat(time_stamp_str[:26]), _zone(time_stamp_str[26:]))
+        if length == 27 or length == 20:
+            return _with_zone(datetime.fromisoformat(time_stamp_str[:-1]), _zone(time_stamp_str[-1:]))
+        if length == 25:
+            return _with_zone(datetime.fromisoformat(time_stamp_str[:19]), _zone(time_stamp_str[19:]))
+    except ValueError:
+        pass
+    return parse(time_stamp_str)
+
+
+def utc_now():
+    """Aware pytz.UTC datetime of the current time."""
+    return _with_zone(datetime.now(timezone.utc), pytz.UTC)
+
+
+def to_epoch(time_stamp):
+    """Seconds since the epoch of a datetime, naive datetimes are UTC."""
+    if time_stamp.tzinfo is None:
+        time_stamp = time_stamp.replace(tzinfo=timezone.utc)
+    return time_stamp.timestamp()
+
+
+def from_epoch(seconds):
+    """Aware pytz.UTC datetime of seconds since the epoch."""
+    return _with_zone(datetime.fromtimestamp(seconds, timezone.utc), pytz.UTC)
+
+
+def format_epoch(seconds):
+    """ISO 8601 UTC string of seconds since the epoch."""
+    return format_timestamp(from_epoch(seconds))
+
+
+def parse_epoch(time_stamp_str):
+    """Seconds since the epoch of an ISO 8601 string, naive strings are UTC."""
+    return to_epoch(parse_timestamp(time_stamp_str))
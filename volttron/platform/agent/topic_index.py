@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2023 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+"""
+In memory index of a historian's topic names used to answer topic pattern
+lookups without querying the database.
+
+Topic names are kept in a sorted list of lower case names, so lookups by
+prefix, by anchored regular expression (``^campus/building1/.*``) or by glob
+(``campus/building1/*``) only test the names that share the literal prefix of
+the pattern. Matching is case insensitive like the topic pattern queries of
+the sql historians.
+"""
+
+import bisect
+import fnmatch
+import re
+import threading
+
+__all__ = ['TopicIndex']
+
+_REGEX_SPECIAL = frozenset('.^$*+?{}[]\\|()')
+_GLOB_SPECIAL = frozenset('*?[')
+
+
+def _regex_literal_prefix(pattern):
+    """
+    Return the literal text every match of an anchored pattern starts with
+    or None if the pattern is not anchored at the start of the name.
+    """
+    if not pattern.startswith('^') or '|' in pattern:
+        return None
+    prefix = []
+    for c in pattern[1:]:
+        if c in _REGEX_SPECIAL:
+            # The previous character is optional if a quantifier follows
+            if c in '*?{' and prefix:
+                prefix.pop()
+            break
+        prefix.append(c)
+    return ''.join(prefix)
+
+
+class TopicIndex(object):
+    """
+    Map of topic name to topic id that supports prefix, glob and regular
+    expression lookups. Safe to update from the historian's background
+    thread while the main thread queries it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # topic_name.lower() -> (topic_name, topic_id)
+        self._topics = {}
+        self._sorted = []
+        # Incremented on every change so callers can cheaply tell whether
+        # the topic list they hold is still current.
+        self.version = 0
+
+    def __len__(self):
+        return len(self._topics)
+
+    def update(self, topic_id_map, topic_name_map):
+        """
+        Load topics from a historian's topic maps
+
+        :param topic_id_map: dictionary of {topic_name.lower(): topic_id}
+        :param topic_name_map: dictionary of {topic_name.lower(): topic_name}
+        """
+        with self._lock:
+            for key, topic_id in topic_id_map.items():
+                self._topics[key] = (topic_name_map.get(key, key), topic_id)
+            self._sorted = sorted(self._topics)
+            self.version += 1
+
+    def add(self, topic_name, topic_id):
+        """
+        Add a topic or update the name and id of an existing one
+        """
+        key = topic_name.lower()
+        with self._lock:
+            if key not in self._topics:
+                bisect.insort(self._sorted, key)
+            self._topics[key] = (topic_name, topic_id)
+            self.version += 1
+
+    def remove(self, topic_name):
+        key = topic_name.lower()
+        with self._lock:
+            if self._topics.pop(key, None) is not None:
+                del self._sorted[bisect.bisect_left(self._sorted, key)]
+                self.version += 1
+
+    def _with_prefix(self, prefix):
+        start = bisect.bisect_left(self._sorted, prefix)
+        for key in self._sorted[start:]:
+            if not key.startswith(prefix):
+                break
+            yield key
+
+    def _result(self, keys):
+        return dict(self._topics[key] for key in keys)
+
+    def match_prefix(self, prefix):
+        """
+        :return: dictionary of {topic_name: topic_id} of topics starting with
+                 prefix
+        """
+        with self._lock:
+            return self._result(list(self._with_prefix(prefix.lower())))
+
+    def match_glob(self, pattern):
+        """
+        :param pattern: shell style pattern matched against the whole topic
+                        name, for example campus/building1/*/zonetemp
+        :return: dictionary of {topic_name: topic_id}
+        """
+        pattern = pattern.lower()
+        prefix = []
+        for c in pattern:
+            if c in _GLOB_SPECIAL:
+                break
+            prefix.append(c)
+        prefix = ''.join(prefix)
+        if prefix == pattern:
+            with self._lock:
+                return self._result([prefix] if prefix in self._topics else [])
+        regex = re.compile(fnmatch.translate(pattern))
+        with self._lock:
+            return self._result([key for key in self._with_prefix(prefix)
+                                 if regex.match(key)])
+
+    def match_regex(self, pattern):
+        """
+        :param pattern: regular expression searched for anywhere in the topic
+                        name, same as the REGEXP queries of the sql historians
+        :return: dictionary of {topic_name: topic_id}
+        """
+        prefix = _regex_literal_prefix(pattern)
+        if prefix is None and not _REGEX_SPECIAL.intersection(pattern):
+            # Plain text, match by substring
+            text = pattern.lower()
+            with self._lock:
+                return self._result([key for key in self._topics
+                                     if text in key])
+        regex = re.compile(pattern, re.IGNORECASE)
+        with self._lock:
+            keys = self._with_prefix(prefix.lower()) if prefix else \
+                self._topics
+            return self._result([key for key in keys if regex.search(key)])
@@ -49,13 +49,13 @@ import gevent
 import psutil
 import pytz
 import yaml
-from dateutil.parser import parse
-from dateutil.tz import tzoffset, tzutc
+from dateutil.tz import tzutc
 from tzlocal import get_localzone
 from watchdog.events import FileClosedEvent, FileSystemEventHandler
 from watchdog_gevent import Observer
 
 from volttron.platform import get_address, get_home, jsonapi
+from volttron.platform.agent import timestamps
 from volttron.utils import AbsolutePathFileReloader, VolttronHomeFileReloader
 from volttron.utils.prompt import prompt_response
 
@@ -593,21 +593,7 @@ def format_timestamp(time_stamp):
     :rtype: str
     """
 
-    time_str = time_stamp.strftime("%Y-%m-%dT%H:%M:%S.%f")
-
-    if time_stamp.tzinfo is not None:
-        sign = '+'
-        td = time_stamp.tzinfo.utcoffset(time_stamp)
-        if td.days < 0:
-            sign = '-'
-            td = -td
-
-        seconds = td.seconds
-        minutes, seconds = divmod(seconds, 60)
-        hours, minutes = divmod(minutes, 60)
-        time_str += "{sign}{HH:02}:{MM:02}".format(sign=sign, HH=hours, MM=minutes)
-
-    return time_str
+    return timestamps.format_timestamp(time_stamp)
 
 
 def parse_timestamp_string(time_stamp_str):
@@ -620,39 +606,12 @@ def parse_timestamp_string(time_stamp_str):
     or
     YYYY-MM-DDTHH:MM:SS.mmmmmm+HH:MM
     based on the string length before falling back to dateutil.parse.
+    See :mod:`volttron.platform.agent.timestamps`.
 
     @param time_stamp_str:
     @return: value to convert
     """
-
-    if len(time_stamp_str) == 26:
-        try:
-            return datetime.strptime(time_stamp_str, "%Y-%m-%dT%H:%M:%S.%f")
-        except ValueError:
-            pass
-
-    elif len(time_stamp_str) == 32:
-        try:
-            base_time_stamp_str = time_stamp_str[:26]
-            time_zone_str = time_stamp_str[26:]
-            time_stamp = datetime.strptime(base_time_stamp_str, "%Y-%m-%dT%H:%M:%S.%f")
-            # Handle most common case.
-            if time_zone_str == "+00:00":
-                return time_stamp.replace(tzinfo=pytz.UTC)
-
-            hours_offset = int(time_zone_str[1:3])
-            minutes_offset = int(time_zone_str[4:6])
-
-            seconds_offset = hours_offset * 3600 + minutes_offset * 60
-            if time_zone_str[0] == "-":
-                seconds_offset = -seconds_offset
-
-            return time_stamp.replace(tzinfo=tzoffset("", seconds_offset))
-
-        except ValueError:
-            pass
-
-    return parse(time_stamp_str)
+    return timestamps.parse_timestamp(time_stamp_str)
 
 
 def get_aware_utc_now():
@@ -661,9 +620,7 @@ def get_aware_utc_now():
     :returns: an aware UTC datetime object
     :rtype: datetime
     """
-    utcnow = datetime.utcnow()
-    utcnow = pytz.UTC.localize(utcnow)
-    return utcnow
+    return timestamps.utc_now()
 
 
 def get_utc_seconds_from_epoch(timestamp=None):
@@ -712,6 +669,8 @@ def process_timestamp(timestamp_string, topic=''):
     if timestamp.tzinfo is None:
         timestamp = timestamp.replace(tzinfo=pytz.UTC)
         original_tz = None
+    elif timestamp.tzinfo is pytz.UTC:
+        original_tz = pytz.UTC
     else:
         original_tz = timestamp.tzinfo
         timestamp = timestamp.astimezone(pytz.UTC)
@@ -806,7 +765,7 @@ def fix_sqlite3_datetime(sql=None):
         import sqlite3 as sql
 
     def parse(time_stamp_bytes):
-        return parse_timestamp_string(time_stamp_bytes.decode("utf-8"))
+        return timestamps.parse_timestamp(time_stamp_bytes.decode("utf-8"))
 
     sql.register_adapter(datetime, format_timestamp)
     sql.register_converter("timestamp", parse)
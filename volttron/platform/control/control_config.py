@@ -36,10 +36,21 @@ from volttron.platform.jsonrpc import RemoteError
 _stdout = sys.stdout
 _stderr = sys.stderr
 
+_bulk_config_types = {".json": "json", ".csv": "csv"}
+
+
 def add_config_to_store(opts):
     opts.connection.peer = CONFIGURATION_STORE
     call = opts.connection.call
 
+    if opts.bulk is not None:
+        add_configs_to_store(opts)
+        return
+
+    if opts.name is None:
+        _stderr.write("ERROR: must specify a configuration name or --bulk\n")
+        return
+
     file_contents = opts.infile.read()
 
     call(
@@ -51,6 +62,35 @@ def add_config_to_store(opts):
     )
 
 
+def add_configs_to_store(opts):
+    """Stores every file under a directory in one call. Files are named by
+    their path relative to the directory. The type of .json and .csv files
+    comes from the extension, other files use the type from the command line."""
+    if not os.path.isdir(opts.bulk):
+        _stderr.write("ERROR: {} is not a directory\n".format(opts.bulk))
+        return
+
+    configs = []
+    for root, dirs, files in os.walk(opts.bulk):
+        dirs.sort()
+        for filename in sorted(files):
+            path = os.path.join(root, filename)
+            config_name = os.path.relpath(path, opts.bulk).replace(os.sep, "/")
+            if opts.name is not None:
+                config_name = opts.name.rstrip("/") + "/" + config_name
+            config_type = _bulk_config_types.get(os.path.splitext(filename)[1].lower(), opts.config_type)
+            with open(path) as f:
+                configs.append({"config_name": config_name,
+                                "raw_contents": f.read(),
+                                "config_type": config_type})
+
+    if not configs:
+        _stderr.write("No configurations found in {}\n".format(opts.bulk))
+        return
+
+    opts.connection.call("set_configs", opts.identity, configs)
+
+
 def delete_config_from_store(opts):
     opts.connection.peer = CONFIGURATION_STORE
     call = opts.connection.call
@@ -169,7 +209,10 @@ def add_config_store_parser(add_parser_fn):
     config_store_store.add_argument("identity",
                                     help="VIP IDENTITY of the store")
     config_store_store.add_argument(
-        "name", help="name used to reference the configuration by in the store"
+        "name",
+        nargs="?",
+        help="name used to reference the configuration by in the store. "
+             "With --bulk, an optional prefix for the configuration names",
     )
     config_store_store.add_argument(
         "infile",
@@ -200,6 +243,14 @@ def add_config_store_parser(add_parser_fn):
         help="interpret the input file as csv",
     )
 
+    config_store_store.add_argument(
+        "--bulk",
+        metavar="DIRECTORY",
+        help="store every file under DIRECTORY in one update, named by its "
+             "path relative to DIRECTORY. .json and .csv files get their type "
+             "from the extension",
+    )
+
     config_store_store.set_defaults(func=add_config_to_store,
                                     config_type="json")
 
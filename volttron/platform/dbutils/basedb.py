@@ -30,7 +30,12 @@ import threading
 import sqlite3
 import sys
 from abc import abstractmethod
+from datetime import datetime
+
+import gevent
+import pytz
 from gevent.local import local
+from gevent.threadpool import ThreadPool
 
 from volttron.platform.agent import utils
 from volttron.platform import jsonapi
@@ -62,6 +67,33 @@ def closing(obj):
             _log.exception('An exception was raised while closing the cursor and is being ignored.')
 
 
+def timestamp_string_to_epoch(time_stamp_str):
+    """
+    Convert a timestamp string read from a historian table to seconds since the epoch. Naive timestamps are
+    treated as UTC since that is how the historians store them.
+
+    :param time_stamp_str: timestamp string such as the output of
+        :py:func:`volttron.platform.agent.utils.format_timestamp`
+    :return: seconds since the epoch
+    :rtype: float
+    """
+    try:
+        time_stamp = datetime.fromisoformat(time_stamp_str)
+    except ValueError:
+        time_stamp = utils.parse_timestamp_string(time_stamp_str)
+    if time_stamp.tzinfo is None:
+        time_stamp = time_stamp.replace(tzinfo=pytz.UTC)
+    return time_stamp.timestamp()
+
+
+def epoch_values(values):
+    """
+    Convert query results of the form {topic_name: [(timestamp string, value), ...]} to the raw result form
+    {topic_name: [(seconds since the epoch, value), ...]}, for drivers that format timestamps in the database.
+    """
+    return {name: [(timestamp_string_to_epoch(ts), value) for ts, value in rows] for name, rows in values.items()}
+
+
 class DbDriver:
     """
     Parent class used by :py:class:`sqlhistorian.historian.SQLHistorian` to
@@ -82,6 +114,7 @@ class DbDriver:
         self.__connect = connect
         self.__connection = None
         self.stash = local()
+        self._statements = {}
 
     @contextlib.contextmanager
     def bulk_insert(self):
@@ -103,6 +136,30 @@ class DbDriver:
         """
         yield self.insert_meta
 
+    def statement(self, key, build=None):
+        """
+        Return a statement that is built once and cached for the life of the driver. The data, topic and query
+        statements are the same for every batch and query, and database modules that keep prepared statements by
+        statement text, such as sqlite3, reuse the prepared statement for the cached text.
+
+        :param key: name of the method that builds the statement, for example 'insert_data_query', or any hashable
+            key when build is given
+        :param build: optional function that builds the statement
+        :return: statement returned by :py:meth:`prepare_statement`
+        """
+        stmt = self._statements.get(key)
+        if stmt is None:
+            stmt = build() if build is not None else getattr(self, key)()
+            stmt = self._statements[key] = self.prepare_statement(stmt)
+        return stmt
+
+    def prepare_statement(self, stmt):
+        """
+        Convert a statement to the form cached by :py:meth:`statement`. Drivers can override this to do work once
+        that would otherwise be repeated on every execution.
+        """
+        return stmt
+
     def cursor(self):
 
         self.stash.cursor = None
@@ -293,7 +350,7 @@ class DbDriver:
         :param data: data value
         :return: True if execution completes. raises Exception if unable to connect to database
         """
-        self.execute_stmt(self.insert_data_query(), (ts, topic_id, jsonapi.dumps(data)), commit=False)
+        self.execute_stmt(self.statement('insert_data_query'), (ts, topic_id, jsonapi.dumps(data)), commit=False)
         return True
 
     def insert_topic(self, topic, **kwargs):
@@ -306,10 +363,10 @@ class DbDriver:
         insert_topic_only = True
         if self.meta_table == self.topics_table and topic and meta:
             value = (topic, jsonapi.dumps(kwargs.get("metadata")))
-            query = self.insert_topic_and_meta_query()
+            query = self.statement('insert_topic_and_meta_query')
         else:
             value = (topic,)
-            query = self.insert_topic_query()
+            query = self.statement('insert_topic_query')
 
         with closing(self.cursor()) as cursor:
             _log.debug(f"Inserting topic {query} {value}")
@@ -460,7 +517,7 @@ class DbDriver:
 
     @abstractmethod
     def query(self, topic_ids, id_name_map, start=None, end=None, agg_type=None, agg_period=None, skip=0, count=None,
-              order="FIRST_TO_LAST"):
+              order="FIRST_TO_LAST", raw=False):
         """
         Queries the raw historian data or aggregate data and returns the results of the query
         :param topic_ids: list of topic ids to query for.
@@ -473,11 +530,13 @@ class DbDriver:
         :param count: Limit results to this value. When the query is for multiple topics, count applies to individual
         topics. For example, a query on 2 topics with count=5 will return 5 records for each topic
         :param order: How to order the results, either "FIRST_TO_LAST" or "LAST_TO_FIRST"
+        :param raw: If True, timestamps are returned as seconds since the epoch (float) instead of ISO 8601 strings
         :type start: datetime
         :type end: datetime
         :type skip: int
         :type count: int
         :type order: str
+        :type raw: bool
         :return: result of the query in the format:
         .. code-block:: python
 
@@ -543,3 +602,114 @@ class DbDriver:
         :return: a tuple of (aggregated value, count of records over which this aggregation was computed)
         """
         pass
+
+    def collect_partial_aggregate(self, topic_ids, start=None, end=None):
+        """
+        Collect the count, sum, min and max of the raw data. Used by aggregate historians to fold new data into
+        running partial aggregates. The default implementation runs four aggregate queries.
+        :param topic_ids: list of topic ids for which aggregation should be performed.
+        :param start: start time for query (inclusive)
+        :param end:  end time for query (exclusive)
+        :return: a tuple of (count, sum, min, max, count of the values in sum, min and max). The last count differs
+            from the first where COUNT counts values that SUM skips.
+        """
+        count, _ = self.collect_aggregate(topic_ids, 'COUNT', start, end)
+        total, numeric_count = self.collect_aggregate(topic_ids, 'SUM', start, end)
+        minimum, _ = self.collect_aggregate(topic_ids, 'MIN', start, end)
+        maximum, _ = self.collect_aggregate(topic_ids, 'MAX', start, end)
+        return count, total, minimum, maximum, numeric_count
+
+    def get_topic_list_version(self):
+        """
+        Cheap fingerprint of the topics table that changes when topics are added or removed
+        :return: tuple of (number of topics, largest topic id)
+        """
+        rows = self.select("SELECT COUNT(*), MAX(topic_id) FROM " + self.topics_table)
+        return tuple(rows[0]) if rows else None
+
+
+class DbDriverPool:
+    """
+    Runs :py:class:`DbDriver` methods, usually queries, in a pool of native threads so they neither block the gevent
+    loop nor wait for each other on a single connection. Each pool thread creates its own driver, and so its own
+    connection, the first time it runs a call because sqlite connections can only be used by the thread that opened
+    them.
+
+    :param factory: function that creates a driver
+    :param size: number of threads, which is also the number of connections
+    """
+    def __init__(self, factory, size):
+        self._factory = factory
+        self.size = size
+        self._threadpool = ThreadPool(size)
+        self._local = local()
+        self._drivers = []
+        self._in_use = 0
+        self._peak = 0
+        self._calls = 0
+
+    def call(self, method, *args, **kwargs):
+        """
+        Call a driver method in a pool thread and return its result. Waits, without blocking other greenlets,
+        while every thread is busy.
+
+        :param method: name of the driver method, for example 'query'
+        """
+        self._in_use += 1
+        self._peak = max(self._peak, self._in_use)
+        try:
+            return self._threadpool.apply(self._call, (method, args, kwargs))
+        finally:
+            self._in_use -= 1
+            self._calls += 1
+
+    def _call(self, method, args, kwargs):
+        driver = getattr(self._local, 'driver', None)
+        if driver is None:
+            driver = self._local.driver = self._factory()
+            self._drivers.append(driver)
+        return getattr(driver, method)(*args, **kwargs)
+
+    def status(self):
+        """
+        :return: dictionary of the pool size, the calls in use (running or waiting for a thread), the calls waiting,
+            the most calls in use at once and the number of completed calls
+        """
+        return {'size': self.size,
+                'in_use': self._in_use,
+                'waiting': max(0, self._in_use - self.size),
+                'peak': self._peak,
+                'calls': self._calls}
+
+    def close(self, timeout=30):
+        """
+        Close every connection in the pool thread that opened it, because sqlite refuses to close a connection from
+        another thread, then stop the threads. A thread finishes the call it is running before closing its
+        connection. Connections still busy after timeout seconds are left open.
+
+        :param timeout: seconds to wait for running calls
+        """
+        # One close call per thread. The barrier holds each thread until all of them have taken a call, so no
+        # thread can take two and leave another connection open.
+        barrier = threading.Barrier(self.size, timeout=timeout)
+        closing = [self._threadpool.spawn(self._close_local, barrier) for _ in range(self.size)]
+        gevent.wait(closing, timeout=timeout)
+        self._threadpool.kill()
+        if self._drivers:
+            _log.warning("{} pooled connections were still in use and were not closed".format(len(self._drivers)))
+        self._drivers = []
+
+    def _close_local(self, barrier):
+        try:
+            barrier.wait()
+        except threading.BrokenBarrierError:
+            pass
+        driver = getattr(self._local, 'driver', None)
+        if driver is None:
+            return
+        self._local.driver = None
+        self._drivers.remove(driver)
+        try:
+            driver.close()
+        except Exception as e:
+            _log.warning("Error closing pooled connection: {}".format(e))
@@ -28,7 +28,7 @@ from collections import defaultdict
 
 import pytz
 import re
-from .basedb import DbDriver
+from .basedb import DbDriver, epoch_values
 from mysql.connector import Error as MysqlError
 from mysql.connector import errorcode as mysql_errorcodes
 from volttron.platform.agent import utils
@@ -174,7 +174,7 @@ class MySqlFuncts(DbDriver):
 
     def query(self, topic_ids, id_name_map, start=None, end=None, skip=0,
               agg_type=None, agg_period=None, count=None,
-              order="FIRST_TO_LAST"):
+              order="FIRST_TO_LAST", raw=False):
 
         table_name = self.data_table
         value_col = 'value_string'
@@ -266,6 +266,8 @@ class MySqlFuncts(DbDriver):
 
             if cursor is not None:
                 cursor.close()
+        if raw:
+            values = epoch_values(values)
         return values
 
     @contextlib.contextmanager
@@ -18,19 +18,22 @@
 
 import ast
 import contextlib
+import csv
+import io
 import logging
 import copy
+from datetime import datetime
 
 import pytz
 import psycopg2
 from psycopg2 import InterfaceError, ProgrammingError, errorcodes
-from psycopg2.sql import Identifier, Literal, SQL
+from psycopg2.sql import Composable, Identifier, Literal, SQL
 from psycopg2.extras import execute_values
 
-from volttron.platform.agent import utils
+from volttron.platform.agent import timestamps, utils
 from volttron.platform import jsonapi
 
-from .basedb import DbDriver
+from .basedb import DbDriver, epoch_values
 
 utils.setup_logging()
 _log = logging.getLogger(__name__)
@@ -44,6 +47,9 @@ For method details please refer to base class
 :py:class:`volttron.platform.dbutils.basedb.DbDriver`
 """
 class PostgreSqlFuncts(DbDriver):
+    # Rows read per round trip from the server side cursor of a multi-topic query.
+    QUERY_FETCH_SIZE = 10000
+
     def __init__(self, connect_params, table_names):
         self.db_name = connect_params.get('dbname')
         if table_names:
@@ -58,6 +64,8 @@ class PostgreSqlFuncts(DbDriver):
             del connect_params["timescale_dialect"]
         else:
             self.timescale_dialect = False
+        # Write bulk inserts with COPY FROM STDIN instead of multi-row INSERT statements
+        self.copy_insert = connect_params.pop("copy_insert", False)
         def connect():
             connection = psycopg2.connect(**connect_params)
             connection.autocommit = True
@@ -96,13 +104,51 @@ class PostgreSqlFuncts(DbDriver):
 
         yield insert_data
 
-        if records:
+        if records and self.copy_insert:
+            self.copy_data(records)
+        elif records:
             query = SQL('INSERT INTO {} VALUES %s '
                         'ON CONFLICT (ts, topic_id) DO UPDATE '
                         'SET value_string = EXCLUDED.value_string').format(
                             Identifier(self.data_table))
             execute_values(self.cursor(), query, records)
 
+    def copy_data(self, records):
+        """
+        Write data records with COPY FROM STDIN. COPY can not update rows that already exist, so the records are
+        copied into a temporary staging table and merged into the data table with INSERT ... ON CONFLICT.
+
+        :param records: list of (ts, topic_id, value_string) tuples
+        """
+        # One INSERT ... ON CONFLICT can not update the same row twice, keep the last value of each (ts, topic_id)
+        rows = {}
+        for ts, topic_id, value in records:
+            if isinstance(ts, datetime):
+                # The text form of a timestamp with an offset loses the offset in a TIMESTAMP column
+                if ts.tzinfo is not None:
+                    ts = ts.astimezone(pytz.UTC).replace(tzinfo=None)
+                ts = timestamps.format_timestamp(ts)
+            rows[(ts, topic_id)] = value
+        data = io.StringIO()
+        writer = csv.writer(data, lineterminator='\n')
+        writer.writerows((ts, topic_id, value) for (ts, topic_id), value in rows.items())
+        data.seek(0)
+
+        staging = Identifier(self.data_table + '_copy')
+        with self.cursor() as cursor:
+            cursor.execute(SQL('CREATE TEMPORARY TABLE IF NOT EXISTS {} (LIKE {})').format(
+                staging, Identifier(self.data_table)))
+            # Left over rows of a batch that failed to merge
+            cursor.execute(SQL('TRUNCATE {}').format(staging))
+            cursor.copy_expert(SQL('COPY {} (ts, topic_id, value_string) FROM STDIN WITH (FORMAT csv)').format(
+                staging), data)
+            cursor.execute(SQL('INSERT INTO {} (ts, topic_id, value_string) '
+                               'SELECT ts, topic_id, value_string FROM {} '
+                               'ON CONFLICT (ts, topic_id) DO UPDATE '
+                               'SET value_string = EXCLUDED.value_string').format(
+                Identifier(self.data_table), staging))
+            cursor.execute(SQL('TRUNCATE {}').format(staging))
+
     @contextlib.contextmanager
     def bulk_insert_meta(self):
         """
@@ -140,6 +186,13 @@ class PostgreSqlFuncts(DbDriver):
                             Identifier(self.meta_table))
             execute_values(self.cursor(), query, records)
 
+    def prepare_statement(self, stmt):
+        # Render composed statements to text once instead of on every execute
+        if isinstance(stmt, Composable):
+            with self.cursor() as cursor:
+                return stmt.as_string(cursor)
+        return stmt
+
     def rollback(self):
         try:
             return super(PostgreSqlFuncts, self).rollback()
@@ -212,7 +265,7 @@ class PostgreSqlFuncts(DbDriver):
 
     def query(self, topic_ids, id_name_map, start=None, end=None, skip=0,
               agg_type=None, agg_period=None, count=None,
-              order='FIRST_TO_LAST'):
+              order='FIRST_TO_LAST', raw=False):
         if agg_type and agg_period:
             table_name = agg_type + '_' + agg_period
             value_col = 'agg_value'
@@ -220,16 +273,19 @@ class PostgreSqlFuncts(DbDriver):
             table_name = self.data_table
             value_col = 'value_string'
 
+        if start and start.tzinfo != pytz.UTC:
+            start = start.astimezone(pytz.UTC)
+        if end and end.tzinfo != pytz.UTC:
+            end = end.astimezone(pytz.UTC)
+        if not skip and not count:
+            return self._query_all_topics(table_name, value_col, topic_ids, id_name_map, start, end, order, raw)
+
         topic_id = Literal(0)
         query = [SQL(
             '''SELECT to_char(ts, 'YYYY-MM-DD"T"HH24:MI:SS.USOF:00'), ''' + value_col + ' \n'
             'FROM {}\n'
             'WHERE topic_id = {}'
         ).format(Identifier(table_name), topic_id)]
-        if start and start.tzinfo != pytz.UTC:
-            start = start.astimezone(pytz.UTC)
-        if end and end.tzinfo != pytz.UTC:
-            end = end.astimezone(pytz.UTC)
         if start and start == end:
             query.append(SQL(' AND ts = {}').format(Literal(start)))
         else:
@@ -257,15 +313,93 @@ class PostgreSqlFuncts(DbDriver):
                 with self.select(query, fetch_all=False) as cursor:
                     values[name] = [(ts, jsonapi.loads(value))
                                     for ts, value in cursor]
+        if raw:
+            values = epoch_values(values)
         return values
 
+    def _query_all_topics(self, table_name, value_col, topic_ids, id_name_map, start, end, order, raw):
+        """
+        Read every topic with a single ``topic_id = ANY(...)`` query. Rows are fetched from a named server side
+        cursor QUERY_FETCH_SIZE at a time and converted as they arrive, so psycopg2 never holds the raw result set
+        next to the converted values. The converted values of every topic are still returned together, so client
+        memory grows with the size of the result, plus the timestamps of at most two topics kept for reuse.
+        """
+        if start and start == end:
+            bounds = ('ts = %s',)
+            args = [list(topic_ids), start]
+        else:
+            bounds = (('ts >= %s',) if start else ()) + (('ts < %s',) if end else ())
+            args = [list(topic_ids)] + [ts for ts in (start, end) if ts]
+        direction = 'DESC' if order == 'LAST_TO_FIRST' else 'ASC'
+
+        def build():
+            return SQL('\n').join(
+                [SQL('SELECT topic_id, ts, {} FROM {} WHERE topic_id = ANY(%s)').format(
+                    Identifier(value_col), Identifier(table_name))] +
+                [SQL('AND ' + bound) for bound in bounds] +
+                [SQL('ORDER BY topic_id, ts ' + direction)])
+        query = self.statement(('query', table_name, value_col, bounds, direction), build)
+
+        if value_col == 'agg_value':
+            def decode(value):
+                return value
+        else:
+            decode = jsonapi.loads
+        if raw:
+            convert_timestamp = timestamps.to_epoch
+        else:
+            def convert_timestamp(ts):
+                # ts is a naive UTC datetime
+                return timestamps.format_timestamp(ts) + '+00:00'
+        # Points scraped together share their timestamps. Rows are ordered by topic, so reuse the conversions of the
+        # previous topic and keep no more than that.
+        previous = {}
+        converted = {}
+
+        values = {id_name_map[topic_id]: [] for topic_id in topic_ids}
+        with self._server_cursor() as cursor:
+            cursor.execute(query, args)
+            current_id = None
+            current = None
+            while True:
+                rows = cursor.fetchmany(self.QUERY_FETCH_SIZE)
+                if not rows:
+                    break
+                for topic_id, ts, value in rows:
+                    if topic_id != current_id:
+                        current_id = topic_id
+                        current = values[id_name_map[topic_id]]
+                        previous, converted = converted, {}
+                    timestamp = previous.get(ts)
+                    if timestamp is None:
+                        timestamp = convert_timestamp(ts)
+                    converted[ts] = timestamp
+                    current.append((timestamp, decode(value)))
+        return values
+
+    @contextlib.contextmanager
+    def _server_cursor(self):
+        """
+        Yield a named (server side) cursor. Named cursors only live inside a transaction so autocommit is turned off
+        until the cursor is closed.
+        """
+        with self.cursor() as cursor:
+            connection = cursor.connection
+        connection.autocommit = False
+        try:
+            with connection.cursor(name='historian_query') as cursor:
+                yield cursor
+        finally:
+            connection.rollback()
+            connection.autocommit = True
+
     def insert_topic(self, topic, **kwargs):
         meta = kwargs.get('metadata')
         with self.cursor() as cursor:
             if self.meta_table == self.topics_table and topic and meta:
-                cursor.execute(self.insert_topic_and_meta_query(), (topic, jsonapi.dumps(meta)))
+                cursor.execute(self.statement('insert_topic_and_meta_query'), (topic, jsonapi.dumps(meta)))
             else:
-                cursor.execute(self.insert_topic_query(), {'topic': topic})
+                cursor.execute(self.statement('insert_topic_query'), {'topic': topic})
             return cursor.fetchone()[0]
 
     def insert_agg_topic(self, topic, agg_type, agg_time_period):
@@ -346,6 +480,13 @@ class PostgreSqlFuncts(DbDriver):
         name_map = {key: name for _, name, key in rows}
         return id_map, name_map
 
+    def get_topic_list_version(self):
+        query = SQL(
+            'SELECT COUNT(*), MAX(topic_id) '
+            'FROM {}').format(Identifier(self.topics_table))
+        rows = self.select(query)
+        return tuple(rows[0]) if rows else None
+
     def get_topic_meta_map(self):
         query = SQL(
             'SELECT topic_id, metadata '
@@ -440,3 +581,19 @@ class PostgreSqlFuncts(DbDriver):
             query.append(SQL(' AND ts < {}').format(Literal(end)))
         rows = self.select(SQL('\n').join(query))
         return rows[0] if rows else (0, 0)
+
+    def collect_partial_aggregate(self, topic_ids, start=None, end=None):
+        query = [
+            SQL('SELECT COUNT(value_string), SUM(CAST(value_string as float)), '
+                'MIN(CAST(value_string as float)), '
+                'MAX(CAST(value_string as float))'),
+            SQL('FROM {}').format(Identifier(self.data_table)),
+            SQL('WHERE topic_id in ({})').format(
+                SQL(', ').join(Literal(tid) for tid in topic_ids)),
+        ]
+        if start is not None:
+            query.append(SQL(' AND ts >= {}').format(Literal(start)))
+        if end is not None:
+            query.append(SQL(' AND ts < {}').format(Literal(end)))
+        rows = self.select(SQL('\n').join(query))
+        return tuple(rows[0]) if rows else (0, None, None, None)
@@ -28,7 +28,7 @@ from psycopg2.sql import Identifier, Literal, SQL
 from volttron.platform.agent import utils
 from volttron.platform import jsonapi
 
-from .basedb import DbDriver
+from .basedb import DbDriver, epoch_values
 
 utils.setup_logging()
 _log = logging.getLogger(__name__)
@@ -145,7 +145,7 @@ class RedshiftFuncts(DbDriver):
 
     def query(self, topic_ids, id_name_map, start=None, end=None, skip=0,
               agg_type=None, agg_period=None, count=None,
-              order='FIRST_TO_LAST'):
+              order='FIRST_TO_LAST', raw=False):
         if agg_type and agg_period:
             table_name = agg_type + '_' + agg_period
         else:
@@ -181,6 +181,8 @@ class RedshiftFuncts(DbDriver):
             with self.select(query, fetch_all=False) as cursor:
                 values[name] = [(ts, jsonapi.loads(value))
                                 for ts, value in cursor]
+        if raw:
+            values = epoch_values(values)
         return values
 
     def insert_topic(self, topic, **kwargs):
@@ -261,6 +263,13 @@ class RedshiftFuncts(DbDriver):
         name_map = {key: name for _, name, key in rows}
         return id_map, name_map
 
+    def get_topic_list_version(self):
+        query = SQL(
+            'SELECT COUNT(*), MAX(topic_id) '
+            'FROM {}').format(Identifier(self.topics_table))
+        rows = self.select(query)
+        return tuple(rows[0]) if rows else None
+
     def get_topic_meta_map(self):
         query = SQL(
             'SELECT topic_id, metadata '
@@ -339,3 +348,19 @@ class RedshiftFuncts(DbDriver):
             query.append(SQL(' AND ts < {}').format(Literal(end)))
         rows = self.select(SQL('\n').join(query))
         return rows[0] if rows else (0, 0)
+
+    def collect_partial_aggregate(self, topic_ids, start=None, end=None):
+        query = [
+            SQL('SELECT COUNT(value_string), SUM(CAST(value_string as float)), '
+                'MIN(CAST(value_string as float)), '
+                'MAX(CAST(value_string as float))'),
+            SQL('FROM {}').format(Identifier(self.data_table)),
+            SQL('WHERE topic_id in ({})').format(
+                SQL(', ').join(Literal(tid) for tid in topic_ids)),
+        ]
+        if start is not None:
+            query.append(SQL(' AND ts >= {}').format(Literal(start)))
+        if end is not None:
+            query.append(SQL(' AND ts < {}').format(Literal(end)))
+        rows = self.select(SQL('\n').join(query))
+        return tuple(rows[0]) if rows else (0, None, None, None)
@@ -23,6 +23,7 @@
 # }}}
 
 import ast
+import contextlib
 import errno
 import logging
 import sqlite3
@@ -30,7 +31,7 @@ import pytz
 import threading
 import os
 import re
-from .basedb import DbDriver
+from .basedb import DbDriver, timestamp_string_to_epoch
 from collections import defaultdict
 from datetime import datetime
 from math import ceil
@@ -54,6 +55,9 @@ class SqlLiteFuncts(DbDriver):
     For method details please refer to base class
     :py:class:`volttron.platform.dbutils.basedb.DbDriver`
     """
+    # Topic ids bound in a single multi-topic query, well below SQLITE_MAX_VARIABLE_NUMBER on older builds.
+    MAX_QUERY_PARAMETERS = 500
+
     def __init__(self, connect_params, table_names):
         database = connect_params['database']
         thread_name = threading.currentThread().getName()
@@ -88,6 +92,11 @@ class SqlLiteFuncts(DbDriver):
         if 'timeout' not in connect_params.keys():
             connect_params['timeout'] = 10
 
+        # Store numeric values in a REAL value_num column next to the JSON value_string so they can be aggregated
+        # natively. Only applies to data tables created with the option. Not a sqlite3.connect() argument.
+        self.numeric_values = connect_params.get('numeric_values', False)
+        self._value_num = None
+
         self.data_table = None
         self.topics_table = None
         self.meta_table = None
@@ -101,7 +110,8 @@ class SqlLiteFuncts(DbDriver):
             self.agg_topics_table = table_names['agg_topics_table']
             self.agg_meta_table = table_names['agg_meta_table']
         _log.debug("In sqlitefuncts connect params {}".format(connect_params))
-        super(SqlLiteFuncts, self).__init__('sqlite3', **connect_params)
+        super(SqlLiteFuncts, self).__init__('sqlite3', **{k: v for k, v in connect_params.items()
+                                                          if k != 'numeric_values'})
 
     def setup_historian_tables(self):
 
@@ -123,14 +133,21 @@ class SqlLiteFuncts(DbDriver):
                 if row[1] == "metadata":
                     _log.debug("Existing topics table contains metadata column")
                     self.meta_table = self.topics_table
+            if self.numeric_values and not self.has_value_num():
+                _log.warning("numeric_values is set but the existing {} table has no value_num column. "
+                             "Numeric values will only be stored as JSON.".format(self.data_table))
+            # Statements built before the schema was known
+            self._statements.clear()
         else:
             self.meta_table = self.topics_table
+            value_num = '''value_num REAL,
+                     ''' if self.numeric_values else ''
             self.execute_stmt(
                 '''CREATE TABLE IF NOT EXISTS ''' + self.data_table +
                 ''' (ts timestamp NOT NULL,
                      topic_id INTEGER NOT NULL,
                      value_string TEXT NOT NULL,
-                     UNIQUE(topic_id, ts))''', commit=False)
+                     ''' + value_num + '''UNIQUE(topic_id, ts))''', commit=False)
             self.execute_stmt(
                 '''CREATE INDEX IF NOT EXISTS data_idx
                 ON ''' + self.data_table + ''' (ts ASC)''', commit=False)
@@ -143,8 +160,52 @@ class SqlLiteFuncts(DbDriver):
             self.commit()
             # metadata is in topics table
             self.meta_table = self.topics_table
+            self._value_num = bool(self.numeric_values)
+            self._statements.clear()
             _log.debug("Created new schema. data and topics tables")
 
+    def has_value_num(self):
+        """
+        :return: True if the data table has the REAL value_num column of the numeric_values schema
+        """
+        if self._value_num is None:
+            rows = self.select(f"PRAGMA table_info({self.data_table})")
+            if not rows:
+                # The historian has not created the table yet
+                return False
+            self._value_num = any(row[1] == 'value_num' for row in rows)
+        return self._value_num
+
+    def _data_row(self, ts, topic_id, data):
+        row = (ts, topic_id, jsonapi.dumps(data))
+        if self.has_value_num():
+            # bool is a subclass of int but is not point data that should be aggregated
+            row += (float(data) if type(data) in (int, float) else None,)
+        return row
+
+    def insert_data(self, ts, topic_id, data):
+        self.execute_stmt(self.statement('insert_data_query'), self._data_row(ts, topic_id, data), commit=False)
+        return True
+
+    @contextlib.contextmanager
+    def bulk_insert(self):
+        """
+        Overrides DbDriver::bulk_insert() in basedb.py. Rows are buffered and written with a single executemany when
+        the context exits instead of one statement per row.
+
+        :yields: insert method
+        """
+        records = []
+
+        def insert_data(ts, topic_id, data):
+            records.append(self._data_row(ts, topic_id, data))
+            return True
+
+        yield insert_data
+
+        if records:
+            self.execute_many(self.statement('insert_data_query'), records)
+
     def setup_aggregate_historian_tables(self):
 
         self.execute_stmt(
@@ -162,7 +223,7 @@ class SqlLiteFuncts(DbDriver):
         self.commit()
 
     def query(self, topic_ids, id_name_map, start=None, end=None, agg_type=None, agg_period=None, skip=0, count=None,
-              order="FIRST_TO_LAST"):
+              order="FIRST_TO_LAST", raw=False):
         """
         This function should return the results of a query in the form:
 
@@ -172,6 +233,11 @@ class SqlLiteFuncts(DbDriver):
              "metadata": {"key1": value1, "key2": value2, ...}}
 
         metadata is not required (The caller will normalize this to {} for you)
+
+        When neither skip nor count is given all topics are read with a single
+        ``topic_id IN (...)`` query ordered by ``(topic_id, ts)``. skip and count
+        apply to each topic individually, so those queries still run once per topic.
+
         @param topic_ids: topic_ids to query data for
         @param id_name_map: dictionary containing topic_id:topic_name
         @param start:
@@ -181,6 +247,7 @@ class SqlLiteFuncts(DbDriver):
         @param skip:
         @param count:
         @param order:
+        @param raw: return timestamps as seconds since the epoch (float) instead of ISO 8601 strings
         """
         table_name = self.data_table
         value_col = 'value_string'
@@ -188,16 +255,15 @@ class SqlLiteFuncts(DbDriver):
             table_name = agg_type + "_" + agg_period
             value_col = 'agg_value'
 
-        query = '''SELECT topic_id, ts, ''' + value_col + '''
+        # ts is read as text, rather than through the sqlite3 timestamp converter, so that each distinct timestamp
+        # is converted once per query. Points scraped together share their timestamps across topics.
+        query = '''SELECT topic_id, CAST(ts AS TEXT), ''' + value_col + '''
                    FROM ''' + table_name + '''
                    {where}
                    {order_by}
                    {limit}
                    {offset}'''
 
-        where_clauses = ["WHERE topic_id = ?"]
-        args = [topic_ids[0]]
-
         # base historian converts naive timestamps to UTC, but if the start and end had explicit timezone info then they
         # need to get converted to UTC since sqlite3 only store naive timestamp
         if start:
@@ -205,6 +271,8 @@ class SqlLiteFuncts(DbDriver):
         if end:
             end = end.astimezone(pytz.UTC)
 
+        where_clauses = []
+        args = []
         if start and end and start == end:
             where_clauses.append("ts = ?")
             args.append(start)
@@ -216,8 +284,6 @@ class SqlLiteFuncts(DbDriver):
                 where_clauses.append("ts < ?")
                 args.append(end)
 
-        where_statement = ' AND '.join(where_clauses)
-
         order_by = 'ORDER BY topic_id ASC, ts ASC'
         if order == 'LAST_TO_FIRST':
             order_by = ' ORDER BY topic_id DESC, ts DESC'
@@ -227,36 +293,64 @@ class SqlLiteFuncts(DbDriver):
         if count is None:
             count = -1
 
-        limit_statement = 'LIMIT ?'
-        args.append(count)
-
+        limit_statement = ''
         offset_statement = ''
-        if skip > 0:
-            offset_statement = 'OFFSET ?'
-            args.append(skip)
-
-        real_query = query.format(where=where_statement,
-                                  limit=limit_statement,
-                                  offset=offset_statement,
-                                  order_by=order_by)
-        _log.debug("Real Query: " + real_query)
-        _log.debug("args: " + str(args))
+        per_topic = count >= 0 or skip > 0
+        if per_topic:
+            limit_statement = 'LIMIT ?'
+            args.append(count)
+            if skip > 0:
+                offset_statement = 'OFFSET ?'
+                args.append(skip)
+
+        if value_col == 'agg_value':
+            def decode(value):
+                return value
+        else:
+            decode = jsonapi.loads
+        if raw:
+            convert_timestamp = timestamp_string_to_epoch
+        else:
+            def convert_timestamp(ts):
+                return utils.format_timestamp(utils.parse_timestamp_string(ts))
+        timestamps = {}
 
         values = defaultdict(list)
-        start_t = datetime.utcnow()
         for topic_id in topic_ids:
-            args[0] = topic_id
             values[id_name_map[topic_id]] = []
-            cursor = self.select(real_query, args, fetch_all=False)
+
+        if per_topic:
+            batches = [[topic_id] for topic_id in topic_ids]
+        else:
+            batches = [topic_ids[i:i + self.MAX_QUERY_PARAMETERS]
+                       for i in range(0, len(topic_ids), self.MAX_QUERY_PARAMETERS)]
+
+        start_t = datetime.utcnow()
+        for batch in batches:
+            if len(batch) == 1:
+                topic_clause = "topic_id = ?"
+            else:
+                topic_clause = "topic_id IN ({})".format(", ".join("?" * len(batch)))
+            real_query = query.format(where='WHERE ' + ' AND '.join([topic_clause] + where_clauses),
+                                      limit=limit_statement,
+                                      offset=offset_statement,
+                                      order_by=order_by)
+            _log.debug("Real Query: " + real_query)
+            _log.debug("args: " + str(batch + args))
+            cursor = self.select(real_query, batch + args, fetch_all=False)
             if cursor:
-                if value_col == 'agg_value':
-                    for _id, ts, value in cursor:
-                        values[id_name_map[topic_id]].append((utils.format_timestamp(ts), value))
-                    cursor.close()
-                else:
-                    for _id, ts, value in cursor:
-                        values[id_name_map[topic_id]].append((utils.format_timestamp(ts), jsonapi.loads(value)))
-                    cursor.close()
+                # Rows arrive grouped by topic_id so only look up the result list when the topic changes.
+                current_id = None
+                current = None
+                for _id, ts, value in cursor:
+                    if _id != current_id:
+                        current_id = _id
+                        current = values[id_name_map[_id]]
+                    timestamp = timestamps.get(ts)
+                    if timestamp is None:
+                        timestamp = timestamps[ts] = convert_timestamp(ts)
+                    current.append((timestamp, decode(value)))
+                cursor.close()
 
         _log.debug("Time taken to load results from db:{}".format(datetime.utcnow()-start_t))
         return values
@@ -317,6 +411,9 @@ class SqlLiteFuncts(DbDriver):
             WHERE topic_id = ?'''
 
     def insert_data_query(self):
+        if self.has_value_num():
+            return '''INSERT OR REPLACE INTO ''' + self.data_table + \
+                   ''' values(?, ?, ?, ?)'''
         return '''INSERT OR REPLACE INTO ''' + self.data_table + \
                ''' values(?, ?, ?)'''
 
@@ -412,7 +509,6 @@ class SqlLiteFuncts(DbDriver):
 
     @staticmethod
     def regexp(expr, item):
-        _log.debug("item {} matched against expr {}".format(item, expr))
         return re.search(expr, item, re.IGNORECASE) is not None
 
     def set_cache(self, cache_size):
@@ -453,12 +549,9 @@ class SqlLiteFuncts(DbDriver):
                     conn.close()
 
     def query_topics_by_pattern(self, topic_pattern):
-        id_map, name_map = self.get_topic_map()
-        _log.debug("Contents of topics table {}".format(list(id_map.keys())))
-        q = "SELECT topic_id, topic_name FROM " + self.topics_table + " WHERE topic_name REGEXP '" + topic_pattern + \
-            "';"
+        q = "SELECT topic_id, topic_name FROM " + self.topics_table + " WHERE topic_name REGEXP ?;"
 
-        rows = self.regex_select(q, None)
+        rows = self.regex_select(q, [topic_pattern])
         _log.debug("loading topic map from db")
         id_map = dict()
         for t, n in rows:
@@ -496,7 +589,11 @@ class SqlLiteFuncts(DbDriver):
         if isinstance(agg_type, str):
             if agg_type.upper() not in ['AVG', 'MIN', 'MAX', 'COUNT', 'SUM']:
                 raise ValueError("Invalid aggregation type {}".format(agg_type))
-        query = '''SELECT ''' + agg_type + '''(value_string), count(value_string) FROM ''' + \
+        # value_num is NULL for non numeric values so COUNT keeps counting every row of value_string
+        value_col = 'value_string'
+        if self.has_value_num() and str(agg_type).upper() != 'COUNT':
+            value_col = 'value_num'
+        query = '''SELECT ''' + agg_type + '''(''' + value_col + '''), count(''' + value_col + ''') FROM ''' + \
                 self.data_table + ''' {where}'''
 
         where_clauses = ["WHERE topic_id = ?"]
@@ -541,6 +638,37 @@ class SqlLiteFuncts(DbDriver):
         else:
             return 0, 0
 
+    def collect_partial_aggregate(self, topic_ids, start=None, end=None):
+        """
+        Collect count, sum, min and max of the raw data in a single query
+        @param topic_ids: list of single topics
+        @param start: start time
+        @param end: end time
+        @return: tuple of (count, sum, min, max, count of the values in sum, min and max)
+        """
+        where_clauses = ["WHERE topic_id IN (" + ", ".join("?" * len(topic_ids)) + ")"]
+        args = list(topic_ids)
+        if start:
+            where_clauses.append("ts >= ?")
+            args.append(start.astimezone(pytz.UTC))
+        if end:
+            where_clauses.append("ts < ?")
+            args.append(end.astimezone(pytz.UTC))
+        if self.has_value_num():
+            # value_num is NULL for non numeric values, so like collect_aggregate count every row of value_string
+            # and only average over the numeric ones
+            query = "SELECT count(value_string), SUM(value_num), MIN(value_num), MAX(value_num), count(value_num) " \
+                    "FROM " + self.data_table + " " + ' AND '.join(where_clauses)
+        else:
+            query = "SELECT count(value_string), SUM(CAST(value_string AS REAL)), MIN(CAST(value_string AS REAL)), " \
+                    "MAX(CAST(value_string AS REAL)), count(value_string) FROM " + self.data_table + " " + \
+                    ' AND '.join(where_clauses)
+        _log.debug("Partial aggregate query: {} args: {}".format(query, args))
+        results = self.select(query, args)
+        if results:
+            return tuple(results[0])
+        return 0, None, None, None, 0
+
     @staticmethod
     def get_tagging_query_from_ast(topic_tags_table, tup, tag_refs):
         """
@@ -51,6 +51,7 @@ from volttron.utils.prompt import prompt_response, y, n, y_or_n
 from . import get_home, get_services_core, set_home
 from volttron.platform.agent.utils import load_config as load_yml_or_json
 from volttron.platform.store import process_raw_config
+from volttron.utils.persistance import AppendLogDict
 
 if is_rabbitmq_available():
     from bootstrap import install_rabbit, default_rmq_dir
@@ -1019,6 +1020,9 @@ def update_configs_in_store(args_dict):
 
             configs_updated = False
             agent_store_path = os.path.join(vhome, "configuration_store", vip_id+".store")
+            if os.path.isfile(agent_store_path + AppendLogDict.log_ext):
+                # Fold changes the platform has not compacted yet into the store file.
+                AppendLogDict(agent_store_path).close()
             if os.path.isfile(agent_store_path):
                 # load current store configs as python object for comparison
                 store_configs = read_agent_configs_from_store(agent_store_path)
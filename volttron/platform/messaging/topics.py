@@ -97,6 +97,8 @@ LOGGER_STATUS = LOGGER(subtopic='status')
 
 DRIVER_TOPIC_BASE = 'devices'
 DRIVER_TOPIC_ALL = 'all'
+# Scrape results of many devices published together by the platform driver.
+DRIVER_TOPIC_BATCH = DRIVER_TOPIC_BASE + '/batch'
 DEVICES_PATH = _('{base}//{node}//{campus}//{building}//{unit}//{path!S}//{point}')
 _DEVICES_VALUE = _(DEVICES_PATH.replace('{base}',DRIVER_TOPIC_BASE))
 DEVICES_VALUE = _(_DEVICES_VALUE.replace('{node}/', ''))
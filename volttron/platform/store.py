@@ -28,6 +28,7 @@ import glob
 import os
 import os.path
 import errno
+import uuid
 from csv import DictReader
 from io import StringIO
 import gevent
@@ -36,7 +37,7 @@ from deprecated import deprecated
 from volttron.platform import jsonapi
 from gevent.lock import Semaphore
 
-from volttron.utils.persistance import PersistentDict
+from volttron.utils.persistance import AppendLogDict
 from volttron.platform.agent.utils import parse_json_config
 from volttron.platform.vip.agent import errors
 from volttron.platform.jsonrpc import RemoteError, MethodNotFound
@@ -108,7 +109,14 @@ class ConfigStoreService(Agent):
         self.core.delay_running_event_set = False
 
         self.store = {}
+        # Stores found on disk that have not been loaded yet,
+        # identity -> store file path.
+        self._unloaded_stores = {}
         self.store_path = os.path.join(os.environ['VOLTTRON_HOME'], 'configuration_store')
+        # Change counters of the stores, identity -> int, reported by
+        # get_store_version so clients can tell when to reload a store.
+        self._store_versions = {}
+        self._instance_token = uuid.uuid4().hex[:8]
 
     @Core.receiver('onsetup')
     def _setup(self, sender, **kwargs):
@@ -126,18 +134,14 @@ class ConfigStoreService(Agent):
             else:
                 _log.debug("Configuration directory already exists.")
 
-        config_store_iter = glob.iglob(os.path.join(self.store_path, "*" + store_ext))
-
-        for store_path in config_store_iter:
-            root, ext = os.path.splitext(store_path)
-            agent_identity = os.path.basename(root)
-            _log.debug("Processing store for agent {}".format(agent_identity))
-            store = PersistentDict(filename=store_path, flag='c', format='json')
-            parsed_configs, name_map = process_store(agent_identity, store)
-            self.store[agent_identity] = {"configs": parsed_configs,
-                                          "store": store,
-                                          "name_map": name_map,
-                                          "lock": Semaphore()}
+        # Stores are parsed the first time they are used so a platform with
+        # many or large stores does not have to read all of them at startup.
+        for pattern in ("*" + store_ext, "*" + store_ext + AppendLogDict.log_ext):
+            for store_path in glob.iglob(os.path.join(self.store_path, pattern)):
+                if store_path.endswith(AppendLogDict.log_ext):
+                    store_path = store_path[:-len(AppendLogDict.log_ext)]
+                agent_identity = os.path.basename(store_path)[:-len(store_ext)]
+                self._unloaded_stores[agent_identity] = store_path
 
     @Core.receiver('onstart')
     def _onstart(self, sender, **kwargs):
@@ -146,6 +150,38 @@ class ConfigStoreService(Agent):
         except Exception as e:
             _log.error(f"Exception getting peerlist on startup of config store: {e}")
 
+    @Core.receiver('onstop')
+    def _onstop(self, sender, **kwargs):
+        for agent_store in list(self.store.values()):
+            agent_store["store"].sync()
+
+    def _get_agent_store(self, identity, create=False):
+        """Returns the store of an agent, loading it from disk if needed.
+        If create is True a new empty store is created when the agent has none."""
+        agent_store = self.store.get(identity)
+        if agent_store is not None:
+            return agent_store
+
+        store_path = self._unloaded_stores.pop(identity, None)
+        if store_path is not None:
+            _log.debug("Processing store for agent {}".format(identity))
+            store = AppendLogDict(filename=store_path)
+            parsed_configs, name_map = process_store(identity, store)
+            if store or create:
+                agent_store = {"configs": parsed_configs,
+                               "store": store,
+                               "name_map": name_map,
+                               "lock": Semaphore()}
+                self.store[identity] = agent_store
+            return agent_store
+
+        if create:
+            store_path = os.path.join(self.store_path, identity + store_ext)
+            store = AppendLogDict(filename=store_path, flag='n')
+            agent_store = {"configs": {}, "store": store, "name_map": {}, "lock": Semaphore()}
+            self.store[identity] = agent_store
+        return agent_store
+
     @RPC.export
     @RPC.allow('edit_config_store')
     @deprecated(reason="Use set_config")
@@ -166,6 +202,83 @@ class ConfigStoreService(Agent):
         self._add_config_to_store(identity, config_name, raw_contents, contents, config_type,
                                   trigger_callback=trigger_callback, send_update=send_update)
 
+    @RPC.export
+    @RPC.allow('edit_config_store')
+    def set_configs(self, identity, configs, trigger_callback=True, send_update=True):
+        """
+        Adds or updates many configurations of an agent at once.
+
+        Either all configurations are stored or, if any of them is invalid,
+        none are. The agent is sent a single update with all the changes so
+        its callbacks are triggered once per affected configuration instead
+        of once per change.
+
+        :param identity: VIP IDENTITY of the store
+        :param configs: list of dictionaries with the keys "config_name",
+                        "raw_contents" and optionally "config_type" (defaults
+                        to "raw")
+        """
+        agent_store = self._get_agent_store(identity)
+        checked_configs = dict(agent_store["configs"]) if agent_store is not None else {}
+        checked_names = {name.lower(): name for name in checked_configs}
+        new_configs = {}
+        for config in configs:
+            config_name = strip_config_name(config["config_name"])
+            config_type = config.get("config_type", "raw")
+            raw = config["raw_contents"]
+            parsed = process_raw_config(raw, config_type)
+            config_name_lower = config_name.lower()
+
+            if config_name_lower in checked_names:
+                del checked_configs[checked_names[config_name_lower]]
+            if check_for_recursion(config_name, parsed, checked_configs):
+                raise ValueError("Recursive configuration references detected in {}.".format(config_name))
+            checked_configs[config_name] = parsed
+            checked_names[config_name_lower] = config_name
+            # Last one wins if a configuration is given more than once.
+            new_configs.pop(config_name_lower, None)
+            new_configs[config_name_lower] = (config_name, raw, parsed, config_type)
+
+        if not new_configs:
+            return
+
+        agent_store = self._get_agent_store(identity, create=True)
+        agent_disk_store = agent_store["store"]
+        agent_store_lock = agent_store["lock"]
+
+        changes = []
+        for config_name, raw, parsed, config_type in new_configs.values():
+            action = self._store_config(agent_store, config_name, raw, parsed, config_type)
+            changes.append([action, config_name, parsed])
+
+        agent_disk_store.async_sync()
+        self._store_changed(identity)
+
+        _log.debug("Agent {} configs {} stored.".format(identity, [change[1] for change in changes]))
+
+        if send_update and identity in self.vip.peerlist.peers_list:
+            with agent_store_lock:
+                try:
+                    self.vip.rpc.call(identity, "config.update_bulk", changes,
+                                      trigger_callback=trigger_callback).get(timeout=UPDATE_TIMEOUT)
+                except MethodNotFound:
+                    # Agent predates bulk updates, send them one at a time.
+                    for action, config_name, parsed in changes:
+                        try:
+                            self.vip.rpc.call(identity, "config.update", action, config_name, contents=parsed,
+                                              trigger_callback=trigger_callback).get(timeout=UPDATE_TIMEOUT)
+                        except Exception as e:
+                            _log.error("Agent {} failure when adding/updating configuration {}: {}".format(
+                                identity, config_name, e))
+                except errors.Unreachable:
+                    _log.debug("Agent {} not currently running. Configuration update not sent.".format(identity))
+                except RemoteError as e:
+                    _log.error("Agent {} failure when adding/updating configurations: {}".format(identity, e))
+                except gevent.timeout.Timeout:
+                    _log.error("Config update to agent {} timed out after {} seconds".format(identity, UPDATE_TIMEOUT))
+                except Exception as e:
+                    _log.error("Unknown error sending update to agent identity {}.: {}".format(identity, e))
+
     @RPC.export
     @RPC.allow('edit_config_store')
     @deprecated(reason="Use delete_config")
@@ -192,7 +305,7 @@ class ConfigStoreService(Agent):
     @RPC.export
     @RPC.allow('edit_config_store')
     def delete_store(self, identity):
-        agent_store = self.store.get(identity)
+        agent_store = self._get_agent_store(identity)
         if agent_store is None:
             return
 
@@ -207,6 +320,7 @@ class ConfigStoreService(Agent):
 
         # Sync will delete the file if the store is empty.
         agent_disk_store.async_sync()
+        self._store_changed(identity)
 
         if identity in self.vip.peerlist.peers_list:
             with agent_store_lock:
@@ -237,7 +351,8 @@ class ConfigStoreService(Agent):
 
     @RPC.export
     def list_configs(self, identity):
-        result = list(self.store.get(identity, {}).get("store", {}).keys())
+        agent_store = self._get_agent_store(identity) or {}
+        result = list(agent_store.get("store", {}).keys())
         result.sort()
         return result
 
@@ -251,10 +366,26 @@ class ConfigStoreService(Agent):
 
     @RPC.export
     def list_stores(self):
-        result = list(self.store.keys())
+        result = list(set(self.store) | set(self._unloaded_stores))
         result.sort()
         return result
 
+    @RPC.export
+    def get_store_version(self, identity):
+        """
+        Returns a token that changes whenever a configuration of the store is
+        added, updated or deleted. Clients caching data built from a store
+        can call this instead of reading every configuration to find out
+        whether their copy is stale.
+
+        :param identity: VIP IDENTITY of the store
+        :return: opaque version string
+        """
+        return "{}-{}".format(self._instance_token, self._store_versions.get(identity, 0))
+
+    def _store_changed(self, identity):
+        self._store_versions[identity] = self._store_versions.get(identity, 0) + 1
+
     @RPC.export
     @deprecated(reason="Use get_config")
     def manage_get(self, identity, config_name, raw=True):
@@ -265,7 +396,7 @@ class ConfigStoreService(Agent):
 
     @RPC.export
     def get_config(self, identity, config_name, raw=True):
-        agent_store = self.store.get(identity)
+        agent_store = self._get_agent_store(identity)
         if agent_store is None:
             raise KeyError('No configuration file "{}" for VIP IDENTIY {}'.format(config_name, identity))
 
@@ -296,7 +427,7 @@ class ConfigStoreService(Agent):
 
     @RPC.export
     def get_metadata(self, identity, config_name):
-        agent_store = self.store.get(identity)
+        agent_store = self._get_agent_store(identity)
         if agent_store is None:
             raise KeyError('No configuration file "{}" for VIP IDENTIY {}'.format(config_name, identity))
 
@@ -329,17 +460,7 @@ class ConfigStoreService(Agent):
 
         # We need to create store and lock if it doesn't exist in case someone
         # tries to add a configuration while we are sending the initial state.
-        agent_store = self.store.get(identity)
-
-        if agent_store is None:
-            # Initialize a new store.
-            store_path = os.path.join(self.store_path, identity + store_ext)
-            store = PersistentDict(filename=store_path, flag='c', format='json')
-            agent_store = {
-                "configs": {}, "store": store, "name_map": {},
-                "lock": Semaphore()
-            }
-            self.store[identity] = agent_store
+        agent_store = self._get_agent_store(identity, create=True)
 
         agent_configs = agent_store["configs"]
         agent_disk_store = agent_store["store"]
@@ -367,7 +488,7 @@ class ConfigStoreService(Agent):
     # Helper method to allow the local services to delete configs before message
     # bus in online.
     def delete(self, identity, config_name, trigger_callback=False, send_update=True):
-        agent_store = self.store.get(identity)
+        agent_store = self._get_agent_store(identity)
         if agent_store is None:
             raise KeyError('No configuration file "{}" for VIP IDENTIY {}'.format(config_name, identity))
 
@@ -390,6 +511,7 @@ class ConfigStoreService(Agent):
 
         # Sync will delete the file if the store is empty.
         agent_disk_store.async_sync()
+        self._store_changed(identity)
 
         if send_update and identity in self.vip.peerlist.peers_list:
             with agent_store_lock:
@@ -432,43 +554,21 @@ class ConfigStoreService(Agent):
                              config_type, trigger_callback=False,
                              send_update=True):
         """Adds a processed configuration to the store."""
-        agent_store = self.store.get(identity)
-
-        action = "UPDATE"
-
-        if agent_store is None:
-            #Initialize a new store.
-            store_path = os.path.join(self.store_path, identity+ store_ext)
-            store = PersistentDict(filename=store_path, flag='c', format='json')
-            agent_store = {"configs": {}, "store": store, "name_map": {}, "lock": Semaphore()}
-            self.store[identity] = agent_store
+        agent_store = self._get_agent_store(identity, create=True)
 
         agent_configs = agent_store["configs"]
         agent_disk_store = agent_store["store"]
         agent_store_lock = agent_store["lock"]
-        agent_name_map = agent_store["name_map"]
 
         config_name = strip_config_name(config_name)
-        config_name_lower = config_name.lower()
-
-        if config_name_lower not in agent_name_map:
-            action = "NEW"
 
         if check_for_recursion(config_name, parsed, agent_configs):
             raise ValueError("Recursive configuration references detected.")
 
-        if config_name_lower in agent_name_map:
-            old_config_name = agent_name_map[config_name_lower]
-            del agent_configs[old_config_name]
-
-        agent_configs[config_name] = parsed
-        agent_name_map[config_name_lower] = config_name
-
-        agent_disk_store[config_name] = {"type": config_type,
-                                         "modified": format_timestamp(get_aware_utc_now()),
-                                         "data": raw}
+        action = self._store_config(agent_store, config_name, raw, parsed, config_type)
 
         agent_disk_store.async_sync()
+        self._store_changed(identity)
 
         _log.debug("Agent {} config {} stored.".format(identity, config_name))
 
@@ -487,3 +587,27 @@ class ConfigStoreService(Agent):
                     _log.error("Config update to agent {} timed out after {} seconds".format(identity, UPDATE_TIMEOUT))
                 except Exception as e:
                     _log.error("Unknown error sending update to agent identity {}.: {}".format(identity, e))
+
+    @staticmethod
+    def _store_config(agent_store, config_name, raw, parsed, config_type):
+        """Puts a checked configuration in an agent's store.
+        Returns the action to send to the agent."""
+        agent_configs = agent_store["configs"]
+        agent_disk_store = agent_store["store"]
+        agent_name_map = agent_store["name_map"]
+
+        config_name_lower = config_name.lower()
+
+        action = "NEW"
+        if config_name_lower in agent_name_map:
+            action = "UPDATE"
+            old_config_name = agent_name_map[config_name_lower]
+            del agent_configs[old_config_name]
+
+        agent_configs[config_name] = parsed
+        agent_name_map[config_name_lower] = config_name
+
+        agent_disk_store[config_name] = {"type": config_type,
+                                         "modified": format_timestamp(get_aware_utc_now()),
+                                         "data": raw}
+        return action
@@ -78,9 +78,11 @@ class ConfigStore(SubsystemBase):
 
         def onsetup(sender, **kwargs):
             rpc.export(self._update_config, 'config.update')
+            rpc.export(self._update_configs, 'config.update_bulk')
             rpc.export(self._initial_update, 'config.initial_update')
             if is_auth_enabled():
                 rpc.allow('config.update', 'sync_agent_config')
+                rpc.allow('config.update_bulk', 'sync_agent_config')
                 rpc.allow('config.initial_update', 'sync_agent_config')
 
         core.onsetup.connect(onsetup, self)
@@ -200,8 +202,43 @@ class ConfigStore(SubsystemBase):
             return
 
         affected_configs = {}
+        self._apply_update(action, config_name, contents, affected_configs)
 
-        # Update local store.
+        if trigger_callback and self._initial_callbacks_called:
+            self._process_callbacks(affected_configs)
+
+        self._remove_names([(action, config_name)])
+
+    def _update_configs(self, changes, trigger_callback=False):
+        """Called by the platform to push out many configuration changes at once.
+        Callbacks are processed once for all affected configurations.
+
+        :param changes: list of [action, config_name, contents]
+        """
+        if not self._initialized:
+            return
+
+        affected_configs = {}
+        for action, config_name, contents in changes:
+            self._apply_update(action, config_name, contents, affected_configs)
+
+        if trigger_callback and self._initial_callbacks_called:
+            self._process_callbacks(affected_configs)
+
+        self._remove_names([(action, config_name) for action, config_name, _ in changes])
+
+    def _remove_names(self, changes):
+        # Names of deleted configurations are needed until the callbacks are done.
+        for action, config_name in changes:
+            if action == "DELETE" and config_name.lower() not in self._store:
+                self._name_map.pop(config_name.lower(), None)
+
+            if action == "DELETE_ALL":
+                self._name_map.clear()
+
+    def _apply_update(self, action, config_name, contents, affected_configs):
+        """Updates the local store and adds the configurations affected by
+        the change to affected_configs."""
         if action == "DELETE":
             config_name_lower = config_name.lower()
             if config_name_lower in self._store:
@@ -236,15 +273,6 @@ class ConfigStore(SubsystemBase):
             self._update_refs(config_name_lower, self._store[config_name_lower])
             self._gather_affected(config_name_lower, affected_configs)
 
-        if trigger_callback and self._initial_callbacks_called:
-            self._process_callbacks(affected_configs)
-
-        if action == "DELETE":
-            del self._name_map[config_name_lower]
-
-        if action == "DELETE_ALL":
-            self._name_map.clear()
-
     def _process_callbacks(self, affected_configs):
         _log.debug("Processing callbacks for affected files: {}".format(affected_configs))
         all_map = self._default_name_map.copy()
@@ -39,6 +39,7 @@ from .base import SubsystemBase
 from ..decorators import annotate, annotations, dualmethod, spawn
 from ..errors import Unreachable
 from .... import jsonrpc
+from ...topic_trie import SubscriptionIndex
 
 from ..results import ResultsDictionary
 from gevent.queue import Queue
@@ -83,6 +84,8 @@ class PubSub(SubsystemBase):
             return defaultdict(set)
 
         self._my_subscriptions = defaultdict(platform_subscriptions)
+        # Prefix index over _my_subscriptions used to find the callbacks of an incoming topic
+        self._subscription_index = SubscriptionIndex()
         self.protected_topics = ProtectedPubSubTopics()
         core.register('pubsub', self._handle_subsystem, self._handle_error)
         self.vip_socket = None
@@ -134,16 +137,11 @@ class PubSub(SubsystemBase):
         peer = 'pubsub'
 
         handled = 0
-        for platform in self._my_subscriptions:
-            # _log.debug("SYNC: process callback subscriptions: {}".format(self._my_subscriptions[platform][bus]))
-            buses = self._my_subscriptions[platform]
-            if bus in buses:
-                subscriptions = buses[bus]
-                for prefix, callbacks in subscriptions.items():
-                    if topic.startswith(prefix):
-                        handled += 1
-                        for callback in callbacks:
-                            callback(peer, sender, bus, topic, headers, message)
+        # One group of callbacks per platform and matching prefix
+        for callbacks in self._subscription_index.match_groups(bus, topic):
+            handled += 1
+            for callback in callbacks:
+                callback(peer, sender, bus, topic, headers, message)
         if not handled:
             # No callbacks for topic; synchronize with sender
             self.synchronize()
@@ -272,11 +270,9 @@ class PubSub(SubsystemBase):
         if not callable(callback):
             raise ValueError('callback %r is not callable' % (callback,))
         try:
-            if not all_platforms:
-                self._my_subscriptions['internal'][bus][prefix].add(callback)
-            else:
-                self._my_subscriptions['all'][bus][prefix].add(callback)
-                # _log.debug("SYNC: add subscriptions: {}".format(self._my_subscriptions['internal'][bus][prefix]))
+            platform = 'all' if all_platforms else 'internal'
+            self._my_subscriptions[platform][bus][prefix].add(callback)
+            self._subscription_index.add(platform, bus, prefix, callback)
         except KeyError:
             _log.error("PUBSUB something went wrong in add subscriptions")
 
@@ -366,6 +362,7 @@ class PubSub(SubsystemBase):
                             pass
                         else:
                             topics.append(topic)
+                            self._subscription_index.discard(platform, bus, topic, callback)
                         if not callbacks:
                             remove.append(topic)
                     for topic in remove:
@@ -389,6 +386,7 @@ class PubSub(SubsystemBase):
                             del subscriptions[prefix]
                         except KeyError:
                             return []
+                        self._subscription_index.remove(platform, bus, prefix)
                     else:
                         try:
                             callbacks = subscriptions[prefix]
@@ -400,6 +398,7 @@ class PubSub(SubsystemBase):
                         except KeyError as e:
                             _log.debug(f"KeyError: {e}")
                             pass
+                        self._subscription_index.discard(platform, bus, prefix, callback)
                         if not callbacks:
                             try:
                                 del subscriptions[prefix]
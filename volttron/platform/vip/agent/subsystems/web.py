@@ -74,7 +74,7 @@ class WebSubSystem(SubsystemBase):
         self._rpc().call(PLATFORM_WEB, 'unregister_all_agent_routes').get(timeout=10)
 
     def register_endpoint(self, endpoint, callback,
-                          res_type: ResourceType = ResourceType.JSONRPC):
+                          res_type: ResourceType = ResourceType.JSONRPC, max_concurrent=None, timeout=None):
         """
         The :meth:`register_endpoint` method registers an endpoint with the
         :param res_type:
@@ -95,6 +95,10 @@ class WebSubSystem(SubsystemBase):
         :param endpoint:
             Http endpoint matching the PATH_INFO environmental variable
         :param callback: Agent method to be called with the env and data.
+        :param max_concurrent: Requests served at once before the platform
+            web service answers 503, no limit if None.
+        :param timeout: Seconds the platform web service waits for the
+            callback before answering 504, 60 if None.
         :type endpoint: str
         :type callback: function
         """
@@ -102,7 +106,12 @@ class WebSubSystem(SubsystemBase):
         self._endpoints[endpoint] = callback
         if isinstance(res_type, ResourceType):
             res_type = res_type.value
-        self._rpc().call(PLATFORM_WEB, 'register_endpoint', endpoint, res_type).get(timeout=10)
+        limits = {}
+        if max_concurrent is not None:
+            limits['max_concurrent'] = max_concurrent
+        if timeout is not None:
+            limits['timeout'] = timeout
+        self._rpc().call(PLATFORM_WEB, 'register_endpoint', endpoint, res_type, **limits).get(timeout=10)
 
     def register_path(self, prefix, static_path):
         """
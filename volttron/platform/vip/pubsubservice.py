@@ -40,6 +40,7 @@ from volttron.utils.frame_serialization import serialize_frames
 
 green.Context._instance = green.Context.shadow(zmq.Context.instance().underlying)
 from .agent.subsystems.pubsub import ProtectedPubSubTopics
+from .topic_trie import SubscriptionIndex, TopicTrie
 from volttron.platform.jsonrpc import (INVALID_REQUEST, UNAUTHORIZED)
 from volttron.platform import jsonapi
 
@@ -63,11 +64,14 @@ class PubSubService:
             return defaultdict(set)
 
         self._peer_subscriptions = defaultdict(platform_subscriptions)
+        # Prefix index over _peer_subscriptions used to find the subscribers of a published topic
+        self._subscription_index = SubscriptionIndex()
         self._vip_sock = socket
         self._user_capabilities = {}
         self._protected_topics = ProtectedPubSubTopics()
         self._load_protected_topics(protected_topics)
         self._ext_subscriptions = defaultdict(set)
+        self._ext_subscription_index = TopicTrie()
         self._ext_router = routing_service
         if self._ext_router is not None:
             self._ext_router.register('on_connect', self.external_platform_add)
@@ -85,6 +89,7 @@ class PubSubService:
         :type str
         """
         self._peer_subscriptions[platform][bus][prefix].add(peer)
+        self._subscription_index.add(platform, bus, prefix, peer)
 
     def peer_drop(self, peer, **kwargs):
         """
@@ -111,7 +116,8 @@ class PubSubService:
     def external_platform_drop(self, instance_name):
         if instance_name in self._ext_subscriptions:
             self._logger.debug("PUBSUBSERVICE dropping external subscriptions for {}".format(instance_name))
-            del self._ext_subscriptions[instance_name]
+            for prefix in self._ext_subscriptions.pop(instance_name):
+                self._ext_subscription_index.discard(prefix, instance_name)
 
     def _sync(self, peer, items):
         """
@@ -136,13 +142,16 @@ class PubSubService:
                         items.remove(item)
                     except KeyError:
                         subscribers.discard(peer)
+                        self._subscription_index.discard(platform, bus, prefix, peer)
                         if not subscribers:
                             remove.append(item)
                     else:
                         subscribers.add(peer)
+                        self._subscription_index.add(platform, bus, prefix, peer)
         for platform, bus, prefix in remove:
             subscriptions = self._peer_subscriptions[platform][bus]
             assert not subscriptions.pop(prefix)
+            self._subscription_index.remove(platform, bus, prefix)
 
         for platform, bus, prefix in items:
             self._add_peer_subscription(peer, bus, prefix, platform)
@@ -250,6 +259,7 @@ class PubSubService:
                     remove = []
                     for topic, subscribers in subscriptions.items():
                         subscribers.discard(peer)
+                        self._subscription_index.discard(platform, bus, topic, peer)
                         if not subscribers:
                             remove.append(topic)
                     for topic in remove:
@@ -258,6 +268,7 @@ class PubSubService:
                     for prefix in prefix if isinstance(prefix, list) else [prefix]:
                         subscribers = subscriptions[prefix]
                         subscribers.discard(peer)
+                        self._subscription_index.discard(platform, bus, prefix, peer)
                         if not subscribers:
                             del subscriptions[prefix]
 
@@ -408,34 +419,19 @@ class PubSubService:
             self._logger.error("JSON decode error. Invalid character")
             return 0
 
-        all_subscriptions = dict()
-        subscriptions = dict()
-        subs = dict()
-        # Get subscriptions for all platforms
-        try:
-            all_subscriptions = self._peer_subscriptions['all'][bus]
-        except KeyError:
-            pass
-        try:
-            subscriptions = self._peer_subscriptions['internal'][bus]
-        except KeyError:
-            pass
-
-        subs.update(all_subscriptions)
-        subs.update(subscriptions)
-        subscribers = set()
-        # Check for local subscribers
-        for prefix, subscription in subs.items():
-            if subscription and topic.startswith(prefix):
-                subscribers |= subscription
+        # Local subscribers of all platforms ('internal' and 'all') matching the topic
+        subscribers = self._subscription_index.match(bus, topic)
 
         if subscribers:
             # self._logger.debug("PUBSUBSERVICE: found subscribers: {}".format(subscribers))
+            # Encode the publish frames (including the message payload) only once. The encoded
+            # frames are shared by every recipient and only the recipient frame is swapped.
+            serialized = serialize_frames(frames)
             for subscriber in subscribers:
                 frames[0] = subscriber
                 try:
                     # Send the message to the subscriber
-                    for sub in self._send(frames, publisher):
+                    for sub in self._send(frames, publisher, serialized=serialized):
                         # Drop the subscriber if unreachable
                         self.peer_drop(sub)
                 except ZMQError:
@@ -452,12 +448,7 @@ class PubSubService:
         publisher, receiver, proto, user_id, msg_id, subsystem, op, topic, data = frames[0:9]
 
         success = False
-        external_subscribers = set()
-        topic = topic
-        for platform_id, subscriptions in self._ext_subscriptions.items():
-            for prefix in subscriptions:
-                if topic.startswith(prefix):
-                    external_subscribers.add(platform_id)
+        external_subscribers = self._ext_subscription_index.match(topic)
         # self._logger.debug("PUBSUBSERVICE External subscriptions {0}, {1}".format(topic, external_subscribers))
         if external_subscribers:
             frames[:] = []
@@ -491,7 +482,7 @@ class PubSubService:
                         raise
         return len(external_subscribers)
 
-    def _send(self, frames, publisher):
+    def _send(self, frames, publisher, serialized=None):
         """
         Sends the message to the recipient. If the recipient is unreachable, it is dropped from list of peers (and
         associated subscriptions are removed. Any EAGAIN errors are reported back to the publisher.
@@ -499,6 +490,9 @@ class PubSubService:
         :type frames list
         :param publisher
         :type bytes
+        :param serialized already serialized frames shared across recipients (fan-out). Only the recipient
+                          frame is replaced before sending; the remaining frames are sent zero-copy.
+        :type list
         :returns: List of dropped recipients, if any
         :rtype: list
 
@@ -515,7 +509,10 @@ class PubSubService:
             # Try sending the message to its recipient
             # Because we are sending directly on the socket we need
             # bytes
-            serialized = serialize_frames(frames)
+            if serialized is None:
+                serialized = serialize_frames(frames)
+            else:
+                serialized[0] = serialize_frames([subscriber])[0]
             self._vip_sock.send_multipart(serialized, flags=NOBLOCK, copy=False)
         except ZMQError as exc:
             try:
@@ -744,7 +741,11 @@ class PubSubService:
                         continue
                     prefixes = msg[instance_name]
                     # Store external subscription list for later use (during publish)
+                    for prefix in self._ext_subscriptions.get(instance_name, ()):
+                        self._ext_subscription_index.discard(prefix, instance_name)
                     self._ext_subscriptions[instance_name] = prefixes
+                    for prefix in prefixes:
+                        self._ext_subscription_index.add(prefix, instance_name)
                     self._logger.debug("PUBSUBSERVICE New external list from {0}: List: {1}".
                                        format(instance_name, self._ext_subscriptions))
                     if self._rabbitmq_agent:
@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2023 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+"""
+Prefix index used to match published topics against pubsub subscriptions.
+
+A subscription to ``prefix`` matches every topic for which
+``topic.startswith(prefix)`` is true.  Rather than testing every subscribed
+prefix on each publish, :class:`TopicTrie` stores the prefixes in a character
+trie so a lookup walks the topic once, independent of the number of
+subscriptions.  The subscribers resolved for a topic are cached until the
+subscriptions change.
+"""
+
+from collections import defaultdict
+
+__all__ = ['TopicTrie', 'SubscriptionIndex']
+
+
+class _TrieNode:
+    __slots__ = ('children', 'subscribers')
+
+    def __init__(self):
+        self.children = {}
+        self.subscribers = None
+
+
+class TopicTrie:
+    """
+    Character trie mapping subscription prefixes to the set of subscribers
+    (peer identities, callbacks, platform names, ...) of each prefix.
+    """
+
+    # Upper bound on the number of topics with a cached result. Publishers
+    # rarely use more distinct topics than this, the cache is simply reset
+    # when the bound is reached.
+    cache_size = 10000
+
+    def __init__(self):
+        self._root = _TrieNode()
+        self._cache = {}
+        self._prefix_count = 0
+
+    def __len__(self):
+        return self._prefix_count
+
+    def add(self, prefix, subscriber):
+        """
+        Add subscriber to the prefix.
+        :param prefix: subscription prefix
+        :param subscriber: hashable subscriber
+        """
+        node = self._root
+        for char in prefix:
+            try:
+                node = node.children[char]
+            except KeyError:
+                node.children[char] = node = _TrieNode()
+        if node.subscribers is None:
+            node.subscribers = set()
+            self._prefix_count += 1
+        node.subscribers.add(subscriber)
+        self._cache.clear()
+
+    def discard(self, prefix, subscriber):
+        """
+        Remove subscriber from the prefix, dropping the prefix when it has no
+        subscribers left.
+        :param prefix: subscription prefix
+        :param subscriber: subscriber to remove
+        """
+        path = self._path(prefix)
+        if path is None:
+            return
+        subscribers = path[-1][1].subscribers
+        if subscribers is None or subscriber not in subscribers:
+            return
+        subscribers.discard(subscriber)
+        if not subscribers:
+            self._remove_path(path)
+        self._cache.clear()
+
+    def remove(self, prefix):
+        """
+        Remove the prefix along with all of its subscribers.
+        :param prefix: subscription prefix
+        """
+        path = self._path(prefix)
+        if path is None or path[-1][1].subscribers is None:
+            return
+        self._remove_path(path)
+        self._cache.clear()
+
+    def subscribers(self, prefix):
+        """
+        Returns the subscribers of exactly this prefix.
+        :param prefix: subscription prefix
+        :return: frozenset of subscribers
+        """
+        path = self._path(prefix)
+        if path is None or path[-1][1].subscribers is None:
+            return frozenset()
+        return frozenset(path[-1][1].subscribers)
+
+    def match_groups(self, topic):
+        """
+        Returns the subscribers of every prefix of topic, one frozenset per
+        matching prefix ordered from the shortest to the longest prefix.
+        :param topic: published topic
+        :return: tuple of frozensets
+        """
+        return self._lookup(topic)[0]
+
+    def match(self, topic):
+        """
+        Returns all of the subscribers whose prefix matches topic.
+        :param topic: published topic
+        :return: frozenset of subscribers
+        """
+        return self._lookup(topic)[1]
+
+    def _lookup(self, topic):
+        try:
+            return self._cache[topic]
+        except KeyError:
+            pass
+        node = self._root
+        groups = []
+        if node.subscribers:
+            groups.append(frozenset(node.subscribers))
+        for char in topic:
+            node = node.children.get(char)
+            if node is None:
+                break
+            if node.subscribers:
+                groups.append(frozenset(node.subscribers))
+        if len(groups) == 1:
+            result = (tuple(groups), groups[0])
+        else:
+            result = (tuple(groups), frozenset().union(*groups))
+        if len(self._cache) >= self.cache_size:
+            self._cache.clear()
+        self._cache[topic] = result
+        return result
+
+    def _path(self, prefix):
+        # List of (char, node) pairs from the root to the node of prefix.
+        node = self._root
+        path = [(None, node)]
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return None
+            path.append((char, node))
+        return path
+
+    def _remove_path(self, path):
+        path[-1][1].subscribers = None
+        self._prefix_count -= 1
+        # Prune the nodes that no longer lead to a subscription.
+        for index in range(len(path) - 1, 0, -1):
+            char, node = path[index]
+            if node.subscribers is not None or node.children:
+                break
+            del path[index - 1][1].children[char]
+
+
+class SubscriptionIndex:
+    """
+    Collection of :class:`TopicTrie` keyed by bus and platform ('internal' or
+    'all') mirroring the layout of the pubsub subscription dictionaries.
+    """
+
+    def __init__(self):
+        self._buses = defaultdict(dict)
+
+    def add(self, platform, bus, prefix, subscriber):
+        try:
+            trie = self._buses[bus][platform]
+        except KeyError:
+            self._buses[bus][platform] = trie = TopicTrie()
+        trie.add(prefix, subscriber)
+
+    def discard(self, platform, bus, prefix, subscriber):
+        trie = self._buses.get(bus, {}).get(platform)
+        if trie is not None:
+            trie.discard(prefix, subscriber)
+
+    def remove(self, platform, bus, prefix):
+        trie = self._buses.get(bus, {}).get(platform)
+        if trie is not None:
+            trie.remove(prefix)
+
+    def match_groups(self, bus, topic):
+        """
+        Returns a list of subscriber sets, one per matching platform and prefix.
+        """
+        groups = []
+        for trie in self._buses.get(bus, {}).values():
+            groups.extend(trie.match_groups(topic))
+        return groups
+
+    def match(self, bus, topic):
+        """
+        Returns the set of subscribers on any platform whose prefix matches topic.
+        """
+        tries = list(self._buses.get(bus, {}).values())
+        if len(tries) == 1:
+            return tries[0].match(topic)
+        return frozenset().union(*(trie.match(topic) for trie in tries))
@@ -217,6 +217,8 @@ class AdminEndpoints:
             response = self.__cert_list_api()
         elif endpoint == 'pending_csrs':
             response = self.__pending_csrs_api()
+        elif endpoint == 'route_metrics':
+            response = self.__route_metrics_api()
         elif endpoint.startswith('approve_csr/'):
             response = self.__approve_csr_api(endpoint.split('/')[1])
         elif endpoint.startswith('deny_csr/'):
@@ -283,6 +285,15 @@ class AdminEndpoints:
 
         return Response(jsonapi.dumps(data), content_type="application/json")
 
+    def __route_metrics_api(self):
+        try:
+            data = self._rpc_caller.call(PLATFORM_WEB, 'get_route_metrics').get(timeout=4)
+
+        except TimeoutError as e:
+            data = dict(status="ERROR", message=str(e))
+
+        return Response(jsonapi.dumps(data), content_type="application/json")
+
     def __cert_list_api(self):
 
         try:
@@ -28,6 +28,7 @@ import mimetypes
 import os
 from pathlib import Path
 import re
+import sys
 from urllib.parse import urlparse, parse_qs
 import zlib
 from collections import defaultdict
@@ -35,6 +36,7 @@ from collections import defaultdict
 import gevent
 import gevent.pywsgi
 import werkzeug
+import werkzeug.wsgi
 import jwt
 from cryptography.hazmat.primitives import serialization
 from gevent import Greenlet
@@ -46,6 +48,7 @@ from .admin_endpoints import AdminEndpoints
 from .vui_endpoints import VUIEndpoints
 from .authenticate_endpoint import AuthenticateEndpoints
 from .csr_endpoints import CSREndpoints
+from .route_table import RouteLimit, RouteStats, RouteTable
 from .webapp import WebApplicationWrapper
 from volttron.platform.agent.known_identities import \
     CONTROL, VOLTTRON_CENTRAL, AUTH
@@ -93,6 +96,13 @@ tplenv = Environment(
     autoescape=select_autoescape(['html', 'xml'])
 )
 
+# Seconds to wait for an agent to answer a request routed to it, unless the
+# route was registered with its own timeout.
+ENDPOINT_TIMEOUT = 60
+AGENT_ROUTE_TIMEOUT = 120
+# Bytes per read when sending a file.
+SENDFILE_BLOCK_SIZE = 64 * 1024
+
 
 class PlatformWebService(Agent):
     """The service that is responsible for managing and serving registered pages
@@ -117,9 +127,12 @@ class PlatformWebService(Agent):
         self.bind_web_address = bind_web_address
         self.serverkey = serverkey
         self.instance_name = None
-        self.registeredroutes = []
+        self.registeredroutes = RouteTable()
         self.peerroutes = defaultdict(list)
         self.pathroutes = defaultdict(list)
+        # Limits and metrics of routes, keyed by endpoint or route regex.
+        self._route_limits = {}
+        self._route_stats = defaultdict(RouteStats)
         # These will be used if set rather than the
         # any of the internal agent's certificates
         self.web_ssl_key = web_ssl_key
@@ -217,11 +230,38 @@ class PlatformWebService(Agent):
         return self.volttron_central_address
 
     @RPC.export
-    def register_endpoint(self, endpoint, res_type):
+    def get_route_metrics(self):
+        """
+        Returns the request count, errors, requests rejected by the route's
+        concurrency limit, timeouts, requests in flight and latencies of
+        every route that has been requested, keyed by endpoint or route regex.
+        """
+        return {route: stats.to_dict() for route, stats in self._route_stats.items()}
+
+    def set_route_limit(self, route, max_concurrent=None, timeout=None):
+        """
+        Limits the number of requests a route serves at once and the seconds
+        each may take. Requests over the limit are answered with
+        503 Service Unavailable and requests taking too long with
+        504 Gateway Timeout.
+
+        :param route: endpoint or route regex the limit applies to
+        :param max_concurrent: requests served at once, None for no limit
+        :param timeout: seconds, None for the default
+        """
+        if max_concurrent is None and timeout is None:
+            self._route_limits.pop(route, None)
+        else:
+            self._route_limits[route] = RouteLimit(max_concurrent, timeout)
+
+    @RPC.export
+    def register_endpoint(self, endpoint, res_type, max_concurrent=None, timeout=None):
         """
         RPC method to register a dynamic route.
 
         :param endpoint:
+        :param max_concurrent: requests the endpoint serves at once
+        :param timeout: seconds to wait for the agent to answer a request
         :return:
         """
         # Get calling identity from whom the request came from
@@ -236,13 +276,17 @@ class PlatformWebService(Agent):
                 "Endpoint {} is already an endpoint".format(endpoint))
 
         self.endpoints[endpoint] = (identity, res_type)
+        self.set_route_limit(endpoint, max_concurrent, timeout)
 
     @RPC.export
-    def register_agent_route(self, regex, fn):
+    def register_agent_route(self, regex, fn, max_concurrent=None, timeout=None):
         """ Register an agent route to an exported function.
 
         When a http request is executed and matches the passed regular
         expression then the function on peer is executed.
+
+        max_concurrent and timeout limit the requests the route serves at
+        once and the seconds to wait for the agent to answer each.
         """
         # Get calling identity from whom the request came from
         identity = self.vip.rpc.context.vip_message.peer
@@ -256,6 +300,7 @@ class PlatformWebService(Agent):
         compiled = re.compile(regex)
         self.peerroutes[identity].append(compiled)
         self.registeredroutes.insert(0, (compiled, 'peer_route', (identity, fn)))
+        self.set_route_limit(regex, max_concurrent, timeout)
 
     @RPC.export
     def unregister_all_agent_routes(self):
@@ -264,16 +309,17 @@ class PlatformWebService(Agent):
 
         _log.info('Unregistering agent routes for: {}'.format(identity))
         for regex in self.peerroutes[identity]:
-            out = [cp for cp in self.registeredroutes if cp[0] != regex]
-            self.registeredroutes = out
+            self.registeredroutes[:] = [cp for cp in self.registeredroutes if cp[0] != regex]
+            self._route_limits.pop(regex.pattern, None)
         del self.peerroutes[identity]
         for regex in self.pathroutes[identity]:
-            out = [cp for cp in self.registeredroutes if cp[0] != regex]
-            self.registeredroutes = out
+            self.registeredroutes[:] = [cp for cp in self.registeredroutes if cp[0] != regex]
         del self.pathroutes[identity]
 
         _log.debug(self.endpoints)
         endpoints = self.endpoints.copy()
+        for endpoint in [i for i in endpoints if endpoints[i][0] == identity]:
+            self._route_limits.pop(endpoint, None)
         endpoints = {i:endpoints[i] for i in endpoints if endpoints[i][0] != identity}
         _log.debug(endpoints)
         self.endpoints = endpoints
@@ -413,6 +459,75 @@ class PlatformWebService(Agent):
         if path_info.startswith('/http://'):
             path_info = path_info[path_info.index('/', len('/http://')):]
 
+        _log.debug('path_info is: {}'.format(path_info))
+        # Get the peer responsible for dealing with the endpoint.  If there
+        # isn't a peer then fall back on the other methods of routing.
+        (peer, res_type) = self.endpoints.get(path_info, (None, None))
+        _log.debug('Peer path_info is associated with: {}'.format(peer))
+
+        if peer and res_type in ('jsonrpc', 'raw'):
+            route_key, route = path_info, None
+        else:
+            peer = None
+            # if ws4pi.socket is set then this connection is a web socket
+            # and so we return the websocket response.
+            if 'ws4py.socket' in env and 'vui' not in path_info:
+                return env['ws4py.socket'](env, start_response)
+
+            route = self.registeredroutes.match(path_info)
+            if route is None:
+                start_response('404 Not Found', [('Content-Type', 'text/html')])
+                return [b'<h1>Not Found</h1>']
+            route_key = route[0].pattern
+
+        limit = self._route_limits.get(route_key)
+        stats = self._route_stats[route_key]
+        if limit is not None and not limit.acquire():
+            stats.rejected += 1
+            start_response('503 Service Unavailable', [('Content-Type', 'text/html'), ('Retry-After', '1')])
+            return [b'<h1>Service Unavailable</h1>']
+
+        statuses = []
+
+        def _start_response(status, headers, exc_info=None):
+            statuses.append(status)
+            if exc_info is None:
+                return start_response(status, headers)
+            return start_response(status, headers, exc_info)
+
+        started = stats.start()
+        timed_out = False
+
+        def finish(error=False):
+            if limit is not None:
+                limit.release()
+            status = statuses[-1] if statuses else ''
+            # Raw responses send their status as bytes.
+            if isinstance(status, bytes):
+                status = status.decode('utf-8', 'replace')
+            stats.finish(started, error=error or status.startswith('5'), timed_out=timed_out)
+
+        try:
+            response = self._route_request(env, _start_response, path_info, peer, res_type, route,
+                                           limit.timeout if limit is not None else None)
+        except gevent.Timeout:
+            timed_out = True
+            _log.warning('Request for {} timed out.'.format(path_info))
+            _start_response('504 Gateway Timeout', [('Content-Type', 'text/html')], sys.exc_info())
+            response = [b'<h1>Gateway Timeout</h1>']
+        except Exception:
+            finish(error=True)
+            raise
+        # The route stays busy until the server has sent the body and closes
+        # the response.
+        return werkzeug.wsgi.ClosingIterator(response, finish)
+
+    def _route_request(self, env, start_response, path_info, peer, res_type, route, timeout):
+        """
+        Calls the endpoint peer or the route matched by app_routing.
+
+        :param timeout: seconds the route may take, None for the default
+        """
         # only expose a partial list of the env variables to the registered
         # agents.
         envlist = ['HTTP_USER_AGENT', 'PATH_INFO', 'QUERY_STRING',
@@ -420,17 +535,12 @@ class PlatformWebService(Agent):
                    'HTTP_ACCEPT_ENCODING', 'HTTP_COOKIE', 'CONTENT_TYPE',
                    'HTTP_AUTHORIZATION', 'SERVER_NAME', 'wsgi.url_scheme',
                    'HTTP_HOST']
-        data = env['wsgi.input'].read().decode('utf-8')
+        # Files are served without reading the request body.
+        data = self._read_body(env) if route is None or route[1] != 'path' else ''
         passenv = dict(
             (envlist[i], env[envlist[i]]) for i in range(0, len(envlist)) if envlist[i] in env.keys())
 
-        _log.debug('path_info is: {}'.format(path_info))
-        # Get the peer responsible for dealing with the endpoint.  If there
-        # isn't a peer then fall back on the other methods of routing.
-        (peer, res_type) = self.endpoints.get(path_info, (None, None))
-        _log.debug('Peer path_info is associated with: {}'.format(peer))
-
-        if self.is_json_content(env):
+        if data and self.is_json_content(env):
             data = jsonapi.loads(data)
 
         # Only if https available and rmq for the admin area.
@@ -448,68 +558,76 @@ class PlatformWebService(Agent):
                 peer, passenv, data
             ))
             res = self.vip.rpc.call(peer, 'route.callback',
-                                    passenv, data).get(timeout=60)
+                                    passenv, data).get(timeout=timeout or ENDPOINT_TIMEOUT)
 
             if res_type == "jsonrpc":
                 return self.create_response(res, start_response)
-            elif res_type == "raw":
-                return self.create_raw_response(res, start_response)
+            return self.create_raw_response(res, start_response)
 
         env['JINJA2_TEMPLATE_ENV'] = tplenv
 
-        # if ws4pi.socket is set then this connection is a web socket
-        # and so we return the websocket response.
-
-        if 'ws4py.socket' in env and 'vui' not in path_info:
-            return env['ws4py.socket'](env, start_response)
-
-        for k, t, v in self.registeredroutes:
-            if k.match(path_info):
-                _log.debug("MATCHED:\npattern: {}, path_info: {}\n v: {}"
-                           .format(k.pattern, path_info, v))
-                _log.debug('registered route t is: {}'.format(t))
-                if t == 'callable':  # Generally for locally called items.
-                    # Changing signature of the "locally" called points to return
-                    # a Response object. Our response object then will in turn
-                    # be processed and the response will be written back to the
-                    # calling client.
-                    try:
-                        retvalue = v(env, start_response, data)
-                    except TypeError:
-                        response = v(env, data)
-                        #_log.debug(f'VUI:  Response at app_routing is: {response.response}')
-                        return response(env, start_response)
-                        # retvalue = self.process_response(start_response, v(env, data))
-
-                    if isinstance(retvalue, werkzeug.Response):
-                        return retvalue(env, start_response)
-                    else:
-                        return retvalue[0]
-
-                elif t == 'peer_route':  # RPC calls from agents on the platform
-                    _log.debug('Matched peer_route with pattern {}'.format(
-                        k.pattern))
-                    peer, fn = (v[0], v[1])
-                    res = self.vip.rpc.call(peer, fn, passenv, data).get(
-                        timeout=120)
-                    _log.debug(res)
-                    return self.create_response(res, start_response)
-
-                elif t == 'path':  # File service from agents on the platform.
-                    if path_info == '/':
-                        return self._redirect_index(env, start_response)
-                    server_path = v + path_info  # os.path.join(v, path_info)
-                    server_path = str(Path(server_path).resolve())
-                    _log.debug('Serverpath: {}'.format(server_path))
-                    # protects against relative server traversal.
-                    if not server_path.startswith(v):
-                        start_response('403 Forbidden', [('Content-Type', 'text/html')])
-                        return [b'<h1>403 Forbidden</h1>']
-                    return self._sendfile(env, start_response, server_path)
+        k, t, v = route
+        _log.debug("MATCHED:\npattern: {}, path_info: {}\n v: {}"
+                   .format(k.pattern, path_info, v))
+        _log.debug('registered route t is: {}'.format(t))
+        if t == 'callable':  # Generally for locally called items.
+            # Changing signature of the "locally" called points to return
+            # a Response object. Our response object then will in turn
+            # be processed and the response will be written back to the
+            # calling client.
+            with gevent.Timeout(timeout):
+                try:
+                    retvalue = v(env, start_response, data)
+                except TypeError:
+                    response = v(env, data)
+                    #_log.debug(f'VUI:  Response at app_routing is: {response.response}')
+                    return response(env, start_response)
+                    # retvalue = self.process_response(start_response, v(env, data))
+
+            if isinstance(retvalue, werkzeug.Response):
+                return retvalue(env, start_response)
+            else:
+                return retvalue[0]
+
+        elif t == 'peer_route':  # RPC calls from agents on the platform
+            _log.debug('Matched peer_route with pattern {}'.format(
+                k.pattern))
+            peer, fn = (v[0], v[1])
+            res = self.vip.rpc.call(peer, fn, passenv, data).get(
+                timeout=timeout or AGENT_ROUTE_TIMEOUT)
+            _log.debug(res)
+            return self.create_response(res, start_response)
+
+        elif t == 'path':  # File service from agents on the platform.
+            if path_info == '/':
+                return self._redirect_index(env, start_response)
+            server_path = v + path_info  # os.path.join(v, path_info)
+            server_path = str(Path(server_path).resolve())
+            _log.debug('Serverpath: {}'.format(server_path))
+            # protects against relative server traversal.
+            if not server_path.startswith(v):
+                start_response('403 Forbidden', [('Content-Type', 'text/html')])
+                return [b'<h1>403 Forbidden</h1>']
+            return self._sendfile(env, start_response, server_path)
 
         start_response('404 Not Found', [('Content-Type', 'text/html')])
         return [b'<h1>Not Found</h1>']
 
+    @staticmethod
+    def _read_body(env):
+        """
+        Reads the request body, no more than the Content-Length the client
+        sent.
+        """
+        try:
+            length = int(env.get('CONTENT_LENGTH') or -1)
+        except ValueError:
+            length = -1
+        if length == 0:
+            return ''
+        body = env['wsgi.input'].read(length) if length > 0 else env['wsgi.input'].read()
+        return body.decode('utf-8')
+
     def is_json_content(self, env):
         ct = env.get('CONTENT_TYPE')
         if ct is not None and 'application/json' in ct:
@@ -628,7 +746,10 @@ class PlatformWebService(Agent):
         ]
         start_response(status, response_headers)
 
-        return FileWrapper(open(filename, 'rb'))
+        # Use the server's file wrapper when it has one so it can send the
+        # file without copying it through python.
+        file_wrapper = env.get('wsgi.file_wrapper', FileWrapper)
+        return file_wrapper(open(filename, 'rb'), SENDFILE_BLOCK_SIZE)
 
     def _to_jsonrpc_obj(self, jsonrpcstr):
         """ Convert data string into a JsonRpcData named tuple.
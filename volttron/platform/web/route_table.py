@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2023 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+"""
+Route matching, limits and metrics for the
+:class:`volttron.platform.web.PlatformWebService`.
+
+Routes are kept in a :class:`RouteTable`, an ordered list of
+``(compiled regex, route type, value)`` tuples where the first route whose
+regex matches the request path wins. Instead of testing every regex in turn
+the table compiles itself, on first use after a change, into a dictionary of
+the literal routes (``^/discovery/$``) and a few combined regular expressions
+covering the others, while keeping the first match semantics of the list.
+"""
+
+import re
+import time
+from collections import deque
+
+from gevent.lock import BoundedSemaphore
+
+__all__ = ['RouteTable', 'RouteLimit', 'RouteStats']
+
+_REGEX_SPECIAL = frozenset('.^$*+?{}[]\\|()')
+_DEFAULT_FLAGS = re.compile('').flags
+# Backreferences by number or name change meaning once patterns are combined
+_BACKREFERENCE = re.compile(r'\\[1-9]|\(\?P=')
+
+
+def _literal_path(regex):
+    """
+    Return the only path an anchored regex without special characters
+    matches, or None if the regex is not such a literal.
+    """
+    pattern = regex.pattern
+    if regex.flags != _DEFAULT_FLAGS or len(pattern) < 2 or pattern[0] != '^' or pattern[-1] != '$':
+        return None
+    path = pattern[1:-1]
+    if _REGEX_SPECIAL.intersection(path):
+        return None
+    return path
+
+
+def _combinable(regex):
+    return regex.flags == _DEFAULT_FLAGS and not _BACKREFERENCE.search(regex.pattern)
+
+
+class RouteTable(list):
+    """
+    List of ``(compiled regex, route type, value)`` routes matched in order
+    by :meth:`match`. Any change to the list discards the compiled lookup.
+    """
+
+    def __init__(self, *args):
+        super(RouteTable, self).__init__(*args)
+        self._lookup = None
+
+    def match(self, path):
+        """
+        :return: the first route whose regex matches path, or None
+        """
+        if self._lookup is None:
+            self._lookup = self._compile()
+        literals, segments = self._lookup
+        best = literals.get(path)
+        for first, regex, index_map in segments:
+            if best is not None and first > best:
+                break
+            m = regex.match(path)
+            if m:
+                # The outer group of an alternative closes after any group
+                # inside it so lastindex identifies the alternative.
+                index = index_map[m.lastindex] if index_map else first
+                if best is None or index < best:
+                    best = index
+                break
+        return self[best] if best is not None else None
+
+    def _compile(self):
+        literals = {}
+        # (index of the first route, regex, {group number: route index})
+        segments = []
+        pending = []
+
+        def flush():
+            if len(pending) == 1:
+                segments.append((pending[0][0], pending[0][1], None))
+            elif pending:
+                combined = '|'.join('(?P<_route{}>{})'.format(i, regex.pattern) for i, regex in pending)
+                try:
+                    compiled = re.compile(combined)
+                except re.error:
+                    # For example the same group name used by two routes.
+                    segments.extend((i, regex, None) for i, regex in pending)
+                else:
+                    index_map = {compiled.groupindex['_route{}'.format(i)]: i for i, _ in pending}
+                    segments.append((pending[0][0], compiled, index_map))
+            del pending[:]
+
+        for index, route in enumerate(self):
+            regex = route[0]
+            path = _literal_path(regex)
+            if path is not None:
+                literals.setdefault(path, index)
+            elif _combinable(regex):
+                pending.append((index, regex))
+            else:
+                flush()
+                segments.append((index, regex, None))
+        flush()
+        return literals, segments
+
+
+def _invalidating(name):
+    method = getattr(list, name)
+
+    def wrapper(self, *args, **kwargs):
+        self._lookup = None
+        return method(self, *args, **kwargs)
+
+    wrapper.__name__ = name
+    wrapper.__doc__ = method.__doc__
+    return wrapper
+
+
+for _name in ('__setitem__', '__delitem__', '__iadd__', '__imul__', 'append', 'extend', 'insert', 'remove',
+              'pop', 'clear', 'sort', 'reverse'):
+    setattr(RouteTable, _name, _invalidating(_name))
+
+
+class RouteLimit(object):
+    """
+    Limits of a route: the number of requests it serves at once and the
+    seconds a request may take.
+    """
+
+    def __init__(self, max_concurrent=None, timeout=None):
+        self.max_concurrent = max_concurrent
+        self.timeout = timeout
+        self._semaphore = BoundedSemaphore(max_concurrent) if max_concurrent else None
+
+    def acquire(self):
+        """
+        :return: False if the route is already serving max_concurrent
+                 requests
+        """
+        return self._semaphore is None or self._semaphore.acquire(blocking=False)
+
+    def release(self):
+        if self._semaphore is not None:
+            self._semaphore.release()
+
+
+class RouteStats(object):
+    """
+    Request counts and latencies of a route.
+    """
+    # Number of recent latencies percentiles are computed from
+    SAMPLES = 256
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.in_flight = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self._recent = deque(maxlen=self.SAMPLES)
+
+    def start(self):
+        self.in_flight += 1
+        return time.perf_counter()
+
+    def finish(self, started, error=False, timed_out=False):
+        elapsed = time.perf_counter() - started
+        self.in_flight -= 1
+        self.count += 1
+        self.total_time += elapsed
+        self.max_time = max(self.max_time, elapsed)
+        self._recent.append(elapsed)
+        if timed_out:
+            self.timeouts += 1
+        if error or timed_out:
+            self.errors += 1
+
+    def to_dict(self):
+        recent = sorted(self._recent)
+
+        def percentile(p):
+            return round(recent[min(len(recent) - 1, int(len(recent) * p))] * 1000, 3) if recent else None
+
+        return {"count": self.count,
+                "errors": self.errors,
+                "rejected": self.rejected,
+                "timeouts": self.timeouts,
+                "in_flight": self.in_flight,
+                "mean_ms": round(self.total_time / self.count * 1000, 3) if self.count else None,
+                "max_ms": round(self.max_time * 1000, 3),
+                "p50_ms": percentile(0.5),
+                "p95_ms": percentile(0.95)}
@@ -1,7 +1,7 @@
 # TODO: Add treelib to requirements.
 from typing import Union, Iterable
 from treelib import Tree, Node
-from treelib.exceptions import DuplicatedNodeIdError, NodeIDAbsentError
+from treelib.exceptions import NodeIDAbsentError
 from collections import defaultdict
 
 from volttron.platform.agent.known_identities import CONFIGURATION_STORE
@@ -37,16 +37,35 @@ class TopicTree(Tree):
         if all([top[0] == root_name for top in tops]):
             [top.pop(0) for top in tops]
         self.create_node(root_name, root_name).segment_type = 'TOPIC_ROOT'
+        self._add_segments(tops)
+
+    def _add_segments(self, tops):
         for top in tops:
-            parent = root_name
+            parent = self.root
             for segment in top:
                 nid = '/'.join([parent, segment])
-                try:
+                if nid not in self._nodes:
                     self.create_node(segment, nid, parent=parent)
-                except DuplicatedNodeIdError:
-                    pass
                 parent = nid
 
+    def add_topics(self, topic_list: Iterable):
+        """Adds topics, relative to the root, and any missing parent segments to the tree."""
+        self._add_segments(t.split('/') for t in topic_list)
+
+    def remove_topics(self, topic_list: Iterable, remaining_topics: Iterable = ()):
+        """
+        Removes topics, relative to the root, from the tree along with any parent segments left without children.
+        Nodes which still have children, or which are themselves in remaining_topics, are kept.
+        """
+        remaining = remaining_topics if isinstance(remaining_topics, (set, frozenset)) else set(remaining_topics)
+        for topic in topic_list:
+            nid = '/'.join([self.root, topic])
+            while nid != self.root and nid in self._nodes and not self.children(nid) \
+                    and self[nid].topic not in remaining:
+                parent = self.parent(nid).identifier
+                self.remove_node(nid)
+                nid = parent
+
     def add_node(self, node, parent=None):
         super(TopicTree, self).add_node(node, parent)
         node.topic = node.identifier[(len(self.root) + 1):]
@@ -98,8 +117,12 @@ class TopicTree(Tree):
         return pruned
 
     def get_matches(self, topic, return_nodes=True):
-        pattern = topic.replace('-', '[^/]+') + '$'
-        nodes = self.filter_nodes(lambda x: re.match(pattern, x.identifier))
+        if '-' not in topic and re.escape(topic) == topic:
+            # No wildcards, look the node up instead of testing every node in the tree.
+            nodes = [self._nodes[topic]] if topic in self._nodes else []
+        else:
+            pattern = topic.replace('-', '[^/]+') + '$'
+            nodes = self.filter_nodes(lambda x: re.match(pattern, x.identifier))
         if return_nodes:
             return list(nodes)
         else:
@@ -66,6 +66,10 @@ class VUIEndpoints:
         self._agent = agent
         q = Query(self._agent.core)
         self.local_instance_name = q.query('instance-name').get(timeout=5)
+        # Trees of historian topics, (platform, historian) -> {'version', 'topics', 'tree'}, and of devices,
+        # platform -> {'version', 'tree'}. Reused until the version reported by the historian or config store changes.
+        self._historian_trees = {}
+        self._device_trees = {}
         # TODO: Load active_routes from configuration. Default can just be {'vui': {'endpoint-active': False}}
         self.active_routes = {
             'vui': {
@@ -613,8 +617,9 @@ class VUIEndpoints:
             tag_list = None
         # Prune device tree and get nodes matching topic:
         try:
-            # TODO: Should we be storing this tree to use for faster requests later? How to keep it updated?
-            device_tree = DeviceTree.from_store(platform, self._rpc).prune(topic, regex, tag_list)
+            device_tree = self._get_device_tree(platform)
+            if topic or regex or tag_list:
+                device_tree = device_tree.prune(topic, regex, tag_list)
             topic_nodes = device_tree.get_matches(f'devices/{topic}' if topic else 'devices')
             if not topic_nodes:
                 return Response(json.dumps({f'error': f'Device topic {topic} not found on platform: {platform}.'}),
@@ -649,7 +654,8 @@ class VUIEndpoints:
                             ret_dict[point.topic]['writable'] = self._to_bool(point.data.get('Writable'))
                         if return_config:
                             ret_dict[point.topic]['config'] = point.data
-                    return Response(json.dumps(ret_dict), 200, content_type='application/json')
+                    return self._conditional(env, Response(json.dumps(ret_dict), 200,
+                                                           content_type='application/json'))
                 else:
                     # All topics are not complete to points and read_all=False -- return route to next segments:
                     ret_dict = {
@@ -657,7 +663,8 @@ class VUIEndpoints:
                                                                        replace_topic=topic,
                                                                        prefix=f'/vui/platforms/{platform}')
                     }
-                    return Response(json.dumps(ret_dict), 200, content_type='application/json')
+                    return self._conditional(env, Response(json.dumps(ret_dict), 200,
+                                                           content_type='application/json'))
 
             except Timeout as e:
                 return Response(json.dumps({'error': f'RPC Timed Out: {e}'}), 504, content_type='application/json')
@@ -844,8 +851,9 @@ class VUIEndpoints:
         else:
             tag_list = None
         try:
-            historian_topics = self._rpc(historian, 'get_topic_list', external_platform=platform)
-            historian_tree = TopicTree(historian_topics, 'historians').prune(topic, regex, tag_list)
+            historian_tree = self._get_historian_tree(platform, historian)
+            if topic or regex or tag_list:
+                historian_tree = historian_tree.prune(topic, regex, tag_list)
             topic_nodes = historian_tree.get_matches(f'historians/{topic}' if topic else 'historians')
 
             if not topic_nodes:
@@ -881,7 +889,8 @@ class VUIEndpoints:
                             ret_dict[point.topic][
                                 'route'] = f'/vui/platforms/{platform}/historians/{historian}/{point.identifier}'
 
-                    return Response(json.dumps(ret_dict), 200, content_type='application/json')
+                    return self._conditional(env, Response(json.dumps(ret_dict), 200,
+                                                           content_type='application/json'))
 
                 else:
                     # All topics are not complete to points and read_all=False -- return route to next segments:
@@ -889,7 +898,8 @@ class VUIEndpoints:
                         'links': historian_tree.get_children_dict([n.identifier for n in topic_nodes],
                                                                           replace_topic=f'{historian}/topics/{topic}',
                                                                           prefix=f'/vui/platforms/{platform}')}
-                    return Response(json.dumps(ret_dict), 200, content_type='application/json')
+                    return self._conditional(env, Response(json.dumps(ret_dict), 200,
+                                                           content_type='application/json'))
 
             except Timeout as e:
                 return Response(json.dumps({'error': f'RPC Timed Out: {e}'}), 504, content_type='application/json')
@@ -993,6 +1003,61 @@ class VUIEndpoints:
             ret_dict[agent_identity] = la
         return ret_dict
 
+    def _get_data_version(self, vip_identity, method, *args, platform=None):
+        """Returns the version of the data an agent reports through method, or None if it does not report one."""
+        try:
+            return self._rpc(vip_identity, method, *args, external_platform=platform)
+        except (MethodNotFound, RemoteError) as e:
+            _log.debug(f'Unable to get data version with {vip_identity}.{method}: {e}')
+            return None
+
+    def _get_historian_tree(self, platform: str, historian: str) -> TopicTree:
+        """
+        Returns the tree of a historian's topics. The cached tree is reused while the historian's topic list version
+        is unchanged, and patched with the added and removed topics when it changes.
+        """
+        key = (platform, historian)
+        version = self._get_data_version(historian, 'get_topic_list_version', platform=platform)
+        cached = self._historian_trees.get(key)
+        if version is not None and cached and cached['version'] == version:
+            return cached['tree']
+        topics = self._rpc(historian, 'get_topic_list', external_platform=platform)
+        if version is None:
+            # The historian cannot tell when its topics change, so there is nothing to validate a cached tree with.
+            self._historian_trees.pop(key, None)
+            return TopicTree(topics, 'historians')
+        topic_set = set(topics)
+        if cached:
+            tree = cached['tree']
+            tree.remove_topics(cached['topics'] - topic_set, topic_set)
+            tree.add_topics(topic_set - cached['topics'])
+        else:
+            tree = TopicTree(topics, 'historians')
+        self._historian_trees[key] = {'version': version, 'topics': topic_set, 'tree': tree}
+        return tree
+
+    def _get_device_tree(self, platform: str) -> DeviceTree:
+        """
+        Returns the tree of the platform driver's devices. The cached tree is rebuilt only when the version of the
+        platform driver's configuration store changes.
+        """
+        version = self._get_data_version('config.store', 'get_store_version', 'platform.driver', platform=platform)
+        cached = self._device_trees.get(platform)
+        if version is not None and cached and cached['version'] == version:
+            return cached['tree']
+        tree = DeviceTree.from_store(platform, self._rpc)
+        if version is None:
+            self._device_trees.pop(platform, None)
+        else:
+            self._device_trees[platform] = {'version': version, 'tree': tree}
+        return tree
+
+    @staticmethod
+    def _conditional(env: dict, response: Response) -> Response:
+        """Adds an ETag to the response and turns it into a 304 if it matches the request's If-None-Match."""
+        response.add_etag()
+        return response.make_conditional(env)
+
     def _insert_config(self, config_type, data, vip_identity, config_name, platform):
         config_type = re.search(r'([^\/]+$)', config_type).group() if config_type in ['application/json',
                                                                                       'text/csv'] else 'raw'
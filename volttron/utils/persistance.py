@@ -8,7 +8,8 @@ import pickle
 
 from volttron.platform import jsonapi
 
-from threading import Thread
+from collections import OrderedDict, deque
+from threading import Condition, Lock, Thread
 from queue import Queue
 from copy import deepcopy
 
@@ -130,6 +131,215 @@ class PersistentDict(dict):
         raise ValueError('File not in a supported format')
 
 
+class AppendLogDict(dict):
+    """ Persistent JSON dictionary that writes only the entries that changed.
+
+    The dict is kept in memory. The file at ``filename`` holds a JSON snapshot
+    of the whole dictionary in the same format PersistentDict writes.
+    Changes are appended as one JSON line per entry to ``filename + '.log'``
+    by a background thread. Writes that happen before the thread gets to
+    the dictionary are coalesced so only the last value of an entry is
+    written.
+
+    The log is folded back into the snapshot (compacted) once it holds more
+    lines than the dictionary has entries (and at least ``compact_min``),
+    when sync or close is called, and when the dictionary is cleared.
+    An empty dictionary removes both files.
+    """
+
+    # Uses a plain deque and condition rather than a Queue so the worker
+    # thread can be woken from a gevent process where queue is patched.
+    _waiting = deque()
+    _condition = Condition()
+    _process_thread = None
+
+    log_ext = '.log'
+
+    def __init__(self, filename, flag='c', mode=None, compact_min=100, *args, **kwds):
+        dict.__init__(self, *args, **kwds)
+        self.flag = flag                    # c=create or n=new
+        self.filename = filename
+        self.log_filename = filename + self.log_ext
+        self.mode = mode
+        self.compact_min = compact_min
+
+        # Pending changes, entry name -> JSON of the entry (None to delete)
+        self._lock = Lock()
+        self._pending = OrderedDict()
+        self._cleared = False
+        self._scheduled = False
+
+        # Serialized copy of what is on disk, only used while holding
+        # _io_lock so the snapshot can be written without touching the
+        # live dictionary.
+        self._io_lock = Lock()
+        self._disk = {}
+        self._log_lines = 0
+
+        if flag != 'n':
+            self._load()
+
+        if AppendLogDict._process_thread is None:
+            AppendLogDict._process_thread = Thread(target=AppendLogDict._process_loop)
+            AppendLogDict._process_thread.daemon = True  # Don't wait on thread to exit.
+            AppendLogDict._process_thread.start()
+
+    def _load(self):
+        if os.access(self.filename, os.R_OK):
+            with open(self.filename, 'r') as fileobj:
+                dict.update(self, jsonapi.load(fileobj))
+        if os.access(self.log_filename, os.R_OK):
+            with open(self.log_filename, 'r') as fileobj:
+                for line in fileobj:
+                    try:
+                        change = jsonapi.loads(line)
+                    except ValueError:
+                        # The last line may be incomplete if we stopped
+                        # while writing it.
+                        _log.warning("Skipping unreadable change in {}".format(self.log_filename))
+                        continue
+                    self._log_lines += 1
+                    if "v" in change:
+                        dict.__setitem__(self, change["k"], change["v"])
+                    else:
+                        dict.pop(self, change["k"], None)
+        self._disk = {key: jsonapi.dumps(value) for key, value in self.items()}
+
+    def _record(self, key, value):
+        with self._lock:
+            self._pending.pop(key, None)
+            self._pending[key] = None if value is None else jsonapi.dumps(value)
+
+    def __setitem__(self, key, value):
+        dict.__setitem__(self, key, value)
+        self._record(key, value)
+
+    def __delitem__(self, key):
+        dict.__delitem__(self, key)
+        self._record(key, None)
+
+    _marker = object()
+
+    def pop(self, key, default=_marker):
+        if key in self:
+            value = dict.pop(self, key)
+            self._record(key, None)
+            return value
+        if default is AppendLogDict._marker:
+            raise KeyError(key)
+        return default
+
+    def clear(self):
+        dict.clear(self)
+        with self._lock:
+            self._pending.clear()
+            self._cleared = True
+
+    def update(self, *args, **kwds):
+        for key, value in dict(*args, **kwds).items():
+            self[key] = value
+
+    def async_sync(self):
+        """Write pending changes to disk via worker thread."""
+        with self._lock:
+            if self._scheduled or not (self._pending or self._cleared):
+                return
+            self._scheduled = True
+        with AppendLogDict._condition:
+            AppendLogDict._waiting.append(self)
+            AppendLogDict._condition.notify()
+
+    def sync(self):
+        """Write pending changes to disk and compact the log."""
+        self._write(compact=True)
+
+    def close(self):
+        self.sync()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @staticmethod
+    def _process_loop():
+        while True:
+            with AppendLogDict._condition:
+                while not AppendLogDict._waiting:
+                    AppendLogDict._condition.wait()
+                store = AppendLogDict._waiting.popleft()
+            try:
+                store._write()
+            except Exception as e:
+                _log.error("Unable to sync to file {}: {}".format(store.filename, e))
+
+    def _write(self, compact=False):
+        with self._io_lock:
+            with self._lock:
+                pending, self._pending = self._pending, OrderedDict()
+                cleared, self._cleared = self._cleared, False
+                self._scheduled = False
+
+            if cleared:
+                # Nothing in the log is needed anymore
+                self._disk.clear()
+                self._remove(self.log_filename)
+                compact = True
+
+            for key, value in pending.items():
+                if value is None:
+                    self._disk.pop(key, None)
+                else:
+                    self._disk[key] = value
+
+            if not compact:
+                self._log_lines += len(pending)
+                compact = self._log_lines > max(self.compact_min, len(self._disk))
+
+            if compact:
+                self._compact()
+            elif pending:
+                self._append(pending)
+
+    def _append(self, pending):
+        lines = []
+        for key, value in pending.items():
+            if value is None:
+                lines.append('{{"k":{}}}\n'.format(jsonapi.dumps(key)))
+            else:
+                lines.append('{{"k":{},"v":{}}}\n'.format(jsonapi.dumps(key), value))
+        with open(self.log_filename, 'a') as fileobj:
+            fileobj.writelines(lines)
+        if self.mode is not None:
+            os.chmod(self.log_filename, self.mode)
+
+    def _compact(self):
+        self._log_lines = 0
+        if not self._disk:
+            self._remove(self.filename)
+            self._remove(self.log_filename)
+            return
+
+        tempname = self.filename + '.tmp'
+        with open(tempname, 'w') as fileobj:
+            fileobj.write('{')
+            fileobj.write(','.join('{}:{}'.format(jsonapi.dumps(key), value)
+                                   for key, value in self._disk.items()))
+            fileobj.write('}')
+        shutil.move(tempname, self.filename)  # atomic commit
+        if self.mode is not None:
+            os.chmod(self.filename, self.mode)
+        self._remove(self.log_filename)
+
+    @staticmethod
+    def _remove(filename):
+        try:
+            os.remove(filename)
+        except OSError:
+            pass
+
+
 if __name__ == '__main__':
     import random
 
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2023 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+"""
+Micro-benchmark for caching device data in the historian
+:class:`BackupDatabase`.
+
+Reports rows/sec for the batched ``backup_new_data`` path against writing the
+same batch one row at a time (the way the cache was written before the bulk
+path was added).  The benchmark runs in a temporary directory so the backup
+database of an installed agent is never touched.
+
+Usage::
+
+    python -m volttrontesting.benchmarks.backup_database --points 500 --publishes 20
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from volttron.platform.agent.base_historian import BackupDatabase, dumps
+from volttron.platform.agent.utils import get_aware_utc_now
+
+
+class _Owner:
+    """Placeholder for the historian owning the backup database."""
+
+
+def _device_publishes(publishes, points, devices=10):
+    headers = {'Date': get_aware_utc_now().isoformat()}
+    batch = []
+    for publish in range(publishes):
+        device = f'campus/building/device{publish % devices}'
+        timestamp = get_aware_utc_now()
+        for point in range(points):
+            batch.append({'source': 'scrape',
+                          'topic': f'{device}/point{point}',
+                          'readings': [(timestamp, float(point))],
+                          'meta': {'units': 'F', 'type': 'float', 'tz': 'UTC'},
+                          'headers': headers})
+    return batch
+
+
+def _row_at_a_time(backupdb, new_publish_list):
+    # Writes every reading with its own statement, resolving new topics one at a time.
+    c = backupdb._connection.cursor()
+    for item in new_publish_list:
+        topic = item['topic']
+        topic_id = backupdb._backup_cache.get(topic)
+        if topic_id is None:
+            c.execute('''INSERT INTO topics values (?,?)''', (None, topic))
+            c.execute('''SELECT last_insert_rowid()''')
+            topic_id = c.fetchone()[0]
+            backupdb._backup_cache[topic_id] = topic
+            backupdb._backup_cache[topic] = topic_id
+        for timestamp, value in item['readings']:
+            c.execute('''INSERT INTO outstanding values(NULL, ?, ?, ?, ?, ?)''',
+                      (timestamp, item['source'], topic_id, dumps(value), dumps(item['headers'])))
+    c.execute("PRAGMA page_count")
+    c.execute("PRAGMA page_count")
+    c.execute("PRAGMA freelist_count")
+    backupdb._connection.commit()
+
+
+def _measure(write, batch, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        write(batch)
+    return rounds * len(batch) / (time.perf_counter() - start)
+
+
+def run(points, publishes, rounds, storage_limit_gb):
+    batch = _device_publishes(publishes, points)
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            results = {}
+            for name in ('row at a time', 'batched'):
+                backupdb = BackupDatabase(_Owner(), storage_limit_gb, 0.9)
+                if name == 'batched':
+                    results[name] = _measure(backupdb.backup_new_data, batch, rounds)
+                else:
+                    results[name] = _measure(lambda b: _row_at_a_time(backupdb, b), batch, rounds)
+                backupdb.close()
+                os.remove(os.path.join(tmp, 'backup.sqlite'))
+        finally:
+            os.chdir(cwd)
+    print(f"{len(batch)} rows per batch, {rounds} batches")
+    for name, rate in results.items():
+        print(f"{name:>14}: {rate:12.1f} rows/sec")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--points', type=int, default=500, help='points per device all publish')
+    parser.add_argument('--publishes', type=int, default=20, help='device publishes per batch')
+    parser.add_argument('--rounds', type=int, default=10, help='batches written per measurement')
+    parser.add_argument('--storage-limit-gb', type=float, default=None)
+    args = parser.parse_args()
+    run(args.points, args.publishes, args.rounds, args.storage_limit_gb)
+
+
+if __name__ == '__main__':
+    main()
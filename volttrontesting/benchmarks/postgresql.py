@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2023 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+"""
+Benchmark for ingestion and queries of the PostgreSQL historian driver against
+a local PostgreSQL (or TimescaleDB) server.
+
+Writes ``--rows`` points in batches of ``--batch`` through
+:meth:`PostgreSqlFuncts.bulk_insert` two ways:
+
+* ``execute_values``: multi-row INSERT statements, the default.
+* ``copy``: COPY FROM STDIN into a staging table, with ``copy_insert``.
+
+then times a query of every topic over the whole data set:
+
+* ``per topic``: one SELECT per topic, the path still used when skip or
+  count is given.
+* ``single query``: one ``topic_id = ANY(...)`` SELECT read through a
+  server side cursor.
+* ``single query raw``: the same SELECT returning epoch timestamps.
+
+The benchmark creates its own ``benchmark_data`` and ``benchmark_topics``
+tables in the database and drops them when it is done. Pass ``--timescale``
+to make the data table a hypertable.
+
+Usage::
+
+    python -m volttrontesting.benchmarks.postgresql --dbname volttron --user volttron --password secret \\
+        --rows 1000000 --topics 200
+"""
+
+import argparse
+import logging
+import time
+from datetime import datetime, timedelta
+
+import pytz
+from psycopg2.sql import Identifier, SQL
+
+from volttron.platform.dbutils.postgresqlfuncts import PostgreSqlFuncts
+
+TABLE_NAMES = {'data_table': 'benchmark_data',
+               'topics_table': 'benchmark_topics',
+               'meta_table': 'benchmark_topics',
+               'agg_topics_table': 'benchmark_aggregate_topics',
+               'agg_meta_table': 'benchmark_aggregate_meta'}
+
+START = datetime(2020, 1, 1, tzinfo=pytz.UTC)
+
+
+def _drop_tables(functs):
+    for table in (TABLE_NAMES['data_table'], TABLE_NAMES['topics_table']):
+        functs.execute_stmt(SQL('DROP TABLE IF EXISTS {}').format(Identifier(table)))
+
+
+def _ingest(functs, rows, topics, batch, interval):
+    functs.execute_stmt(SQL('TRUNCATE {}').format(Identifier(TABLE_NAMES['data_table'])))
+    begin = time.perf_counter()
+    for first in range(0, rows, batch):
+        with functs.bulk_insert() as insert_data:
+            for i in range(first, min(first + batch, rows)):
+                insert_data(START + timedelta(seconds=(i // topics) * interval), i % topics + 1, (i % 1000) / 10.0)
+    return time.perf_counter() - begin
+
+
+def _measure(query):
+    begin = time.perf_counter()
+    values = query()
+    elapsed = time.perf_counter() - begin
+    return elapsed, sum(len(rows) for rows in values.values())
+
+
+def run(connect_params, rows, topics, batch, interval):
+    functs = PostgreSqlFuncts(connect_params, TABLE_NAMES)
+    _drop_tables(functs)
+    try:
+        functs.setup_historian_tables()
+        functs.execute_many(SQL('INSERT INTO {} (topic_id, topic_name) VALUES (%s, %s)').format(
+                                Identifier(TABLE_NAMES['topics_table'])),
+                            [(topic_id, f'campus/building/device/point{topic_id}')
+                             for topic_id in range(1, topics + 1)])
+
+        print(f"Inserting {rows} rows for {topics} topics in batches of {batch}")
+        for name, copy_insert in (('execute_values', False), ('copy', True)):
+            functs.copy_insert = copy_insert
+            elapsed = _ingest(functs, rows, topics, batch, interval)
+            print(f"{name:>17}: {elapsed:8.2f} s  {rows / elapsed:12.1f} rows/sec")
+
+        topic_ids = list(range(1, topics + 1))
+        id_name_map = {topic_id: f'campus/building/device/point{topic_id}' for topic_id in topic_ids}
+        # A count makes query() read one topic at a time
+        queries = {'per topic': lambda: functs.query(topic_ids, id_name_map, count=rows),
+                   'single query': lambda: functs.query(topic_ids, id_name_map),
+                   'single query raw': lambda: functs.query(topic_ids, id_name_map, raw=True)}
+        print(f"Querying {len(topic_ids)} topics")
+        for name, query in queries.items():
+            elapsed, count = _measure(query)
+            print(f"{name:>17}: {elapsed:8.2f} s  {count / elapsed:12.1f} rows/sec ({count} rows)")
+    finally:
+        _drop_tables(functs)
+        functs.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dbname', default='volttron', help='database to create the benchmark tables in')
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=5432)
+    parser.add_argument('--user', default='volttron')
+    parser.add_argument('--password', default='')
+    parser.add_argument('--timescale', action='store_true', help='create the data table as a TimescaleDB hypertable')
+    parser.add_argument('--rows', type=int, default=1000000, help='rows to insert')
+    parser.add_argument('--topics', type=int, default=200, help='topics to insert and query')
+    parser.add_argument('--batch', type=int, default=5000, help='rows per bulk insert')
+    parser.add_argument('--interval', type=int, default=5, help='seconds between samples of a topic')
+    args = parser.parse_args()
+    # The driver logs every statement at debug level.
+    logging.disable(logging.INFO)
+    connect_params = {'dbname': args.dbname, 'host': args.host, 'port': args.port, 'user': args.user,
+                      'password': args.password, 'timescale_dialect': args.timescale}
+    run(connect_params, args.rows, args.topics, args.batch, args.interval)
+
+
+if __name__ == '__main__':
+    main()
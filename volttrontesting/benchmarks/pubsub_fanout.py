@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2023 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+"""
+Micro-benchmark for the router side publish fan-out in :class:`PubSubService`.
+
+Reports publishes/sec against the number of subscribers for a device ``all``
+publish, comparing the serialize-once fan-out with encoding the frames for
+every recipient.  The VIP socket is replaced by a sink so only the router cost
+is measured.
+
+Usage::
+
+    python -m volttrontesting.benchmarks.pubsub_fanout --points 500 --subscribers 1 5 10 50
+"""
+
+import argparse
+import time
+
+from mock import MagicMock
+
+from volttron.platform.vip.pubsubservice import PubSubService
+
+
+class _SinkSocket:
+    """Stand-in for the VIP router socket that drops everything sent to it."""
+
+    def __init__(self):
+        self.sent = 0
+
+    def send_multipart(self, frames, flags=0, copy=True):
+        self.sent += 1
+
+
+def _build_service(subscribers):
+    service = PubSubService(socket=_SinkSocket(), protected_topics=MagicMock(), routing_service=None)
+    for i in range(subscribers):
+        service.handle_subsystem([f'subscriber{i}', '', 'VIP1', '', '1', 'pubsub', 'subscribe',
+                                  dict(prefix='devices', bus='')])
+    return service
+
+
+def _publish_frames(points):
+    values = {f'point{i}': float(i) for i in range(points)}
+    meta = {f'point{i}': {'units': 'F', 'type': 'float', 'tz': 'UTC'} for i in range(points)}
+    message = dict(bus='', headers={'Date': '2023-01-01T00:00:00.000000+00:00'}, message=[values, meta])
+    return ['publisher', '', 'VIP1', '', '2', 'pubsub', 'publish', 'devices/campus/building/unit/all', message]
+
+
+def _per_recipient(service, frames):
+    # Encodes the frames once per subscriber, the way fan-out worked before the payload frame was shared.
+    for sub in service._peer_subscriptions['internal']['']['devices']:
+        frames[0] = sub
+        service._send(frames, 'publisher')
+
+
+def run(points, subscriber_counts, duration):
+    print(f"{'subscribers':>12} {'shared pub/s':>14} {'per-recipient pub/s':>20}")
+    for count in subscriber_counts:
+        service = _build_service(count)
+        rates = []
+        for publish in (lambda f: service._distribute(f, ''), lambda f: _per_recipient(service, f)):
+            published = 0
+            start = time.perf_counter()
+            while time.perf_counter() - start < duration:
+                publish(_publish_frames(points))
+                published += 1
+            rates.append(published / (time.perf_counter() - start))
+        print(f"{count:>12} {rates[0]:>14.1f} {rates[1]:>20.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--points', type=int, default=500, help='points per device all publish')
+    parser.add_argument('--subscribers', type=int, nargs='+', default=[1, 5, 10, 50])
+    parser.add_argument('--duration', type=float, default=2.0, help='seconds to run each measurement')
+    args = parser.parse_args()
+    run(args.points, args.subscribers, args.duration)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2023 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+"""
+Benchmark for multi-topic queries against the SQLite historian tables.
+
+Generates a historian database (10 million rows by default) and times a one
+day query over many topics three ways:
+
+* ``per topic``: one SELECT per topic, the way :meth:`SqlLiteFuncts.query`
+  ran every multi-topic query before the single query path was added.
+* ``single query``: one ``topic_id IN (...)`` SELECT with ISO 8601 timestamps.
+* ``single query raw``: the same SELECT returning epoch timestamps.
+
+Generating the database takes a while, pass ``--database`` to keep it and
+reuse it on later runs.
+
+Usage::
+
+    python -m volttrontesting.benchmarks.sqlite_query --rows 10000000 --topics 200
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import pytz
+
+from volttron.platform import jsonapi
+from volttron.platform.agent import utils
+from volttron.platform.dbutils.sqlitefuncts import SqlLiteFuncts
+
+TABLE_NAMES = {'data_table': 'data',
+               'topics_table': 'topics',
+               'meta_table': 'meta',
+               'agg_topics_table': 'aggregate_topics',
+               'agg_meta_table': 'aggregate_meta'}
+
+START = datetime(2020, 1, 1, tzinfo=pytz.UTC)
+
+
+def _generate(functs, rows, topics, interval):
+    functs.setup_historian_tables()
+    functs.execute_many('INSERT INTO topics (topic_id, topic_name) VALUES (?, ?)',
+                        [(topic_id, f'campus/building/device/point{topic_id}') for topic_id in range(1, topics + 1)],
+                        commit=False)
+    # Rows are generated inside SQLite so the timestamps match what the historian stores.
+    functs.execute_stmt(
+        '''WITH RECURSIVE n(i) AS (SELECT 0 UNION ALL SELECT i + 1 FROM n WHERE i + 1 < ?)
+           INSERT INTO data (ts, topic_id, value_string)
+           SELECT strftime('%Y-%m-%dT%H:%M:%S.000000+00:00', ? + (i / ?) * ?, 'unixepoch'),
+                  i % ? + 1,
+                  CAST((i % 1000) / 10.0 AS TEXT)
+           FROM n''',
+        (rows, int(START.timestamp()), topics, interval, topics), commit=True)
+
+
+def _per_topic(functs, topic_ids, id_name_map, start, end):
+    # One SELECT per topic through the sqlite3 timestamp converter, converting every row.
+    values = {}
+    for topic_id in topic_ids:
+        rows = values[id_name_map[topic_id]] = []
+        cursor = functs.select('SELECT ts, value_string FROM data WHERE topic_id = ? AND ts >= ? AND ts < ? '
+                               'ORDER BY topic_id ASC, ts ASC LIMIT -1', [topic_id, start, end], fetch_all=False)
+        for ts, value in cursor:
+            rows.append((utils.format_timestamp(ts), jsonapi.loads(value)))
+        cursor.close()
+    return values
+
+
+def _measure(query):
+    begin = time.perf_counter()
+    values = query()
+    elapsed = time.perf_counter() - begin
+    return elapsed, sum(len(rows) for rows in values.values())
+
+
+def run(database, rows, topics, interval, hours):
+    functs = SqlLiteFuncts({'database': database}, TABLE_NAMES)
+    if not functs.select("SELECT name FROM sqlite_master WHERE type='table' AND name='data'"):
+        print(f"Generating {rows} rows for {topics} topics in {database}")
+        _generate(functs, rows, topics, interval)
+    topic_ids, names = zip(*functs.select('SELECT topic_id, topic_name FROM topics ORDER BY topic_id'))
+    topic_ids = list(topic_ids)
+    id_name_map = dict(zip(topic_ids, names))
+    start = START
+    end = START + timedelta(hours=hours)
+
+    queries = {'per topic': lambda: _per_topic(functs, topic_ids, id_name_map, start, end),
+               'single query': lambda: functs.query(topic_ids, id_name_map, start=start, end=end),
+               'single query raw': lambda: functs.query(topic_ids, id_name_map, start=start, end=end, raw=True)}
+    print(f"{len(topic_ids)} topics, {hours} hour window")
+    for name, query in queries.items():
+        elapsed, count = _measure(query)
+        print(f"{name:>17}: {elapsed:8.2f} s  {count / elapsed:12.1f} rows/sec ({count} rows)")
+    functs.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database', help='database file to generate or reuse, defaults to a temporary file')
+    parser.add_argument('--rows', type=int, default=10000000, help='rows to generate')
+    parser.add_argument('--topics', type=int, default=200, help='topics to generate and query')
+    parser.add_argument('--interval', type=int, default=5, help='seconds between samples of a topic')
+    parser.add_argument('--hours', type=float, default=24, help='length of the query window')
+    args = parser.parse_args()
+    # The query path logs every statement at debug level.
+    logging.disable(logging.INFO)
+    if args.database:
+        run(os.path.abspath(args.database), args.rows, args.topics, args.interval, args.hours)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            run(os.path.join(tmp, 'historian.sqlite'), args.rows, args.topics, args.interval, args.hours)
+
+
+if __name__ == '__main__':
+    main()
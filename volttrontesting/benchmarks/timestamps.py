@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*- {{{
+# ===----------------------------------------------------------------------===
+#
+#                 Component of Eclipse VOLTTRON
+#
+# ===----------------------------------------------------------------------===
+#
+# Copyright 2023 Battelle Memorial Institute
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may not
+# use this file except in compliance with the License. You may obtain a copy
+# of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+# ===----------------------------------------------------------------------===
+# }}}
+
+"""
+Benchmark for :mod:`volttron.platform.agent.timestamps`.
+
+Times formatting and parsing of the timestamps found in message headers and
+the historian caches with the timestamps module against the implementations
+``volttron.platform.agent.utils`` used before it, which are copied here:
+
+* ``format``: aware UTC datetime to ISO 8601 string.
+* ``parse``: ISO 8601 string with "+00:00" to datetime.
+* ``parse naive``: ISO 8601 string without an offset to datetime.
+* ``parse offset``: ISO 8601 string with a "-05:00" offset to datetime.
+* ``now``: aware UTC datetime of the current time.
+* ``to epoch``: ISO 8601 string to seconds since the epoch.
+
+Usage::
+
+    python -m volttrontesting.benchmarks.timestamps --count 1000000
+"""
+
+import argparse
+import calendar
+import time
+from datetime import datetime, timedelta
+
+import pytz
+from dateutil.parser import parse
+from dateutil.tz import tzoffset
+
+from volttron.platform.agent import timestamps
+
+
+def legacy_format_timestamp(time_stamp):
+    time_str = time_stamp.strftime("%Y-%m-%dT%H:%M:%S.%f")
+
+    if time_stamp.tzinfo is not None:
+        sign = '+'
+        td = time_stamp.tzinfo.utcoffset(time_stamp)
+        if td.days < 0:
+            sign = '-'
+            td = -td
+
+        seconds = td.seconds
+        minutes, seconds = divmod(seconds, 60)
+        hours, minutes = divmod(minutes, 60)
+        time_str += "{sign}{HH:02}:{MM:02}".format(sign=sign, HH=hours, MM=minutes)
+
+    return time_str
+
+
+def legacy_parse_timestamp_string(time_stamp_str):
+    if len(time_stamp_str) == 26:
+        try:
+            return datetime.strptime(time_stamp_str, "%Y-%m-%dT%H:%M:%S.%f")
+        except ValueError:
+            pass
+
+    elif len(time_stamp_str) == 32:
+        try:
+            base_time_stamp_str = time_stamp_str[:26]
+            time_zone_str = time_stamp_str[26:]
+            time_stamp = datetime.strptime(base_time_stamp_str, "%Y-%m-%dT%H:%M:%S.%f")
+            if time_zone_str == "+00:00":
+                return time_stamp.replace(tzinfo=pytz.UTC)
+
+            hours_offset = int(time_zone_str[1:3])
+            minutes_offset = int(time_zone_str[4:6])
+
+            seconds_offset = hours_offset * 3600 + minutes_offset * 60
+            if time_zone_str[0] == "-":
+                seconds_offset = -seconds_offset
+
+            return time_stamp.replace(tzinfo=tzoffset("", seconds_offset))
+
+        except ValueError:
+            pass
+
+    return parse(time_stamp_str)
+
+
+def legacy_get_aware_utc_now():
+    return pytz.UTC.localize(datetime.utcnow())
+
+
+def legacy_to_epoch(time_stamp_str):
+    timestamp = legacy_parse_timestamp_string(time_stamp_str)
+    seconds_from_epoch = calendar.timegm(timestamp.utctimetuple())
+    return seconds_from_epoch + timestamp.microsecond / 1000000.0
+
+
+def _inputs(count):
+    start = datetime(2023, 1, 1, tzinfo=pytz.UTC)
+    datetimes = [start + timedelta(seconds=i * 5, microseconds=i) for i in range(count)]
+    strings = [legacy_format_timestamp(d) for d in datetimes]
+    offset = tzoffset("", -18000)
+    return {'format': datetimes,
+            'parse': strings,
+            'parse naive': [s[:26] for s in strings],
+            'parse offset': [legacy_format_timestamp(d.astimezone(offset)) for d in datetimes],
+            'now': [None] * count,
+            'to epoch': strings}
+
+
+BENCHMARKS = {'format': (legacy_format_timestamp, timestamps.format_timestamp),
+              'parse': (legacy_parse_timestamp_string, timestamps.parse_timestamp),
+              'parse naive': (legacy_parse_timestamp_string, timestamps.parse_timestamp),
+              'parse offset': (legacy_parse_timestamp_string, timestamps.parse_timestamp),
+              'now': (lambda _: legacy_get_aware_utc_now(), lambda _: timestamps.utc_now()),
+              'to epoch': (legacy_to_epoch, timestamps.parse_epoch)}
+
+
+def _measure(function, values):
+    begin = time.perf_counter()
+    for value in values:
+        function(value)
+    return time.perf_counter() - begin
+
+
+def run(count):
+    inputs = _inputs(count)
+    print(f"{count} calls each")
+    print(f"{'':>13}  {'legacy':>10}  {'timestamps':>10}  speedup")
+    for name, (legacy, fast) in BENCHMARKS.items():
+        values = inputs[name]
+        if name != 'now':
+            # Both must agree before timing them.
+            assert [legacy(v) for v in values[:1000]] == [fast(v) for v in values[:1000]], name
+        legacy_time = _measure(legacy, values)
+        fast_time = _measure(fast, values)
+        print(f"{name:>13}: {legacy_time:8.3f} s  {fast_time:8.3f} s  {legacy_time / fast_time:6.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--count', type=int, default=1000000, help='calls per function')
+    args = parser.parse_args()
+    run(args.count)
+
+
+if __name__ == '__main__':
+    main()
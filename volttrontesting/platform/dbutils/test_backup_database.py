@@ -5,7 +5,7 @@ from gevent import subprocess
 from datetime import datetime
 from pytz import UTC
 
-from volttron.platform.agent.base_historian import BackupDatabase, BaseHistorian
+from volttron.platform.agent.base_historian import BackupDatabase, BaseHistorian, get_backup_cache_pragmas
 
 SIZE_LIMIT = 1000  # the default submit_size_limit for BaseHistorianAgents
 
@@ -183,6 +183,123 @@ def test_get_outstanding_to_publish_should_return_unique_records_on_multiple_tra
     assert backup_database.get_outstanding_to_publish(SIZE_LIMIT) == []
 
 
+def test_backup_new_data_should_resolve_topics_in_batch(backup_database):
+    headers = {"Date": "2020-06-01 12:31:00"}
+    timestamp = datetime(2020, 6, 1, 12, 31, tzinfo=UTC)
+    batch = [
+        {"source": "scrape", "topic": f"device/point{idx}", "meta": {"units": "F"},
+         "readings": [(timestamp, idx)], "headers": headers}
+        for idx in range(3)
+    ]
+    batch.append(None)
+    batch.append({"source": "scrape", "topic": "device/point1", "meta": {"units": "F"},
+                  "readings": [(timestamp, 10)], "headers": headers})
+
+    assert not backup_database.backup_new_data(batch)
+
+    assert backup_database.get_backlog_count() == 4
+    assert get_all_data("topics") == ["1|device/point0", "2|device/point1", "3|device/point2"]
+    assert get_all_data("metadata") == ["scrape|1|units|F", "scrape|2|units|F", "scrape|3|units|F"]
+    records = backup_database.get_outstanding_to_publish(SIZE_LIMIT)
+    assert [(r["topic"], r["value"], r["timestamp"], r["headers"]) for r in records] == [
+        ("device/point0", 0, timestamp, headers),
+        ("device/point1", 1, timestamp, headers),
+        ("device/point2", 2, timestamp, headers),
+    ]
+
+
+def test_backup_new_data_should_check_storage_limit_every_interval(new_publish_list_unique):
+    os.makedirs(agent_data_dir, exist_ok=True)
+    # Report the cache as full as soon as it holds more than a couple of pages.
+    backup_database = BackupDatabase(BaseHistorian(), 1, 0.00001, storage_check_interval=3)
+    try:
+        # Only the third batch checks the size of the cache.
+        assert not backup_database.backup_new_data(new_publish_list_unique)
+        assert not backup_database.backup_new_data(new_publish_list_unique)
+        assert backup_database.backup_new_data(new_publish_list_unique)
+        assert not backup_database.backup_new_data(new_publish_list_unique)
+    finally:
+        backup_database.close()
+        os.remove(cache_db)
+        os.rmdir(agent_data_dir)
+
+
+def test_record_count_should_persist_across_restarts(backup_database, new_publish_list_unique):
+    init_db(backup_database, new_publish_list_unique)
+    backup_database.get_outstanding_to_publish(100)
+    backup_database.remove_successfully_published(set((None,)), 100)
+    assert backup_database.get_backlog_count() == len(new_publish_list_unique) - 100
+    backup_database.close()
+
+    reopened = BackupDatabase(BaseHistorian(), None, 0.9)
+    assert reopened.get_backlog_count() == len(new_publish_list_unique) - 100
+    # A short batch no longer resets the count.
+    assert len(reopened.get_outstanding_to_publish(SIZE_LIMIT)) == len(new_publish_list_unique) - 100
+    assert reopened.get_backlog_count() == len(new_publish_list_unique) - 100
+    reopened.close()
+
+
+@pytest.mark.parametrize("profile, expected", [
+    ("wal", ["wal", "1", "2"]),
+    ({"profile": "wal", "synchronous": "full"}, ["wal", "2", "2"]),
+    ("default", ["delete", "2", "1"]),
+])
+def test_cache_profile_should_configure_database(profile, expected, new_publish_list_unique):
+    os.makedirs(agent_data_dir, exist_ok=True)
+    backup_database = BackupDatabase(BaseHistorian(), None, 0.9, cache_profile=profile)
+    try:
+        c = backup_database._connection.cursor()
+        settings = []
+        for pragma in ("journal_mode", "synchronous", "auto_vacuum"):
+            c.execute(f"PRAGMA {pragma}")
+            settings.append(str(c.fetchone()[0]))
+        assert settings == expected
+
+        init_db(backup_database, new_publish_list_unique)
+        backup_database.get_outstanding_to_publish(SIZE_LIMIT)
+        backup_database.remove_successfully_published(set((None,)), SIZE_LIMIT)
+        assert backup_database.get_backlog_count() == 0
+    finally:
+        backup_database.close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(cache_db + suffix):
+                os.remove(cache_db + suffix)
+        os.rmdir(agent_data_dir)
+
+
+def test_cache_file_should_shrink_after_backlog_is_published():
+    os.makedirs(agent_data_dir, exist_ok=True)
+    backup_database = BackupDatabase(BaseHistorian(), None, 0.9, cache_profile="wal")
+    large_publish_list = [{"source": "foobar_source", "topic": f"foobar_topic{idx}", "meta": {},
+                           "readings": [("2020-06-01 12:31:00", "x" * 1000)], "headers": {}}
+                          for idx in range(5000)]
+    try:
+        backup_database.backup_new_data(large_publish_list)
+        backup_database._connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        full_size = os.path.getsize(cache_db)
+
+        while backup_database.get_outstanding_to_publish(SIZE_LIMIT):
+            backup_database.remove_successfully_published(set((None,)), SIZE_LIMIT)
+
+        assert backup_database.get_backlog_count() == 0
+        assert os.path.getsize(cache_db) < full_size / 10
+    finally:
+        backup_database.close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(cache_db + suffix):
+                os.remove(cache_db + suffix)
+        os.rmdir(agent_data_dir)
+
+
+def test_invalid_cache_profile_should_raise():
+    with pytest.raises(ValueError):
+        get_backup_cache_pragmas("fast")
+    with pytest.raises(ValueError):
+        get_backup_cache_pragmas({"profile": "wal", "page_size": 4096})
+    with pytest.raises(ValueError):
+        get_backup_cache_pragmas({"journal_mode": "WAL; DROP TABLE outstanding"})
+
+
 def init_db_with_dupes(backup_database, new_publish_list_dupes):
     backup_database.backup_new_data(new_publish_list_dupes)
 
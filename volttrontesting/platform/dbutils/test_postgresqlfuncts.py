@@ -211,6 +211,48 @@ def test_insert_data_should_return_true(get_container_func):
     assert get_data_in_table(connection_port, "data") == expected_data
 
 
+def test_bulk_insert_with_copy_should_merge_rows(get_container_func):
+    container, sqlfuncts, connection_port, historian_version = get_container_func
+    sqlfuncts.copy_insert = True
+    ts = datetime.datetime(2001, 9, 11, 8, 46, tzinfo=datetime.timezone(datetime.timedelta(hours=-4)))
+
+    try:
+        with sqlfuncts.bulk_insert() as insert_data:
+            insert_data("2001-09-11 08:46:00", 11, "1wtc")
+            insert_data(ts, 12, {"a": "b,\"c\""})
+        with sqlfuncts.bulk_insert() as insert_data:
+            insert_data("2001-09-11 08:46:00", 11, "first")
+            insert_data("2001-09-11 08:46:00", 11, "updated")
+    finally:
+        sqlfuncts.copy_insert = False
+
+    assert sorted(get_data_in_table(connection_port, "data")) == [
+        (datetime.datetime(2001, 9, 11, 8, 46), 11, '"updated"'),
+        (datetime.datetime(2001, 9, 11, 12, 46), 12, '{"a": "b,\\"c\\""}'),
+    ]
+
+
+def test_query_multiple_topics_should_return_data(get_container_func):
+    container, sqlfuncts, connection_port, historian_version = get_container_func
+    query = f"""
+                INSERT INTO {DATA_TABLE} VALUES ('2020-06-01 12:30:59', 42, '1'), ('2020-06-01 12:31:59', 42, '2'),
+                                                ('2020-06-01 12:30:59', 43, '[2,3]')
+            """
+    seed_database(container, query)
+    id_name_map = {42: "topic42", 43: "topic43", 44: "topic44"}
+
+    assert sqlfuncts.query([42, 43, 44], id_name_map, order="LAST_TO_FIRST") == {
+        "topic42": [("2020-06-01T12:31:59.000000+00:00", 2), ("2020-06-01T12:30:59.000000+00:00", 1)],
+        "topic43": [("2020-06-01T12:30:59.000000+00:00", [2, 3])],
+        "topic44": [],
+    }
+    start = datetime.datetime(2020, 6, 1, 12, 31, tzinfo=datetime.timezone.utc)
+    assert sqlfuncts.query([42, 43], id_name_map, start=start, raw=True) == {
+        "topic42": [(1591014719.0, 2)],
+        "topic43": [],
+    }
+
+
 def test_update_topic_should_return_true(get_container_func):
     container, sqlfuncts, connection_port, historian_version = get_container_func
 
@@ -1,11 +1,18 @@
 import sqlite3
+import threading
+import time
+from datetime import datetime
 
+import gevent
+import pytz
 from gevent import subprocess
 import pytest
 import os
 
 from setuptools import glob
 
+from volttron.platform.agent.base_aggregate_historian import PartialAggregate
+from volttron.platform.dbutils.basedb import DbDriverPool
 from volttron.platform.dbutils.sqlitefuncts import SqlLiteFuncts
 
 
@@ -77,6 +84,42 @@ def test_query(get_sqlitefuncts, topic_ids, id_name_map, expected_values):
     assert actual_results == expected_values
 
 
+@pytest.mark.sqlitefuncts
+@pytest.mark.dbutils
+@pytest.mark.parametrize(
+    "query_kwargs, expected_values",
+    [
+        ({}, {"topic42": [("2020-06-01T12:30:58.000000", 1), ("2020-06-01T12:30:59.000000", 2)],
+              "topic43": [("2020-06-01T12:30:59.000000", [2, 3])],
+              "topic44": []}),
+        ({"order": "LAST_TO_FIRST"}, {"topic42": [("2020-06-01T12:30:59.000000", 2),
+                                                  ("2020-06-01T12:30:58.000000", 1)],
+                                      "topic43": [("2020-06-01T12:30:59.000000", [2, 3])],
+                                      "topic44": []}),
+        ({"count": 1}, {"topic42": [("2020-06-01T12:30:58.000000", 1)],
+                        "topic43": [("2020-06-01T12:30:59.000000", [2, 3])],
+                        "topic44": []}),
+        ({"raw": True}, {"topic42": [(1591014658.0, 1), (1591014659.0, 2)],
+                         "topic43": [(1591014659.0, [2, 3])],
+                         "topic44": []}),
+    ],
+)
+def test_query_multiple_topics(get_sqlitefuncts, query_kwargs, expected_values):
+    sqlitefuncts, historain_version = get_sqlitefuncts
+    query = (
+        "INSERT OR REPLACE INTO data VALUES('2020-06-01 12:30:59',43,'[2,3]'); "
+        "INSERT OR REPLACE INTO data VALUES('2020-06-01 12:30:59',42,'2'); "
+        "INSERT OR REPLACE INTO data VALUES('2020-06-01 12:30:58',42,'1')"
+    )
+    query_db(query)
+
+    actual_results = sqlitefuncts.query([42, 43, 44], {42: "topic42", 43: "topic43", 44: "topic44"},
+                                        **query_kwargs)
+
+    assert actual_results == expected_values
+    assert list(actual_results) == ["topic42", "topic43", "topic44"]
+
+
 @pytest.mark.sqlitefuncts
 @pytest.mark.dbutils
 @pytest.mark.parametrize(
@@ -144,6 +187,133 @@ def test_insert_data(get_sqlitefuncts):
     assert get_all_data(DATA_TABLE) == expected_data
 
 
+@pytest.mark.sqlitefuncts
+@pytest.mark.dbutils
+def test_bulk_insert(get_sqlitefuncts):
+    sqlitefuncts, historain_version = get_sqlitefuncts
+
+    with sqlitefuncts.bulk_insert() as insert_data:
+        assert insert_data("2001-09-11 08:46:00", 11, 1.5) is True
+        assert insert_data("2001-09-11 08:47:00", 11, "1wtc") is True
+        # Nothing is written until the context exits
+        assert get_all_data(DATA_TABLE) == []
+    sqlitefuncts.commit()
+
+    assert get_all_data(DATA_TABLE) == ['2001-09-11 08:46:00|11|1.5', '2001-09-11 08:47:00|11|"1wtc"']
+
+
+@pytest.mark.sqlitefuncts
+@pytest.mark.dbutils
+def test_numeric_values(sqlitefuncts_db_not_initialized):
+    table_names = {"data_table": DATA_TABLE, "topics_table": TOPICS_TABLE, "meta_table": META_TABLE,
+                   "agg_topics_table": AGG_TOPICS_TABLE, "agg_meta_table": AGG_META_TABLE}
+    sqlitefuncts = SqlLiteFuncts(dict(CONNECT_PARAMS, numeric_values=True), table_names)
+    sqlitefuncts.setup_historian_tables()
+    assert sqlitefuncts.has_value_num()
+
+    with sqlitefuncts.bulk_insert() as insert_data:
+        insert_data("2020-06-01 12:30:59", 42, 2)
+        insert_data("2020-06-01 12:31:59", 42, 10.5)
+        insert_data("2020-06-01 12:32:59", 42, True)
+        insert_data("2020-06-01 12:33:59", 42, "on")
+    sqlitefuncts.commit()
+
+    assert get_all_data(DATA_TABLE) == ['2020-06-01 12:30:59|42|2|2.0',
+                                        '2020-06-01 12:31:59|42|10.5|10.5',
+                                        '2020-06-01 12:32:59|42|true|',
+                                        '2020-06-01 12:33:59|42|"on"|']
+    assert sqlitefuncts.collect_aggregate([42], "avg") == (6.25, 2)
+    assert sqlitefuncts.collect_aggregate([42], "max") == (10.5, 2)
+    assert sqlitefuncts.collect_aggregate([42], "count") == (4, 4)
+    assert sqlitefuncts.collect_partial_aggregate([42]) == (4, 12.5, 2.0, 10.5, 2)
+    # Partial aggregates give the same COUNT and AVG as the raw data
+    partial = PartialAggregate(*sqlitefuncts.collect_partial_aggregate([42]))
+    assert partial.value("count") == sqlitefuncts.collect_aggregate([42], "count")[0]
+    assert partial.value("avg") == sqlitefuncts.collect_aggregate([42], "avg")[0]
+    # The JSON value is still what queries return
+    assert sqlitefuncts.query([42], {42: "topic42"}) == {"topic42": [("2020-06-01T12:30:59.000000", 2),
+                                                                      ("2020-06-01T12:31:59.000000", 10.5),
+                                                                      ("2020-06-01T12:32:59.000000", True),
+                                                                      ("2020-06-01T12:33:59.000000", "on")]}
+
+    # Drivers opened without the option, such as the aggregate historian's, still use the column
+    other = SqlLiteFuncts(CONNECT_PARAMS, table_names)
+    assert other.has_value_num()
+    assert other.collect_aggregate([42], "sum") == (12.5, 2)
+
+
+@pytest.mark.sqlitefuncts
+@pytest.mark.dbutils
+def test_statement_cache(get_sqlitefuncts):
+    sqlitefuncts, historain_version = get_sqlitefuncts
+
+    statement = sqlitefuncts.statement("insert_data_query")
+
+    assert statement == sqlitefuncts.insert_data_query()
+    assert sqlitefuncts.statement("insert_data_query") is statement
+    assert sqlitefuncts.statement(("custom", 1), lambda: "SELECT 1") == "SELECT 1"
+
+
+@pytest.mark.sqlitefuncts
+@pytest.mark.dbutils
+def test_driver_pool_queries_in_threads(get_sqlitefuncts):
+    sqlitefuncts, historain_version = get_sqlitefuncts
+    query_db("INSERT OR REPLACE INTO data VALUES('2020-06-01 12:30:59',43,'[2,3]')")
+    table_names = {"data_table": DATA_TABLE, "topics_table": TOPICS_TABLE, "meta_table": META_TABLE,
+                   "agg_topics_table": AGG_TOPICS_TABLE, "agg_meta_table": AGG_META_TABLE}
+    pool = DbDriverPool(lambda: SqlLiteFuncts(CONNECT_PARAMS, table_names), 2)
+
+    try:
+        greenlets = [gevent.spawn(pool.call, "query", [43], {43: "topic43"}) for _ in range(4)]
+        gevent.joinall(greenlets, raise_error=True)
+
+        for greenlet in greenlets:
+            assert greenlet.value == {"topic43": [("2020-06-01T12:30:59.000000", [2, 3])]}
+        status = pool.status()
+        assert status["size"] == 2
+        assert status["in_use"] == 0
+        assert status["calls"] == 4
+        assert status["peak"] == 4
+        # One driver, and so one connection, per pool thread
+        assert len(pool._drivers) <= 2
+        with pytest.raises(sqlite3.OperationalError):
+            pool.call("select", "SELECT * FROM no_such_table")
+    finally:
+        pool.close()
+
+
+@pytest.mark.sqlitefuncts
+@pytest.mark.dbutils
+def test_driver_pool_close_should_close_connections_in_their_threads():
+    class Driver:
+        def __init__(self):
+            self.thread = threading.get_ident()
+            self.closed_in = None
+            self.busy = False
+
+        def wait(self, seconds):
+            self.busy = True
+            time.sleep(seconds)
+            self.busy = False
+
+        def close(self):
+            assert not self.busy
+            self.closed_in = threading.get_ident()
+
+    pool = DbDriverPool(Driver, 3)
+    greenlets = [gevent.spawn(pool.call, "wait", 0.2) for _ in range(3)]
+    gevent.sleep(0.05)
+    drivers = list(pool._drivers)
+    assert len(drivers) == 3
+
+    # Closing waits for the running calls and closes each driver in the thread that created it
+    pool.close()
+    gevent.joinall(greenlets, raise_error=True)
+    assert pool._drivers == []
+    for driver in drivers:
+        assert driver.closed_in == driver.thread
+
+
 @pytest.mark.sqlitefuncts
 @pytest.mark.dbutils
 def test_insert_topic(get_sqlitefuncts):
@@ -418,6 +588,34 @@ def test_collect_aggregate(get_sqlitefuncts):
     assert actual_aggregate == expected_aggregate
 
 
+@pytest.mark.sqlitefuncts
+@pytest.mark.dbutils
+def test_collect_partial_aggregate(get_sqlitefuncts):
+    sqlitefuncts, historain_version = get_sqlitefuncts
+    query = (
+        "INSERT OR REPLACE INTO data values('2020-06-01T12:30:59.000000+00:00', 42, '2');"
+        "INSERT OR REPLACE INTO data values('2020-06-01T12:31:59.000000+00:00', 43, '10');"
+        "INSERT OR REPLACE INTO data values('2020-06-01T12:32:59.000000+00:00', 43, '8');"
+    )
+    query_db(query)
+    start = datetime(2020, 6, 1, 12, 0, tzinfo=pytz.UTC)
+    end = datetime(2020, 6, 1, 12, 32, tzinfo=pytz.UTC)
+
+    assert sqlitefuncts.collect_partial_aggregate([42, 43], start, end) == (2, 12.0, 2.0, 10.0, 2)
+    assert sqlitefuncts.collect_partial_aggregate([44], start, end) == (0, None, None, None, 0)
+
+
+@pytest.mark.sqlitefuncts
+@pytest.mark.dbutils
+def test_get_topic_list_version(get_sqlitefuncts):
+    sqlitefuncts, historain_version = get_sqlitefuncts
+    before = sqlitefuncts.get_topic_list_version()
+    sqlitefuncts.insert_topic("football")
+    sqlitefuncts.commit()
+
+    assert sqlitefuncts.get_topic_list_version() != before
+
+
 def get_indexes(table):
     res = query_db(f"""PRAGMA index_list({table})""")
     return res.splitlines()
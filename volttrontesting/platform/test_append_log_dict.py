@@ -0,0 +1,89 @@
+import json
+import os
+import time
+
+from volttron.utils.persistance import AppendLogDict
+
+
+def _entry(data):
+    return {"type": "raw", "modified": None, "data": data}
+
+
+def test_changes_are_appended_and_reloaded(tmp_path):
+    filename = str(tmp_path / "agent.store")
+    store = AppendLogDict(filename)
+    store["a"] = _entry("1")
+    store["b"] = _entry("2")
+    store["a"] = _entry("3")
+    del store["b"]
+    store._write()
+
+    # Only the log was written and the burst was coalesced
+    assert not os.path.exists(filename)
+    with open(filename + AppendLogDict.log_ext) as f:
+        assert len(f.readlines()) == 2
+
+    reloaded = AppendLogDict(filename)
+    assert reloaded == {"a": _entry("3")}
+
+
+def test_sync_compacts_log(tmp_path):
+    filename = str(tmp_path / "agent.store")
+    store = AppendLogDict(filename, compact_min=2)
+    store["a"] = _entry("1")
+    store["b"] = _entry("b")
+    store._write()
+    assert os.path.exists(filename + AppendLogDict.log_ext)
+
+    # The third line exceeds compact_min so the log is folded in the snapshot
+    store["a"] = _entry("2")
+    store._write()
+    assert not os.path.exists(filename + AppendLogDict.log_ext)
+    with open(filename) as f:
+        assert json.load(f) == {"a": _entry("2"), "b": _entry("b")}
+
+    store.pop("b")
+    store._write()
+    assert os.path.exists(filename + AppendLogDict.log_ext)
+    store.sync()
+    assert not os.path.exists(filename + AppendLogDict.log_ext)
+    assert AppendLogDict(filename) == {"a": _entry("2")}
+
+
+def test_clear_removes_files(tmp_path):
+    filename = str(tmp_path / "agent.store")
+    store = AppendLogDict(filename)
+    store["a"] = _entry("1")
+    store.sync()
+    store["b"] = _entry("2")
+    store._write()
+
+    store.clear()
+    store._write()
+    assert not os.path.exists(filename)
+    assert not os.path.exists(filename + AppendLogDict.log_ext)
+
+
+def test_incomplete_last_change_is_skipped(tmp_path):
+    filename = str(tmp_path / "agent.store")
+    store = AppendLogDict(filename)
+    store["a"] = _entry("1")
+    store._write()
+    with open(filename + AppendLogDict.log_ext, "a") as f:
+        f.write('{"k":"b","v":{"ty')
+
+    assert AppendLogDict(filename) == {"a": _entry("1")}
+
+
+def test_async_sync_writes_in_background(tmp_path):
+    filename = str(tmp_path / "agent.store")
+    store = AppendLogDict(filename)
+    store["a"] = _entry("1")
+    store.async_sync()
+
+    for _ in range(50):
+        if not store._scheduled:
+            break
+        time.sleep(0.1)
+    with store._io_lock:
+        assert AppendLogDict(filename) == {"a": _entry("1")}
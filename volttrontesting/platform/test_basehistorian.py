@@ -92,6 +92,17 @@ def test_enable_and_disable_cache_only_through_config_store():
     assert not agent.is_cache_only_enabled()
 
 
+@mock.patch(target='volttron.platform.agent.base_historian.Query', new=QueryHelper)
+def test_query_cursor_timeout_through_config_store():
+    agent = BaseHistorianAgent()
+    agent._configure("config", "UPDATE", dict(query_cursor_timeout=5))
+    assert agent._query_cursor_timeout == 5.0
+
+    # Invalid values leave the setting unchanged
+    agent._configure("config", "UPDATE", dict(query_cursor_timeout="soon"))
+    assert agent._query_cursor_timeout == 5.0
+
+
 def test_cache_enable():
     with create_vcfg_vhome() as vhome:
         assert os.path.isdir(vhome)
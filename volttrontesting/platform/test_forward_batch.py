@@ -0,0 +1,33 @@
+import pytest
+
+from volttron.platform.agent.forward_batch import pack_batch, unpack_batch
+
+PUBLISHES = [("devices/campus/building/device/all",
+              {"Date": "2023-01-01T00:00:00.000000+00:00", "X-Forwarded": True},
+              [{"temp": 72.5}, {"temp": {"units": "F"}}]),
+             ("record/note", {}, "text")]
+
+
+@pytest.mark.parametrize("compress", [True, False])
+def test_pack_unpack_round_trip(compress):
+    batch = pack_batch(PUBLISHES, compress=compress)
+
+    assert batch["count"] == 2
+    assert batch["compression"] == ("zlib" if compress else None)
+    assert isinstance(batch["data"], str)
+    assert unpack_batch(batch) == PUBLISHES
+
+
+def test_compressed_batch_is_smaller():
+    publishes = PUBLISHES * 100
+    assert len(pack_batch(publishes)["data"]) < len(pack_batch(publishes, compress=False)["data"]) / 4
+
+
+def test_unpack_rejects_bad_batches():
+    batch = pack_batch(PUBLISHES)
+    with pytest.raises(ValueError):
+        unpack_batch(dict(batch, version=99))
+    with pytest.raises(ValueError):
+        unpack_batch(dict(batch, compression="lz4"))
+    with pytest.raises(ValueError):
+        unpack_batch(dict(batch, count=3))
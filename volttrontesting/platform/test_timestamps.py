@@ -0,0 +1,46 @@
+from datetime import datetime
+
+import pytest
+import pytz
+from dateutil.tz import tzoffset
+
+from volttron.platform.agent import timestamps
+
+
+@pytest.mark.parametrize("time_stamp_str, expected", [
+    ("2023-01-01T01:02:03.000004", datetime(2023, 1, 1, 1, 2, 3, 4)),
+    ("2023-01-01T01:02:03.000004+00:00", datetime(2023, 1, 1, 1, 2, 3, 4, tzinfo=pytz.UTC)),
+    ("2023-01-01T01:02:03.000004-05:30", datetime(2023, 1, 1, 1, 2, 3, 4, tzinfo=tzoffset("", -19800))),
+    ("2023-01-01 01:02:03", datetime(2023, 1, 1, 1, 2, 3)),
+    ("2023-01-01T01:02:03Z", datetime(2023, 1, 1, 1, 2, 3, tzinfo=pytz.UTC)),
+    ("2023-01-01T01:02:03+02:00", datetime(2023, 1, 1, 1, 2, 3, tzinfo=tzoffset("", 7200))),
+    # Falls back to dateutil
+    ("Jan 1 2023 1:02:03", datetime(2023, 1, 1, 1, 2, 3)),
+])
+def test_parse_timestamp(time_stamp_str, expected):
+    result = timestamps.parse_timestamp(time_stamp_str)
+    assert result == expected
+    assert result.utcoffset() == expected.utcoffset()
+
+
+def test_parse_timestamp_utc_is_pytz():
+    assert timestamps.parse_timestamp("2023-01-01T01:02:03.000004+00:00").tzinfo is pytz.UTC
+
+
+@pytest.mark.parametrize("time_stamp, expected", [
+    (datetime(2023, 1, 1, 1, 2, 3, 4), "2023-01-01T01:02:03.000004"),
+    (datetime(2023, 1, 1, tzinfo=pytz.UTC), "2023-01-01T00:00:00.000000+00:00"),
+    (pytz.timezone("US/Eastern").localize(datetime(2023, 6, 1)), "2023-06-01T00:00:00.000000-04:00"),
+    # Offsets with seconds are truncated to minutes.
+    (datetime(2023, 1, 1, tzinfo=pytz.timezone("US/Eastern")), "2023-01-01T00:00:00.000000-04:56"),
+])
+def test_format_timestamp(time_stamp, expected):
+    assert timestamps.format_timestamp(time_stamp) == expected
+
+
+def test_epoch_round_trip():
+    assert timestamps.parse_epoch("1970-01-01T00:00:01.500000") == 1.5
+    assert timestamps.parse_epoch("1970-01-01T01:00:01.500000+01:00") == 1.5
+    assert timestamps.from_epoch(1.5) == datetime(1970, 1, 1, 0, 0, 1, 500000, tzinfo=pytz.UTC)
+    assert timestamps.format_epoch(1.5) == "1970-01-01T00:00:01.500000+00:00"
+    assert timestamps.to_epoch(timestamps.parse_timestamp(timestamps.format_epoch(1.5))) == 1.5
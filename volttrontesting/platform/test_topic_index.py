@@ -0,0 +1,74 @@
+import pytest
+
+from volttron.platform.agent.topic_index import TopicIndex
+
+
+@pytest.fixture()
+def topic_index():
+    index = TopicIndex()
+    index.update({"campus/building1/device1/zonetemp": 1,
+                  "campus/building1/device2/zonetemp": 2,
+                  "campus/building2/device1/zonetemp": 3,
+                  "campus/building10/device1/oat": 4},
+                 {"campus/building1/device1/zonetemp": "Campus/Building1/Device1/ZoneTemp",
+                  "campus/building1/device2/zonetemp": "Campus/Building1/Device2/ZoneTemp",
+                  "campus/building2/device1/zonetemp": "Campus/Building2/Device1/ZoneTemp",
+                  "campus/building10/device1/oat": "Campus/Building10/Device1/OAT"})
+    return index
+
+
+@pytest.mark.parametrize(
+    "pattern, expected_ids",
+    [
+        ("ZoneTemp", {1, 2, 3}),
+        ("building1/", {1, 2}),
+        ("^campus/building1.*", {1, 2, 4}),
+        ("^campus/building1/.*/zonetemp$", {1, 2}),
+        ("^campus/building1?/device1", {1}),
+        ("device[12]/zone", {1, 2, 3}),
+        ("^building1", set()),
+        ("^campus/building2|oat", {3, 4}),
+    ],
+)
+def test_match_regex(topic_index, pattern, expected_ids):
+    assert set(topic_index.match_regex(pattern).values()) == expected_ids
+
+
+def test_match_should_return_original_topic_names(topic_index):
+    assert topic_index.match_regex("oat$") == {"Campus/Building10/Device1/OAT": 4}
+    assert topic_index.match_prefix("campus/building2") == {"Campus/Building2/Device1/ZoneTemp": 3}
+
+
+def test_match_glob(topic_index):
+    assert set(topic_index.match_glob("campus/building1/*/zonetemp").values()) == {1, 2}
+    assert set(topic_index.match_glob("campus/building?/device1/*").values()) == {1, 3}
+    assert topic_index.match_glob("Campus/Building10/Device1/OAT") == {"Campus/Building10/Device1/OAT": 4}
+    assert topic_index.match_glob("campus/building1") == {}
+
+
+def test_add_and_remove(topic_index):
+    topic_index.add("campus/building1/device3/zonetemp", 5)
+    assert set(topic_index.match_prefix("campus/building1/").values()) == {1, 2, 5}
+
+    # Adding a topic with different case renames it
+    topic_index.add("CAMPUS/building1/device3/zonetemp", 5)
+    assert topic_index.match_regex("device3") == {"CAMPUS/building1/device3/zonetemp": 5}
+    assert len(topic_index) == 5
+
+    topic_index.remove("campus/building1/device3/zonetemp")
+    assert topic_index.match_regex("device3") == {}
+    assert len(topic_index) == 4
+
+
+def test_version_changes_on_update(topic_index):
+    version = topic_index.version
+    topic_index.add("campus/building1/device3/zonetemp", 5)
+    assert topic_index.version > version
+
+    version = topic_index.version
+    topic_index.remove("campus/building1/device3/zonetemp")
+    assert topic_index.version > version
+
+    version = topic_index.version
+    topic_index.remove("campus/building1/device3/zonetemp")
+    assert topic_index.version == version
@@ -0,0 +1,81 @@
+import re
+
+import pytest
+from volttron.platform.web.route_table import RouteLimit, RouteStats, RouteTable
+
+
+def _table(*patterns, **kwargs):
+    return RouteTable([(re.compile(p, **kwargs), 'callable', p) for p in patterns])
+
+
+def _matched(table, path):
+    route = table.match(path)
+    return route[2] if route is not None else None
+
+
+@pytest.mark.parametrize('path, expected', [('/discovery/', '^/discovery/$'),
+                                            ('/vui/platforms', '^/vui/platforms$'),
+                                            ('/vui/platforms/p1', '^/vui/platforms/[^/]+$'),
+                                            ('/admin/login.html', '^/admin.*'),
+                                            ('/index.html', '^/.*'),
+                                            ('nope', None)])
+def test_match_first_route_wins(path, expected):
+    table = _table('^/discovery/$', '^/vui/platforms$', '^/vui/platforms/[^/]+$', '^/admin.*', '^/.*')
+    assert _matched(table, path) == expected
+
+
+def test_match_regex_before_literal():
+    table = _table('^/vui.*', '^/vui/platforms$')
+    assert _matched(table, '/vui/platforms') == '^/vui.*'
+
+
+def test_match_literal_before_regex():
+    table = _table('^/vui/platforms$', '^/vui.*')
+    assert _matched(table, '/vui/platforms') == '^/vui/platforms$'
+
+
+def test_match_uncombinable_routes_keep_order():
+    table = RouteTable([(re.compile('^/a(?P<x>.)$'), 'callable', 1),
+                        (re.compile('^/A$', re.IGNORECASE), 'callable', 2),
+                        (re.compile('^/b(?P<x>.)$'), 'callable', 3),
+                        (re.compile(r'^/(.)\1$'), 'callable', 4),
+                        (re.compile('^/.*'), 'callable', 5)])
+    assert _matched(table, '/ab') == 1
+    assert _matched(table, '/a') == 2
+    assert _matched(table, '/bc') == 3
+    assert _matched(table, '/cc') == 4
+    assert _matched(table, '/cd') == 5
+
+
+def test_match_after_changes():
+    table = _table('^/.*')
+    assert _matched(table, '/vui') == '^/.*'
+    table.insert(0, (re.compile('^/vui$'), 'callable', 'vui'))
+    assert _matched(table, '/vui') == 'vui'
+    table[:] = [r for r in table if r[2] != 'vui']
+    assert _matched(table, '/vui') == '^/.*'
+    table.clear()
+    assert table.match('/vui') is None
+
+
+def test_route_limit():
+    limit = RouteLimit(max_concurrent=1)
+    assert limit.acquire()
+    assert not limit.acquire()
+    limit.release()
+    assert limit.acquire()
+    assert RouteLimit(timeout=5).acquire()
+
+
+def test_route_stats():
+    stats = RouteStats()
+    assert stats.to_dict()['p50_ms'] is None
+    stats.finish(stats.start())
+    stats.finish(stats.start(), error=True)
+    stats.finish(stats.start(), timed_out=True)
+    metrics = stats.to_dict()
+    assert metrics['count'] == 3
+    assert metrics['errors'] == 2
+    assert metrics['timeouts'] == 1
+    assert metrics['in_flight'] == 0
+    assert metrics['p95_ms'] >= metrics['p50_ms'] >= 0
@@ -129,6 +129,34 @@ def test_get_matches():
     assert idents == t.get_matches('root/Campus/Building1/Fake1/-', return_nodes=False)
 
 
+def test_get_matches_without_wildcards():
+    t = TopicTree(TOPIC_LIST)
+    assert t.get_matches('root/Campus/Building1') == [t.get_node('root/Campus/Building1')]
+    assert t.get_matches('root/Campus/Building1', return_nodes=False) == ['root/Campus/Building1']
+    assert t.get_matches('root/Campus/Building4') == []
+
+
+def test_add_and_remove_topics():
+    t = TopicTree(TOPIC_LIST)
+    t.add_topics(['Campus/Building4/Fake1/SampleBool1', 'Campus/Building1/Fake1/SampleBool1'])
+    assert len(t) == 17
+    assert t.get_node('root/Campus/Building4/Fake1/SampleBool1').topic == 'Campus/Building4/Fake1/SampleBool1'
+
+    # Removing the last topic under a segment removes the segment too.
+    t.remove_topics(['Campus/Building4/Fake1/SampleBool1'])
+    assert len(t) == 14
+    assert 'root/Campus/Building4' not in t
+
+    # Segments still holding other topics are kept.
+    t.remove_topics(['Campus/Building3/Fake1/SampleBool1'])
+    assert len(t) == 13
+    assert t.parent('root/Campus/Building3/Fake1/SampleWritableFloat1').identifier == 'root/Campus/Building3/Fake1'
+
+    # A segment which is also a topic is kept.
+    t.remove_topics(['Campus/Building3/Fake1/SampleWritableFloat1'], remaining_topics=['Campus/Building3/Fake1'])
+    assert t.get_node('root/Campus/Building3/Fake1').is_leaf()
+
+
 @pytest.mark.parametrize('topic_pattern, regex, exact_matches, included',
     [
         ('', '', [], ALL_IDENTIFIERS),
@@ -1069,6 +1069,85 @@ def test_handle_platforms_historians_historian_topics_get_response(mock_platform
             assert 'value' in keys if return_values else 'value' not in keys
 
 
+def test_historian_topic_tree_cached_until_version_changes(mock_platform_web_service):
+    topics = list(HISTORIAN_TOPIC_LIST)
+    version = ['1']
+
+    def _rpc(peer, meth, *args, external_platform=None, **kwargs):
+        if meth == 'get_topic_list_version':
+            return version[0]
+        elif meth == 'get_topic_list':
+            return list(topics)
+        return _mock_historians_rpc(peer, meth, *args, external_platform=external_platform, **kwargs)
+
+    path = '/vui/platforms/my_instance_name/historians/platform.historian/topics/Campus/Building1/Fake1'
+    vui_endpoints = VUIEndpoints(mock_platform_web_service)
+    vui_endpoints._rpc = MagicMock(wraps=_rpc)
+
+    def _get_links():
+        env = get_test_web_env(path, method='GET', HTTP_AUTHORIZATION='BEARER foo')
+        return check_links_return(vui_endpoints.handle_platforms_historians_historian_topics(env, {}))
+
+    def _topic_list_calls():
+        return len([c for c in vui_endpoints._rpc.call_args_list if c.args[1] == 'get_topic_list'])
+
+    assert len(_get_links()) == 5
+    assert len(_get_links()) == 5
+    assert _topic_list_calls() == 1
+
+    # A new version patches the cached tree with the changed topics.
+    tree = vui_endpoints._historian_trees[('my_instance_name', 'platform.historian')]['tree']
+    topics.remove('Campus/Building1/Fake1/EKG_Cos')
+    topics.append('Campus/Building1/Fake1/OutsideAirTemperature1')
+    version[0] = '2'
+    links = _get_links()
+    assert _topic_list_calls() == 2
+    assert 'EKG_Cos' not in links and 'OutsideAirTemperature1' in links
+    assert vui_endpoints._historian_trees[('my_instance_name', 'platform.historian')]['tree'] is tree
+
+
+def test_historian_topics_not_modified(mock_platform_web_service):
+    path = '/vui/platforms/my_instance_name/historians/platform.historian/topics/Campus'
+    vui_endpoints = VUIEndpoints(mock_platform_web_service)
+    vui_endpoints._rpc = _mock_historians_rpc
+    env = get_test_web_env(path, method='GET', HTTP_AUTHORIZATION='BEARER foo')
+    response = vui_endpoints.handle_platforms_historians_historian_topics(env, {})
+    check_response_codes(response, '200')
+    etag = response.headers['ETag']
+
+    env = get_test_web_env(path, method='GET', HTTP_AUTHORIZATION='BEARER foo', HTTP_IF_NONE_MATCH=etag)
+    response = vui_endpoints.handle_platforms_historians_historian_topics(env, {})
+    check_response_codes(response, '304')
+
+    env = get_test_web_env(path, method='GET', HTTP_AUTHORIZATION='BEARER foo', HTTP_IF_NONE_MATCH='"other"')
+    response = vui_endpoints.handle_platforms_historians_historian_topics(env, {})
+    check_response_codes(response, '200')
+
+
+def test_device_tree_cached_until_store_version_changes(mock_platform_web_service):
+    version = ['1']
+
+    def _rpc(peer, meth, *args, external_platform=None, **kwargs):
+        if peer == 'config.store' and meth == 'get_store_version':
+            return version[0]
+        return _mock_devices_rpc(peer, meth, *args, external_platform=external_platform, **kwargs)
+
+    with mock.patch('volttron.platform.web.vui_endpoints.DeviceTree.from_store',
+                    side_effect=lambda *args: pickle.loads(DEV_TREE)) as from_store:
+        vui_endpoints = VUIEndpoints(mock_platform_web_service)
+        vui_endpoints._rpc = _rpc
+        for _ in range(2):
+            env = get_test_web_env('/vui/platforms/my_instance_name/devices/Campus', method='GET',
+                                   HTTP_AUTHORIZATION='BEARER foo')
+            response = vui_endpoints.handle_platforms_devices(env, {})
+            check_links_return(response, ['Building1', 'Building2', 'Building3'])
+        assert from_store.call_count == 1
+
+        version[0] = '2'
+        vui_endpoints.handle_platforms_devices(env, {})
+        assert from_store.call_count == 2
+
+
 @pytest.mark.parametrize("method, status", gen_response_codes(['GET'], ['DELETE']))
 def test_handle_platforms_status_status_code(mock_platform_web_service, method, status):
     env = get_test_web_env('/vui/platforms/my_instance_name/status', method=method,
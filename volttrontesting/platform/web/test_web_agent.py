@@ -1,9 +1,13 @@
 import os
 from pathlib import Path
+import re
 import shutil
 from unittest.mock import MagicMock
 
+import gevent
+from gevent.event import AsyncResult
 import pytest
+from werkzeug import Response
 
 from volttron.platform.vip.agent import Agent
 from volttron.platform.web import PlatformWebService
@@ -77,3 +81,100 @@ def test_register_routes(mock_platformweb_service):
 
     finally:
         shutil.rmtree(str(Path(html_root).parent), ignore_errors=True)
+
+
+def test_route_limits_and_metrics(mock_platformweb_service):
+    pws = mock_platformweb_service
+
+    def slow(env, data):
+        gevent.sleep(0.2)
+        return Response('done')
+
+    pws.registeredroutes.append((re.compile('^/slow$'), 'callable', slow))
+    pws.set_route_limit('^/slow$', max_concurrent=1, timeout=0.1)
+
+    first_response = MagicMock()
+    first = gevent.spawn(pws.app_routing, get_test_web_env('/slow'), first_response)
+    gevent.sleep(0)
+    start_response = MagicMock()
+    data = pws.app_routing(get_test_web_env('/slow'), start_response)
+    assert start_response.call_args[0][0] == '503 Service Unavailable'
+    assert b'Service Unavailable' in b''.join(data)
+
+    first.join()
+    assert first_response.call_args[0][0] == '504 Gateway Timeout'
+    first.value.close()
+
+    start_response.reset_mock()
+    pws.set_route_limit('^/slow$', timeout=1)
+    data = pws.app_routing(get_test_web_env('/slow'), start_response)
+    assert start_response.call_args[0][0] == '200 OK'
+    assert b''.join(data) == b'done'
+    data.close()
+
+    metrics = pws.get_route_metrics()['^/slow$']
+    assert metrics['count'] == 2
+    assert metrics['rejected'] == 1
+    assert metrics['timeouts'] == 1
+    assert metrics['in_flight'] == 0
+
+
+@pytest.fixture()
+def pending_rpc_calls(mock_platformweb_service):
+    """Answers to the rpc calls of the platform web service, set by the test."""
+    results = []
+
+    def call(peer, method, *args, **kwargs):
+        results.append(AsyncResult())
+        return results[-1]
+
+    mock_platformweb_service.vip.rpc.call.side_effect = call
+    yield results
+    mock_platformweb_service.vip.rpc.call.side_effect = None
+
+
+def test_endpoint_limit_should_hold_until_response_is_closed(mock_platformweb_service, pending_rpc_calls):
+    pws = mock_platformweb_service
+    pws.register_endpoint('/endpoint', 'jsonrpc', max_concurrent=1)
+
+    first = gevent.spawn(pws.app_routing, get_test_web_env('/endpoint'), MagicMock())
+    gevent.sleep(0)
+    start_response = MagicMock()
+    pws.app_routing(get_test_web_env('/endpoint'), start_response)
+    assert start_response.call_args[0][0] == '503 Service Unavailable'
+
+    pending_rpc_calls[0].set({'result': 'done'})
+    data = first.get()
+    assert b''.join(data) == b'{"result": "done"}'
+    # The body has not been closed by the server yet
+    pws.app_routing(get_test_web_env('/endpoint'), start_response)
+    assert pws.get_route_metrics()['/endpoint']['rejected'] == 2
+
+    data.close()
+    metrics = pws.get_route_metrics()['/endpoint']
+    assert metrics['count'] == 1
+    assert metrics['in_flight'] == 0
+
+    gevent.spawn_later(0.05, lambda: pending_rpc_calls[1].set({'result': 'again'}))
+    start_response.reset_mock()
+    data = pws.app_routing(get_test_web_env('/endpoint'), start_response)
+    assert start_response.call_args[0][0] == '200 OK'
+    data.close()
+
+
+@pytest.mark.parametrize('register, path', [
+    (lambda pws: pws.register_endpoint('/endpoint', 'jsonrpc', timeout=0.1), '/endpoint'),
+    (lambda pws: pws.register_agent_route('^/route/.*', 'handle', timeout=0.1), '/route/1')])
+def test_agent_timeout_should_answer_gateway_timeout(mock_platformweb_service, pending_rpc_calls, register, path):
+    pws = mock_platformweb_service
+    register(pws)
+
+    start_response = MagicMock()
+    data = pws.app_routing(get_test_web_env(path), start_response)
+    assert start_response.call_args[0][0] == '504 Gateway Timeout'
+    assert b''.join(data) == b'<h1>Gateway Timeout</h1>'
+    data.close()
+
+    metrics = list(pws.get_route_metrics().values())[0]
+    assert metrics['timeouts'] == 1
+    assert metrics['in_flight'] == 0
@@ -1,5 +1,6 @@
 import pytz
-from volttron.platform.agent.base_aggregate_historian import AggregateHistorian
+from volttron.platform.agent.base_aggregate_historian import (
+    AggregateHistorian, PartialAggregate, PartialAggregateStore)
 import pytest
 from datetime import datetime, timedelta
 
@@ -191,3 +192,137 @@ def test_compute_next_collection_time():
     assert next2 == datetime.strptime(
         '2016-04-30T01:15:23.123456',
         '%Y-%m-%dT%H:%M:%S.%f').replace(tzinfo=pytz.utc)
+
+
+@pytest.mark.aggregator
+def test_partial_aggregate_merge():
+    '''
+    Test if partial aggregates of adjacent slices merge into the aggregate
+    of the combined slice
+    '''
+    partial = PartialAggregate(2, 10.0, 4.0, 6.0)
+    partial.merge(PartialAggregate(1, 2.0, 2.0, 2.0))
+    partial.merge(PartialAggregate())
+    assert partial.value('avg') == 4.0
+    assert partial.value('sum') == 12.0
+    assert partial.value('count') == 3
+    assert partial.value('min') == 2.0
+    assert partial.value('max') == 6.0
+    assert PartialAggregate().value('avg') is None
+    assert PartialAggregate().value('total') == 0.0
+
+    # Non numeric values are counted but not averaged
+    partial = PartialAggregate(3, 1.5, 1.5, 1.5, 1)
+    partial.merge(PartialAggregate(1, 2.5, 2.5, 2.5))
+    assert partial.value('count') == 4
+    assert partial.value('avg') == 2.0
+    assert PartialAggregate(2, None, None, None, 0).value('avg') is None
+
+
+@pytest.mark.aggregator
+def test_partial_aggregate_store_composes_coarser_periods():
+    '''
+    Test if a coarser time period is composed from stored finer slices and
+    only the uncovered parts are returned as gaps to be read from raw data
+    '''
+    store = PartialAggregateStore(retention=timedelta(hours=1))
+    start = datetime(2016, 3, 1, 1, 0, tzinfo=pytz.utc)
+    minute = timedelta(minutes=1)
+    for i in range(1, 14):
+        store.add([2, 1], start + i * minute, start + (i + 1) * minute,
+                  PartialAggregate(1, float(i), float(i), float(i)))
+
+    partial, gaps = store.cover([1, 2], start, start + 15 * minute)
+    assert partial.count == 13
+    assert partial.value('sum') == sum(range(1, 14))
+    assert gaps == [(start, start + minute),
+                    (start + 14 * minute, start + 15 * minute)]
+
+    # Different topic ids do not share slices
+    partial, gaps = store.cover([1], start, start + 15 * minute)
+    assert partial.count == 0
+    assert gaps == [(start, start + 15 * minute)]
+
+    # Slices older than the retention period are dropped
+    later = start + timedelta(hours=2)
+    store.add([1, 2], later, later + minute, PartialAggregate(1, 1.0, 1.0, 1.0))
+    partial, gaps = store.cover([1, 2], start, later + minute)
+    assert partial.count == 1
+    assert gaps == [(start, later)]
+
+
+@pytest.mark.aggregator
+def test_partial_aggregate_store_retention_per_slice():
+    '''
+    Test if slices expire after their own retention period, and only when
+    slices of the same topic ids are added
+    '''
+    store = PartialAggregateStore()
+    start = datetime(2016, 3, 1, 1, 0, tzinfo=pytz.utc)
+    minute = timedelta(minutes=1)
+    hour = timedelta(hours=1)
+    store.add([1], start, start + minute, PartialAggregate(1, 1.0, 1.0, 1.0),
+              retention=2 * hour)
+    store.add([1], start, start + hour, PartialAggregate(2, 2.0, 1.0, 1.0),
+              retention=timedelta(days=2))
+    store.add([2], start, start + minute, PartialAggregate(1, 1.0, 1.0, 1.0),
+              retention=2 * hour)
+
+    later = start + timedelta(hours=4)
+    store.add([1], later, later + minute, PartialAggregate(1, 1.0, 1.0, 1.0),
+              retention=2 * hour)
+    # The minute slice expired, the hour slice is still kept
+    partial, gaps = store.cover([1], start, start + minute)
+    assert partial.count == 0
+    partial, gaps = store.cover([1], start, start + hour)
+    assert partial.count == 2
+    assert gaps == []
+    # Other topic ids are not expired
+    partial, gaps = store.cover([2], start, start + minute)
+    assert partial.count == 1
+
+
+@pytest.mark.aggregator
+def test_partial_aggregate_store_invalidate():
+    '''
+    Test if slices overlapping backfilled data are dropped
+    '''
+    store = PartialAggregateStore()
+    start = datetime(2016, 3, 1, 1, 0, tzinfo=pytz.utc)
+    minute = timedelta(minutes=1)
+    for i in range(5):
+        store.add([1, 2], start + i * minute, start + (i + 1) * minute,
+                  PartialAggregate(1, 1.0, 1.0, 1.0))
+        store.add([3], start + i * minute, start + (i + 1) * minute,
+                  PartialAggregate(1, 1.0, 1.0, 1.0))
+
+    assert store.invalidate(start + 90 * minute / 60, start + 3 * minute,
+                            topic_ids=[2]) == 2
+    partial, gaps = store.cover([1, 2], start, start + 5 * minute)
+    assert partial.count == 3
+    assert gaps == [(start + minute, start + 3 * minute)]
+    partial, gaps = store.cover([3], start, start + 5 * minute)
+    assert partial.count == 5
+
+    assert store.invalidate(start, start + 5 * minute) == 8
+    assert store.cover([3], start, start + 5 * minute)[0].count == 0
+
+
+@pytest.mark.aggregator
+def test_compute_partial_retention():
+    '''
+    Test if the slices of a period are kept for twice the next longer period
+    '''
+    aggregations = [
+        {'aggregation_period': '1m',
+         'points': [{'aggregation_type': 'avg'}]},
+        {'aggregation_period': '60m',
+         'points': [{'aggregation_type': 'sum'}]},
+        {'aggregation_period': '1d',
+         'points': [{'aggregation_type': 'bit_and'}]},
+        {'aggregation_period': '1M',
+         'points': [{'aggregation_type': 'max'}]}]
+    assert AggregateHistorian.compute_partial_retention(aggregations) == {
+        '1m': timedelta(hours=2),
+        '1h': timedelta(days=60),
+        '1M': timedelta(days=60)}
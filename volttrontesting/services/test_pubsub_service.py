@@ -1,4 +1,5 @@
 from volttron.platform.vip.pubsubservice import PubSubService, ProtectedPubSubTopics
+from volttron.platform.vip.topic_trie import TopicTrie
 from mock import Mock, MagicMock
 import pytest
 
@@ -53,3 +54,98 @@ def test_returns_empty_list_when_subsystem_not_specified(pubsub_service):
     frames[6] = "not_pubsub"
     result = service.handle_subsystem(frames)
     assert [] == result
+
+
+def test_publish_serializes_payload_once_for_all_subscribers(pubsub_service):
+    parameters, service = pubsub_service
+    subscribers = ['hist1', 'hist2', 'app1']
+    for peer in subscribers:
+        frames = [peer, '', 'VIP1', '', '1', 'pubsub', 'subscribe', dict(prefix='devices', bus='')]
+        assert service.handle_subsystem(frames)
+
+    sent = []
+    parameters['socket'].send_multipart.side_effect = lambda frames, **kwargs: sent.append(list(frames))
+    message = dict(bus='', headers={'Date': '2023-01-01T00:00:00'}, message=[{'temp': 72.0}, {}])
+    frames = ['publisher', '', 'VIP1', '', '2', 'pubsub', 'publish', 'devices/campus/building/all', message]
+    result = service.handle_subsystem(frames)
+
+    assert result[-1] == len(subscribers)
+    assert len(sent) == len(subscribers)
+    assert sorted(f[0].bytes.decode() for f in sent) == sorted(subscribers)
+    # The encoded payload frame is shared by every recipient.
+    assert all(f[8] is sent[0][8] for f in sent)
+
+
+def _subscribe(service, peer, prefix, bus='', all_platforms=False):
+    frames = [peer, '', 'VIP1', '', '1', 'pubsub', 'subscribe',
+              dict(prefix=prefix, bus=bus, all_platforms=all_platforms)]
+    return service.handle_subsystem(frames)
+
+
+def _publish(service, topic, bus=''):
+    message = dict(bus=bus, headers={}, message='value')
+    frames = ['publisher', '', 'VIP1', '', '2', 'pubsub', 'publish', topic, message]
+    return service.handle_subsystem(frames)[-1]
+
+
+def test_publish_matches_subscribed_prefixes(pubsub_service):
+    parameters, service = pubsub_service
+    if parameters['has_external_routing']:
+        parameters['routing_service'].my_instance_name.return_value = 'volttron1'
+        parameters['routing_service'].get_connected_platforms.return_value = []
+    _subscribe(service, 'hist', 'devices')
+    _subscribe(service, 'app', 'devices/campus/building1')
+    _subscribe(service, 'remote', 'devices/campus', all_platforms=True)
+    _subscribe(service, 'other', 'analysis')
+    _subscribe(service, 'otherbus', 'devices', bus='special')
+
+    assert _publish(service, 'devices/campus/building1/all') == 3
+    assert _publish(service, 'devices/campus/building2/all') == 2
+    assert _publish(service, 'devices') == 1
+    assert _publish(service, 'dev') == 0
+    assert _publish(service, 'devices/campus', bus='special') == 1
+
+
+def test_publish_after_unsubscribe_and_sync(pubsub_service):
+    parameters, service = pubsub_service
+    _subscribe(service, 'hist', 'devices')
+    _subscribe(service, 'app', 'devices/campus')
+    assert _publish(service, 'devices/campus/all') == 2
+
+    unsubscribe = ['app', '', 'VIP1', '', '3', 'pubsub', 'unsubscribe',
+                   dict(internal=dict(prefix='devices/campus', bus=''))]
+    assert service.handle_subsystem(unsubscribe)
+    assert _publish(service, 'devices/campus/all') == 1
+
+    # Synchronizing the subscriptions of hist replaces its devices subscription.
+    service._sync('hist', {'internal': {'': ['analysis']}})
+    assert _publish(service, 'devices/campus/all') == 0
+    assert _publish(service, 'analysis/campus') == 1
+
+    service.peer_drop('hist')
+    assert _publish(service, 'analysis/campus') == 0
+
+
+def test_topic_trie_prefix_matching():
+    trie = TopicTrie()
+    trie.add('', 'everything')
+    trie.add('devices', 'a')
+    trie.add('devices/camp', 'b')
+    trie.add('devices/campus', 'b')
+
+    assert trie.match('devices/campus/all') == {'everything', 'a', 'b'}
+    assert trie.match_groups('devices/campus/all') == (frozenset(['everything']), frozenset(['a']),
+                                                       frozenset(['b']), frozenset(['b']))
+    assert trie.match('record') == {'everything'}
+    assert len(trie) == 4
+
+    trie.discard('devices/camp', 'b')
+    trie.remove('')
+    assert trie.match('devices/campus/all') == {'a', 'b'}
+    assert trie.match('record') == frozenset()
+    assert trie.subscribers('devices/campus') == {'b'}
+
+    trie.discard('devices/campus', 'b')
+    trie.discard('devices', 'a')
+    assert len(trie) == 0
+    assert trie.match('devices/campus/all') == frozenset()
@@ -32,7 +32,7 @@ import pytest
 from mock import MagicMock
 
 from volttron.platform.agent import utils
-from volttron.platform.agent.base_weather import BaseWeatherAgent
+from volttron.platform.agent.base_weather import BaseWeatherAgent, WeatherCache
 from volttron.platform.agent.utils import get_fq_identity
 from volttron.platform.messaging.health import STATUS_BAD, STATUS_GOOD
 from volttron.platform import jsonapi
@@ -216,6 +216,9 @@ def clear_api_calls(weather):
     cursor.execute("DELETE FROM API_CALLS")
     connection.commit()
     cursor.close()
+    # API calls are tracked in memory and written to the database periodically
+    cache.pending_calls = []
+    cache.load_api_calls()
 
 
 @pytest.mark.weather2
@@ -325,6 +328,7 @@ def test_api_call_tracking(weather):
 
     for i in range(0, 100):
         cache.add_api_call()
+    cache.checkpoint_api_calls()
 
     quantity_query = "SELECT COUNT(*) FROM API_CALLS;"
     cursor.execute(quantity_query)
@@ -850,6 +854,7 @@ def test_api_calls_services(weather):
 
     for i in range(0, 100):
         cache.add_api_call()
+    cache.checkpoint_api_calls()
 
     quantity_query = "SELECT COUNT(*) FROM API_CALLS;"
     cursor.execute(quantity_query)
@@ -871,6 +876,7 @@ def test_api_calls_services(weather):
     connection.commit()
 
     result = weather.get_current_weather([{"location": "fake_location1"}])
+    cache.checkpoint_api_calls()
 
     cursor.execute(quantity_query)
     stored_calls = cursor.fetchone()[0]
@@ -901,6 +907,54 @@ def test_api_calls_services(weather):
     clear_api_calls(weather)
 
 
+CACHE_API_SERVICES = {"get_current_weather": {"type": "current",
+                                             "update_interval": datetime.timedelta(hours=1)}}
+
+
+@pytest.mark.weather2
+def test_api_calls_checkpoint(tmp_path):
+    database_file = str(tmp_path / "weather.sqlite")
+    cache = WeatherCache(database_file, api_services=CACHE_API_SERVICES, calls_limit=3,
+                         calls_period=datetime.timedelta(hours=1), checkpoint_interval=3600)
+    for i in range(0, 3):
+        assert cache.add_api_call()
+    assert not cache.api_calls_available()
+
+    # Calls are only written to the database on checkpoint
+    cursor = cache._sqlite_conn.cursor()
+    assert cursor.execute("SELECT COUNT(*) FROM API_CALLS;").fetchone()[0] == 0
+    cache.close()
+
+    # Closing the cache writes the calls, so the limit applies after a restart
+    cache = WeatherCache(database_file, api_services=CACHE_API_SERVICES, calls_limit=3,
+                         calls_period=datetime.timedelta(hours=1), checkpoint_interval=3600)
+    assert not cache.api_calls_available()
+    cache._calls_limit = 4
+    assert cache.api_calls_available()
+    cache.close()
+
+
+@pytest.mark.weather2
+def test_current_data_cache(tmp_path):
+    cache = WeatherCache(str(tmp_path / "weather.sqlite"), api_services=CACHE_API_SERVICES, calls_limit=-1,
+                         current_data_cache_size=1)
+    observation_time = utils.get_aware_utc_now()
+    cache.store_weather_records("get_current_weather", ['"location1"', observation_time, '{"fake1": 1}'])
+
+    connection = cache._sqlite_conn
+    connection.execute("DELETE FROM get_current_weather;")
+    connection.commit()
+
+    # The latest observation is served from memory
+    assert cache.get_current_data("get_current_weather", '"location1"') == (observation_time, '{"fake1": 1}')
+
+    # Only one location is kept so location1 is evicted
+    cache.store_weather_records("get_current_weather", ['"location2"', observation_time, '{"fake1": 2}'])
+    assert cache.get_current_data("get_current_weather", '"location1"') == (None, None)
+    assert cache.get_current_data("get_current_weather", '"location2"') == (observation_time, '{"fake1": 2}')
+    cache.close()
+
+
 @pytest.mark.weather2
 def test_poll_location(volttron_instance, query_agent):
     agent = None
@@ -437,6 +437,58 @@ def test_agent_reference_config_and_callback_order(default_config_test_agent):
     assert second == ("config3", "NEW", {"value": 3})
 
 
+@pytest.mark.config_store
+def test_set_configs_callbacks_once(default_config_test_agent):
+    json_config = """{"config2":"config://config2", "config3":"config://config3"}"""
+    default_config_test_agent.vip.rpc.call(CONFIGURATION_STORE, 'set_config',
+                                           "config_test_agent", "config", json_config, config_type="json").get()
+    default_config_test_agent.reset_results()
+
+    configs = [{"config_name": "config2", "raw_contents": """{"value":2}""", "config_type": "json"},
+               {"config_name": "config3", "raw_contents": "value\n3", "config_type": "csv"}]
+    default_config_test_agent.vip.rpc.call(CONFIGURATION_STORE, 'set_configs',
+                                           "config_test_agent", configs).get()
+
+    # "config" references both changed configs but is only called back once.
+    results = default_config_test_agent.callback_results
+    assert len(results) == 3
+    assert results[0] == ("config", "UPDATE", {"config2": {"value": 2}, "config3": [{"value": "3"}]})
+    assert results[1:] == [("config2", "NEW", {"value": 2}), ("config3", "NEW", [{"value": "3"}])]
+
+
+@pytest.mark.config_store
+def test_set_configs_invalid_stores_nothing(default_config_test_agent):
+    configs = [{"config_name": "config", "raw_contents": """{"value":1}""", "config_type": "json"},
+               {"config_name": "config2", "raw_contents": "not json", "config_type": "json"}]
+    with pytest.raises(jsonrpc.RemoteError):
+        default_config_test_agent.vip.rpc.call(CONFIGURATION_STORE, 'set_configs',
+                                               "config_test_agent", configs).get()
+
+    assert default_config_test_agent.callback_results == []
+    config_list = default_config_test_agent.vip.rpc.call(CONFIGURATION_STORE, 'list_configs',
+                                                         "config_test_agent").get()
+    assert config_list == []
+
+
+@pytest.mark.config_store
+def test_store_version_changes_with_store(default_config_test_agent):
+    def get_version():
+        return default_config_test_agent.vip.rpc.call(CONFIGURATION_STORE, 'get_store_version',
+                                                      "config_test_agent").get()
+
+    version = get_version()
+    assert get_version() == version
+
+    default_config_test_agent.vip.rpc.call(CONFIGURATION_STORE, 'set_config',
+                                           "config_test_agent", "config", "value").get()
+    set_version = get_version()
+    assert set_version != version
+
+    default_config_test_agent.vip.rpc.call(CONFIGURATION_STORE, 'delete_config',
+                                           "config_test_agent", "config").get()
+    assert get_version() not in (version, set_version)
+
+
 @pytest.mark.config_store
 def test_agent_set_config(default_config_test_agent, volttron_instance):
     json_config = {"value": 1}
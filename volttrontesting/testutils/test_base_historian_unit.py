@@ -1,13 +1,17 @@
 import datetime
 import os
+import sqlite3
 from shutil import rmtree
 from pathlib import Path
 
+import gevent
 import pytest
 from pytz import UTC
 
 from volttrontesting.utils.utils import AgentMock
-from volttron.platform.agent.base_historian import BaseHistorianAgent, Agent
+from volttron.platform.agent import utils
+from volttron.platform.agent.base_historian import BaseHistorianAgent, BaseQueryHistorianAgent, Agent, \
+    build_insert_batch
 
 
 agent_data_dir = os.path.join(os.getcwd(), os.path.basename(os.getcwd()) + ".agent-data")
@@ -88,6 +92,7 @@ def test_base_historian_agent_should_filter_duplicates(base_historian_agent):
 
 
 BaseHistorianAgent.__bases__ = (AgentMock.imitate(Agent, Agent()),)
+BaseQueryHistorianAgent.__bases__ = (AgentMock.imitate(Agent, Agent()),)
 
 
 class BaseHistorianAgentTestWrapper(BaseHistorianAgent):
@@ -121,3 +126,167 @@ def base_historian_agent():
         os.remove(CACHE_NAME)
     if os.path.exists(agent_data_dir):
         os.rmdir(agent_data_dir)
+
+
+def test_capture_device_data_should_queue_one_item_per_publish(base_historian_agent):
+    base_historian_agent._device_data_filter = {}
+    headers = {"Date": "2020-11-17 21:24:10.189393+00:00"}
+    message = [{"temperature": 72.5, "setpoint": 70, "mode": "cool"},
+               {"temperature": {"units": "F", "type": "float"}}]
+    base_historian_agent._capture_device_data(peer=None, sender=None, bus=None,
+                                              topic="devices/campus/building/rtu1/all",
+                                              headers=headers, message=message)
+
+    assert base_historian_agent._event_queue.qsize() == 1
+
+    base_historian_agent.start_process_thread()
+    gevent.sleep(0.5)
+
+    timestamp = datetime.datetime(2020, 11, 17, 21, 24, 10, 189393, tzinfo=UTC)
+    published = sorted(base_historian_agent.last_to_publish_list, key=lambda r: r["_id"])
+    assert [(r["topic"], r["value"], r["meta"], r["timestamp"], r["source"]) for r in published] == [
+        ("campus/building/rtu1/temperature", 72.5, {"units": "F", "type": "float"}, timestamp, "scrape"),
+        ("campus/building/rtu1/setpoint", 70, {}, timestamp, "scrape"),
+        ("campus/building/rtu1/mode", "cool", {}, timestamp, "scrape"),
+    ]
+
+
+def test_epoch_timestamps_should_reach_publish_as_seconds(base_historian_agent):
+    base_historian_agent._device_data_filter = {}
+    base_historian_agent._epoch_timestamps = True
+    headers = {"Date": "2020-11-17T21:24:10.189393+00:00"}
+    base_historian_agent._capture_device_data(peer=None, sender=None, bus=None,
+                                              topic="devices/campus/building/rtu1/all",
+                                              headers=headers, message=[{"temperature": 72.5}, {}])
+
+    base_historian_agent.start_process_thread()
+    gevent.sleep(0.5)
+
+    timestamp = datetime.datetime(2020, 11, 17, 21, 24, 10, 189393, tzinfo=UTC).timestamp()
+    assert [(r["topic"], r["timestamp"]) for r in base_historian_agent.last_to_publish_list] == \
+        [("campus/building/rtu1/temperature", timestamp)]
+
+
+def test_epoch_timestamps_should_be_rejected_by_historians_without_support():
+    with pytest.raises(ValueError):
+        BaseHistorianAgentTestWrapper(epoch_timestamps=True)
+
+
+def test_epoch_timestamps_should_only_convert_backup_cache_timestamps():
+    # Other sqlite connections keep parsing timestamp columns as datetimes
+    connection = sqlite3.connect(":memory:", detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES)
+    connection.execute("CREATE TABLE test (ts timestamp)")
+    connection.execute("INSERT INTO test VALUES (20201117)")
+    assert connection.execute("SELECT ts FROM test").fetchone()[0] == datetime.datetime(2020, 11, 17)
+    assert connection.execute('SELECT ts AS "ts [backup_timestamp]" FROM test').fetchone()[0] == 20.201117
+
+
+def test_insert_batch_should_queue_records_and_report_credit(base_historian_agent):
+    base_historian_agent._insert_queue_limit = 3
+    headers = {"Date": "2020-11-17 21:24:10.189393+00:00"}
+    records = [{"topic": "record/note", "headers": headers, "message": "a"},
+               {"topic": "record/other", "headers": headers, "message": "b"},
+               {"topic": "record/note", "headers": headers, "message": "c"}]
+    batch = build_insert_batch(records)
+
+    assert batch["topics"] == ["record/note", "record/other"]
+    assert batch["topic"] == [0, 1, 0]
+
+    assert base_historian_agent.insert_batch(build_insert_batch(records[:2])) == \
+        {"accepted": 2, "queue_depth": 2, "credit": 1}
+    assert base_historian_agent.insert_batch(batch) == {"accepted": 3, "queue_depth": 5, "credit": 0}
+    # The queue is over the limit so the next batch is rejected.
+    assert base_historian_agent.insert_batch(batch) == {"accepted": 0, "queue_depth": 5, "credit": 0}
+
+    queued = [base_historian_agent._event_queue.get_nowait() for _ in range(5)]
+    assert [(q["topic"], q["readings"][0][1]) for q in queued] == \
+        [("record/note", "a"), ("record/other", "b"), ("record/note", "a"), ("record/other", "b"),
+         ("record/note", "c")]
+
+
+class QueryHistorianTestWrapper(BaseQueryHistorianAgent):
+    """Answers queries from an in memory {topic: [(datetime, value), ...]} the way the SQL historians do."""
+    def __init__(self, data, **kwargs):
+        self.data = data
+        self.calls = []
+        super(QueryHistorianTestWrapper, self).__init__(**kwargs)
+
+    def query_historian(self, topic, start=None, end=None, agg_type=None, agg_period=None, skip=0, count=None,
+                        order=None):
+        self.calls.append((topic, skip, count))
+        rows = [(ts, value) for ts, value in self.data[topic]
+                if (start is None or ts >= start) and (end is None or ts < end)]
+        if order == "LAST_TO_FIRST":
+            rows.reverse()
+        rows = rows[skip:skip + count if count is not None else None]
+        if not rows:
+            return {}
+        return {"values": [(utils.format_timestamp(ts), value) for ts, value in rows],
+                "metadata": {"units": "F"}}
+
+    def query_topic_list(self):
+        return list(self.data)
+
+    def query_topics_metadata(self, topics):
+        return {}
+
+
+@pytest.fixture()
+def query_historian():
+    base = datetime.datetime(2020, 1, 1, tzinfo=UTC)
+    # topic "b" has two values at the same timestamp to exercise paging across equal timestamps
+    data = {"a": [(base + datetime.timedelta(minutes=i), i) for i in range(7)],
+            "b": [(base, 100), (base, 101), (base + datetime.timedelta(minutes=1), 102)]}
+    return QueryHistorianTestWrapper(data)
+
+
+@pytest.mark.parametrize("order", ["FIRST_TO_LAST", "LAST_TO_FIRST"])
+def test_query_cursor_should_page_through_results(query_historian, order):
+    cursor = query_historian.query_start(topic=["a", "b"], order=order)
+
+    pages = []
+    while True:
+        page = query_historian.query_next(cursor, 2)
+        pages.append(page)
+        if page["done"]:
+            break
+
+    values = {}
+    for page in pages:
+        assert sum(len(rows) for rows in page["values"].values()) <= 2
+        for topic, rows in page["values"].items():
+            values.setdefault(topic, []).extend(value for _, value in rows)
+    expected = {"a": list(range(7)), "b": [100, 101, 102]}
+    if order == "LAST_TO_FIRST":
+        expected = {"a": list(reversed(range(7))), "b": [102, 101, 100]}
+    assert values == expected
+    # every page only asked the historian for the rows it returned
+    assert all(count <= 2 for _, _, count in query_historian.calls)
+    assert cursor not in query_historian._query_cursors
+
+
+def test_query_cursor_single_topic_should_return_metadata_once(query_historian):
+    cursor = query_historian.query_start(topic="a", start="2020-01-01T00:02:00")
+
+    first = query_historian.query_next(cursor, 3)
+    second = query_historian.query_next(cursor, 3)
+
+    assert [value for _, value in first["values"]] == [2, 3, 4]
+    assert first["metadata"] == {"units": "F"}
+    assert not first["done"]
+    assert [value for _, value in second["values"]] == [5, 6]
+    assert second["metadata"] == {}
+    assert second["done"]
+
+
+def test_query_cursor_should_expire(query_historian):
+    cursor = query_historian.query_start(topic="a")
+    query_historian._query_cursors[cursor].expires = 0
+
+    with pytest.raises(ValueError):
+        query_historian.query_next(cursor, 10)
+
+    closed = query_historian.query_start(topic="a")
+    query_historian.query_close(closed)
+    with pytest.raises(ValueError):
+        query_historian.query_next(closed, 10)